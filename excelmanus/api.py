@@ -1114,6 +1114,11 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     # 将 Docker 沙盒状态传播到会话管理器，用于按工作区注入。
     if _session_manager is not None:
         await _session_manager.set_sandbox_docker_enabled(_docker_env)
+        # 预热引擎池：匿名模式启动即预构造；认证模式在用户首个会话后按用户补充
+        if not auth_enabled:
+            _fire_and_forget(
+                _session_manager.prewarm_engines(), name="engine_pool_prewarm",
+            )
 
     logger.info(
         "API 服务启动完成，已加载 %d 个工具、%d 个 Skillpack",
@@ -8904,8 +8909,23 @@ async def health(request: Request) -> dict:
         skillpacks = sorted(_skillpack_loader.get_skillpacks().keys())
 
     active_sessions = 0
+    engine_pool: dict[str, Any] | None = None
     if _session_manager is not None:
         active_sessions = await _session_manager.get_active_count()
+        engine_pool = _session_manager.engine_pool_stats()
+    try:
+        from excelmanus.tools.code_tools import run_code_stats
+
+        run_code_metrics = run_code_stats()
+    except Exception:
+        run_code_metrics = None
+    mcp_call_metrics: dict[str, Any] | None = None
+    _mcp_manager = getattr(_session_manager, "_shared_mcp_manager", None)
+    if _mcp_manager is not None:
+        try:
+            mcp_call_metrics = _mcp_manager.call_stats()
+        except Exception:
+            mcp_call_metrics = None
 
     auth_enabled = os.environ.get("EXCELMANUS_AUTH_ENABLED", "").strip().lower() in ("1", "true", "yes")
 
@@ -8941,6 +8961,9 @@ async def health(request: Request) -> dict:
         "tools": tools,
         "skillpacks": skillpacks,
         "active_sessions": active_sessions,
+        "engine_pool": engine_pool,
+        "run_code": run_code_metrics,
+        "mcp_calls": mcp_call_metrics,
         "auth_enabled": auth_enabled,
         "login_methods": login_methods,
         "session_isolation_enabled": getattr(request.app.state, "session_isolation_enabled", False),
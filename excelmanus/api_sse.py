@@ -208,6 +208,7 @@ def sse_event_to_sse(
         EventType.THINKING_DELTA,
         EventType.TOOL_CALL_START,
         EventType.TOOL_CALL_END,
+        EventType.TOOL_OUTPUT_DELTA,
         EventType.ITERATION_START,
         EventType.SUBAGENT_START,
         EventType.SUBAGENT_ITERATION,
@@ -249,6 +250,7 @@ def sse_event_to_sse(
         EventType.THINKING_DELTA: "thinking_delta",
         EventType.TEXT_DELTA: "text_delta",
         EventType.TOOL_CALL_ARGS_DELTA: "tool_call_args_delta",
+        EventType.TOOL_OUTPUT_DELTA: "tool_output_delta",
         EventType.EXCEL_PREVIEW: "excel_preview",
         EventType.EXCEL_DIFF: "excel_diff",
         EventType.TEXT_DIFF: "text_diff",
@@ -448,6 +450,13 @@ def sse_event_to_sse(
             "tool_name": event.tool_name,
             "args_delta": event.args_delta,
         }
+    elif event.event_type == EventType.TOOL_OUTPUT_DELTA:
+        data = {
+            "tool_call_id": sanitize_external_text(event.tool_call_id, max_len=160),
+            "tool_name": event.tool_name,
+            "stream": event.output_stream,
+            "content": sanitize_external_text(event.output_delta, max_len=4000),
+        }
     elif event.event_type == EventType.PENDING_APPROVAL:
         data = {
             "approval_id": sanitize_external_text(event.approval_id or "", max_len=120),
@@ -0,0 +1,230 @@
+"""数据库并发微基准：对比单连接与连接池下多线程读写的吞吐与延迟。
+
+模拟多个会话在 ``asyncio.to_thread`` 工作线程中同时访问 Store 的场景：
+每个工作线程按比例混合执行点查 / 聚合查询与带 commit 的 INSERT。
+默认对同一 SQLite 文件分别以 ``pool_size=0``（单连接，旧行为）和
+``pool_size=N``（WAL 读连接池 + 串行写连接）运行并输出对比。
+
+运行方式：
+    python -m excelmanus.bench_db
+    python -m excelmanus.bench_db --threads 32 --ops 500 --write-ratio 0.1
+    python -m excelmanus.bench_db --pool-sizes 0 4 16 --json
+    python -m excelmanus.bench_db --database-url postgresql://... --pool-sizes 1 10
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import tempfile
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+from excelmanus.db_adapter import ConnectionAdapter, create_pg_adapter, create_sqlite_adapter
+
+_SEED_ROWS = 2000
+
+
+@dataclass
+class ConcurrencyBenchResult:
+    """一组 (后端, 池大小) 配置的基准结果。"""
+
+    backend: str
+    pool_size: int
+    threads: int
+    ops_per_thread: int
+    write_ratio: float
+    elapsed_s: float
+    ops_per_s: float
+    read_p50_ms: float
+    read_p95_ms: float
+    write_p50_ms: float
+    write_p95_ms: float
+    errors: int = 0
+    pool_stats: dict[str, Any] = field(default_factory=dict)
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return round(ordered[idx] * 1000, 3)
+
+
+def _prepare(adapter: ConnectionAdapter) -> None:
+    adapter.execute("DROP TABLE IF EXISTS bench_db_calls")
+    adapter.execute(
+        "CREATE TABLE bench_db_calls ("
+        "  id INTEGER PRIMARY KEY, session_id TEXT NOT NULL,"
+        "  tool_name TEXT NOT NULL, duration_ms REAL NOT NULL)"
+        if not adapter.is_pg else
+        "CREATE TABLE bench_db_calls ("
+        "  id SERIAL PRIMARY KEY, session_id TEXT NOT NULL,"
+        "  tool_name TEXT NOT NULL, duration_ms REAL NOT NULL)"
+    )
+    adapter.execute("CREATE INDEX idx_bench_db_calls_session ON bench_db_calls(session_id)")
+    adapter.executemany(
+        "INSERT INTO bench_db_calls (session_id, tool_name, duration_ms) VALUES (?, ?, ?)",
+        [(f"s{i % 64}", f"tool{i % 13}", float(i % 97)) for i in range(_SEED_ROWS)],
+    )
+    adapter.commit()
+
+
+def _open(database_url: str, db_path: str, pool_size: int) -> ConnectionAdapter:
+    if database_url:
+        return create_pg_adapter(database_url, max_connections=max(1, pool_size))
+    return create_sqlite_adapter(db_path, max_readers=pool_size)
+
+
+def bench_concurrency(
+    *,
+    pool_size: int,
+    threads: int = 16,
+    ops: int = 200,
+    write_ratio: float = 0.2,
+    db_path: str | Path | None = None,
+    database_url: str = "",
+) -> ConcurrencyBenchResult:
+    """在 ``threads`` 个线程中各执行 ``ops`` 次混合读写，返回吞吐与延迟分位数。"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(db_path or Path(tmp) / "bench_db.sqlite")
+        adapter = _open(database_url, path, pool_size)
+        try:
+            _prepare(adapter)
+            reads: list[list[float]] = [[] for _ in range(threads)]
+            writes: list[list[float]] = [[] for _ in range(threads)]
+            errors = [0] * threads
+            barrier = threading.Barrier(threads)
+
+            def _worker(idx: int) -> None:
+                rng = random.Random(idx)
+                barrier.wait()
+                for n in range(ops):
+                    session = f"s{rng.randrange(64)}"
+                    t0 = time.perf_counter()
+                    try:
+                        if rng.random() < write_ratio:
+                            adapter.execute(
+                                "INSERT INTO bench_db_calls (session_id, tool_name, duration_ms) "
+                                "VALUES (?, ?, ?)",
+                                (session, f"tool{n % 13}", rng.random() * 100),
+                            )
+                            adapter.commit()
+                            writes[idx].append(time.perf_counter() - t0)
+                        else:
+                            if n % 4 == 0:
+                                adapter.execute(
+                                    "SELECT tool_name, COUNT(*) AS cnt, AVG(duration_ms) AS avg_ms "
+                                    "FROM bench_db_calls WHERE session_id = ? "
+                                    "GROUP BY tool_name ORDER BY cnt DESC",
+                                    (session,),
+                                ).fetchall()
+                            else:
+                                adapter.execute(
+                                    "SELECT * FROM bench_db_calls WHERE session_id = ? "
+                                    "ORDER BY id DESC LIMIT 20",
+                                    (session,),
+                                ).fetchall()
+                            reads[idx].append(time.perf_counter() - t0)
+                    except Exception:
+                        errors[idx] += 1
+
+            workers = [threading.Thread(target=_worker, args=(i,)) for i in range(threads)]
+            t_start = time.perf_counter()
+            for w in workers:
+                w.start()
+            for w in workers:
+                w.join()
+            elapsed = time.perf_counter() - t_start
+
+            all_reads = [v for bucket in reads for v in bucket]
+            all_writes = [v for bucket in writes for v in bucket]
+            pool = adapter.pool
+            return ConcurrencyBenchResult(
+                backend=adapter.backend,
+                pool_size=pool_size,
+                threads=threads,
+                ops_per_thread=ops,
+                write_ratio=write_ratio,
+                elapsed_s=round(elapsed, 4),
+                ops_per_s=round((len(all_reads) + len(all_writes)) / elapsed, 1) if elapsed else 0.0,
+                read_p50_ms=_percentile(all_reads, 50),
+                read_p95_ms=_percentile(all_reads, 95),
+                write_p50_ms=_percentile(all_writes, 50),
+                write_p95_ms=_percentile(all_writes, 95),
+                errors=sum(errors),
+                pool_stats=pool.stats() if pool is not None else {},
+            )
+        finally:
+            try:
+                adapter.execute("DROP TABLE IF EXISTS bench_db_calls")
+                adapter.commit()
+            except Exception:
+                pass
+            adapter.close()
+
+
+def _format_results(results: list[ConcurrencyBenchResult]) -> str:
+    lines = [
+        f"后端: {results[0].backend}  线程: {results[0].threads}  "
+        f"每线程操作: {results[0].ops_per_thread}  写比例: {results[0].write_ratio:.0%}",
+        f"{'pool':>6} {'ops/s':>10} {'read p50':>10} {'read p95':>10} "
+        f"{'write p50':>10} {'write p95':>10} {'errors':>7}",
+    ]
+    for r in results:
+        lines.append(
+            f"{r.pool_size:>6} {r.ops_per_s:>10.1f} {r.read_p50_ms:>9.2f}ms "
+            f"{r.read_p95_ms:>9.2f}ms {r.write_p50_ms:>9.2f}ms {r.write_p95_ms:>9.2f}ms "
+            f"{r.errors:>7}"
+        )
+    return "\n".join(lines)
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m excelmanus.bench_db",
+        description="数据库连接池并发微基准",
+    )
+    parser.add_argument("--threads", type=int, default=16, help="并发工作线程数")
+    parser.add_argument("--ops", type=int, default=200, help="每线程操作次数")
+    parser.add_argument("--write-ratio", type=float, default=0.2, help="写操作比例 (0~1)")
+    parser.add_argument(
+        "--pool-sizes", type=int, nargs="+", default=[0, 8],
+        help="待对比的池大小（SQLite 为读连接数，0 表示单连接）",
+    )
+    parser.add_argument("--db-path", default=None, help="SQLite 文件路径（缺省时使用临时文件）")
+    parser.add_argument("--database-url", default="", help="PostgreSQL 连接 URL")
+    parser.add_argument("--json", action="store_true", help="以 JSON 输出")
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _build_parser().parse_args(argv)
+    results = [
+        bench_concurrency(
+            pool_size=size,
+            threads=args.threads,
+            ops=args.ops,
+            write_ratio=args.write_ratio,
+            db_path=args.db_path,
+            database_url=args.database_url,
+        )
+        for size in args.pool_sizes
+    ]
+    if args.json:
+        print(json.dumps([r.to_dict() for r in results], ensure_ascii=False, indent=2))
+    else:
+        print(_format_results(results))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,198 @@
+"""I/O 微基准：统计单次工具调用触发的文件解析次数与耗时。
+
+与 :mod:`excelmanus.bench`（端到端 LLM 用例）互补，本模块不调用模型，
+只测量数据读取路径本身，便于回归检查"一次调用解析几次 xlsx"。
+
+运行方式：
+    python -m excelmanus.bench_io read-df
+    python -m excelmanus.bench_io read-df --file data.xlsx --sheet 销售 --rounds 5
+    python -m excelmanus.bench_io read-df --rows 50000 --json
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import json
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Iterator
+
+
+@dataclass
+class ParseCounts:
+    """一段代码内各解析入口的调用次数。"""
+
+    load_workbook: int = 0
+    read_excel: int = 0
+    read_csv: int = 0
+
+    @property
+    def total(self) -> int:
+        return self.load_workbook + self.read_excel + self.read_csv
+
+
+@contextlib.contextmanager
+def count_parses() -> Iterator[ParseCounts]:
+    """临时包装 openpyxl / pandas 的解析入口，统计调用次数。
+
+    ``pd.read_excel`` 内部也会调用 ``openpyxl.load_workbook``，因此一次
+    read_excel 会同时计入两项；比较不同实现时以 ``load_workbook`` 为准。
+    """
+    import openpyxl
+    import pandas as pd
+
+    counts = ParseCounts()
+    originals = {
+        "load_workbook": (openpyxl, openpyxl.load_workbook),
+        "read_excel": (pd, pd.read_excel),
+        "read_csv": (pd, pd.read_csv),
+    }
+
+    def _wrap(name: str, fn: Any) -> Any:
+        def _counting(*args: Any, **kwargs: Any) -> Any:
+            setattr(counts, name, getattr(counts, name) + 1)
+            return fn(*args, **kwargs)
+        return _counting
+
+    for name, (module, fn) in originals.items():
+        setattr(module, name, _wrap(name, fn))
+    try:
+        yield counts
+    finally:
+        for name, (module, fn) in originals.items():
+            setattr(module, name, fn)
+
+
+@dataclass
+class ReadDfBenchResult:
+    """``_read_df`` 基准结果。"""
+
+    file: str
+    sheet: str | None
+    rows: int
+    columns: int
+    header_row: int | None
+    cold_ms: float
+    cold_parses: ParseCounts
+    warm_ms: list[float] = field(default_factory=list)
+    warm_parses: list[ParseCounts] = field(default_factory=list)
+
+    def to_dict(self) -> dict[str, Any]:
+        data = asdict(self)
+        data["cold_parses"]["total"] = self.cold_parses.total
+        for item, counts in zip(data["warm_parses"], self.warm_parses):
+            item["total"] = counts.total
+        return data
+
+
+def make_sample_workbook(
+    path: str | Path,
+    *,
+    rows: int = 5000,
+    columns: int = 12,
+    title_row: bool = True,
+) -> Path:
+    """生成带标题行的示例工作簿（表头在第 2 行，触发表头自动检测）。"""
+    from openpyxl import Workbook
+
+    path = Path(path)
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "数据"
+    if title_row:
+        ws.append(["2024年度销售明细报表"])
+        ws.merge_cells(start_row=1, start_column=1, end_row=1, end_column=columns)
+    ws.append(["日期", "产品", "地区"] + [f"指标{i}" for i in range(columns - 3)])
+    for r in range(rows):
+        ws.append(
+            [f"2024-01-{r % 28 + 1:02d}", f"P{r % 17}", f"区域{r % 5}"]
+            + [(r * (c + 1)) % 997 for c in range(columns - 3)]
+        )
+    wb.save(path)
+    return path
+
+
+def bench_read_df(
+    file_path: str | Path,
+    sheet_name: str | None = None,
+    *,
+    rounds: int = 3,
+) -> ReadDfBenchResult:
+    """测量 ``_read_df`` 冷启动（清空解析缓存）与后续重复调用的解析次数和耗时。"""
+    from excelmanus.tools._read_cache import get_read_cache
+    from excelmanus.tools.data_tools import _read_df
+
+    get_read_cache().clear()
+
+    with count_parses() as cold:
+        t0 = time.perf_counter()
+        df, header = _read_df(file_path, sheet_name)
+        cold_ms = (time.perf_counter() - t0) * 1000
+
+    result = ReadDfBenchResult(
+        file=str(file_path),
+        sheet=sheet_name,
+        rows=len(df),
+        columns=len(df.columns),
+        header_row=header,
+        cold_ms=round(cold_ms, 2),
+        cold_parses=cold,
+    )
+    for _ in range(max(0, rounds)):
+        with count_parses() as warm:
+            t0 = time.perf_counter()
+            _read_df(file_path, sheet_name)
+            result.warm_ms.append(round((time.perf_counter() - t0) * 1000, 2))
+        result.warm_parses.append(warm)
+    return result
+
+
+def _format_read_df(result: ReadDfBenchResult) -> str:
+    lines = [
+        f"文件: {result.file}  sheet: {result.sheet or '(默认)'}",
+        f"结果: {result.rows} 行 × {result.columns} 列, header_row={result.header_row}",
+        f"冷启动: {result.cold_ms:.1f} ms, 解析 {result.cold_parses.total} 次 "
+        f"(load_workbook={result.cold_parses.load_workbook}, "
+        f"read_excel={result.cold_parses.read_excel})",
+    ]
+    for i, (ms, counts) in enumerate(zip(result.warm_ms, result.warm_parses), 1):
+        lines.append(f"重复 #{i}: {ms:.1f} ms, 解析 {counts.total} 次")
+    return "\n".join(lines)
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m excelmanus.bench_io",
+        description="数据读取路径 I/O 微基准",
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    read_df = sub.add_parser("read-df", help="统计 _read_df 每次调用的解析次数")
+    read_df.add_argument("--file", help="待测 xlsx 文件（缺省时生成示例文件）")
+    read_df.add_argument("--sheet", default=None, help="工作表名（默认第一个）")
+    read_df.add_argument("--rows", type=int, default=5000, help="示例文件数据行数")
+    read_df.add_argument("--rounds", type=int, default=3, help="重复调用次数")
+    read_df.add_argument("--json", action="store_true", help="以 JSON 输出")
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _build_parser().parse_args(argv)
+    if args.command == "read-df":
+        with tempfile.TemporaryDirectory() as tmp:
+            file_path = args.file or make_sample_workbook(
+                Path(tmp) / "bench_read_df.xlsx", rows=args.rows,
+            )
+            result = bench_read_df(file_path, args.sheet, rounds=args.rounds)
+        if args.json:
+            print(json.dumps(result.to_dict(), ensure_ascii=False, indent=2))
+        else:
+            print(_format_read_df(result))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
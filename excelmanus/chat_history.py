@@ -10,13 +10,23 @@ import logging
 from datetime import datetime, timezone
 from typing import TYPE_CHECKING, Any, overload
 
-from excelmanus.db_adapter import ConnectionAdapter, user_filter_clause
+from excelmanus.db_adapter import (
+    ConnectionAdapter,
+    register_prepared_statement,
+    user_filter_clause,
+)
 
 if TYPE_CHECKING:
     from excelmanus.database import Database
 
 logger = logging.getLogger(__name__)
 
+_INSERT_MESSAGE_SQL = (
+    "INSERT INTO messages (session_id, role, content, turn_number, created_at) "
+    "VALUES (?, ?, ?, ?, ?)"
+)
+register_prepared_statement(_INSERT_MESSAGE_SQL)
+
 
 class ChatHistoryStore:
     """聊天记录存储（纯查询 / 写入层）。
@@ -243,11 +253,7 @@ class ChatHistoryStore:
             )
             for msg in messages
         ]
-        self._conn.executemany(
-            "INSERT INTO messages (session_id, role, content, turn_number, created_at) "
-            "VALUES (?, ?, ?, ?, ?)",
-            rows,
-        )
+        self._conn.executemany(_INSERT_MESSAGE_SQL, rows)
         self._conn.execute(
             "UPDATE sessions SET message_count = "
             "(SELECT COUNT(*) FROM messages WHERE session_id = ?), "
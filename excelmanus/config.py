@@ -396,6 +396,8 @@ class ExcelManusConfig:
     session_ttl_seconds: int = 1800
     max_sessions: int = 1000
     max_sessions_per_user: int = 0  # 每用户会话上限，0 表示不限制
+    engine_pool_size: int = 0  # 每个绑定键预热的 AgentEngine 数量，0 表示关闭
+    engine_pool_max_idle_seconds: int = 600  # 预热引擎最长闲置时间，超时后丢弃重建
     workspace_root: str = "."
     data_root: str = ""  # 集中数据目录（默认 ~/.excelmanus/data）
     deploy_mode: str = "standalone"  # standalone|server|docker — 部署模式
@@ -422,6 +424,8 @@ class ExcelManusConfig:
         "http://localhost:5173",
     )
     mcp_shared_manager: bool = False
+    mcp_schema_cache: bool = True  # 按配置哈希持久化 MCP 工具 schema，启动时先从缓存注册
+    mcp_connect_timeout_seconds: int = 30  # 单个 MCP Server 连接 + 工具发现的截止时间（秒）
     pool_enabled: bool = False  # 号池功能开关（默认关闭，灰度上线）
     pool_auto_enabled: bool = False  # 号池自动轮换开关（需 pool_enabled=True）
     pool_auto_interval_seconds: int = 60  # 自动轮换定时扫描间隔（秒）
@@ -565,6 +569,8 @@ class ExcelManusConfig:
     embedding_model: str = DEFAULT_EMBEDDING_MODEL
     embedding_dimensions: int = DEFAULT_EMBEDDING_DIMENSIONS
     embedding_timeout_seconds: float = 30.0
+    embedding_vector_storage: str = "memory"  # memory / mmap（预归一化矩阵 + ANN 索引）
+    embedding_vector_quantization: str = "float32"  # float32 / float16 / int8（仅 mmap）
     memory_semantic_top_k: int = 10
     memory_semantic_threshold: float = 0.3
     memory_semantic_fallback_recent: int = 5
@@ -928,6 +934,18 @@ def _parse_tool_schema_validation_mode(value: str | None) -> str:
     )
 
 
+def _parse_choice(value: str | None, name: str, choices: tuple[str, ...]) -> str:
+    """解析枚举配置项，未设置时返回 choices[0]。"""
+    if value is None or not value.strip():
+        return choices[0]
+    normalized = value.strip().lower()
+    if normalized in choices:
+        return normalized
+    raise ConfigError(
+        f"配置项 {name} 必须是 {list(choices)} 之一，当前值: {value!r}"
+    )
+
+
 _ALLOWED_CLI_LAYOUT_MODES = {"dashboard", "classic"}
 
 
@@ -1257,6 +1275,14 @@ def load_config() -> ExcelManusConfig:
         os.environ.get("EXCELMANUS_MAX_SESSIONS_PER_USER"),
         "EXCELMANUS_MAX_SESSIONS_PER_USER", 0,
     )
+    engine_pool_size = _parse_int_allow_zero(
+        os.environ.get("EXCELMANUS_ENGINE_POOL_SIZE"),
+        "EXCELMANUS_ENGINE_POOL_SIZE", 0,
+    )
+    engine_pool_max_idle_seconds = _parse_int(
+        os.environ.get("EXCELMANUS_ENGINE_POOL_MAX_IDLE_SECONDS"),
+        "EXCELMANUS_ENGINE_POOL_MAX_IDLE_SECONDS", 600,
+    )
 
     workspace_root = os.environ.get("EXCELMANUS_WORKSPACE_ROOT", ".")
     data_root = os.environ.get("EXCELMANUS_DATA_ROOT", "")
@@ -1347,6 +1373,16 @@ def load_config() -> ExcelManusConfig:
         "EXCELMANUS_MCP_SHARED_MANAGER",
         False,
     )
+    mcp_schema_cache = _parse_bool(
+        os.environ.get("EXCELMANUS_MCP_SCHEMA_CACHE"),
+        "EXCELMANUS_MCP_SCHEMA_CACHE",
+        True,
+    )
+    mcp_connect_timeout_seconds = _parse_int(
+        os.environ.get("EXCELMANUS_MCP_CONNECT_TIMEOUT"),
+        "EXCELMANUS_MCP_CONNECT_TIMEOUT",
+        30,
+    )
     pool_enabled = _parse_bool(
         os.environ.get("EXCELMANUS_POOL_ENABLED"),
         "EXCELMANUS_POOL_ENABLED",
@@ -1740,6 +1776,16 @@ def load_config() -> ExcelManusConfig:
     embedding_timeout_seconds = float(
         os.environ.get("EXCELMANUS_EMBEDDING_TIMEOUT_SECONDS", "30.0")
     )
+    embedding_vector_storage = _parse_choice(
+        os.environ.get("EXCELMANUS_EMBEDDING_VECTOR_STORAGE"),
+        "EXCELMANUS_EMBEDDING_VECTOR_STORAGE",
+        ("memory", "mmap"),
+    )
+    embedding_vector_quantization = _parse_choice(
+        os.environ.get("EXCELMANUS_EMBEDDING_VECTOR_QUANTIZATION"),
+        "EXCELMANUS_EMBEDDING_VECTOR_QUANTIZATION",
+        ("float32", "float16", "int8"),
+    )
     memory_semantic_top_k = _parse_int(
         os.environ.get("EXCELMANUS_MEMORY_SEMANTIC_TOP_K"),
         "EXCELMANUS_MEMORY_SEMANTIC_TOP_K",
@@ -1857,6 +1903,8 @@ def load_config() -> ExcelManusConfig:
         session_ttl_seconds=session_ttl_seconds,
         max_sessions=max_sessions,
         max_sessions_per_user=max_sessions_per_user,
+        engine_pool_size=engine_pool_size,
+        engine_pool_max_idle_seconds=engine_pool_max_idle_seconds,
         workspace_root=workspace_root,
         data_root=data_root,
         deploy_mode=deploy_mode,
@@ -1880,6 +1928,8 @@ def load_config() -> ExcelManusConfig:
         external_safe_mode=external_safe_mode,
         cors_allow_origins=cors_allow_origins,
         mcp_shared_manager=mcp_shared_manager,
+        mcp_schema_cache=mcp_schema_cache,
+        mcp_connect_timeout_seconds=mcp_connect_timeout_seconds,
         pool_enabled=pool_enabled,
         pool_auto_enabled=pool_auto_enabled,
         pool_auto_interval_seconds=pool_auto_interval_seconds,
@@ -1980,6 +2030,8 @@ def load_config() -> ExcelManusConfig:
         embedding_model=embedding_model,
         embedding_dimensions=embedding_dimensions,
         embedding_timeout_seconds=embedding_timeout_seconds,
+        embedding_vector_storage=embedding_vector_storage,
+        embedding_vector_quantization=embedding_vector_quantization,
         memory_semantic_top_k=memory_semantic_top_k,
         memory_semantic_threshold=memory_semantic_threshold,
         memory_semantic_fallback_recent=memory_semantic_fallback_recent,
@@ -7,9 +7,10 @@ import logging
 import re
 import shutil
 import sqlite3
+import threading
 from datetime import datetime
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 import numpy as np
 
@@ -20,6 +21,9 @@ from excelmanus.db_adapter import (
     create_sqlite_adapter,
 )
 
+if TYPE_CHECKING:
+    from excelmanus.stores.audit_sink import AuditSink
+
 logger = logging.getLogger(__name__)
 
 # ── SQLite 迁移 DDL ──────────────────────────────────────────
@@ -1006,6 +1010,8 @@ class Database:
             self._adapter = create_sqlite_adapter(db_path)
             self._db_path = db_path
             self._database_url = ""
+        self._audit_sink: AuditSink | None = None
+        self._audit_sink_lock = threading.Lock()
         self._ensure_schema_version_table()
         self._migrate()
 
@@ -1027,8 +1033,25 @@ class Database:
         """返回数据库文件路径（仅 SQLite 有意义）。"""
         return self._db_path
 
+    @property
+    def audit_sink(self) -> "AuditSink":
+        """工具 / LLM 调用审计日志的写后批量落盘队列（首次访问时创建）。"""
+        if self._audit_sink is None:
+            with self._audit_sink_lock:
+                if self._audit_sink is None:
+                    from excelmanus.stores.audit_sink import AuditSink
+                    self._audit_sink = AuditSink.from_env(self._adapter)
+        return self._audit_sink
+
+    def close_audit_sink(self) -> None:
+        """停止审计写线程并落盘积压记录（幂等）。"""
+        sink = self._audit_sink
+        if sink is not None:
+            sink.close()
+
     def close(self) -> None:
-        """关闭数据库连接。"""
+        """关闭数据库连接（先落盘审计日志队列）。"""
+        self.close_audit_sink()
         self._adapter.close()
 
     def _ensure_schema_version_table(self) -> None:
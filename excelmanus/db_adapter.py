@@ -11,8 +11,12 @@
 
 from __future__ import annotations
 
+import hashlib
 import re
 import sqlite3
+import threading
+from contextlib import contextmanager, nullcontext
+from functools import lru_cache
 from typing import Any, Iterator, Sequence
 
 __all__ = [
@@ -20,6 +24,8 @@ __all__ = [
     "CursorAdapter",
     "DictRow",
     "Backend",
+    "prepared_statement_name",
+    "register_prepared_statement",
     "user_filter_clause",
 ]
 
@@ -148,6 +154,39 @@ def _rewrite_insert_or_replace(sql: str) -> str:
     return sql + f" ON CONFLICT ({pk}) DO UPDATE SET {set_clause}"
 
 
+@lru_cache(maxsize=2048)
+def _translate_pg(sql: str) -> str:
+    """``_sqlite_to_pg`` 的记忆化版本：每条不同的 SQL 字面量只改写一次。"""
+    return _sqlite_to_pg(sql)
+
+
+# ── 预编译语句注册表 ─────────────────────────────────────────
+
+# SQLite 方言 SQL → 服务端预编译语句名（PG 启用预编译时使用）
+_prepared_statements: dict[str, str] = {}
+_prepared_lock = threading.Lock()
+
+
+def register_prepared_statement(sql: str) -> str:
+    """将高频 SQL 登记为 PG 服务端预编译语句候选，返回语句名。
+
+    仅在 ``EXCELMANUS_PG_PREPARED_STATEMENTS`` 开启时生效：每条连接首次
+    执行时 ``PREPARE``，之后以 ``EXECUTE`` 复用执行计划。
+    """
+    with _prepared_lock:
+        name = _prepared_statements.get(sql)
+        if name is None:
+            digest = hashlib.blake2b(sql.encode("utf-8"), digest_size=8).hexdigest()
+            name = f"em_{digest}"
+            _prepared_statements[sql] = name
+        return name
+
+
+def prepared_statement_name(sql: str) -> str | None:
+    """返回已登记 SQL 的预编译语句名，未登记时为 None。"""
+    return _prepared_statements.get(sql)
+
+
 # ── 游标适配 ─────────────────────────────────────────────────
 
 
@@ -194,13 +233,19 @@ class CursorAdapter:
 
 
 class ConnectionAdapter:
-    """统一连接接口：所有 Store 通过此对象执行 SQL。"""
+    """统一连接接口：所有 Store 通过此对象执行 SQL。
+
+    持有连接池（见 :mod:`excelmanus.db_pool`）时，SQL 经由池路由到
+    读连接 / 串行写连接（SQLite）或按语句借还的连接（PostgreSQL）；
+    否则直接使用传入的单条连接。
+    """
 
-    __slots__ = ("_conn", "_backend")
+    __slots__ = ("_conn", "_backend", "_pool")
 
-    def __init__(self, conn: Any, backend: str) -> None:
+    def __init__(self, conn: Any, backend: str, *, pool: Any = None) -> None:
         self._conn = conn
         self._backend = backend
+        self._pool = pool
 
     @property
     def backend(self) -> str:
@@ -210,6 +255,11 @@ class ConnectionAdapter:
     def is_pg(self) -> bool:
         return self._backend == Backend.POSTGRES
 
+    @property
+    def pool(self) -> Any:
+        """底层连接池（未启用时为 None）。"""
+        return self._pool
+
     @property
     def raw(self) -> Any:
         """返回底层原始连接（仅迁移 / 特殊场景使用）。"""
@@ -223,7 +273,15 @@ class ConnectionAdapter:
         return 0
 
     def execute(self, sql: str, params: Any = None) -> CursorAdapter:
-        real_sql = sql if self._backend == Backend.SQLITE else _sqlite_to_pg(sql)
+        real_sql = sql if self._backend == Backend.SQLITE else _translate_pg(sql)
+        if self._pool is not None:
+            if self._backend == Backend.POSTGRES and params:
+                name = prepared_statement_name(sql)
+                if name is not None:
+                    return CursorAdapter(
+                        self._pool.execute(real_sql, params, prepared=name), self._backend,
+                    )
+            return CursorAdapter(self._pool.execute(real_sql, params), self._backend)
         if self._backend == Backend.SQLITE:
             if params is None:
                 cursor = self._conn.execute(real_sql)
@@ -239,7 +297,21 @@ class ConnectionAdapter:
         return CursorAdapter(cursor, self._backend)
 
     def executemany(self, sql: str, params_seq: Sequence) -> CursorAdapter:
-        real_sql = sql if self._backend == Backend.SQLITE else _sqlite_to_pg(sql)
+        real_sql = sql if self._backend == Backend.SQLITE else _translate_pg(sql)
+        if self._pool is not None:
+            if (
+                self._backend == Backend.POSTGRES
+                and isinstance(params_seq, (list, tuple))
+                and len(params_seq) == 1
+            ):
+                # 单行批量（如单条消息落盘）走预编译语句；多行由 execute_values 合并
+                name = prepared_statement_name(sql)
+                if name is not None:
+                    return CursorAdapter(
+                        self._pool.execute(real_sql, params_seq[0], prepared=name),
+                        self._backend,
+                    )
+            return CursorAdapter(self._pool.executemany(real_sql, params_seq), self._backend)
         if self._backend == Backend.SQLITE:
             cursor = self._conn.executemany(real_sql, params_seq)
         else:
@@ -255,20 +327,54 @@ class ConnectionAdapter:
     def executescript(self, script: str) -> None:
         """执行多条 SQL 语句（仅 SQLite 使用，PG 用 execute 逐条）。"""
         if self._backend == Backend.SQLITE:
-            self._conn.executescript(script)
+            if self._pool is not None:
+                self._pool.executescript(script)
+            else:
+                self._conn.executescript(script)
+        elif self._pool is not None:
+            with self._pool.connection() as conn:
+                self._execute_pg_script(conn, script)
         else:
-            cursor = self._conn.cursor()
-            for stmt in script.split(";"):
-                stmt = stmt.strip()
-                if stmt:
-                    cursor.execute(stmt)
-            cursor.close()
+            self._execute_pg_script(self._conn, script)
+
+    @staticmethod
+    def _execute_pg_script(conn: Any, script: str) -> None:
+        cursor = conn.cursor()
+        for stmt in script.split(";"):
+            stmt = stmt.strip()
+            if stmt:
+                cursor.execute(stmt)
+        cursor.close()
 
     def commit(self) -> None:
-        self._conn.commit()
+        if self._pool is not None:
+            self._pool.commit()
+        else:
+            self._conn.commit()
+
+    @contextmanager
+    def savepoint(self, name: str) -> Iterator[None]:
+        """在命名保存点内执行一组语句：异常时只撤销保存点之后的写入。
+
+        连接上其他 Store 尚未提交的语句不受影响。持有连接池时作用域内独占
+        写连接（SQLite）或借出的连接（PostgreSQL）；提交仍由调用方负责。
+        """
+        scope = self._pool.exclusive() if self._pool is not None else nullcontext()
+        with scope:
+            self.execute(f"SAVEPOINT {name}")
+            try:
+                yield
+            except BaseException:
+                self.execute(f"ROLLBACK TO SAVEPOINT {name}")
+                self.execute(f"RELEASE SAVEPOINT {name}")
+                raise
+            self.execute(f"RELEASE SAVEPOINT {name}")
 
     def close(self) -> None:
-        self._conn.close()
+        if self._pool is not None:
+            self._pool.close()
+        else:
+            self._conn.close()
 
     @property
     def row_factory(self) -> Any:
@@ -279,7 +385,10 @@ class ConnectionAdapter:
     @row_factory.setter
     def row_factory(self, value: Any) -> None:
         if self._backend == Backend.SQLITE:
-            self._conn.row_factory = value
+            if self._pool is not None:
+                self._pool.row_factory = value
+            else:
+                self._conn.row_factory = value
 
     def table_exists(self, table_name: str) -> bool:
         """跨后端检查表是否存在。"""
@@ -300,21 +409,37 @@ class ConnectionAdapter:
 # ── 工厂 ─────────────────────────────────────────────────────
 
 
-def create_sqlite_adapter(db_path: str) -> ConnectionAdapter:
-    """创建 SQLite 连接适配器。"""
+def create_sqlite_adapter(
+    db_path: str, *, max_readers: int | None = None,
+) -> ConnectionAdapter:
+    """创建 SQLite 连接适配器（WAL 读连接池 + 串行写连接）。
+
+    ``max_readers`` 为 0 或数据库为内存库时不启用读连接池。
+    """
     from pathlib import Path
-    Path(db_path).parent.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(db_path, check_same_thread=False)
-    conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA journal_mode=WAL")
-    conn.execute("PRAGMA busy_timeout=5000")
-    conn.execute("PRAGMA foreign_keys=ON")
-    return ConnectionAdapter(conn, Backend.SQLITE)
-
-
-def create_pg_adapter(database_url: str) -> ConnectionAdapter:
-    """创建 PostgreSQL 连接适配器。"""
-    import psycopg2
-    conn = psycopg2.connect(database_url)
-    conn.autocommit = False
-    return ConnectionAdapter(conn, Backend.POSTGRES)
+
+    from excelmanus.db_pool import SqliteConnectionPool, default_pool_size
+
+    in_memory = db_path in ("", ":memory:") or db_path.startswith("file::memory:")
+    if not in_memory:
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+    readers = default_pool_size(Backend.SQLITE) if max_readers is None else max_readers
+    if in_memory or readers <= 0:
+        conn = sqlite3.connect(db_path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        conn.execute("PRAGMA foreign_keys=ON")
+        return ConnectionAdapter(conn, Backend.SQLITE)
+    pool = SqliteConnectionPool(db_path, max_readers=readers)
+    return ConnectionAdapter(pool.writer, Backend.SQLITE, pool=pool)
+
+
+def create_pg_adapter(
+    database_url: str, *, max_connections: int | None = None,
+) -> ConnectionAdapter:
+    """创建 PostgreSQL 连接适配器（有界线程连接池）。"""
+    from excelmanus.db_pool import PgConnectionPool
+
+    pool = PgConnectionPool(database_url, max_connections=max_connections)
+    return ConnectionAdapter(pool.primary, Backend.POSTGRES, pool=pool)
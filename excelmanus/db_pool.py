@@ -0,0 +1,480 @@
+"""数据库连接池：SQLite（WAL 读连接池 + 串行写连接）与 PostgreSQL（有界线程连接池）。
+
+``ConnectionAdapter`` 持有池对象时，所有 SQL 经由池路由：
+
+SQLite：
+- 写语句、``PRAGMA``、事务控制统一走唯一的写连接，并以锁串行化；
+- ``SELECT`` 从只读连接池借出连接执行（WAL 下可与写入并发），结果立即取完、
+  语句释放后归还，既不长期持有旧快照，也让少量连接服务任意多线程；
+- 写连接存在未提交事务时，读语句回退到写连接，保证读到自己的写入。
+
+PostgreSQL：
+- 每条语句（或 ``connection()`` 作用域内的一组语句）从 ``ThreadedConnectionPool``
+  借出一条连接，结束时提交（异常时回滚）并立即归还，连接不随线程长期占用；
+  池耗尽时串行共用主连接；
+- ``executemany`` 对 ``INSERT ... VALUES (...)`` 使用 ``execute_values``
+  单语句批量写入，其余语句使用 ``execute_batch``；
+- 开启 ``EXCELMANUS_PG_PREPARED_STATEMENTS`` 后，经
+  ``register_prepared_statement`` 登记的高频语句在每条连接上 ``PREPARE``
+  一次，之后以 ``EXECUTE`` 执行（PgBouncer 事务池模式下不要开启）。
+
+池大小由 ``EXCELMANUS_DB_POOL_SIZE`` 控制（SQLite 为读连接数，PG 为最大连接数）。
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import re
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Any, Iterator, Sequence
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "PgConnectionPool",
+    "SqliteConnectionPool",
+    "default_pool_size",
+    "prepared_statements_enabled",
+    "split_values_template",
+]
+
+_DEFAULT_SQLITE_READERS = 8
+_DEFAULT_PG_MAX_CONNECTIONS = 10
+_PG_BATCH_PAGE_SIZE = 500
+
+_READ_SQL_RE = re.compile(r"^\s*SELECT\b", re.IGNORECASE)
+# 依赖连接级状态的函数必须在写连接上执行
+_WRITER_STATE_RE = re.compile(r"\b(?:last_insert_rowid|changes|total_changes)\s*\(", re.IGNORECASE)
+_PG_PLACEHOLDER_RE = re.compile(r"%s")
+_PG_INVALID_STATEMENT_NAME = "26000"
+_PG_VALUES_RE = re.compile(
+    r"^(?P<head>.*?\bVALUES\s*)(?P<tpl>\(\s*%s(?:\s*,\s*%s)*\s*\))(?P<tail>.*)$",
+    re.IGNORECASE | re.DOTALL,
+)
+
+
+def default_pool_size(backend: str) -> int:
+    """读取 ``EXCELMANUS_DB_POOL_SIZE``，未设置或非法时按后端取默认值。"""
+    default = _DEFAULT_PG_MAX_CONNECTIONS if backend == "postgres" else _DEFAULT_SQLITE_READERS
+    raw = os.environ.get("EXCELMANUS_DB_POOL_SIZE", "").strip()
+    if not raw:
+        return default
+    try:
+        value = int(raw)
+    except ValueError:
+        return default
+    return max(0, value)
+
+
+def split_values_template(sql: str) -> tuple[str, str] | None:
+    """将 ``INSERT ... VALUES (%s, ...) [tail]`` 拆为 execute_values 的 (sql, template)。
+
+    VALUES 之后仍有占位符（如 ``ON CONFLICT ... SET x = %s``）时返回 None。
+    """
+    m = _PG_VALUES_RE.match(sql)
+    if m is None or "%s" in m.group("tail"):
+        return None
+    return f"{m.group('head')}%s{m.group('tail')}", m.group("tpl")
+
+
+def prepared_statements_enabled() -> bool:
+    return os.environ.get("EXCELMANUS_PG_PREPARED_STATEMENTS", "").strip().lower() in (
+        "1", "true", "yes", "on",
+    )
+
+
+def _to_positional(sql: str) -> tuple[str, int]:
+    """``%s`` 占位符改写为 ``$1..$n``（PREPARE 语法），返回 (sql, 参数个数)。"""
+    counter = 0
+
+    def _next(_: re.Match[str]) -> str:
+        nonlocal counter
+        counter += 1
+        return f"${counter}"
+
+    return _PG_PLACEHOLDER_RE.sub(_next, sql), counter
+
+
+def _open_sqlite(db_path: str, *, read_only: bool = False) -> sqlite3.Connection:
+    conn = sqlite3.connect(db_path, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA busy_timeout=5000")
+    if read_only:
+        conn.execute("PRAGMA query_only=ON")
+    else:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+    return conn
+
+
+class _BufferedCursor:
+    """已取完结果的游标（只读连接查询后立即释放语句）。"""
+
+    __slots__ = ("_rows", "_pos", "_rowcount", "description")
+
+    def __init__(self, rows: list, description: Any, rowcount: int = -1) -> None:
+        self._rows = rows
+        self._pos = 0
+        self._rowcount = rowcount
+        self.description = description
+
+    def fetchone(self) -> Any:
+        if self._pos >= len(self._rows):
+            return None
+        row = self._rows[self._pos]
+        self._pos += 1
+        return row
+
+    def fetchall(self) -> list:
+        rows = self._rows[self._pos:]
+        self._pos = len(self._rows)
+        return rows
+
+    @property
+    def rowcount(self) -> int:
+        return self._rowcount
+
+    @property
+    def lastrowid(self) -> None:
+        return None
+
+    def close(self) -> None:
+        self._rows = []
+
+
+def _buffer_pg_cursor(cursor: Any) -> _BufferedCursor:
+    """取完 PG 游标结果并关闭，使连接可在语句结束后立即归还池中。"""
+    description = cursor.description
+    rows = cursor.fetchall() if description is not None else []
+    rowcount = cursor.rowcount
+    cursor.close()
+    return _BufferedCursor(rows, description, rowcount)
+
+
+# ── SQLite ──────────────────────────────────────────────────
+
+
+class SqliteConnectionPool:
+    """SQLite WAL 连接池：一条串行写连接 + 按需借还的只读连接。"""
+
+    def __init__(self, db_path: str, *, max_readers: int | None = None) -> None:
+        self._path = db_path
+        self._writer = _open_sqlite(db_path)
+        self._write_lock = threading.RLock()
+        self._max_readers = (
+            default_pool_size("sqlite") if max_readers is None else max(0, max_readers)
+        )
+        # 空闲只读连接（LIFO，优先复用热连接）与已创建连接总数
+        self._idle: list[sqlite3.Connection] = []
+        self._opened = 0
+        self._readers_cond = threading.Condition()
+        self._row_factory: Any = sqlite3.Row
+        self._closed = False
+        self.pooled_reads = 0
+        self.writer_reads = 0
+        self.reader_waits = 0
+
+    @property
+    def writer(self) -> sqlite3.Connection:
+        return self._writer
+
+    @property
+    def max_readers(self) -> int:
+        return self._max_readers
+
+    @property
+    def row_factory(self) -> Any:
+        return self._row_factory
+
+    @row_factory.setter
+    def row_factory(self, value: Any) -> None:
+        self._row_factory = value
+        with self._write_lock:
+            self._writer.row_factory = value
+        with self._readers_cond:
+            for conn in self._idle:
+                conn.row_factory = value
+
+    def _acquire_reader(self) -> sqlite3.Connection | None:
+        """借出一条只读连接；写连接有未提交事务时返回 None（读到自己的写入）。"""
+        if self._closed or self._max_readers <= 0 or self._writer.in_transaction:
+            return None
+        with self._readers_cond:
+            while not self._idle and self._opened >= self._max_readers:
+                self.reader_waits += 1
+                self._readers_cond.wait()
+                if self._closed:
+                    return None
+            if self._idle:
+                return self._idle.pop()
+            self._opened += 1
+        try:
+            conn = _open_sqlite(self._path, read_only=True)
+        except sqlite3.Error:
+            logger.debug("打开 SQLite 只读连接失败", exc_info=True)
+            with self._readers_cond:
+                self._opened -= 1
+                self._readers_cond.notify()
+            return None
+        conn.row_factory = self._row_factory
+        return conn
+
+    def _release_reader(self, conn: sqlite3.Connection) -> None:
+        with self._readers_cond:
+            if self._closed:
+                conn.close()
+                return
+            if conn.row_factory is not self._row_factory:
+                conn.row_factory = self._row_factory
+            self._idle.append(conn)
+            self._readers_cond.notify()
+
+    def execute(self, sql: str, params: Any = None) -> Any:
+        if _READ_SQL_RE.match(sql) and not _WRITER_STATE_RE.search(sql):
+            reader = self._acquire_reader()
+            if reader is not None:
+                try:
+                    cursor = reader.execute(sql) if params is None else reader.execute(sql, params)
+                    try:
+                        rows = cursor.fetchall()
+                        description = cursor.description
+                    finally:
+                        cursor.close()
+                finally:
+                    self._release_reader(reader)
+                self.pooled_reads += 1
+                return _BufferedCursor(rows, description)
+            self.writer_reads += 1
+        with self._write_lock:
+            if params is None:
+                return self._writer.execute(sql)
+            return self._writer.execute(sql, params)
+
+    def executemany(self, sql: str, params_seq: Sequence) -> Any:
+        with self._write_lock:
+            return self._writer.executemany(sql, params_seq)
+
+    @contextmanager
+    def exclusive(self) -> Iterator[sqlite3.Connection]:
+        """作用域内独占写连接，其他线程的写语句等待作用域结束。"""
+        with self._write_lock:
+            yield self._writer
+
+    def executescript(self, script: str) -> None:
+        with self._write_lock:
+            self._writer.executescript(script)
+
+    def commit(self) -> None:
+        with self._write_lock:
+            self._writer.commit()
+
+    def rollback(self) -> None:
+        with self._write_lock:
+            self._writer.rollback()
+
+    def close(self) -> None:
+        with self._readers_cond:
+            self._closed = True
+            readers = list(self._idle)
+            self._idle.clear()
+            self._readers_cond.notify_all()
+        for conn in readers:
+            try:
+                conn.close()
+            except Exception:
+                pass
+        with self._write_lock:
+            self._writer.close()
+
+    def stats(self) -> dict[str, int]:
+        with self._readers_cond:
+            opened, idle = self._opened, len(self._idle)
+        return {
+            "readers": opened,
+            "idle_readers": idle,
+            "max_readers": self._max_readers,
+            "pooled_reads": self.pooled_reads,
+            "writer_reads": self.writer_reads,
+            "reader_waits": self.reader_waits,
+        }
+
+
+# ── PostgreSQL ──────────────────────────────────────────────
+
+
+class PgConnectionPool:
+    """psycopg2 有界连接池：按语句 / 事务借还连接，池耗尽时回退共享主连接。"""
+
+    def __init__(
+        self,
+        database_url: str,
+        *,
+        max_connections: int | None = None,
+        use_prepared: bool | None = None,
+    ) -> None:
+        from psycopg2.pool import ThreadedConnectionPool
+
+        size = (
+            default_pool_size("postgres") if max_connections is None
+            else max_connections
+        )
+        self._max_connections = max(1, size)
+        self._pool = ThreadedConnectionPool(1, self._max_connections, database_url)
+        self._primary = self._pool.getconn()
+        self._primary.autocommit = False
+        # 池耗尽时多个线程共用主连接，按事务串行化
+        self._primary_lock = threading.RLock()
+        self._local = threading.local()
+        self._closed = False
+        self._use_prepared = (
+            prepared_statements_enabled() if use_prepared is None else use_prepared
+        )
+        # id(连接) → 该连接上已 PREPARE 的语句名
+        self._prepared: dict[int, set[str]] = {}
+        self._prepared_lock = threading.Lock()
+        self.fallbacks = 0
+        self.prepared_executions = 0
+
+    @property
+    def primary(self) -> Any:
+        return self._primary
+
+    @property
+    def max_connections(self) -> int:
+        return self._max_connections
+
+    @contextmanager
+    def connection(self) -> Iterator[Any]:
+        """借出一条连接执行一条语句或一个事务。
+
+        正常退出时提交、异常时回滚，随后归还池中；同一线程内嵌套调用复用
+        外层连接，由最外层负责提交。池耗尽时串行共用主连接。
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            yield conn
+            return
+        conn = self._borrow()
+        self._local.conn = conn
+        try:
+            yield conn
+        except BaseException:
+            self._safe_rollback(conn)
+            raise
+        else:
+            try:
+                conn.commit()
+            except Exception:
+                self._safe_rollback(conn)
+                raise
+        finally:
+            self._local.conn = None
+            self._release(conn)
+
+    def exclusive(self) -> Any:
+        """与 :meth:`connection` 相同：作用域内本线程的语句共用一条借出的连接。"""
+        return self.connection()
+
+    def _borrow(self) -> Any:
+        if not self._closed:
+            try:
+                conn = self._pool.getconn()
+            except Exception:
+                # PoolError：池已耗尽，与未启用池时一样共用主连接
+                self.fallbacks += 1
+            else:
+                conn.autocommit = False
+                return conn
+        self._primary_lock.acquire()
+        return self._primary
+
+    def _release(self, conn: Any) -> None:
+        if conn is self._primary:
+            self._primary_lock.release()
+            return
+        if self._closed:
+            return
+        try:
+            self._pool.putconn(conn, close=bool(conn.closed))
+        except Exception:
+            logger.debug("归还 PG 连接失败", exc_info=True)
+
+    @staticmethod
+    def _safe_rollback(conn: Any) -> None:
+        try:
+            conn.rollback()
+        except Exception:
+            logger.debug("回滚 PG 连接失败", exc_info=True)
+
+    def execute(self, sql: str, params: Any = None, *, prepared: str | None = None) -> Any:
+        with self.connection() as conn:
+            if prepared is not None and self._use_prepared and params:
+                cursor = self._execute_prepared(conn, prepared, sql, params)
+            else:
+                cursor = conn.cursor()
+                cursor.execute(sql, params or ())
+            return _buffer_pg_cursor(cursor)
+
+    def _execute_prepared(self, conn: Any, name: str, sql: str, params: Sequence) -> Any:
+        with self._prepared_lock:
+            names = self._prepared.setdefault(id(conn), set())
+        try:
+            cursor = conn.cursor()
+            if name not in names:
+                positional, _ = _to_positional(sql)
+                cursor.execute(f"PREPARE {name} AS {positional}")
+                names.add(name)
+            placeholders = ", ".join(["%s"] * len(params))
+            cursor.execute(f"EXECUTE {name} ({placeholders})", params)
+        except Exception as exc:
+            if getattr(exc, "pgcode", None) == _PG_INVALID_STATEMENT_NAME:
+                # 连接已重建或语句被释放：下次重新 PREPARE
+                names.discard(name)
+            raise
+        self.prepared_executions += 1
+        return cursor
+
+    def executemany(self, sql: str, params_seq: Sequence) -> Any:
+        from psycopg2.extras import execute_batch, execute_values
+
+        rows = list(params_seq)
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            if rows:
+                split = split_values_template(sql)
+                if split is not None:
+                    values_sql, template = split
+                    execute_values(
+                        cursor, values_sql, rows,
+                        template=template, page_size=_PG_BATCH_PAGE_SIZE,
+                    )
+                else:
+                    execute_batch(cursor, sql, rows, page_size=_PG_BATCH_PAGE_SIZE)
+            return _buffer_pg_cursor(cursor)
+
+    def commit(self) -> None:
+        """提交当前线程 ``connection()`` 作用域内的事务；作用域外的语句已随借还提交。"""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.commit()
+
+    def rollback(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.rollback()
+
+    def close(self) -> None:
+        self._closed = True
+        with self._prepared_lock:
+            self._prepared.clear()
+        self._pool.closeall()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "max_connections": self._max_connections,
+            "fallbacks": self.fallbacks,
+            "prepared_executions": self.prepared_executions,
+        }
@@ -0,0 +1,231 @@
+"""纯 NumPy 的倒排文件（IVF）近似最近邻索引。
+
+向量先行归一化，cosine 相似度即内积。训练阶段在抽样上做球面 k-means
+得到 ``nlist`` 个质心，再把全部向量按所属质心重排为连续的倒排列表；
+查询时只对与 query 最接近的 ``nprobe`` 个列表做内积，每个列表都是
+连续切片，可直接在内存映射数组上计算。
+
+向量可按 float32 / float16 / int8 存储（int8 为 ``round(x * 127)``），
+分数计算时统一转换为 float32。
+"""
+
+from __future__ import annotations
+
+import os
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+QUANTIZATIONS = ("float32", "float16", "int8")
+_INT8_SCALE = 127.0
+_ASSIGN_CHUNK = 65536
+# 训练抽样：每个质心平均分到的样本数
+_SAMPLES_PER_LIST = 64
+
+_ANN_FILES = ("centroids", "offsets", "ids", "vectors")
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """按行 L2 归一化为 float32；零向量保持为零。"""
+    data = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(data, axis=1, keepdims=True)
+    norms[norms < 1e-9] = 1.0
+    return data / norms
+
+
+def quantize(normed: np.ndarray, quantization: str) -> np.ndarray:
+    """把已归一化的 float32 矩阵转换为存储精度。"""
+    if quantization == "float16":
+        return normed.astype(np.float16)
+    if quantization == "int8":
+        return np.clip(np.rint(normed * _INT8_SCALE), -127, 127).astype(np.int8)
+    return np.asarray(normed, dtype=np.float32)
+
+
+def dequantize(stored: np.ndarray) -> np.ndarray:
+    """把存储精度的矩阵还原为 float32（int8 除以 127），``quantize`` 的逆操作。"""
+    data = np.asarray(stored)
+    if data.dtype == np.int8:
+        return data.astype(np.float32) / _INT8_SCALE
+    return data.astype(np.float32, copy=False)
+
+
+def block_scores(block: np.ndarray, query: np.ndarray) -> np.ndarray:
+    """计算存储矩阵块与归一化 query 的内积（返回 float32）。"""
+    if block.dtype == np.float32:
+        return block @ query
+    scores = block.astype(np.float32) @ query
+    if block.dtype == np.int8:
+        scores /= _INT8_SCALE
+    return scores
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """返回分数最高的 k 个位置（降序）。"""
+    if k <= 0 or scores.size == 0:
+        return np.empty(0, dtype=np.int64)
+    if scores.size <= k:
+        return np.argsort(scores)[::-1]
+    part = np.argpartition(scores, -k)[-k:]
+    return part[np.argsort(scores[part])[::-1]]
+
+
+def _assign(data: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    out = np.empty(data.shape[0], dtype=np.int64)
+    for start in range(0, data.shape[0], _ASSIGN_CHUNK):
+        chunk = dequantize(data[start:start + _ASSIGN_CHUNK])
+        out[start:start + len(chunk)] = np.argmax(chunk @ centroids.T, axis=1)
+    return out
+
+
+def atomic_save_npy(path: Path, array: np.ndarray) -> None:
+    """原子写入 .npy（先写临时文件再替换），已映射旧文件的视图不受影响。"""
+    fd, tmp = tempfile.mkstemp(dir=str(path.parent), suffix=".npy.tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.save(f, array)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def atomic_save_npy_blocks(path: Path, blocks: list[np.ndarray]) -> None:
+    """把多个同列同精度的块按行拼接后原子写入 .npy，不在内存中拼接。"""
+    rows = sum(int(b.shape[0]) for b in blocks)
+    fd, tmp = tempfile.mkstemp(dir=str(path.parent), suffix=".npy.tmp")
+    os.close(fd)
+    try:
+        out = np.lib.format.open_memmap(
+            tmp, mode="w+", dtype=blocks[0].dtype, shape=(rows, blocks[0].shape[1]),
+        )
+        start = 0
+        for block in blocks:
+            out[start:start + block.shape[0]] = block
+            start += block.shape[0]
+        out.flush()
+        del out
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+class IVFIndex:
+    """倒排文件索引：质心 + 按列表连续存放的（量化）向量。"""
+
+    def __init__(
+        self,
+        centroids: np.ndarray,
+        offsets: np.ndarray,
+        ids: np.ndarray,
+        vectors: np.ndarray,
+    ) -> None:
+        self.centroids = centroids
+        self.offsets = offsets
+        self.ids = ids
+        self.vectors = vectors
+
+    @property
+    def size(self) -> int:
+        """索引覆盖的向量数（对应原矩阵的前 size 行）。"""
+        return int(self.ids.shape[0])
+
+    @property
+    def nlist(self) -> int:
+        return int(self.centroids.shape[0])
+
+    @classmethod
+    def build(
+        cls,
+        normed: np.ndarray,
+        *,
+        quantization: str = "float32",
+        nlist: int | None = None,
+        iterations: int = 10,
+        seed: int = 0,
+    ) -> "IVFIndex":
+        """在归一化矩阵上训练质心并建立倒排列表。
+
+        ``normed`` 可以是已按任意精度量化的存储矩阵，训练与重排前先还原为
+        float32 并重新归一化，避免重复量化。
+        """
+        n = int(normed.shape[0])
+        if n == 0:
+            raise ValueError("无法为空矩阵建立索引")
+        nlist = min(n, nlist or max(1, int(round(np.sqrt(n)))))
+        rng = np.random.default_rng(seed)
+        sample_size = min(n, nlist * _SAMPLES_PER_LIST)
+        sample_rows = np.sort(rng.choice(n, sample_size, replace=False))
+        sample = normalize_rows(dequantize(normed[sample_rows]))
+        centroids = sample[rng.choice(sample_size, nlist, replace=False)].copy()
+
+        for _ in range(max(1, iterations)):
+            assign = _assign(sample, centroids)
+            order = np.argsort(assign, kind="stable")
+            counts = np.bincount(assign, minlength=nlist)
+            starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+            nonempty = counts > 0
+            sums = np.zeros_like(centroids)
+            sums[nonempty] = np.add.reduceat(sample[order], starts[nonempty], axis=0)
+            empty = np.flatnonzero(~nonempty)
+            if empty.size:
+                # 空簇重新从样本中随机取点
+                sums[empty] = sample[rng.choice(sample_size, empty.size, replace=False)]
+            centroids = normalize_rows(sums)
+
+        assign = _assign(normed, centroids)
+        order = np.argsort(assign, kind="stable")
+        counts = np.bincount(assign, minlength=nlist)
+        offsets = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+        vectors = quantize(normalize_rows(dequantize(normed[order])), quantization)
+        return cls(centroids, offsets, order.astype(np.int64), vectors)
+
+    def search(
+        self, query: np.ndarray, k: int, *, nprobe: int = 8,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """返回 (原始行号, 分数)，按分数降序，最多 k 条。query 须已归一化。"""
+        probes = top_k_indices(self.centroids @ query, min(max(1, nprobe), self.nlist))
+        id_parts: list[np.ndarray] = []
+        score_parts: list[np.ndarray] = []
+        for c in probes:
+            start, end = int(self.offsets[c]), int(self.offsets[c + 1])
+            if end > start:
+                id_parts.append(self.ids[start:end])
+                score_parts.append(block_scores(self.vectors[start:end], query))
+        if not id_parts:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        ids = np.concatenate(id_parts)
+        scores = np.concatenate(score_parts)
+        best = top_k_indices(scores, k)
+        return ids[best], scores[best]
+
+    # ── 持久化 ──────────────────────────────────────────────
+
+    def save(self, directory: str | Path) -> None:
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        for name in _ANN_FILES:
+            atomic_save_npy(directory / f"{name}.npy", getattr(self, name))
+
+    @classmethod
+    def load(cls, directory: str | Path, *, mmap: bool = True) -> "IVFIndex | None":
+        """从目录加载索引；文件缺失时返回 None。向量数组可内存映射。"""
+        directory = Path(directory)
+        paths = {name: directory / f"{name}.npy" for name in _ANN_FILES}
+        if not all(p.exists() for p in paths.values()):
+            return None
+        mode = "r" if mmap else None
+        return cls(
+            centroids=np.load(paths["centroids"]),
+            offsets=np.load(paths["offsets"]),
+            ids=np.load(paths["ids"], mmap_mode=mode),
+            vectors=np.load(paths["vectors"], mmap_mode=mode),
+        )
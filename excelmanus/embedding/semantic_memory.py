@@ -13,7 +13,6 @@ from typing import TYPE_CHECKING, Any
 
 import numpy as np
 
-from excelmanus.embedding.search import cosine_top_k
 from excelmanus.embedding.store import VectorStore
 from excelmanus.memory_models import MemoryEntry
 
@@ -41,6 +40,8 @@ class SemanticMemory:
         threshold: float = 0.3,
         fallback_recent: int = 5,
         database: "Database | None" = None,
+        storage: str = "memory",
+        quantization: str = "float32",
     ) -> None:
         self._pm = persistent_memory
         self._client = embedding_client
@@ -54,6 +55,8 @@ class SemanticMemory:
             store_dir=vectors_dir,
             dimensions=embedding_client.dimensions,
             database=database,
+            storage=storage,
+            quantization=quantization,
         )
         self._synced = False
 
@@ -158,9 +161,8 @@ class SemanticMemory:
                 return self._pm.load_core()
 
         # 语义检索 top-k
-        results = cosine_top_k(
+        results = self._store.search(
             query_vec,
-            self._store.matrix,
             k=self._top_k,
             threshold=self._threshold,
         )
@@ -216,9 +218,8 @@ class SemanticMemory:
         except Exception:
             return []
 
-        results = cosine_top_k(
+        results = self._store.search(
             query_vec,
-            self._store.matrix,
             k=k or self._top_k,
             threshold=threshold or self._threshold,
         )
@@ -13,7 +13,6 @@ from typing import TYPE_CHECKING
 
 import numpy as np
 
-from excelmanus.embedding.search import cosine_top_k
 from excelmanus.embedding.store import VectorStore
 
 if TYPE_CHECKING:
@@ -48,8 +47,12 @@ class SemanticRegistry:
         *,
         top_k: int = 5,
         threshold: float = 0.25,
+        storage: str = "memory",
+        quantization: str = "float32",
     ) -> None:
         self._client = embedding_client
+        self._storage = storage
+        self._quantization = quantization
         self._top_k = top_k
         self._threshold = threshold
         self._store: VectorStore | None = None
@@ -75,6 +78,8 @@ class SemanticRegistry:
             self._store = VectorStore(
                 store_dir="/tmp/excelmanus_registry_vectors",
                 dimensions=self._client.dimensions,
+                storage=self._storage,
+                quantization=self._quantization,
             )
             self._file_entries = []
             self._indexed_registry_id = registry_id
@@ -102,6 +107,8 @@ class SemanticRegistry:
         self._store = VectorStore(
             store_dir="/tmp/excelmanus_registry_vectors",
             dimensions=self._client.dimensions,
+            storage=self._storage,
+            quantization=self._quantization,
         )
         self._store.clear()
         added = self._store.add_batch(texts, vectors)
@@ -133,9 +140,8 @@ class SemanticRegistry:
                 logger.warning("查询向量化失败", exc_info=True)
                 return []
 
-        results = cosine_top_k(
+        results = self._store.search(
             query_vec,
-            self._store.matrix,
             k=k or self._top_k,
             threshold=threshold or self._threshold,
         )
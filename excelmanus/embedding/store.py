@@ -1,4 +1,11 @@
-"""向量存储：内存级向量矩阵 + JSON Lines 文件持久化。"""
+"""向量存储：内存级向量矩阵 + JSON Lines 文件持久化。
+
+``storage="mmap"`` 时额外持久化一份预归一化（可量化）的矩阵并以内存映射方式
+加载；向量数达到 ``ann_min_size`` 后在其上建立 IVF 近似最近邻索引
+（见 :mod:`excelmanus.embedding.ann`），检索只扫描少量倒排列表。
+索引在 ``save()`` 或后台线程中构建，检索路径本身不会同步建索引；
+``storage="memory"`` 始终走精确内积。
+"""
 
 from __future__ import annotations
 
@@ -7,12 +14,25 @@ import json
 import logging
 import os
 import tempfile
+import threading
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import TYPE_CHECKING, Any
 
 import numpy as np
 
+from excelmanus.embedding.ann import (
+    QUANTIZATIONS,
+    IVFIndex,
+    atomic_save_npy,
+    atomic_save_npy_blocks,
+    block_scores,
+    normalize_rows,
+    quantize,
+    top_k_indices,
+)
+from excelmanus.embedding.search import SearchResult
+
 if TYPE_CHECKING:
     from excelmanus.database import Database
     from excelmanus.stores.vector_store_db import VectorStoreDB
@@ -23,6 +43,15 @@ logger = logging.getLogger(__name__)
 _VECTORS_FILE = "vectors.jsonl"
 _VECTORS_NPY_FILE = "vectors.npy"
 _META_FILE = "vectors_meta.json"
+_NORMED_NPY_FILE = "vectors_normed.npy"
+_ANN_DIR = "ann"
+
+STORAGE_MODES = ("memory", "mmap")
+# 向量数达到该值后建立 ANN 索引；更小的库全量内积已足够快
+DEFAULT_ANN_MIN_SIZE = 20000
+# 索引外的追加向量超过索引规模的该比例时重建索引
+_ANN_REBUILD_RATIO = 0.1
+_ANN_NPROBE = 8
 
 
 @dataclass
@@ -43,6 +72,7 @@ class VectorStore:
     - 通过 content_hash 去重，避免重复向量化
     - 持久化到 JSONL 文件（每行一条记录）+ npy 文件（向量矩阵）
     - 支持增量追加，无需全量重写
+    - 归一化矩阵只计算一次并缓存；mmap 模式下持久化并内存映射加载
     """
 
     def __init__(
@@ -51,12 +81,29 @@ class VectorStore:
         dimensions: int = 1536,
         *,
         database: "Database | None" = None,
+        storage: str = "memory",
+        quantization: str = "float32",
+        ann_min_size: int = DEFAULT_ANN_MIN_SIZE,
     ) -> None:
+        if storage not in STORAGE_MODES:
+            raise ValueError(f"不支持的存储模式: {storage}")
+        if quantization not in QUANTIZATIONS:
+            raise ValueError(f"不支持的量化精度: {quantization}")
         self._store_dir = Path(store_dir).expanduser()
         self._dimensions = dimensions
+        self._storage = storage
+        self._quantization = quantization
+        self._ann_min_size = max(1, ann_min_size)
         self._records: list[VectorRecord] = []
         self._hash_index: dict[str, int] = {}  # content_hash → index
         self._matrix: np.ndarray | None = None  # 缓存的向量矩阵
+        self._normed: np.ndarray | None = None  # 缓存的归一化（量化）矩阵
+        # 基座为内存映射时，追加行的归一化结果单独存放，避免拼接时整体读入内存
+        self._normed_tail: np.ndarray | None = None
+        self._ann: IVFIndex | None = None  # 覆盖前 ann.size 行的 ANN 索引
+        self._ann_lock = threading.Lock()
+        self._ann_thread: threading.Thread | None = None
+        self._ann_generation = 0  # clear() 后递增，丢弃过期的后台构建结果
         self._dirty = False  # 是否有未持久化的变更
         self._db_store: "VectorStoreDB | None" = None
         if database is not None:
@@ -82,6 +129,58 @@ class VectorStore:
             self._rebuild_matrix()
         return self._matrix  # type: ignore[return-value]
 
+    @property
+    def normalized_matrix(self) -> np.ndarray:
+        """返回按行归一化并按 quantization 存储的矩阵 (N, D)。
+
+        内存映射基座之后还有追加行时返回拼接后的副本；检索与保存按块
+        处理，不经过该属性。
+        """
+        blocks = self._normed_blocks()
+        if len(blocks) == 1:
+            return blocks[0]
+        return np.concatenate(blocks)
+
+    def search(
+        self,
+        query_vec: np.ndarray,
+        k: int = 5,
+        threshold: float = 0.0,
+    ) -> list[SearchResult]:
+        """cosine 相似度 top-k 检索，语义与 ``cosine_top_k`` 一致。
+
+        mmap 模式下已有 ANN 索引时走索引（近似），索引之后追加的向量全量
+        扫描；否则在缓存的归一化矩阵上做精确内积。索引缺失或过期时只在
+        后台调度构建，本次查询不等待。
+        """
+        n = len(self._records)
+        if n == 0 or k <= 0:
+            return []
+        query = np.asarray(query_vec, dtype=np.float32).reshape(-1)
+        query_norm = float(np.linalg.norm(query))
+        if query.shape[0] == 0 or query_norm < 1e-9:
+            return []
+        query = query / query_norm
+
+        blocks = self._normed_blocks()
+        index = self._current_ann(blocks[0])
+        if index is None:
+            ids, top_scores = self._scan_blocks(blocks, 0, query)
+        else:
+            ids, top_scores = index.search(query, k, nprobe=_ANN_NPROBE)
+            if index.size < n:
+                tail_ids, tail_scores = self._scan_blocks(blocks, index.size, query)
+                ids = np.concatenate((ids, tail_ids))
+                top_scores = np.concatenate((top_scores, tail_scores))
+        best = top_k_indices(top_scores, k)
+        ids, top_scores = ids[best], top_scores[best]
+
+        return [
+            SearchResult(index=int(i), score=float(s))
+            for i, s in zip(ids, top_scores)
+            if s >= threshold
+        ]
+
     def has(self, text: str) -> bool:
         """检查文本是否已存在于存储中。"""
         content_hash = self._hash_text(text)
@@ -151,6 +250,11 @@ class VectorStore:
         self._records.clear()
         self._hash_index.clear()
         self._matrix = None
+        self._normed = None
+        self._normed_tail = None
+        with self._ann_lock:
+            self._ann = None
+            self._ann_generation += 1
         self._dirty = True
 
     def save(self) -> None:
@@ -181,8 +285,7 @@ class VectorStore:
 
         # 保存 numpy 矩阵（二进制格式，加载更快）
         npy_path = self._store_dir / _VECTORS_NPY_FILE
-        matrix = self.matrix
-        np.save(str(npy_path), matrix)
+        atomic_save_npy(npy_path, self.matrix)
 
         # 保存元信息
         meta_path = self._store_dir / _META_FILE
@@ -190,6 +293,9 @@ class VectorStore:
             "dimensions": self._dimensions,
             "count": len(self._records),
         }
+        if self._storage == "mmap":
+            meta["quantization"] = self._quantization
+            self._save_normalized()
         self._atomic_write(meta_path, json.dumps(meta, ensure_ascii=False))
 
         self._dirty = False
@@ -229,7 +335,10 @@ class VectorStore:
         vectors: np.ndarray | None = None
         if npy_path.exists():
             try:
-                vectors = np.load(str(npy_path))
+                vectors = np.load(
+                    str(npy_path),
+                    mmap_mode="r" if self._storage == "mmap" else None,
+                )
                 if vectors.shape[0] != len(entries):
                     logger.warning(
                         "向量矩阵与元数据数量不匹配 (%d vs %d)，将丢弃向量缓存",
@@ -266,8 +375,66 @@ class VectorStore:
             self._hash_index[content_hash] = idx
 
         self._matrix = None  # 延迟重建
+        if (
+            self._storage == "mmap"
+            and vectors is not None
+            and len(self._records) == len(entries)
+        ):
+            self._load_normalized()
         logger.debug("VectorStore 已加载: %d 条记录", len(self._records))
 
+    def _save_normalized(self) -> None:
+        """持久化归一化矩阵与 ANN 索引（仅 mmap 模式）。
+
+        写入后改为内存映射新文件，追加尾部随之并入基座。
+        """
+        normed_path = self._store_dir / _NORMED_NPY_FILE
+        blocks = self._normed_blocks()
+        if len(blocks) == 1:
+            atomic_save_npy(normed_path, blocks[0])
+        else:
+            atomic_save_npy_blocks(normed_path, blocks)
+        self._normed = np.load(str(normed_path), mmap_mode="r")
+        self._normed_tail = None
+
+        ann_dir = self._store_dir / _ANN_DIR
+        n = len(self._records)
+        if n < self._ann_min_size:
+            with self._ann_lock:
+                self._ann = None
+            if ann_dir.exists():
+                for path in ann_dir.glob("*.npy"):
+                    path.unlink(missing_ok=True)
+            return
+        if self._ann_stale(self._ann, n):
+            index = IVFIndex.build(self._normed, quantization=self._quantization)
+            index.save(ann_dir)
+            with self._ann_lock:
+                self._ann = index
+
+    def _load_normalized(self) -> None:
+        """内存映射加载归一化矩阵与 ANN 索引；与记录不一致时丢弃。"""
+        meta_path = self._store_dir / _META_FILE
+        normed_path = self._store_dir / _NORMED_NPY_FILE
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return
+        if meta.get("quantization") != self._quantization or not normed_path.exists():
+            return
+        try:
+            normed = np.load(str(normed_path), mmap_mode="r")
+            index = IVFIndex.load(self._store_dir / _ANN_DIR)
+        except Exception:
+            logger.warning("加载归一化向量或 ANN 索引失败", exc_info=True)
+            return
+        n = len(self._records)
+        if normed.shape != (n, self._dimensions):
+            return
+        self._normed = normed
+        if index is not None and index.size <= n and index.vectors.dtype == normed.dtype:
+            self._ann = index
+
     def _load_from_db(self) -> None:
         """从 VectorStoreDB 加载数据到内存记录。"""
         assert self._db_store is not None
@@ -289,6 +456,98 @@ class VectorStore:
         if self._records:
             logger.debug("VectorStore 从 DB 加载: %d 条记录", len(self._records))
 
+    def _normed_blocks(self) -> list[np.ndarray]:
+        """返回按行覆盖全部记录的归一化矩阵块。
+
+        仅归一化新追加的记录：基座在内存中时直接并入基座；基座为内存映射
+        时放在单独的尾部块中，基座保持映射不动。
+        """
+        n = len(self._records)
+        rows = 0 if self._normed is None else self._normed.shape[0]
+        tail_rows = 0 if self._normed_tail is None else self._normed_tail.shape[0]
+        if self._normed is None or rows == 0 or rows + tail_rows > n:
+            self._normed = quantize(normalize_rows(self.matrix), self._quantization)
+            self._normed_tail = None
+        elif rows + tail_rows < n:
+            added = np.vstack(
+                [r.vector.reshape(1, -1) for r in self._records[rows + tail_rows:]]
+            )
+            added = quantize(normalize_rows(added), self._quantization)
+            if isinstance(self._normed, np.memmap):
+                self._normed_tail = (
+                    added if self._normed_tail is None
+                    else np.concatenate((self._normed_tail, added))
+                )
+            else:
+                self._normed = np.concatenate((self._normed, added))
+        if self._normed_tail is None:
+            return [self._normed]
+        return [self._normed, self._normed_tail]
+
+    @staticmethod
+    def _scan_blocks(
+        blocks: list[np.ndarray], start: int, query: np.ndarray,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """对第 start 行起的全部行做精确内积，返回 (行号, 分数)。"""
+        id_parts: list[np.ndarray] = []
+        score_parts: list[np.ndarray] = []
+        offset = 0
+        for block in blocks:
+            end = offset + block.shape[0]
+            if end > start:
+                lo = max(start - offset, 0)
+                score_parts.append(block_scores(block[lo:], query))
+                id_parts.append(np.arange(offset + lo, end, dtype=np.int64))
+            offset = end
+        if not id_parts:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        return np.concatenate(id_parts), np.concatenate(score_parts)
+
+    def _ann_stale(self, index: IVFIndex | None, rows: int) -> bool:
+        """索引缺失，或索引外的行超过索引规模的 ``_ANN_REBUILD_RATIO`` 时需重建。"""
+        if rows < self._ann_min_size:
+            return False
+        return index is None or rows - index.size > index.size * _ANN_REBUILD_RATIO
+
+    def _current_ann(self, base: np.ndarray) -> IVFIndex | None:
+        """返回当前可用的 ANN 索引（仅 mmap 模式），过期时调度后台重建。
+
+        后台只在基座矩阵上构建；基座为内存映射时，尾部由 ``save()`` 落盘
+        并入基座后再重建。
+        """
+        if self._storage != "mmap":
+            return None
+        index = self._ann
+        if index is not None and index.size > len(self._records):
+            index = None
+        if self._ann_stale(index, int(base.shape[0])):
+            self._schedule_ann_build(base)
+        return index
+
+    def _schedule_ann_build(self, base: np.ndarray) -> None:
+        """在后台线程中为 base 建立 ANN 索引；已有构建在进行时跳过。"""
+        with self._ann_lock:
+            if self._ann_thread is not None and self._ann_thread.is_alive():
+                return
+            thread = threading.Thread(
+                target=self._build_ann,
+                args=(base, self._ann_generation),
+                name="vector-ann-build",
+                daemon=True,
+            )
+            self._ann_thread = thread
+        thread.start()
+
+    def _build_ann(self, base: np.ndarray, generation: int) -> None:
+        try:
+            index = IVFIndex.build(base, quantization=self._quantization)
+        except Exception:
+            logger.warning("后台构建 ANN 索引失败", exc_info=True)
+            return
+        with self._ann_lock:
+            if generation == self._ann_generation:
+                self._ann = index
+
     def _rebuild_matrix(self) -> None:
         """从 records 重建 numpy 矩阵。"""
         if not self._records:
@@ -10,7 +10,7 @@ from pathlib import Path
 import json
 from dataclasses import replace
 from types import SimpleNamespace
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, Callable
 
 import openai
 
@@ -28,6 +28,7 @@ from excelmanus.hooks import (
 )
 from excelmanus.logger import get_logger
 from excelmanus.memory import ConversationMemory, TokenCounter
+from excelmanus.token_cache import get_token_cache, stats_delta
 from excelmanus.interaction import InteractionRegistry, DEFAULT_INTERACTION_TIMEOUT
 from excelmanus.question_flow import PendingQuestion, QuestionFlowManager
 from excelmanus.skillpacks import (
@@ -182,6 +183,8 @@ class AgentEngine:
         self._user_id = user_id
         self._session_id: str | None = None
         self._history_snapshot_index: int = 0
+        # 会话首个模型输出 token 到达时回调一次（SessionManager 用于首 token 耗时统计）
+        self._on_first_token: Callable[[], None] | None = None
         self._state = SessionState()
         # ── LLM 客户端统一管理（main/aux/vlm/advisor 四套） ──
         from excelmanus.engine_core.llm_client_manager import LLMClientManager
@@ -334,6 +337,14 @@ class AgentEngine:
                 )
             except Exception:
                 logger.warning("FileRegistry 初始化失败", exc_info=True)
+        if self._file_registry is not None:
+            try:
+                from excelmanus.workspace_watcher import get_workspace_watcher
+                watcher = get_workspace_watcher(self._config.workspace_root)
+                if watcher is not None:
+                    self._file_registry.attach_watcher(watcher)
+            except Exception:
+                logger.debug("工作区文件监听启动失败，扫描回退为全量遍历", exc_info=True)
         self._transaction: WorkspaceTransaction | None = None
         if self._workspace.transaction_enabled:
             if self._file_registry is not None and self._file_registry.has_versions:
@@ -442,7 +453,10 @@ class AgentEngine:
         if database is not None:
             try:
                 from excelmanus.stores.llm_call_store import LLMCallStore as _LCS
-                self._llm_call_store = _LCS(database, user_id=user_id)
+                self._llm_call_store = _LCS(
+                    database, user_id=user_id,
+                    sink=getattr(database, "audit_sink", None),
+                )
             except Exception:
                 logger.debug("LLM 调用日志初始化失败", exc_info=True)
             try:
@@ -454,6 +468,7 @@ class AgentEngine:
         self._registry_scan_task: asyncio.Task[Any] | None = None
         self._registry_scan_done: bool = False
         self._registry_scan_error: str | None = None
+        self._registry_scan_progress: Any = None  # 最近一次 ScanProgress 事件
         self._registry_refresh_needed: bool = False
 
         # ── 持久记忆集成 ────────────────────────
@@ -489,6 +504,8 @@ class AgentEngine:
                     threshold=config.memory_semantic_threshold,
                     fallback_recent=config.memory_semantic_fallback_recent,
                     database=database,
+                    storage=config.embedding_vector_storage,
+                    quantization=config.embedding_vector_quantization,
                 )
             except Exception:
                 logger.debug("语义记忆初始化失败，回退到传统加载", exc_info=True)
@@ -502,6 +519,8 @@ class AgentEngine:
                     embedding_client=self._embedding_client,
                     top_k=5,
                     threshold=0.25,
+                    storage=config.embedding_vector_storage,
+                    quantization=config.embedding_vector_quantization,
                 )
             except Exception:
                 logger.debug("语义文件注册表初始化失败", exc_info=True)
@@ -1114,8 +1133,12 @@ class AgentEngine:
         """后台执行 FileRegistry 全量扫描 + 自动数据探索。"""
         if self._file_registry is None:
             return
+        self._registry_scan_progress = None
         try:
-            await asyncio.to_thread(self._file_registry.scan_workspace)
+            await asyncio.to_thread(
+                self._file_registry.scan_workspace,
+                on_progress=self._on_registry_scan_progress,
+            )
             self._registry_scan_done = True
             self._registry_scan_error = None
         except asyncio.CancelledError:
@@ -1134,6 +1157,10 @@ class AgentEngine:
         except Exception:
             logger.debug("自动数据探索失败，不影响正常使用", exc_info=True)
 
+    def _on_registry_scan_progress(self, event: Any) -> None:
+        """扫描线程回调：记录最新进度供 registry_scan_status 查询。"""
+        self._registry_scan_progress = event
+
     async def _auto_explore_after_scan(self) -> None:
         """Registry 扫描完成后，自动调用 inspect_excel_files 生成数据概览。
 
@@ -1293,11 +1320,13 @@ class AgentEngine:
             }
         task = self._registry_scan_task
         if task is not None and not task.done():
+            progress = self._registry_scan_progress
             return {
                 "state": "building",
                 "total_files": None,
                 "scan_duration_ms": None,
                 "error": None,
+                "progress": progress.to_dict() if progress is not None else None,
             }
         if self._registry_scan_error:
             return {
@@ -1485,6 +1514,8 @@ class AgentEngine:
     async def shutdown_mcp(self) -> None:
         """关闭所有 MCP Server 连接，释放资源。"""
         await self._cancel_registry_scan()
+        if self._file_registry is not None:
+            self._file_registry.detach_watcher()
 
         if self._active_skills:
             _primary = self._active_skills[-1]
@@ -2238,6 +2269,7 @@ class AgentEngine:
             return ChatResult(reply=block_msg)
 
         chat_start = time.monotonic()
+        _token_stats_start = get_token_cache().stats()
         # 每次真正的 chat 调用递增轮次计数器
         self._state.increment_turn()
         # 新任务默认重置 write_hint；续跑路径会在 _tool_calling_loop 中恢复。
@@ -2864,6 +2896,16 @@ class AgentEngine:
             except Exception:
                 logger.debug("Playbook 反思调度失败", exc_info=True)
 
+        _token_turn = stats_delta(_token_stats_start, get_token_cache().stats())
+        logger.debug(
+            "perf.chat: token_cache hits=%d misses=%d hit_ratio=%.1f%% "
+            "encode=%.1fms saved≈%.1fms",
+            _token_turn["hits"], _token_turn["misses"],
+            _token_turn["hit_ratio"] * 100,
+            _token_turn["encode_seconds"] * 1000,
+            _token_turn["saved_seconds_estimate"] * 1000,
+        )
+
         # 发出执行摘要事件
         elapsed = time.monotonic() - chat_start
         self._emit(
@@ -348,6 +348,13 @@ class CommandHandler:
                     f"- 扫描耗时: {scan_duration_ms}ms"
                 )
             if state == "building":
+                progress = status.get("progress") or {}
+                if progress.get("total"):
+                    return (
+                        "FileRegistry：后台扫描中"
+                        f"（{progress.get('done', 0)}/{progress['total']}）。"
+                        "你可以继续对话，完成后会自动生效。"
+                    )
                 return "FileRegistry：后台扫描中。你可以继续对话，完成后会自动生效。"
             if state == "error":
                 error = str(status.get("error") or "unknown")
@@ -16,6 +16,7 @@ from typing import TYPE_CHECKING, Any
 from excelmanus.logger import get_logger
 from excelmanus.mcp.manager import parse_tool_prefix
 from excelmanus.memory import TokenCounter
+from excelmanus.token_cache import get_token_cache
 from excelmanus.task_list import TaskStatus
 
 if TYPE_CHECKING:
@@ -54,12 +55,8 @@ def build_ref_graph_notice(cache: Any) -> str:
 class ContextBuilder:
     """系统提示词组装器，从 AgentEngine 搬迁所有 _build_*_notice 和 _prepare_system_prompts。"""
 
-    _TOKEN_COUNT_CACHE_MAX = 16  # fingerprint → token_count LRU 上限
-
     def __init__(self, engine: "AgentEngine") -> None:
         self._engine = engine
-        # O3+O4: 基于内容指纹的 token 计数缓存，避免重复 tiktoken 编码
-        self._token_count_cache: dict[str, int] = {}
         # C2: 轮次级静态 notice 缓存，同一 session_turn 内不重复构建
         self._turn_notice_cache: dict[str, str] = {}
         self._turn_notice_cache_key: int = -1
@@ -159,10 +156,10 @@ class ContextBuilder:
 
     @staticmethod
     def _system_prompts_token_count(system_prompts: Sequence[str]) -> int:
-        total = 0
-        for prompt in system_prompts:
-            total += TokenCounter.count_message({"role": "system", "content": prompt})
-        return total
+        # 每条 system 消息 = 4 token 结构开销 + role + content
+        role_tokens = TokenCounter.count("system")
+        counts = get_token_cache().count_batch(list(system_prompts))
+        return sum(4 + role_tokens + n for n in counts)
 
     @staticmethod
     def _shrink_context_text(text: str) -> str:
@@ -1170,16 +1167,8 @@ class ContextBuilder:
         threshold = max(1, int(e.max_context_tokens * 0.9))
         prompts = _compose_prompts()
 
-        # O3+O4: 基于内容指纹的 token 计数缓存
-        _cached_count = self._token_count_cache.get(_content_fingerprint)
-        if _cached_count is not None:
-            total_tokens = _cached_count
-        else:
-            total_tokens = self._system_prompts_token_count(prompts)
-            # LRU 淘汰（最近最少使用）
-            if len(self._token_count_cache) >= self._TOKEN_COUNT_CACHE_MAX:
-                self._token_count_cache.pop(next(iter(self._token_count_cache)))
-            self._token_count_cache[_content_fingerprint] = total_tokens
+        # 每段 prompt 的 token 数由进程级内容哈希缓存提供，未变化的段不重新编码
+        total_tokens = self._system_prompts_token_count(prompts)
 
         if total_tokens <= threshold:
             return prompts, None
@@ -482,6 +482,13 @@ class LLMCaller:
                     if _has_content:
                         _first_token_received = True
                         _ttft_ms = (time.monotonic() - _llm_start_ts) * 1000
+                        _first_token_hook = e._on_first_token
+                        if _first_token_hook is not None:
+                            e._on_first_token = None
+                            try:
+                                _first_token_hook()
+                            except Exception:
+                                logger.debug("首 token 回调失败", exc_info=True)
 
                 # ── 自定义 provider 的 _StreamDelta ──
                 if hasattr(chunk, "content_delta"):
@@ -55,6 +55,7 @@ if TYPE_CHECKING:
     from excelmanus.engine import AgentEngine
     from excelmanus.events import EventCallback
     from excelmanus.stores.tool_call_store import ToolCallStore
+    from excelmanus.tools._run_output import OutputListener
 
 logger = get_logger("tool_dispatcher")
 
@@ -273,7 +274,7 @@ class ToolDispatcher:
         if db is not None:
             try:
                 from excelmanus.stores.tool_call_store import ToolCallStore as _TCS
-                self._tool_call_store = _TCS(db)
+                self._tool_call_store = _TCS(db, sink=getattr(db, "audit_sink", None))
             except Exception:
                 logger.debug("工具调用审计日志初始化失败", exc_info=True)
 
@@ -954,11 +955,16 @@ class ToolDispatcher:
         from excelmanus.tools.code_tools import set_sandbox_env as _set_sandbox_env
         from excelmanus.tools._guard_ctx import set_guard as _set_guard, reset_guard as _reset_guard
 
+        from excelmanus.tools._run_output import reset_output_listener, set_output_listener
+
         e = self._engine  # 引擎快捷引用
 
         # 注入每会话的沙盒环境和 FileAccessGuard 到 contextvars。
         _sandbox_token = _set_sandbox_env(e.sandbox_env)
         _guard_token = _set_guard(e.file_access_guard)
+        _output_token = set_output_listener(
+            self._make_output_listener(tc, on_event, iteration)
+        )
         try:
             return await self._execute_inner(
                 tc, tool_scope, on_event, iteration, route_result, skip_start_event,
@@ -968,6 +974,43 @@ class ToolDispatcher:
             from excelmanus.tools.code_tools import _current_sandbox_env
             _current_sandbox_env.reset(_sandbox_token)
             _reset_guard(_guard_token)
+            reset_output_listener(_output_token)
+
+    def _make_output_listener(
+        self,
+        tc: Any,
+        on_event: "EventCallback | None",
+        iteration: int,
+    ) -> "OutputListener | None":
+        """构造工具增量输出监听器：在工作线程中调用，事件投递回事件循环线程发射。"""
+        if on_event is None:
+            return None
+        from excelmanus.events import EventType, ToolCallEvent
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return None
+        e = self._engine
+        tool_call_id = getattr(tc, "id", "") or ""
+        tool_name = getattr(getattr(tc, "function", None), "name", "")
+
+        def _listener(stream: str, text: str) -> None:
+            event = ToolCallEvent(
+                event_type=EventType.TOOL_OUTPUT_DELTA,
+                tool_call_id=tool_call_id,
+                tool_name=tool_name,
+                output_stream=stream,
+                output_delta=text,
+                iteration=iteration,
+            )
+            try:
+                loop.call_soon_threadsafe(e.emit, on_event, event)
+            except RuntimeError:
+                # 事件循环已关闭（会话结束），丢弃进度输出
+                pass
+
+        return _listener
 
     async def _execute_inner(
         self,
@@ -2140,13 +2183,16 @@ class ToolDispatcher:
     @staticmethod
     def _snapshot_excel_for_diff(
         file_paths: list[str], workspace_root: str,
-    ) -> dict[str, list[tuple[str, list[dict], list[dict]]]]:
-        """对指定 Excel 文件做轻量快照，返回 {file_path: [(sheet, cells, merges)]}。
+    ) -> dict[str, Any]:
+        """对指定 Excel 文件做轻量快照，返回 {file_path: WorkbookSnapshot | [(sheet, cells, merges)]}。
 
+        xlsx/xlsm 返回按 zip part 指纹惰性解析的 ``WorkbookSnapshot``（按文件内容
+        哈希缓存）；无法按 zip 读取时回退到 openpyxl 全量快照列表。
         文件不存在时记录空列表（tombstone），以便 diff 能检测"从无到有"的新建场景。
         """
         from pathlib import Path
-        snapshots: dict[str, list[tuple[str, list[dict], list[dict]]]] = {}
+        from excelmanus.tools._xlsx_snapshot import snapshot_workbook
+        snapshots: dict[str, Any] = {}
         for fp in file_paths:
             try:
                 abs_path = Path(fp) if Path(fp).is_absolute() else Path(workspace_root) / fp
@@ -2155,64 +2201,88 @@ class ToolDispatcher:
                     # 文件不存在 → 记录空快照（tombstone），支持新建文件 diff
                     snapshots[fp] = []
                     continue
-                from openpyxl import load_workbook
-                from openpyxl.utils import get_column_letter
-                from excelmanus.tools._style_extract import extract_cell_style, extract_merge_ranges
                 # .xls/.xlsb → 透明转换为 xlsx
                 from excelmanus.tools._helpers import ensure_openpyxl_compatible
                 abs_path = ensure_openpyxl_compatible(abs_path)
-                wb = load_workbook(str(abs_path), data_only=False, read_only=False)
-                file_snaps: list[tuple[str, list[dict], list[dict]]] = []
-                for sheet_name in wb.sheetnames:
-                    ws = wb[sheet_name]
-                    cells: list[dict] = []
-                    for row in ws.iter_rows(min_row=1, max_row=min(ws.max_row or 0, 500),
-                                            max_col=min(ws.max_column or 0, 50)):
-                        for cell in row:
-                            if cell.value is not None:
-                                ref = f"{get_column_letter(cell.column)}{cell.row}"
-                                val = cell.value
-                                if isinstance(val, (int, float, bool, str)):
-                                    entry: dict = {"cell": ref, "value": val}
-                                else:
-                                    entry = {"cell": ref, "value": str(val)}
-                                style = extract_cell_style(cell)
-                                if style:
-                                    entry["style"] = style
-                                cells.append(entry)
-                    merges = extract_merge_ranges(ws)
-                    file_snaps.append((sheet_name, cells, merges))
-                wb.close()
-                snapshots[fp] = file_snaps
+                snap = snapshot_workbook(abs_path)
+                snapshots[fp] = (
+                    snap if snap is not None
+                    else ToolDispatcher._snapshot_excel_with_openpyxl(abs_path)
+                )
             except Exception:
                 pass
         return snapshots
 
+    @staticmethod
+    def _snapshot_excel_with_openpyxl(abs_path: Any) -> list[tuple[str, list[dict], list[dict]]]:
+        """openpyxl 全量快照（zip 快照不可用时的回退路径）。"""
+        from openpyxl import load_workbook
+        from openpyxl.utils import get_column_letter
+        from excelmanus.tools._style_extract import extract_cell_style, extract_merge_ranges
+        from excelmanus.tools._xlsx_snapshot import MAX_COLS, MAX_ROWS
+        wb = load_workbook(str(abs_path), data_only=False, read_only=False)
+        file_snaps: list[tuple[str, list[dict], list[dict]]] = []
+        for sheet_name in wb.sheetnames:
+            ws = wb[sheet_name]
+            cells: list[dict] = []
+            for row in ws.iter_rows(min_row=1, max_row=min(ws.max_row or 0, MAX_ROWS),
+                                    max_col=min(ws.max_column or 0, MAX_COLS)):
+                for cell in row:
+                    if cell.value is not None:
+                        ref = f"{get_column_letter(cell.column)}{cell.row}"
+                        val = cell.value
+                        if isinstance(val, (int, float, bool, str)):
+                            entry: dict = {"cell": ref, "value": val}
+                        else:
+                            entry = {"cell": ref, "value": str(val)}
+                        style = extract_cell_style(cell)
+                        if style:
+                            entry["style"] = style
+                        cells.append(entry)
+            merges = extract_merge_ranges(ws)
+            file_snaps.append((sheet_name, cells, merges))
+        wb.close()
+        return file_snaps
+
     @staticmethod
     def _compute_snapshot_diffs(
-        before: dict[str, list[tuple[str, list[dict], list[dict]]]],
-        after: dict[str, list[tuple[str, list[dict], list[dict]]]],
+        before: dict[str, Any],
+        after: dict[str, Any],
     ) -> list[dict]:
-        """对比前后快照，返回 [{file_path, sheet, affected_range, changes, old_merge_ranges, new_merge_ranges}]。"""
+        """对比前后快照，返回 [{file_path, sheet, affected_range, changes, old_merge_ranges, new_merge_ranges}]。
+
+        前后均为 ``WorkbookSnapshot`` 时只解析 part 指纹变化的工作表。
+        """
+        from excelmanus.tools._xlsx_snapshot import WorkbookSnapshot, changed_sheets
+
+        # 兼容 2-tuple (旧格式) 和 3-tuple (新格式含 merges)
+        def _unpack(items: Any) -> dict[str, tuple[list[dict], list[dict]]]:
+            if isinstance(items, WorkbookSnapshot):
+                items = items.materialize()
+            out: dict[str, tuple[list[dict], list[dict]]] = {}
+            for item in items:
+                if len(item) >= 3:
+                    out[item[0]] = (item[1], item[2])
+                else:
+                    out[item[0]] = (item[1], [])
+            return out
+
         results: list[dict] = []
         all_files = set(before) | set(after)
         for fp in sorted(all_files):
-            # 兼容 2-tuple (旧格式) 和 3-tuple (新格式含 merges)
-            def _unpack(items: list) -> dict[str, tuple[list[dict], list[dict]]]:
-                out: dict[str, tuple[list[dict], list[dict]]] = {}
-                for item in items:
-                    if len(item) >= 3:
-                        out[item[0]] = (item[1], item[2])
-                    else:
-                        out[item[0]] = (item[1], [])
-                return out
-
-            before_sheets = _unpack(before.get(fp, []))
-            after_sheets = _unpack(after.get(fp, []))
-            all_sheets = set(before_sheets) | set(after_sheets)
-            for sheet in sorted(all_sheets):
-                b_data, b_merges = before_sheets.get(sheet, ([], []))
-                a_data, a_merges = after_sheets.get(sheet, ([], []))
+            b_snap = before.get(fp, [])
+            a_snap = after.get(fp, [])
+            if isinstance(b_snap, WorkbookSnapshot) and isinstance(a_snap, WorkbookSnapshot):
+                sheet_pairs = changed_sheets(b_snap, a_snap)
+            else:
+                before_sheets = _unpack(b_snap)
+                after_sheets = _unpack(a_snap)
+                sheet_pairs = {
+                    sheet: (before_sheets.get(sheet, ([], [])), after_sheets.get(sheet, ([], [])))
+                    for sheet in set(before_sheets) | set(after_sheets)
+                }
+            for sheet in sorted(sheet_pairs):
+                (b_data, b_merges), (a_data, a_merges) = sheet_pairs[sheet]
                 from excelmanus.tools.cell_tools import _compute_cell_diff
                 changes = _compute_cell_diff(b_data, a_data)
                 if changes:
@@ -0,0 +1,250 @@
+"""AgentEngine 预热池：提前构造会话引擎，把冷启动开销移出请求路径。
+
+新建/恢复会话时 ``SessionManager`` 需要完整构造一个 ``AgentEngine``
+（LLM 客户端与 TLS 上下文、提示词模板解析、记忆组件、技能路由等），
+耗时都落在首个请求上。预热池按"绑定键"（隔离用户 ID，匿名为 None）
+在后台线程里预先构造若干引擎，acquire 时取出后只做会话级绑定
+（历史注入、checkpoint、激活模型、能力缓存等）。
+
+- 池中条目带指纹（用户 LLM 覆盖配置等），取出时指纹不符或闲置超时即丢弃；
+- 全局配置变化时 ``invalidate()`` 清空并作废正在构建的条目；
+- 分别统计池命中/冷启动两种路径的引擎就绪耗时与首 token 耗时。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Hashable
+
+from excelmanus.latency import LatencyStat
+from excelmanus.logger import get_logger
+
+logger = get_logger("engine_pool")
+
+# 池中最多保留的绑定键数量（按最近使用淘汰）
+_MAX_KEYS = 64
+
+_ALL = object()
+
+
+@dataclass
+class PooledEngine:
+    """预构造的引擎及其构造时的上下文。"""
+
+    engine: Any
+    fingerprint: Hashable = None
+    scope: Any = None
+    created_at: float = 0.0
+
+
+class EnginePool:
+    """按绑定键缓存预构造引擎的池。
+
+    ``build(key)`` 在工作线程中调用，返回 ``PooledEngine``；
+    ``fingerprint(key)`` 计算当前绑定指纹，用于判断池中条目是否仍可用；
+    ``dispose(engine)`` 为可选的异步回收回调（丢弃条目时调用）。
+    """
+
+    def __init__(
+        self,
+        build: Callable[[str | None], PooledEngine],
+        *,
+        size: int,
+        max_idle_seconds: float = 600.0,
+        fingerprint: Callable[[str | None], Hashable] | None = None,
+        dispose: Callable[[Any], Any] | None = None,
+    ) -> None:
+        self._build = build
+        self._size = max(0, int(size))
+        self._max_idle = max_idle_seconds
+        self._fingerprint = fingerprint
+        self._dispose = dispose
+        self._lock = threading.Lock()
+        self._idle: OrderedDict[str | None, list[PooledEngine]] = OrderedDict()
+        self._building: dict[str | None, int] = {}
+        self._generation = 0
+        self._closed = False
+        self._refills: set[asyncio.Task[Any]] = set()
+        self._disposals: set[asyncio.Task[Any]] = set()
+        self._hits = 0
+        self._misses = 0
+        self._built = 0
+        self._discarded = 0
+        self._build_failures = 0
+        self._ready = {"pooled": LatencyStat(), "cold": LatencyStat()}
+        self._first_token = {"pooled": LatencyStat(), "cold": LatencyStat()}
+
+    @property
+    def enabled(self) -> bool:
+        return self._size > 0 and not self._closed
+
+    # ── 取出 ──────────────────────────────────────────────
+
+    def take(self, key: str | None) -> PooledEngine | None:
+        """取出一个可用条目；没有时返回 None（调用方走冷启动路径）。"""
+        if not self.enabled:
+            return None
+        current = self._fingerprint(key) if self._fingerprint is not None else None
+        now = time.monotonic()
+        stale: list[PooledEngine] = []
+        found: PooledEngine | None = None
+        with self._lock:
+            items = self._idle.get(key)
+            while items:
+                item = items.pop()
+                if item.fingerprint != current or now - item.created_at > self._max_idle:
+                    stale.append(item)
+                    continue
+                found = item
+                break
+            if key in self._idle:
+                self._idle.move_to_end(key)
+            if found is not None:
+                self._hits += 1
+            else:
+                self._misses += 1
+            self._discarded += len(stale)
+        self._dispose_all(stale)
+        return found
+
+    # ── 补充 ──────────────────────────────────────────────
+
+    def schedule_refill(self, key: str | None) -> None:
+        """在后台补足 key 的预热条目（需在事件循环中调用）。"""
+        if not self.enabled:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        task = loop.create_task(self.refill(key))
+        self._refills.add(task)
+        task.add_done_callback(self._refills.discard)
+
+    async def refill(self, key: str | None) -> int:
+        """构造条目直到 key 的空闲 + 构建中数量达到池大小，返回新增数量。"""
+        added = 0
+        while self.enabled:
+            with self._lock:
+                pending = len(self._idle.get(key, ())) + self._building.get(key, 0)
+                if pending >= self._size:
+                    return added
+                self._building[key] = self._building.get(key, 0) + 1
+                generation = self._generation
+            item: PooledEngine | None = None
+            try:
+                item = await asyncio.to_thread(self._build, key)
+            except Exception:
+                logger.warning("预热引擎构造失败 (key=%s)", key, exc_info=True)
+            finally:
+                with self._lock:
+                    left = self._building.pop(key, 1) - 1
+                    if left > 0:
+                        self._building[key] = left
+
+            if item is None:
+                with self._lock:
+                    self._build_failures += 1
+                return added
+            with self._lock:
+                self._built += 1
+                accepted = generation == self._generation
+                if accepted:
+                    item.created_at = time.monotonic()
+                    self._idle.setdefault(key, []).append(item)
+                    self._idle.move_to_end(key)
+                    dropped = self._evict_keys_locked()
+                else:
+                    self._discarded += 1
+                    dropped = [item]
+            self._dispose_all(dropped)
+            if not accepted:
+                return added
+            added += 1
+        return added
+
+    def _evict_keys_locked(self) -> list[PooledEngine]:
+        evicted: list[PooledEngine] = []
+        while len(self._idle) > _MAX_KEYS:
+            _key, items = self._idle.popitem(last=False)
+            evicted.extend(items)
+        self._discarded += len(evicted)
+        return evicted
+
+    # ── 作废与关闭 ────────────────────────────────────────
+
+    def invalidate(self, key: Any = _ALL) -> int:
+        """丢弃 key（默认全部）的空闲条目；全量作废时正在构建的条目也会被丢弃。"""
+        with self._lock:
+            if key is _ALL:
+                self._generation += 1
+                dropped = [item for items in self._idle.values() for item in items]
+                self._idle.clear()
+            else:
+                dropped = self._idle.pop(key, [])
+            self._discarded += len(dropped)
+        self._dispose_all(dropped)
+        return len(dropped)
+
+    async def close(self) -> None:
+        """停止补充、作废全部条目，并等待回收任务结束。"""
+        self._closed = True
+        refills = list(self._refills)
+        for task in refills:
+            task.cancel()
+        if refills:
+            await asyncio.gather(*refills, return_exceptions=True)
+        self.invalidate()
+        disposals = list(self._disposals)
+        if disposals:
+            await asyncio.gather(*disposals, return_exceptions=True)
+
+    def _dispose_all(self, items: list[PooledEngine]) -> None:
+        if not items or self._dispose is None:
+            return
+        for item in items:
+            try:
+                result = self._dispose(item.engine)
+                if asyncio.iscoroutine(result):
+                    try:
+                        loop = asyncio.get_running_loop()
+                    except RuntimeError:
+                        result.close()
+                        continue
+                    task = loop.create_task(result)
+                    self._disposals.add(task)
+                    task.add_done_callback(self._disposals.discard)
+            except Exception:
+                logger.debug("回收预热引擎失败", exc_info=True)
+
+    # ── 统计 ──────────────────────────────────────────────
+
+    def record_ready(self, pooled: bool, ms: float) -> None:
+        """记录一次会话引擎就绪耗时（acquire 开始到引擎可用）。"""
+        with self._lock:
+            self._ready["pooled" if pooled else "cold"].record(ms)
+
+    def record_first_token(self, pooled: bool, ms: float) -> None:
+        """记录会话首 token 耗时（acquire 开始到首个模型输出 token）。"""
+        with self._lock:
+            self._first_token["pooled" if pooled else "cold"].record(ms)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "size": self._size,
+                "idle": sum(len(items) for items in self._idle.values()),
+                "building": sum(self._building.values()),
+                "keys": len(self._idle),
+                "hits": self._hits,
+                "misses": self._misses,
+                "built": self._built,
+                "discarded": self._discarded,
+                "build_failures": self._build_failures,
+                "engine_ready": {k: v.to_dict() for k, v in self._ready.items()},
+                "first_token": {k: v.to_dict() for k, v in self._first_token.items()},
+            }
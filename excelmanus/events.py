@@ -32,6 +32,7 @@ class EventType(Enum):
     THINKING_DELTA = "thinking_delta"
     TEXT_DELTA = "text_delta"
     TOOL_CALL_ARGS_DELTA = "tool_call_args_delta"
+    TOOL_OUTPUT_DELTA = "tool_output_delta"  # 工具执行期间的增量输出（run_code stdout/stderr）
     MODE_CHANGED = "mode_changed"
     EXCEL_PREVIEW = "excel_preview"
     EXCEL_DIFF = "excel_diff"
@@ -121,6 +122,8 @@ class ToolCallEvent:
     text_delta: str = ""
     thinking_delta: str = ""
     args_delta: str = ""
+    output_stream: str = ""    # "stdout" | "stderr"
+    output_delta: str = ""
     # 模式变更事件字段
     mode_name: str = ""        # "full_access" | "plan_mode"
     mode_enabled: bool = False
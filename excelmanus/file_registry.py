@@ -9,11 +9,12 @@ from __future__ import annotations
 import logging
 import os
 import secrets
+import threading
 import time
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, Callable, Iterable
 
 from excelmanus.excel_extensions import EXCEL_EXTENSIONS as _EXCEL_EXTENSIONS_BASE
 from excelmanus.security.path_utils import resolve_in_workspace, to_workspace_relative
@@ -122,6 +123,16 @@ def _detect_file_type(path: str) -> str:
     return "other"
 
 
+def _is_scan_candidate(name: str, *, excel_only: bool = False) -> bool:
+    """文件名是否参与工作区扫描（跳过隐藏 / 临时文件与无用二进制文件）。"""
+    if name.startswith((".", "~$")):
+        return False
+    ext_lower = os.path.splitext(name)[1].lower()
+    if excel_only:
+        return ext_lower in _EXCEL_EXTENSIONS
+    return ext_lower not in _SKIP_EXTENSIONS
+
+
 def _new_id() -> str:
     return secrets.token_hex(8)
 
@@ -244,6 +255,93 @@ class ScanResult:
     scan_duration_ms: int = 0
 
 
+@dataclass
+class ScanProgress:
+    """扫描进度事件。
+
+    phase 为 ``extract``（每提取完一个文件的元数据触发一次）或
+    ``register``（批量写入注册表完成后触发一次）。
+    """
+
+    phase: str
+    done: int
+    total: int
+    path: str = ""
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"phase": self.phase, "done": self.done, "total": self.total, "path": self.path}
+
+
+ScanProgressCallback = Callable[[ScanProgress], None]
+
+
+# ── 并行元数据提取 ───────────────────────────────────────────
+
+# 待提取文件数达到该值才启用进程池（少量文件时进程启动开销大于收益）
+_PARALLEL_SCAN_MIN_FILES = 8
+_DEFAULT_SCAN_WORKERS = 4
+# 增量扫描时单个变更目录最多展开的文件数
+_MAX_INCREMENTAL_FILES = 1000
+
+_scan_pool: Any = None
+_scan_pool_lock = threading.Lock()
+
+
+def _scan_worker_count() -> int:
+    """进程池大小：``EXCELMANUS_SCAN_WORKERS`` 覆盖，默认 min(CPU, 4)；≤1 表示串行。"""
+    raw = os.environ.get("EXCELMANUS_SCAN_WORKERS", "").strip()
+    try:
+        if raw:
+            return int(raw)
+    except ValueError:
+        pass
+    return min(os.cpu_count() or 1, _DEFAULT_SCAN_WORKERS)
+
+
+def _get_scan_pool(workers: int) -> Any:
+    """返回进程级复用的扫描进程池（spawn 启动，避免 fork 带走事件循环线程状态）。"""
+    global _scan_pool
+    with _scan_pool_lock:
+        if _scan_pool is None:
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+
+            _scan_pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _scan_pool
+
+
+def _reset_scan_pool() -> None:
+    """丢弃（已损坏的）扫描进程池，下次调用时重建。"""
+    global _scan_pool
+    with _scan_pool_lock:
+        pool, _scan_pool = _scan_pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _scan_file_meta(path: str, file_type: str, header_scan_rows: int) -> list[dict]:
+    """提取单个文件的元数据（进程池 worker 入口，失败返回空列表）。"""
+    fp = Path(path)
+    try:
+        if file_type == "excel":
+            return FileRegistry._scan_file_sheets(fp, header_scan_rows)
+        if file_type == "word":
+            return FileRegistry._scan_word_meta(fp)
+    except Exception:
+        logger.debug("扫描文件 %s 失败", fp, exc_info=True)
+    return []
+
+
+def _emit_progress(callback: ScanProgressCallback, event: ScanProgress) -> None:
+    try:
+        callback(event)
+    except Exception:
+        logger.debug("扫描进度回调异常", exc_info=True)
+
+
 @dataclass
 class FileGroup:
     """文件组记录。"""
@@ -311,7 +409,15 @@ class FileRegistry:
             from excelmanus.file_versions import FileVersionManager
             self._fvm = FileVersionManager(self._workspace_root)
 
+        # 可选文件监听（增量扫描）：监听器回调只记录变更路径，由下次扫描消化
+        self._watcher: Any = None
+        self._watch_baseline = False  # 监听就绪后是否已完成过一次全量扫描
+        self._dirty_paths: set[str] = set()
+        self._dirty_lock = threading.Lock()
+
         self._load_cache()
+        # 登记工作区值索引：未变化的文件不再重建，查询时按需加载已持久化的索引
+        self._attach_value_index()
 
     @property
     def workspace_root(self) -> Path:
@@ -408,6 +514,10 @@ class FileRegistry:
 
         # Tier 1 引用图谱扫描（.xlsx/.xlsm）
         self._try_tier1_scan(canonical_path)
+        # 后台生成列式旁路文件（需安装 pyarrow）
+        self._schedule_sidecar(canonical_path)
+        # 后台建立单元格值倒排索引，供 search_excel_values 免扫描查询
+        self._schedule_value_index(canonical_path)
 
         return entry
 
@@ -422,6 +532,40 @@ class FileRegistry:
         content_hash: str = "",
     ) -> FileEntry:
         """从工作区扫描注册文件（新增或更新）。"""
+        entry = self._build_scan_entry(
+            canonical_path, original_name, size_bytes, mtime_ns,
+            file_type, sheet_meta, content_hash,
+        )
+        self._store.upsert_file(entry.to_dict())
+        self._cache_entry(entry)
+        self._schedule_value_index(canonical_path)
+        return entry
+
+    def register_scan_batch(self, items: list[dict[str, Any]]) -> list[FileEntry]:
+        """批量注册扫描结果：单次 executemany + 一次 commit 写入注册表。
+
+        items 每项为 register_from_scan 的关键字参数。
+        """
+        entries = [self._build_scan_entry(**item) for item in items]
+        if not entries:
+            return []
+        self._store.upsert_batch([e.to_dict() for e in entries])
+        for entry in entries:
+            self._cache_entry(entry)
+            self._schedule_value_index(entry.canonical_path)
+        return entries
+
+    def _build_scan_entry(
+        self,
+        canonical_path: str,
+        original_name: str,
+        size_bytes: int = 0,
+        mtime_ns: int = 0,
+        file_type: str = "",
+        sheet_meta: list[dict] | None = None,
+        content_hash: str = "",
+    ) -> FileEntry:
+        """构造（或就地更新已有的）扫描 entry，不落库。"""
         if not file_type:
             file_type = _detect_file_type(canonical_path)
         now = _now_iso()
@@ -438,11 +582,9 @@ class FileRegistry:
                 existing.sheet_meta = sheet_meta
             existing.updated_at = now
             existing.deleted_at = None  # 复活
-            self._store.upsert_file(existing.to_dict())
-            self._cache_entry(existing)
             return existing
 
-        entry = FileEntry(
+        return FileEntry(
             id=_new_id(),
             workspace=self._workspace_key,
             canonical_path=canonical_path,
@@ -456,9 +598,6 @@ class FileRegistry:
             created_at=now,
             updated_at=now,
         )
-        self._store.upsert_file(entry.to_dict())
-        self._cache_entry(entry)
-        return entry
 
     def register_agent_output(
         self,
@@ -604,17 +743,48 @@ class FileRegistry:
         if ext not in (".xlsx", ".xlsm"):
             return
         try:
+            from excelmanus.reference_graph.disk_cache import load_or_scan
             from excelmanus.reference_graph.scanner import Tier1Scanner
             from excelmanus.tools.reference_tools import get_cache
 
             cache = get_cache()
             if cache.get_tier1(canonical_path) is None:
-                index = Tier1Scanner().scan(canonical_path)
+                index = load_or_scan(canonical_path, Tier1Scanner())
                 cache.put_tier1(canonical_path, index)
                 logger.info("Tier 1 reference scan completed for %s", canonical_path)
         except Exception:
             logger.debug("Tier 1 reference scan skipped for %s", canonical_path, exc_info=True)
 
+    def _schedule_sidecar(self, canonical_path: str) -> None:
+        """提交后台任务，把上传的 xlsx 转为 Arrow 列式旁路文件。"""
+        try:
+            from excelmanus.tools._sidecar import get_sidecar
+
+            sidecar = get_sidecar()
+            if sidecar is not None:
+                sidecar.schedule(self._resolve(canonical_path))
+        except Exception:
+            logger.debug("列式旁路文件调度失败: %s", canonical_path, exc_info=True)
+
+    def _attach_value_index(self) -> None:
+        try:
+            from excelmanus.tools._value_index import get_value_index
+
+            get_value_index(self._workspace_root)
+        except Exception:
+            logger.debug("单元格值索引登记失败: %s", self._workspace_root, exc_info=True)
+
+    def _schedule_value_index(self, canonical_path: str) -> None:
+        """提交后台任务，为 Excel 文件建立单元格值倒排索引（已是最新时跳过）。"""
+        try:
+            from excelmanus.tools._value_index import get_value_index
+
+            index = get_value_index(self._workspace_root)
+            if index is not None:
+                index.schedule(self._resolve(canonical_path))
+        except Exception:
+            logger.debug("单元格值索引调度失败: %s", canonical_path, exc_info=True)
+
     # ── 事件记录 ─────────────────────────────────────────────
 
     def record_event(
@@ -756,6 +926,14 @@ class FileRegistry:
             entry.updated_at = entry.deleted_at
         self._store.soft_delete(self._workspace_key, canonical_path)
         # 不从缓存移除，保留 provenance
+        try:
+            from excelmanus.tools._value_index import get_value_index
+
+            index = get_value_index(self._workspace_root)
+            if index is not None:
+                index.remove(self._resolve(canonical_path))
+        except Exception:
+            logger.debug("单元格值索引移除失败: %s", canonical_path, exc_info=True)
 
     # ── 重命名/移动 ──────────────────────────────────────────
 
@@ -1155,22 +1333,50 @@ class FileRegistry:
         max_files: int = 1000,
         header_scan_rows: int = 5,
         excel_only: bool = False,
+        workers: int | None = None,
+        on_progress: ScanProgressCallback | None = None,
     ) -> ScanResult:
         """递归扫描工作区，注册/更新文件到 registry。
 
         扫描范围：工作区根目录 + uploads/ + outputs/ 下的所有文件。
         Excel 文件额外提取 sheet 元数据（表名、行列数、表头）。
+        待提取文件较多时在进程池中并行提取，全部结果一次性批量写入注册表。
 
         Args:
             max_files: 最大文件数量限制。
             header_scan_rows: Excel 文件表头探测的行数。
             excel_only: 仅扫描 Excel 文件（兼容旧 manifest 行为）。
+            workers: 元数据提取进程数；None 读取 ``EXCELMANUS_SCAN_WORKERS``，≤1 串行。
+            on_progress: 进度回调，接收 ScanProgress 事件（在扫描线程中调用）。
+
+        已挂载就绪的文件监听器且完成过一次全量扫描时，只处理监听器
+        报告的变更路径（见 apply_changes），不再遍历整个工作区。
         """
+        watcher = self._watcher
+        if not excel_only and self._watch_baseline and watcher is not None and watcher.running:
+            with self._dirty_lock:
+                dirty, self._dirty_paths = self._dirty_paths, set()
+            if "" not in dirty:
+                return self.apply_changes(
+                    dirty,
+                    header_scan_rows=header_scan_rows,
+                    workers=workers,
+                    on_progress=on_progress,
+                )
+            # 事件溢出或后端重建 → 本次退化为全量扫描
+
         start_ts = time.monotonic()
         result = ScanResult()
 
+        # 遍历前清空积压变更：遍历期间的新事件保留到下次扫描
+        watch_ready = not excel_only and watcher is not None and watcher.ready
+        if watch_ready:
+            with self._dirty_lock:
+                self._dirty_paths.clear()
+
         collected = self._collect_file_paths(max_files, excel_only=excel_only)
         current_rel_paths: set[str] = set()
+        pending: list[tuple[Path, str, os.stat_result, str]] = []
 
         for fp in collected:
             try:
@@ -1180,39 +1386,38 @@ class FileRegistry:
 
             rel_path = self._to_rel(fp)
             current_rel_paths.add(rel_path)
-            mtime_ns = stat.st_mtime_ns
 
             existing = self._path_cache.get(rel_path)
-            if existing and existing.mtime_ns == mtime_ns and existing.size_bytes == stat.st_size:
+            if existing and existing.mtime_ns == stat.st_mtime_ns and existing.size_bytes == stat.st_size:
                 result.cache_hits += 1
                 continue
 
-            file_type = _detect_file_type(rel_path)
-            sheet_meta: list[dict] = []
-            if file_type in ("excel",):
-                try:
-                    sheet_meta = self._scan_file_sheets(fp, header_scan_rows)
-                except Exception:
-                    logger.debug("扫描文件 %s 失败", fp, exc_info=True)
-            elif file_type == "word":
-                try:
-                    sheet_meta = self._scan_word_meta(fp)
-                except Exception:
-                    logger.debug("扫描 Word 文件 %s 失败", fp, exc_info=True)
-
             if existing:
                 result.updated_files += 1
             else:
                 result.new_files += 1
+            pending.append((fp, rel_path, stat, _detect_file_type(rel_path)))
 
-            self.register_from_scan(
-                canonical_path=rel_path,
-                original_name=fp.name,
-                size_bytes=stat.st_size,
-                mtime_ns=mtime_ns,
-                file_type=file_type,
-                sheet_meta=sheet_meta,
-            )
+        metas = self._extract_scan_meta(
+            [(fp, rel_path, file_type) for fp, rel_path, _, file_type in pending],
+            header_scan_rows,
+            workers=workers,
+            on_progress=on_progress,
+        )
+        self._register_scanned(
+            [
+                {
+                    "canonical_path": rel_path,
+                    "original_name": fp.name,
+                    "size_bytes": stat.st_size,
+                    "mtime_ns": stat.st_mtime_ns,
+                    "file_type": file_type,
+                    "sheet_meta": meta,
+                }
+                for (fp, rel_path, stat, file_type), meta in zip(pending, metas)
+            ],
+            on_progress,
+        )
 
         # 软删除磁盘已不存在的文件（仅 scan origin 的文件）
         for path, entry in list(self._path_cache.items()):
@@ -1226,6 +1431,8 @@ class FileRegistry:
 
         result.total_files = len(current_rel_paths)
         result.scan_duration_ms = int((time.monotonic() - start_ts) * 1000)
+        if watch_ready:
+            self._watch_baseline = True
 
         logger.info(
             "FileRegistry scan: %d 文件 (新增 %d, 更新 %d, 删除 %d, 缓存命中 %d), 耗时 %dms",
@@ -1234,7 +1441,142 @@ class FileRegistry:
         )
         return result
 
-    def scan_uploads(self, *, header_scan_rows: int = 5) -> ScanResult:
+    def apply_changes(
+        self,
+        rel_paths: Iterable[str],
+        *,
+        header_scan_rows: int = 5,
+        workers: int | None = None,
+        on_progress: ScanProgressCallback | None = None,
+    ) -> ScanResult:
+        """按变更路径增量更新注册表，开销与变更文件数成正比。
+
+        路径为目录时递归处理其下文件；路径已不存在时软删除对应的
+        scan 条目（目录则包括其下全部条目）。返回的 total_files 为
+        注册表中未删除的条目数。
+        """
+        start_ts = time.monotonic()
+        result = ScanResult()
+        pending: list[tuple[Path, str, os.stat_result, str]] = []
+        seen: set[str] = set()
+        removed: list[str] = []
+
+        for raw in sorted(set(rel_paths)):
+            rel = raw.replace("\\", "/").strip("/")
+            if not rel or any(part in _SKIP_DIRS for part in rel.split("/")[:-1]):
+                continue
+            fp = self._workspace_root / rel
+            if fp.is_dir():
+                if fp.name in _SKIP_DIRS:
+                    continue
+                candidates = self._collect_file_paths(_MAX_INCREMENTAL_FILES, start=fp)
+            elif fp.is_file():
+                candidates = [fp] if _is_scan_candidate(fp.name) else []
+            else:
+                removed.append(rel)
+                continue
+
+            for cand in candidates:
+                try:
+                    stat = cand.stat()
+                except OSError:
+                    continue
+                cand_rel = self._to_rel(cand)
+                if cand_rel in seen:
+                    continue
+                seen.add(cand_rel)
+                existing = self._path_cache.get(cand_rel)
+                if (
+                    existing
+                    and existing.deleted_at is None
+                    and existing.mtime_ns == stat.st_mtime_ns
+                    and existing.size_bytes == stat.st_size
+                ):
+                    result.cache_hits += 1
+                    continue
+                if existing:
+                    result.updated_files += 1
+                else:
+                    result.new_files += 1
+                pending.append((cand, cand_rel, stat, _detect_file_type(cand_rel)))
+
+        for rel in removed:
+            prefix = f"{rel}/"
+            for path, entry in list(self._path_cache.items()):
+                if (
+                    entry.origin == "scan"
+                    and entry.deleted_at is None
+                    and (path == rel or path.startswith(prefix))
+                ):
+                    self.mark_deleted(path)
+                    result.deleted_files += 1
+
+        metas = self._extract_scan_meta(
+            [(fp, rel_path, file_type) for fp, rel_path, _, file_type in pending],
+            header_scan_rows,
+            workers=workers,
+            on_progress=on_progress,
+        )
+        self._register_scanned(
+            [
+                {
+                    "canonical_path": rel_path,
+                    "original_name": fp.name,
+                    "size_bytes": stat.st_size,
+                    "mtime_ns": stat.st_mtime_ns,
+                    "file_type": file_type,
+                    "sheet_meta": meta,
+                }
+                for (fp, rel_path, stat, file_type), meta in zip(pending, metas)
+            ],
+            on_progress,
+        )
+
+        result.total_files = sum(1 for e in self._path_cache.values() if e.deleted_at is None)
+        result.scan_duration_ms = int((time.monotonic() - start_ts) * 1000)
+        if result.new_files or result.updated_files or result.deleted_files:
+            logger.info(
+                "FileRegistry 增量扫描: 新增 %d, 更新 %d, 删除 %d, 耗时 %dms",
+                result.new_files, result.updated_files, result.deleted_files,
+                result.scan_duration_ms,
+            )
+        return result
+
+    # ── 文件监听 ─────────────────────────────────────────────
+
+    def attach_watcher(self, watcher: Any) -> None:
+        """挂载工作区监听器（WorkspaceWatcher）并启动。
+
+        挂载后的首次 scan_workspace 仍做全量扫描以建立基线，
+        此后的扫描只处理监听器报告的变更路径。
+        """
+        self.detach_watcher()
+        watcher.subscribe(self._on_watch_changes)
+        if not watcher.start():
+            watcher.unsubscribe(self._on_watch_changes)
+            return
+        self._watcher = watcher
+
+    def detach_watcher(self) -> None:
+        """卸载监听器，后续扫描恢复全量遍历。"""
+        watcher, self._watcher = self._watcher, None
+        self._watch_baseline = False
+        with self._dirty_lock:
+            self._dirty_paths.clear()
+        if watcher is not None:
+            watcher.unsubscribe(self._on_watch_changes)
+
+    def _on_watch_changes(self, rel_paths: set[str]) -> None:
+        with self._dirty_lock:
+            self._dirty_paths |= rel_paths
+
+    def scan_uploads(
+        self,
+        *,
+        header_scan_rows: int = 5,
+        workers: int | None = None,
+        on_progress: ScanProgressCallback | None = None,
+    ) -> ScanResult:
         """专门扫描 uploads/ 目录并注册未跟踪的上传文件。
 
         区别于 scan_workspace：仅扫描 uploads/ 子目录，
@@ -1246,6 +1588,8 @@ class FileRegistry:
 
         start_ts = time.monotonic()
         result = ScanResult()
+        dirty: list[FileEntry] = []
+        pending: list[tuple[Path, str, os.stat_result, str]] = []
 
         for walk_root, dirs, files in os.walk(uploads_dir):
             dirs[:] = [d for d in dirs if d not in _SKIP_DIRS]
@@ -1268,68 +1612,138 @@ class FileRegistry:
                     elif existing.mtime_ns == 0 and existing.size_bytes == stat.st_size:
                         # register_upload 未设 mtime → 补填 mtime，视为缓存命中
                         existing.mtime_ns = mtime_ns
-                        self._store.upsert_file(existing.to_dict())
-                        self._cache_entry(existing)
+                        dirty.append(existing)
                         result.cache_hits += 1
                     else:
                         # 已注册但内容变化 → 更新 mtime/size
                         existing.mtime_ns = mtime_ns
                         existing.size_bytes = stat.st_size
                         existing.updated_at = _now_iso()
-                        self._store.upsert_file(existing.to_dict())
-                        self._cache_entry(existing)
+                        dirty.append(existing)
                         result.updated_files += 1
                     result.total_files += 1
                     continue
 
                 # 未注册的上传文件 → 按 scan origin 注册
-                file_type = _detect_file_type(rel_path)
-                sheet_meta: list[dict] = []
-                if file_type in ("excel",):
-                    try:
-                        sheet_meta = self._scan_file_sheets(fp, header_scan_rows)
-                    except Exception:
-                        logger.debug("扫描上传文件 %s 失败", fp, exc_info=True)
-                elif file_type == "word":
-                    try:
-                        sheet_meta = self._scan_word_meta(fp)
-                    except Exception:
-                        logger.debug("扫描上传 Word 文件 %s 失败", fp, exc_info=True)
-
-                self.register_from_scan(
-                    canonical_path=rel_path,
-                    original_name=name,
-                    size_bytes=stat.st_size,
-                    mtime_ns=mtime_ns,
-                    file_type=file_type,
-                    sheet_meta=sheet_meta,
-                )
+                pending.append((fp, rel_path, stat, _detect_file_type(rel_path)))
                 result.new_files += 1
                 result.total_files += 1
 
+        if dirty:
+            self._store.upsert_batch([e.to_dict() for e in dirty])
+            for entry in dirty:
+                self._cache_entry(entry)
+
+        metas = self._extract_scan_meta(
+            [(fp, rel_path, file_type) for fp, rel_path, _, file_type in pending],
+            header_scan_rows,
+            workers=workers,
+            on_progress=on_progress,
+        )
+        self._register_scanned(
+            [
+                {
+                    "canonical_path": rel_path,
+                    "original_name": fp.name,
+                    "size_bytes": stat.st_size,
+                    "mtime_ns": stat.st_mtime_ns,
+                    "file_type": file_type,
+                    "sheet_meta": meta,
+                }
+                for (fp, rel_path, stat, file_type), meta in zip(pending, metas)
+            ],
+            on_progress,
+        )
+
         result.scan_duration_ms = int((time.monotonic() - start_ts) * 1000)
         return result
 
-    def _collect_file_paths(self, max_files: int, *, excel_only: bool = False) -> list[Path]:
-        """递归收集工作区中的文件路径。"""
+    def _extract_scan_meta(
+        self,
+        targets: list[tuple[Path, str, str]],
+        header_scan_rows: int,
+        *,
+        workers: int | None = None,
+        on_progress: ScanProgressCallback | None = None,
+    ) -> list[list[dict]]:
+        """提取 (fp, rel_path, file_type) 列表的元数据，返回与 targets 对齐的结果。
+
+        需要打开文件的（Excel / Word）达到 _PARALLEL_SCAN_MIN_FILES 个时
+        提交到进程池并行提取；进程池不可用或中途损坏时剩余文件回退串行。
+        """
+        total = len(targets)
+        metas: list[list[dict]] = [[] for _ in targets]
+        done = 0
+
+        def _report(idx: int) -> None:
+            nonlocal done
+            done += 1
+            if on_progress is not None:
+                _emit_progress(on_progress, ScanProgress("extract", done, total, targets[idx][1]))
+
+        remaining: list[int] = []
+        for idx, (_fp, _rel, file_type) in enumerate(targets):
+            if file_type in ("excel", "word"):
+                remaining.append(idx)
+            else:
+                _report(idx)
+
+        if workers is None:
+            workers = _scan_worker_count()
+        if workers > 1 and len(remaining) >= _PARALLEL_SCAN_MIN_FILES:
+            from concurrent.futures import as_completed
+
+            finished: set[int] = set()
+            try:
+                pool = _get_scan_pool(workers)
+                futures = {
+                    pool.submit(_scan_file_meta, str(targets[idx][0]), targets[idx][2], header_scan_rows): idx
+                    for idx in remaining
+                }
+                for fut in as_completed(futures):
+                    idx = futures[fut]
+                    metas[idx] = fut.result()
+                    finished.add(idx)
+                    _report(idx)
+            except Exception:
+                logger.warning("并行元数据提取失败，剩余文件回退串行", exc_info=True)
+                _reset_scan_pool()
+            remaining = [idx for idx in remaining if idx not in finished]
+
+        for idx in remaining:
+            fp, _rel, file_type = targets[idx]
+            metas[idx] = _scan_file_meta(str(fp), file_type, header_scan_rows)
+            _report(idx)
+        return metas
+
+    def _register_scanned(
+        self,
+        items: list[dict[str, Any]],
+        on_progress: ScanProgressCallback | None,
+    ) -> None:
+        """批量写入扫描结果并发出 register 进度事件。"""
+        if not items:
+            return
+        self.register_scan_batch(items)
+        if on_progress is not None:
+            _emit_progress(on_progress, ScanProgress("register", len(items), len(items)))
+
+    def _collect_file_paths(
+        self,
+        max_files: int,
+        *,
+        excel_only: bool = False,
+        start: Path | None = None,
+    ) -> list[Path]:
+        """递归收集工作区（或其子目录 start）中的文件路径。"""
         root = self._workspace_root
         paths: list[Path] = []
 
-        for walk_root, dirs, files in os.walk(root):
+        for walk_root, dirs, files in os.walk(start or root):
             dirs[:] = [d for d in dirs if d not in _SKIP_DIRS]
             for name in files:
-                if name.startswith((".", "~$")):
+                if not _is_scan_candidate(name, excel_only=excel_only):
                     continue
-                _, ext = os.path.splitext(name)
-                ext_lower = ext.lower()
-
-                if excel_only:
-                    if ext_lower not in _EXCEL_EXTENSIONS:
-                        continue
-                else:
-                    # 跳过完全无用的二进制文件
-                    if ext_lower in _SKIP_EXTENSIONS:
-                        continue
 
                 paths.append(Path(walk_root, name))
                 if len(paths) >= max_files:
@@ -1536,7 +1950,25 @@ class FileRegistry:
 
     @staticmethod
     def _scan_xlsx_sheets(fp: Path, header_scan_rows: int) -> list[dict]:
-        """用 openpyxl 扫描 .xlsx/.xlsm 文件的 sheet 元数据。"""
+        """扫描 .xlsx/.xlsm 文件的 sheet 元数据。
+
+        优先直接解析 zip 内的 XML（只读取每个 sheet 的前若干行），
+        解析失败时回退到 openpyxl 只读模式。
+        """
+        from excelmanus.tools._sheet_head import read_sheet_heads
+
+        heads = read_sheet_heads(fp, max_rows=header_scan_rows, max_cols=30)
+        if heads is not None:
+            return [
+                {
+                    "name": head.name,
+                    "rows": head.max_row,
+                    "columns": head.max_column,
+                    "headers": FileRegistry._pick_headers(head.rows),
+                }
+                for head in heads
+            ]
+
         from openpyxl import load_workbook
 
         sheets: list[dict] = []
@@ -1559,23 +1991,7 @@ class FileRegistry:
                         values_only=True,
                     ):
                         rows_raw.append(list(row))
-
-                    if rows_raw:
-                        best_idx = 0
-                        best_score = -1
-                        for idx, r in enumerate(rows_raw):
-                            non_empty = [v for v in r if v is not None and str(v).strip()]
-                            str_count = sum(1 for v in non_empty if isinstance(v, str))
-                            score = str_count * 2 + len(non_empty)
-                            if score > best_score:
-                                best_score = score
-                                best_idx = idx
-                        header_row = rows_raw[best_idx]
-                        headers = [
-                            str(v).strip()
-                            for v in header_row
-                            if v is not None and str(v).strip()
-                        ]
+                    headers = FileRegistry._pick_headers(rows_raw)
 
                 sheets.append({
                     "name": sn,
@@ -1587,6 +2003,26 @@ class FileRegistry:
             wb.close()
         return sheets
 
+    @staticmethod
+    def _pick_headers(rows_raw: list[list[Any]]) -> list[str]:
+        """从前几行中选出最像表头的一行（字符串单元格权重更高）。"""
+        if not rows_raw:
+            return []
+        best_idx = 0
+        best_score = -1
+        for idx, r in enumerate(rows_raw):
+            non_empty = [v for v in r if v is not None and str(v).strip()]
+            str_count = sum(1 for v in non_empty if isinstance(v, str))
+            score = str_count * 2 + len(non_empty)
+            if score > best_score:
+                best_score = score
+                best_idx = idx
+        return [
+            str(v).strip()
+            for v in rows_raw[best_idx]
+            if v is not None and str(v).strip()
+        ]
+
     # ── Staging / CoW / Checkpoint 委托层 ────────────────────
 
     @property
@@ -0,0 +1,43 @@
+"""耗时统计：累计次数/均值/最大值 + 最近窗口内的 p50/p95。
+
+引擎池、run_code 解释器解析与 MCP 工具调用等共用，用于各自的 ``stats()``。
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from typing import Any
+
+_DEFAULT_WINDOW = 256
+
+
+class LatencyStat:
+    """耗时统计：累计次数/均值/最大值 + 最近窗口内的 p50/p95。"""
+
+    def __init__(self, window: int = _DEFAULT_WINDOW) -> None:
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self._recent: deque[float] = deque(maxlen=max(1, window))
+
+    def record(self, ms: float) -> None:
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+        self._recent.append(ms)
+
+    def to_dict(self) -> dict[str, Any]:
+        if not self.count:
+            return {"count": 0}
+        recent = sorted(self._recent)
+
+        def _pct(p: float) -> float:
+            return round(recent[min(len(recent) - 1, int(p * len(recent)))], 1)
+
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total_ms / self.count, 1),
+            "p50_ms": _pct(0.5),
+            "p95_ms": _pct(0.95),
+            "max_ms": round(self.max_ms, 1),
+        }
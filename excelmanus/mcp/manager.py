@@ -7,13 +7,16 @@
 from __future__ import annotations
 
 import asyncio
+import concurrent.futures
 import json
 import logging
+import threading
 import time
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import TYPE_CHECKING, Any, Callable, Literal
 
+from excelmanus.latency import LatencyStat
 from excelmanus.mcp.client import MCPClientWrapper
 from excelmanus.mcp.processes import (
     snapshot_workspace_mcp_pids,
@@ -28,6 +31,11 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(__name__)
 
+# 单个 Server 连接 + 工具发现的默认截止时间（秒）
+_DEFAULT_CONNECT_TIMEOUT = 30.0
+# 同步调用等待结果时在工具超时之外额外留出的余量（秒），防止 loop 卡死时永久阻塞
+_SYNC_CALL_GRACE_SECONDS = 5.0
+
 # ---------------------------------------------------------------------------
 # 工具名前缀映射
 # ---------------------------------------------------------------------------
@@ -252,29 +260,199 @@ def _adapt_mcp_call_arguments(
 # ---------------------------------------------------------------------------
 
 
+class _SyncCallBridge:
+    """同步 MCP 调用桥：把工作线程中的调用提交到长驻 event loop 执行。
+
+    MCP 会话（stdio/SSE 流）绑定在建立连接的 event loop 上，
+    因此优先提交到 ``bind()`` 记录的属主 loop；属主 loop 未运行时
+    （如脚本/测试中直接调用），退回到桥自带的后台 loop 线程。
+    后台线程按需创建、常驻复用，``close()`` 时停止。
+
+    同时按 Server 统计每次调用耗时（同步、异步路径共用）。
+    """
+
+    def __init__(self, name: str = "mcp-sync-bridge") -> None:
+        self._name = name
+        self._owner_loop: asyncio.AbstractEventLoop | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self._latency: dict[str, LatencyStat] = {}
+        self._sync_latency = LatencyStat()
+        self._errors = 0
+
+    def bind(self, loop: asyncio.AbstractEventLoop) -> None:
+        """记录 MCP 会话所属的 event loop。"""
+        self._owner_loop = loop
+
+    def call(
+        self,
+        server_name: str,
+        tool_name: str,
+        coro_factory: Callable[[], Any],
+        timeout: float,
+    ) -> str:
+        """在目标 loop 上执行 ``coro_factory()`` 并阻塞等待结果。
+
+        Raises:
+            RuntimeError: 在目标 loop 所在线程中调用（阻塞等待会死锁）。
+            TimeoutError: 超过 ``timeout`` 加余量仍未返回。
+        """
+        loop = self._target_loop()
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            raise RuntimeError(
+                f"不能在 MCP event loop 线程中同步调用工具 {tool_name}，请使用 async_func"
+            )
+
+        started = time.monotonic()
+        ok = False
+        future = asyncio.run_coroutine_threadsafe(coro_factory(), loop)
+        try:
+            result = future.result(timeout=timeout + _SYNC_CALL_GRACE_SECONDS)
+            ok = True
+            return result
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise TimeoutError(
+                f"MCP 工具 {tool_name} 调用超时（{timeout}s）"
+            ) from None
+        finally:
+            self.record(server_name, tool_name, started, ok=ok, sync=True)
+
+    def record(
+        self,
+        server_name: str,
+        tool_name: str,
+        started: float,
+        *,
+        ok: bool,
+        sync: bool = False,
+    ) -> None:
+        """记录一次调用耗时（可从任意线程调用）。"""
+        elapsed_ms = (time.monotonic() - started) * 1000
+        with self._lock:
+            stat = self._latency.get(server_name)
+            if stat is None:
+                stat = self._latency[server_name] = LatencyStat()
+            stat.record(elapsed_ms)
+            if sync:
+                self._sync_latency.record(elapsed_ms)
+            if not ok:
+                self._errors += 1
+        logger.debug(
+            "MCP 工具调用完成: server=%s tool=%s path=%s ok=%s elapsed_ms=%.1f",
+            server_name,
+            tool_name,
+            "sync" if sync else "async",
+            ok,
+            elapsed_ms,
+        )
+
+    def stats(self) -> dict[str, Any]:
+        """按 Server 的调用耗时统计快照。"""
+        with self._lock:
+            return {
+                "servers": {
+                    name: stat.to_dict()
+                    for name, stat in sorted(self._latency.items())
+                },
+                "sync": self._sync_latency.to_dict(),
+                "errors": self._errors,
+                "loop_thread_alive": bool(self._thread and self._thread.is_alive()),
+            }
+
+    def close(self) -> None:
+        """停止后台 loop 线程（之后的调用会按需重建）。"""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = None
+            self._thread = None
+        if loop is None:
+            return
+        loop.call_soon_threadsafe(loop.stop)
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=5)
+        if thread is None or not thread.is_alive():
+            loop.close()
+
+    def _target_loop(self) -> asyncio.AbstractEventLoop:
+        owner = self._owner_loop
+        if owner is not None and owner.is_running() and not owner.is_closed():
+            return owner
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(
+                    target=self._run_loop, args=(loop,), name=self._name, daemon=True,
+                )
+                thread.start()
+                self._loop, self._thread = loop, thread
+            return self._loop
+
+    @staticmethod
+    def _run_loop(loop: asyncio.AbstractEventLoop) -> None:
+        asyncio.set_event_loop(loop)
+        loop.run_forever()
+
+
+def _run_unbridged(coro_factory: Callable[[], Any]) -> Any:
+    """无调用桥时的同步执行：每次调用新建临时 event loop，不留常驻线程。"""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro_factory())
+    # 当前线程已有运行中的 loop，不能在其中阻塞：换到临时线程执行
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(lambda: asyncio.run(coro_factory())).result()
+
+
 def _make_async_tool_func(
     client: "MCPClientWrapper",
     server_name: str,
     original_name: str,
     workspace_root: str,
+    ready: "asyncio.Future[Any] | None" = None,
+    bridge: _SyncCallBridge | None = None,
 ) -> Callable[..., Any]:
     """创建异步包装函数，直接 await MCP 工具调用。
 
     优先使用此函数，在主 event loop 中直接 await，
-    避免 asyncio.run() 创建新 event loop 的开销。
+    避免跨线程提交的开销。
+
+    Args:
+        ready: 由缓存 schema 提前注册时，Server 连接完成（成功或失败）的信号；
+            调用前先等待连接结束。
+        bridge: 记录调用耗时的调用桥；为 None 时不记录。
 
     Returns:
         异步可调用对象，签名为 ``async (**kwargs) -> str``。
     """
 
     async def async_tool_func(**kwargs: Any) -> str:
-        safe_kwargs = _adapt_mcp_call_arguments(
-            server_name=server_name,
-            arguments=kwargs,
-            workspace_root=workspace_root,
-        )
-        # client.call_tool 内部已有 asyncio.wait_for(timeout) 保护
-        result = await client.call_tool(original_name, safe_kwargs)
+        if (
+            ready is not None
+            and not ready.done()
+            and ready.get_loop() is asyncio.get_running_loop()
+        ):
+            await asyncio.shield(ready)
+        started = time.monotonic()
+        ok = False
+        try:
+            safe_kwargs = _adapt_mcp_call_arguments(
+                server_name=server_name,
+                arguments=kwargs,
+                workspace_root=workspace_root,
+            )
+            # client.call_tool 内部已有 asyncio.wait_for(timeout) 保护
+            result = await client.call_tool(original_name, safe_kwargs)
+            ok = True
+        finally:
+            if bridge is not None:
+                bridge.record(server_name, original_name, started, ok=ok)
         return format_tool_result(result)
 
     return async_tool_func
@@ -286,11 +464,12 @@ def _make_tool_func(
     original_name: str,
     timeout: int,
     workspace_root: str,
+    bridge: _SyncCallBridge | None = None,
 ) -> Callable[..., str]:
-    """创建同步包装函数，内部通过 event loop 执行异步 MCP 工具调用。
+    """创建同步包装函数，经调用桥在长驻 event loop 上执行 MCP 工具调用。
 
-    仅作为 async_func 不可用时的兜底路径。
-    正常流程应使用 _make_async_tool_func 创建的异步版本。
+    供工作线程中的同步调用方使用（如子代理、审批执行路径）；
+    并发调用共用同一个 loop，不再为每次调用新建线程池和 event loop。
 
     Args:
         client: MCP 客户端封装实例。
@@ -298,6 +477,8 @@ def _make_tool_func(
         original_name: 远程工具的原始名称（不含前缀）。
         timeout: 调用超时秒数。
         workspace_root: 当前工作区根目录，用于路径规范化。
+        bridge: 调用桥；为 None 时（未经 MCPManager 创建）每次调用在临时
+            event loop 上执行，见 ``_run_unbridged``。
 
     Returns:
         同步可调用对象，签名为 ``(**kwargs) -> str``。
@@ -316,21 +497,9 @@ def _make_tool_func(
             )
             return format_tool_result(result)
 
-        # 判断当前是否已有运行中的 event loop
-        try:
-            loop = asyncio.get_running_loop()
-        except RuntimeError:
-            loop = None
-
-        if loop is not None and loop.is_running():
-            # 在已有 event loop 中，使用线程池执行 asyncio.run
-            import concurrent.futures
-
-            with concurrent.futures.ThreadPoolExecutor() as pool:
-                future = pool.submit(asyncio.run, _call())
-                return future.result()
-        else:
-            return asyncio.run(_call())
+        if bridge is None:
+            return _run_unbridged(_call)
+        return bridge.call(server_name, original_name, _call, timeout)
 
     return tool_func
 
@@ -345,6 +514,9 @@ def make_tool_def(
     client: "MCPClientWrapper",
     mcp_tool: Any,
     workspace_root: str = ".",
+    *,
+    ready: "asyncio.Future[Any] | None" = None,
+    bridge: _SyncCallBridge | None = None,
 ) -> ToolDef:
     """将 MCP 工具定义转换为 ToolDef。
 
@@ -361,6 +533,8 @@ def make_tool_def(
         mcp_tool: MCP 工具定义对象（duck typing），需具有
             ``name``、``description``、``inputSchema`` 属性。
         workspace_root: 当前工作区根目录。
+        ready: 连接完成信号（缓存 schema 预注册时使用），见 ``_make_async_tool_func``。
+        bridge: 同步调用桥（``MCPManager`` 传入自身实例），见 ``_SyncCallBridge``。
 
     Returns:
         转换后的 ToolDef 实例。
@@ -381,6 +555,7 @@ def make_tool_def(
         original_name,
         timeout,
         workspace_root,
+        bridge,
     )
 
     async_func = _make_async_tool_func(
@@ -388,6 +563,8 @@ def make_tool_def(
         server_name,
         original_name,
         workspace_root,
+        ready,
+        bridge,
     )
 
     return ToolDef(
@@ -401,7 +578,9 @@ def make_tool_def(
     )
 
 
-_ServerStatus = Literal["ready", "connect_failed", "discover_failed", "installing", "install_failed"]
+_ServerStatus = Literal[
+    "ready", "connecting", "connect_failed", "discover_failed", "installing", "install_failed",
+]
 
 
 @dataclass
@@ -426,6 +605,14 @@ def _short_error(exc: BaseException) -> str:
     return text
 
 
+def _tool_signature(tool_defs: list[ToolDef]) -> list[tuple[str, str, str]]:
+    """ToolDef 列表的可比较签名（名称、描述、参数 schema）。"""
+    return sorted(
+        (td.name, td.description, json.dumps(td.input_schema, sort_keys=True, default=str))
+        for td in tool_defs
+    )
+
+
 # ---------------------------------------------------------------------------
 # MCPManager — 多 Server 连接与工具注册管理器
 # ---------------------------------------------------------------------------
@@ -468,6 +655,14 @@ class MCPManager:
         self._registry: "ToolRegistry | None" = None
         # 内置 Server 重试成功后的回调（engine 用于补注册 parallel_search 等）
         self._on_builtin_retry_success: list[Callable[[], Any]] = []
+        # 工具 schema 缓存（仅在 app_config 开启时启用）与单 Server 连接截止时间
+        self._schema_cache_enabled = getattr(app_config, "mcp_schema_cache", False) is True
+        self._schema_cache_dir: Path | None = None
+        self._connect_timeout = float(
+            getattr(app_config, "mcp_connect_timeout_seconds", 0) or _DEFAULT_CONNECT_TIMEOUT
+        )
+        # 同步工具调用桥：工作线程/子代理的 MCP 调用共用，按 Server 统计耗时
+        self._call_bridge = _SyncCallBridge()
 
     async def initialize(self, registry: "ToolRegistry") -> None:
         """加载配置 → 连接所有 Server → 注册远程工具到 ToolRegistry。
@@ -477,8 +672,10 @@ class MCPManager:
         2. 对 npx 命令检查本地缓存：
            - 缓存命中 → 立即连接
            - 缓存未命中 → 后台安装，不阻塞主启动
-        3. 连接成功后发现工具，转换为 ToolDef
-        4. 检查工具名冲突，冲突则跳过并记录 WARNING
+        3. 有工具 schema 缓存的 Server 先按缓存生成 ToolDef，后台连接后校正；
+           其余 Server 并发连接并发现工具（每个 Server 独立截止时间）
+        4. 无论是否命中缓存，都按配置顺序收集工具并检查工具名冲突，
+           冲突则跳过并记录 WARNING
         5. 批量注册所有不冲突的工具到 registry
 
         任何单个 Server 的失败不影响其余 Server。
@@ -488,6 +685,8 @@ class MCPManager:
                 logger.debug("MCP 已初始化，跳过重复初始化")
                 return
 
+            # 会话建立在当前 loop 上，同步调用需回投到这里执行
+            self._call_bridge.bind(asyncio.get_running_loop())
             from excelmanus.mcp.config import MCPConfigLoader
 
             self._clients.clear()
@@ -529,18 +728,37 @@ class MCPManager:
                     )
                     deferred_configs.append(cfg)
 
-            # ── 连接缓存命中的 Server 并注册工具 ──────────
+            # ── 并发连接 Server；有 schema 缓存的 Server 不等待连接 ──────────
+            cached_schemas = [self._load_cached_schemas(cfg) for cfg in ready_configs]
+
             all_tool_defs: list[ToolDef] = []
             auto_approved_names: list[str] = []
             batch_pending_names: set[str] = set()
+            pending_reconciles: list[tuple[Any, ...]] = []
+            loop = asyncio.get_running_loop()
 
-            for cfg in ready_configs:
-                tool_defs, approved = await self._connect_and_register_server(
-                    cfg, registry, batch_pending_names=batch_pending_names,
+            # 无缓存的 Server 并发连接；缓存命中的 Server 用缓存 schema 占据自己的轮次。
+            # 所有 Server 按配置顺序依次收集工具，冲突取舍与缓存状态无关
+            turns = [loop.create_future() for _ in range(len(ready_configs) + 1)]
+            turns[0].set_result(None)
+            results = await asyncio.gather(*(
+                self._collect_cached_server(
+                    cfg, cached, registry,
+                    batch_pending_names=batch_pending_names,
+                    turn=(turns[position], turns[position + 1]),
+                    pending_reconciles=pending_reconciles,
+                )
+                if cached is not None
+                else self._connect_and_register_server(
+                    cfg, registry,
+                    batch_pending_names=batch_pending_names,
+                    turn=(turns[position], turns[position + 1]),
                 )
+                for position, (cfg, cached) in enumerate(zip(ready_configs, cached_schemas))
+            ))
+            for tool_defs, approved in results:
                 all_tool_defs.extend(tool_defs)
                 auto_approved_names.extend(approved)
-                batch_pending_names.update(td.name for td in tool_defs)
 
             # 批量注册
             if all_tool_defs:
@@ -549,6 +767,14 @@ class MCPManager:
             self._auto_approved_tools = auto_approved_names
             self._initialized = True
 
+            # ── 缓存注册的 Server 后台连接并以实时 schema 校正 ──────────
+            for cfg, client, tool_defs, ready in pending_reconciles:
+                task = asyncio.create_task(
+                    self._connect_cached_server(cfg, client, tool_defs, ready, registry),
+                    name=f"mcp-connect-{cfg.name}",
+                )
+                self._background_tasks.append(task)
+
             ready_count = sum(
                 1
                 for item in self._server_states.values()
@@ -556,6 +782,11 @@ class MCPManager:
             )
             total_count = len(self._server_states)
             deferred_count = len(deferred_configs)
+            if pending_reconciles:
+                logger.info(
+                    "MCP 已从 schema 缓存注册 %d 个 Server 的工具，后台连接中",
+                    len(pending_reconciles),
+                )
 
             if deferred_count:
                 logger.info(
@@ -587,7 +818,7 @@ class MCPManager:
                 cfg for cfg in ready_configs
                 if cfg.name in self._builtin_server_names
                 and self._server_states.get(cfg.name)
-                and self._server_states[cfg.name].status != "ready"
+                and self._server_states[cfg.name].status not in ("ready", "connecting")
             ]
             if failed_builtin_configs:
                 retry_task = asyncio.create_task(
@@ -604,31 +835,103 @@ class MCPManager:
         registry: "ToolRegistry",
         *,
         batch_pending_names: set[str] | None = None,
+        turn: "tuple[asyncio.Future[Any], asyncio.Future[Any]] | None" = None,
     ) -> tuple[list[ToolDef], list[str]]:
         """连接单个 Server、发现工具并收集 ToolDef。
 
         Args:
             batch_pending_names: 同一批次中已收集但尚未注册的工具名集合，
-                用于跨 Server 去重。
+                用于跨 Server 去重；收集后就地追加本 Server 的工具名。
+            turn: 并发连接时的 (本轮, 下一轮) 顺序信号：连接不受限制，
+                收集工具前等待本轮信号，结束后释放下一轮。
 
         Returns:
             (tool_defs, auto_approved_names) — 尚未注册到 registry，由调用方批量注册。
         """
+        try:
+            connection = await self._connect_server(cfg)
+            if turn is not None:
+                await turn[0]
+            if connection is None:
+                return [], []
+            client, mcp_tools, started = connection
+            tool_defs, auto_approved, tool_names = self._collect_tool_defs(
+                cfg, client, mcp_tools, registry,
+                batch_pending_names=batch_pending_names,
+            )
+            if batch_pending_names is not None:
+                batch_pending_names.update(td.name for td in tool_defs)
+            self._mark_server_ready(cfg, client, tool_names, started)
+            self._save_schemas(cfg, mcp_tools)
+            return tool_defs, auto_approved
+        finally:
+            if turn is not None and not turn[1].done():
+                turn[1].set_result(None)
+
+    async def _collect_cached_server(
+        self,
+        cfg: "MCPServerConfig",
+        mcp_tools: list[Any],
+        registry: "ToolRegistry",
+        *,
+        batch_pending_names: set[str],
+        turn: "tuple[asyncio.Future[Any], asyncio.Future[Any]]",
+        pending_reconciles: list[tuple[Any, ...]],
+    ) -> tuple[list[ToolDef], list[str]]:
+        """在本轮按缓存 schema 收集 ToolDef，连接留待后台校正。
+
+        收集结果与 (cfg, client, tool_defs, ready) 一并追加到 pending_reconciles。
+        """
+        try:
+            await turn[0]
+            client = MCPClientWrapper(cfg)
+            ready = asyncio.get_running_loop().create_future()
+            tool_defs, auto_approved, tool_names = self._collect_tool_defs(
+                cfg, client, mcp_tools, registry,
+                batch_pending_names=batch_pending_names,
+                ready=ready,
+            )
+            batch_pending_names.update(td.name for td in tool_defs)
+            self._server_states[cfg.name] = _ServerRuntimeState(
+                name=cfg.name,
+                transport=cfg.transport,
+                status="connecting",
+                tool_names=tool_names,
+            )
+            pending_reconciles.append((cfg, client, tool_defs, ready))
+            return tool_defs, auto_approved
+        finally:
+            if not turn[1].done():
+                turn[1].set_result(None)
+
+    async def _connect_server(
+        self,
+        cfg: "MCPServerConfig",
+        *,
+        client: MCPClientWrapper | None = None,
+    ) -> tuple[MCPClientWrapper, list[Any], float] | None:
+        """连接单个 Server 并发现工具，连接与发现共用一个截止时间。
+
+        Returns:
+            (client, mcp_tools, started)；失败时更新 Server 状态并返回 ``None``。
+        """
 
         started = time.monotonic()
+        deadline = started + self._connect_timeout
         state = self._server_states.get(cfg.name)
         if state is None:
             state = _ServerRuntimeState(
                 name=cfg.name,
                 transport=cfg.transport,
-                status="connect_failed",
+                status="connecting",
             )
             self._server_states[cfg.name] = state
         else:
             state.transport = cfg.transport
-            state.status = "connect_failed"
+            state.status = "connecting"
 
-        client = MCPClientWrapper(cfg)
+        if client is None:
+            client = MCPClientWrapper(cfg)
         known_workspace_pids: set[int] = set()
         if cfg.transport == "stdio":
             known_workspace_pids = snapshot_workspace_mcp_pids(
@@ -636,17 +939,27 @@ class MCPManager:
                 state_dir=cfg.state_dir,
             )
         try:
-            await client.connect()
+            await asyncio.wait_for(client.connect(), timeout=self._connect_timeout)
         except (Exception, asyncio.CancelledError) as exc:
             state.status = "connect_failed"
-            state.last_error = _short_error(exc)
+            state.last_error = (
+                f"连接超时（{self._connect_timeout:g}s）"
+                if isinstance(exc, asyncio.TimeoutError)
+                else _short_error(exc)
+            )
             state.init_ms = int((time.monotonic() - started) * 1000)
             logger.error(
                 "连接 MCP Server '%s' 失败: %s",
                 cfg.name,
                 state.last_error,
             )
-            return [], []
+            if isinstance(exc, asyncio.TimeoutError):
+                # 超时取消发生在握手中途，需显式释放已进入的上下文
+                try:
+                    await client.close()
+                except BaseException:
+                    self._leaked_clients.append(client)
+            return None
 
         if cfg.transport == "stdio":
             current_workspace_pids = snapshot_workspace_mcp_pids(
@@ -665,7 +978,10 @@ class MCPManager:
 
         # 发现远程工具
         try:
-            mcp_tools = await client.discover_tools()
+            mcp_tools = await asyncio.wait_for(
+                client.discover_tools(),
+                timeout=max(deadline - time.monotonic(), 1.0),
+            )
         except (Exception, asyncio.CancelledError) as exc:
             state.status = "discover_failed"
             state.last_error = _short_error(exc)
@@ -684,7 +1000,7 @@ class MCPManager:
                     exc_info=True,
                 )
                 self._leaked_clients.append(client)
-            return [], []
+            return None
 
         if cfg.transport == "stdio":
             current_workspace_pids = snapshot_workspace_mcp_pids(
@@ -702,8 +1018,30 @@ class MCPManager:
                     state_dir=cfg.state_dir,
                 )
 
-        # 转换为 ToolDef，检查冲突
+        return client, list(mcp_tools), started
+
+    def _collect_tool_defs(
+        self,
+        cfg: "MCPServerConfig",
+        client: MCPClientWrapper,
+        mcp_tools: list[Any],
+        registry: "ToolRegistry",
+        *,
+        batch_pending_names: set[str] | None = None,
+        replacing: set[str] | None = None,
+        ready: "asyncio.Future[Any] | None" = None,
+    ) -> tuple[list[ToolDef], list[str], list[str]]:
+        """将远程工具转换为 ToolDef，检查冲突并记录白名单与 scope。
+
+        Args:
+            replacing: 即将被替换的已注册工具名（校正缓存注册时），不计入冲突。
+
+        Returns:
+            (tool_defs, auto_approved_names, original_tool_names)。
+        """
         existing_names = set(registry.get_tool_names())
+        if replacing:
+            existing_names -= replacing
         if batch_pending_names:
             existing_names |= batch_pending_names
         tool_defs: list[ToolDef] = []
@@ -717,6 +1055,8 @@ class MCPManager:
                 client,
                 tool,
                 workspace_root=self._workspace_root,
+                ready=ready,
+                bridge=self._call_bridge,
             )
             if tool_def.name in existing_names:
                 logger.warning(
@@ -745,6 +1085,16 @@ class MCPManager:
             # 记录工具 scope（用于路由过滤）
             self._tool_scopes[tool_def.name] = cfg.scope
 
+        return tool_defs, auto_approved, tool_names
+
+    def _mark_server_ready(
+        self,
+        cfg: "MCPServerConfig",
+        client: MCPClientWrapper,
+        tool_names: list[str],
+        started: float,
+    ) -> None:
+        state = self._server_states[cfg.name]
         self._clients[cfg.name] = client
         state.status = "ready"
         state.last_error = None
@@ -758,7 +1108,81 @@ class MCPManager:
             state.init_ms,
             len(getattr(client, "managed_pids", set())),
         )
-        return tool_defs, auto_approved
+
+    async def _connect_cached_server(
+        self,
+        cfg: "MCPServerConfig",
+        client: MCPClientWrapper,
+        cached_defs: list[ToolDef],
+        ready: "asyncio.Future[Any]",
+        registry: "ToolRegistry",
+    ) -> None:
+        """后台连接已按缓存 schema 注册工具的 Server，并以实时发现结果校正注册。
+
+        - 连接失败：注销缓存注册的工具；
+        - schema 有变化：替换为实时 ToolDef 并更新缓存；
+        - 无论成败，最后释放 ``ready``，让等待中的工具调用继续。
+        """
+        cached_names = {td.name for td in cached_defs}
+        try:
+            connection = await self._connect_server(cfg, client=client)
+            if connection is None:
+                self._drop_tools(registry, cached_names)
+                if cfg.name in self._builtin_server_names:
+                    retry_task = asyncio.create_task(
+                        self._retry_failed_builtin_servers([cfg], registry),
+                        name="mcp-builtin-retry",
+                    )
+                    self._background_tasks.append(retry_task)
+                return
+
+            client, mcp_tools, started = connection
+            live_defs, approved, tool_names = self._collect_tool_defs(
+                cfg, client, mcp_tools, registry, replacing=cached_names,
+            )
+            if _tool_signature(live_defs) != _tool_signature(cached_defs):
+                live_names = {td.name for td in live_defs}
+                self._drop_tools(registry, cached_names - live_names)
+                registry.unregister_tools(cached_names & live_names)
+                registry.register_tools(live_defs)
+                self._auto_approved_tools = [
+                    name for name in self._auto_approved_tools if name not in cached_names
+                ] + approved
+                logger.info(
+                    "MCP Server '%s' 工具 schema 已变化，按实时结果重新注册 %d 个工具",
+                    cfg.name,
+                    len(live_defs),
+                )
+            self._mark_server_ready(cfg, client, tool_names, started)
+            self._save_schemas(cfg, mcp_tools)
+        finally:
+            if not ready.done():
+                ready.set_result(None)
+
+    def _drop_tools(self, registry: "ToolRegistry", names: set[str]) -> None:
+        """注销工具并清理对应的白名单与 scope 记录。"""
+        if not names:
+            return
+        registry.unregister_tools(names)
+        self._auto_approved_tools = [
+            name for name in self._auto_approved_tools if name not in names
+        ]
+        for name in names:
+            self._tool_scopes.pop(name, None)
+
+    def _load_cached_schemas(self, cfg: "MCPServerConfig") -> list[Any] | None:
+        if not self._schema_cache_enabled:
+            return None
+        from excelmanus.mcp.schema_cache import load_tool_schemas
+
+        return load_tool_schemas(cfg, cache_dir=self._schema_cache_dir)
+
+    def _save_schemas(self, cfg: "MCPServerConfig", mcp_tools: list[Any]) -> None:
+        if not self._schema_cache_enabled:
+            return
+        from excelmanus.mcp.schema_cache import save_tool_schemas
+
+        save_tool_schemas(cfg, mcp_tools, cache_dir=self._schema_cache_dir)
 
     async def _deferred_install_and_connect(
         self,
@@ -1011,6 +1435,7 @@ class MCPManager:
                     total_remaining,
                 )
 
+            self._call_bridge.close()
             self._initialized = False
             logger.debug("所有 MCP Server 连接已关闭")
 
@@ -1057,3 +1482,14 @@ class MCPManager:
                 "init_ms": state.init_ms,
             })
         return info
+
+    def call_stats(self) -> dict[str, Any]:
+        """返回 MCP 工具调用耗时统计。
+
+        包含：
+        - servers: 按 Server 的 count / avg_ms / p50_ms / p95_ms / max_ms
+        - sync: 同步路径（工作线程经调用桥）的耗时
+        - errors: 失败调用次数
+        - loop_thread_alive: 后台兜底 loop 线程是否在运行
+        """
+        return self._call_bridge.stats()
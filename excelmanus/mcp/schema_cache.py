@@ -0,0 +1,135 @@
+"""MCP 工具 schema 缓存模块。
+
+将 ``tools/list`` 的结果按 Server 配置哈希持久化到磁盘。
+启动时缓存命中的 Server 可先用缓存 schema 注册工具，不必等待连接建立；
+连接就绪后再以实时发现结果校正（见 ``MCPManager``）。
+
+配置哈希覆盖所有影响工具集合的字段（命令、参数、环境变量、URL、请求头），
+配置变化即视为缓存未命中；缓存文件只保存工具 schema，不含配置内容。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import time
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterable
+
+from excelmanus.mcp.config import MCPServerConfig
+
+logger = logging.getLogger(__name__)
+
+# 持久化缓存目录
+_DEFAULT_CACHE_DIR = Path.home() / ".excelmanus" / "mcp_schema_cache"
+_CACHE_VERSION = 1
+
+
+@dataclass(frozen=True)
+class CachedTool:
+    """缓存的 MCP 工具定义（与 MCP Tool 对象的 duck typing 兼容）。"""
+
+    name: str
+    description: str = ""
+    inputSchema: dict[str, Any] = field(default_factory=dict)
+
+
+# ---------------------------------------------------------------------------
+# 公共 API
+# ---------------------------------------------------------------------------
+
+
+def config_fingerprint(config: MCPServerConfig) -> str:
+    """计算影响工具集合的配置字段哈希。"""
+    payload = {
+        "name": config.name,
+        "transport": config.transport,
+        "command": config.command,
+        "args": list(config.args or []),
+        "env": dict(sorted((config.env or {}).items())),
+        "url": config.url,
+        "headers": dict(sorted((config.headers or {}).items())),
+    }
+    raw = json.dumps(payload, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
+
+def load_tool_schemas(
+    config: MCPServerConfig,
+    *,
+    cache_dir: Path | None = None,
+) -> list[CachedTool] | None:
+    """读取缓存的工具 schema；未命中或缓存损坏时返回 ``None``。"""
+    path = _cache_path(config, cache_dir)
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as exc:
+        logger.debug("读取 MCP schema 缓存失败 (%s): %s", path, exc)
+        return None
+
+    if not isinstance(data, dict) or data.get("version") != _CACHE_VERSION:
+        return None
+    raw_tools = data.get("tools")
+    if not isinstance(raw_tools, list):
+        return None
+    tools: list[CachedTool] = []
+    for item in raw_tools:
+        if not isinstance(item, dict) or not isinstance(item.get("name"), str):
+            return None
+        schema = item.get("inputSchema")
+        tools.append(CachedTool(
+            name=item["name"],
+            description=str(item.get("description") or ""),
+            inputSchema=schema if isinstance(schema, dict) else {},
+        ))
+    return tools
+
+
+def save_tool_schemas(
+    config: MCPServerConfig,
+    tools: Iterable[Any],
+    *,
+    cache_dir: Path | None = None,
+) -> bool:
+    """写入工具 schema 缓存（原子替换），失败时返回 ``False``。"""
+    entries = [
+        {
+            "name": getattr(tool, "name", ""),
+            "description": getattr(tool, "description", None) or "",
+            "inputSchema": getattr(tool, "inputSchema", None) or {},
+        }
+        for tool in tools
+    ]
+    path = _cache_path(config, cache_dir)
+    payload = {
+        "version": _CACHE_VERSION,
+        "server": config.name,
+        "saved_at": int(time.time()),
+        "tools": entries,
+    }
+    tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex[:8]}.tmp")
+    try:
+        text = json.dumps(payload, ensure_ascii=False)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path.write_text(text, encoding="utf-8")
+        os.replace(tmp_path, path)
+    except (OSError, TypeError, ValueError) as exc:
+        logger.debug("写入 MCP schema 缓存失败 (server=%s): %s", config.name, exc)
+        tmp_path.unlink(missing_ok=True)
+        return False
+    return True
+
+
+# ---------------------------------------------------------------------------
+# 内部辅助
+# ---------------------------------------------------------------------------
+
+
+def _cache_path(config: MCPServerConfig, cache_dir: Path | None) -> Path:
+    return (cache_dir or _DEFAULT_CACHE_DIR) / f"{config_fingerprint(config)}.json"
@@ -8,9 +8,8 @@ from dataclasses import dataclass
 from pathlib import Path
 from uuid import uuid4
 
-import tiktoken
-
 from excelmanus.config import ExcelManusConfig
+from excelmanus.token_cache import get_token_cache
 
 logger = logging.getLogger(__name__)
 
@@ -228,30 +227,32 @@ class TokenCounter:
     """基于 tiktoken 的 token 计数器。
 
     优先使用 o200k_base 编码（GPT-5 系列），对 Qwen 等模型也能提供
-    比字符估算更准确的近似值，用于 memory 截断判断。
+    比字符估算更准确的近似值，用于 memory 截断判断。计数经由进程级
+    内容哈希缓存（见 :mod:`excelmanus.token_cache`），重复文本不再重新编码。
     """
 
-    try:
-        _encoding = tiktoken.get_encoding("o200k_base")
-    except Exception:
-        _encoding = tiktoken.get_encoding("cl100k_base")
-
     @staticmethod
     def count(text: str) -> int:
         """计算文本的 token 数量。"""
         if not text:
             return 0
-        return len(TokenCounter._encoding.encode(text))
+        return get_token_cache().count(text)
 
     @staticmethod
     def count_message(message: dict) -> int:
-        """计算单条消息的 token 数量（含结构开销）。"""
+        """计算单条消息的 token 数量（含结构开销）。
+
+        只有 content 与列表字段（多模态 parts、tool_calls）经过内容缓存；
+        role、message_id、tool_call_id 等短小或唯一的字段直接编码。
+        """
         tokens = 4  # 每条消息的固定开销（role、分隔符等）
+        texts: list[str] = []
+        fields: list[str] = []
         for key, value in message.items():
             if value is None:
                 continue
             if isinstance(value, str):
-                tokens += TokenCounter.count(value)
+                (texts if key == "content" else fields).append(value)
             elif isinstance(value, list):
                 # 多模态 content parts 或 tool_calls 列表
                 for item in value:
@@ -259,12 +260,17 @@ class TokenCounter:
                         if item.get("type") == "image_url":
                             tokens += IMAGE_TOKEN_ESTIMATE
                         elif item.get("type") == "text":
-                            tokens += TokenCounter.count(item.get("text", ""))
+                            texts.append(item.get("text", ""))
                         else:
-                            tokens += TokenCounter.count(str(item))
+                            texts.append(str(item))
                     else:
-                        tokens += TokenCounter.count(str(item))
-        return tokens
+                        texts.append(str(item))
+        cache = get_token_cache()
+        return (
+            tokens
+            + sum(cache.count_batch(texts))
+            + sum(cache.count_batch(fields, cache=False))
+        )
 
 
 class ConversationMemory:
@@ -281,6 +287,8 @@ class ConversationMemory:
         self._system_prompt: str = _DEFAULT_SYSTEM_PROMPT
         self._max_context_tokens: int = config.max_context_tokens
         self._token_counter = TokenCounter()
+        # 单条消息 token 账本：id(msg) → (msg, 字段值快照, 列表长度快照, tokens)
+        self._token_ledger: dict[int, tuple[dict, tuple, tuple, int]] = {}
         # 预留 10% 的 token 空间给模型输出
         self._truncation_threshold = int(self._max_context_tokens * 0.9)
         # 图片降级追踪
@@ -660,6 +668,7 @@ class ConversationMemory:
     def clear(self) -> None:
         """清除所有对话历史（保留 system prompt 配置）。"""
         self._messages.clear()
+        self._token_ledger.clear()
         self._image_seq = 0
         self._fresh_image_ids.clear()
         self._lifecycle.clear()
@@ -770,13 +779,52 @@ class ConversationMemory:
             "_image_downgraded": True,
         }
 
+    def _message_tokens(self, msg: dict) -> int:
+        """返回单条消息的 token 数（按消息对象缓存）。
+
+        缓存条目持有消息各字段值的引用；任一字段被替换（或列表长度变化）时
+        重新计数，因此外部直接改写消息内容也能被感知。
+        """
+        values = tuple(msg.values())
+        lengths = tuple(len(v) if isinstance(v, list) else -1 for v in values)
+        cached = self._token_ledger.get(id(msg))
+        if cached is not None:
+            cached_msg, cached_values, cached_lengths, tokens = cached
+            if (
+                cached_msg is msg
+                and cached_lengths == lengths
+                and all(a is b for a, b in zip(cached_values, values))
+            ):
+                return tokens
+        tokens = self._token_counter.count_message(msg)
+        self._token_ledger[id(msg)] = (msg, values, lengths, tokens)
+        return tokens
+
+    def _forget_message(self, msg: dict) -> int:
+        """从账本移除一条消息，返回其 token 数。"""
+        tokens = self._message_tokens(msg)
+        self._token_ledger.pop(id(msg), None)
+        return tokens
+
+    def _history_tokens(self) -> int:
+        """对话历史的 token 总数；已计数的消息只查账本不重新编码。"""
+        if len(self._token_ledger) > 2 * len(self._messages) + 16:
+            # 外部整体替换 _messages（如 compaction）后清理失效条目
+            live = {id(m) for m in self._messages}
+            self._token_ledger = {
+                k: v for k, v in self._token_ledger.items() if k in live
+            }
+        return sum(self._message_tokens(msg) for msg in self._messages)
+
+    def _system_tokens(self, system_msgs: list[dict] | None) -> int:
+        if system_msgs is None:
+            system_msg = {"role": "system", "content": self._system_prompt}
+            return self._token_counter.count_message(system_msg)
+        return sum(self._token_counter.count_message(msg) for msg in system_msgs)
+
     def _total_tokens(self) -> int:
         """计算当前所有消息（含 system prompt）的总 token 数。"""
-        system_msg = {"role": "system", "content": self._system_prompt}
-        total = self._token_counter.count_message(system_msg)
-        for msg in self._messages:
-            total += self._token_counter.count_message(msg)
-        return total
+        return self._system_tokens(None) + self._history_tokens()
 
     def _truncate_if_needed(self) -> None:
         """当 token 总量超过阈值时，从最早的消息开始截断。
@@ -789,37 +837,35 @@ class ConversationMemory:
         self._truncate_history_to_threshold(self._truncation_threshold, system_msgs=None)
 
     def _total_tokens_with_system_messages(self, system_msgs: list[dict] | None) -> int:
-        total = 0
-        if system_msgs is None:
-            system_msg = {"role": "system", "content": self._system_prompt}
-            total += self._token_counter.count_message(system_msg)
-        else:
-            for msg in system_msgs:
-                total += self._token_counter.count_message(msg)
-        for msg in self._messages:
-            total += self._token_counter.count_message(msg)
-        return total
+        return self._system_tokens(system_msgs) + self._history_tokens()
 
     def _truncate_history_to_threshold(
         self,
         threshold: int,
         system_msgs: list[dict] | None,
     ) -> None:
-        while self._messages and self._total_tokens_with_system_messages(system_msgs) > threshold:
+        # system 与历史各计数一次，之后每移除一条消息只做减法
+        system_tokens = self._system_tokens(system_msgs)
+        total = system_tokens + self._history_tokens()
+        while self._messages and total > threshold:
             # 仅剩最后一条时做内容收缩，避免单条超长消息长期越阈值。
             if len(self._messages) == 1:
-                if not self._shrink_last_message_for_threshold(threshold, system_msgs):
+                if not self._shrink_last_message_for_threshold(
+                    threshold, system_msgs, system_tokens=system_tokens,
+                ):
                     # 无法收缩（例如 content 为 None 的 tool_call 壳消息）时，
                     # 直接丢弃最后一条，保证请求不会持续超预算。
-                    self._messages.pop(0)
+                    self._forget_message(self._messages.pop(0))
                     break
                 # 收缩后仍可能因 system 过大而超阈值，此时保留最后一条不删
-                if self._total_tokens_with_system_messages(system_msgs) > threshold:
+                total = system_tokens + self._message_tokens(self._messages[0])
+                if total > threshold:
                     break
                 continue
 
             # 移除最早的消息，但至少保留最后一条（最近的消息）
             removed = self._messages.pop(0)
+            total -= self._forget_message(removed)
 
             # 如果移除的是带 tool_calls 的 assistant 消息，
             # 需要同时移除对应的 tool result 消息
@@ -828,13 +874,13 @@ class ConversationMemory:
                     tc["id"] for tc in removed["tool_calls"] if "id" in tc
                 }
                 # 移除所有匹配的 tool result（它们紧跟在 tool_call 之后）
-                self._messages = [
-                    m for m in self._messages
-                    if not (
-                        m.get("role") == "tool"
-                        and m.get("tool_call_id") in call_ids
-                    )
-                ]
+                kept: list[dict] = []
+                for m in self._messages:
+                    if m.get("role") == "tool" and m.get("tool_call_id") in call_ids:
+                        total -= self._forget_message(m)
+                    else:
+                        kept.append(m)
+                self._messages = kept
 
             # 如果最早的消息是孤立的 tool result（对应的 tool_call 已不存在），
             # 继续移除以保持消息一致性。
@@ -852,7 +898,7 @@ class ConversationMemory:
                 if head_call_id in valid_call_ids:
                     # 对应的 tool_call 仍存在，不是孤立消息，停止清理
                     break
-                self._messages.pop(0)
+                total -= self._forget_message(self._messages.pop(0))
 
     def _ensure_starts_with_user(self) -> None:
         """确保 _messages 首条消息为 user 角色。
@@ -895,6 +941,8 @@ class ConversationMemory:
         self,
         threshold: int,
         system_msgs: list[dict] | None,
+        *,
+        system_tokens: int | None = None,
     ) -> bool:
         """尽量收缩最后一条消息内容，返回是否完成收缩。"""
         msg = self._messages[-1]
@@ -905,11 +953,13 @@ class ConversationMemory:
             # 已为空，无需再收缩，保留该条消息
             return True
 
-        message_tokens = self._token_counter.count_message(msg)
+        if system_tokens is None:
+            system_tokens = self._system_tokens(system_msgs)
+        message_tokens = self._message_tokens(msg)
         content_tokens = self._token_counter.count(content)
         base_tokens = message_tokens - content_tokens
         budget_for_content = threshold - (
-            self._total_tokens_with_system_messages(system_msgs) - message_tokens
+            system_tokens + self._history_tokens() - message_tokens
         ) - base_tokens
         if budget_for_content <= 0:
             msg["content"] = ""
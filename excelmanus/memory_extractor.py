@@ -8,10 +8,10 @@ from datetime import datetime
 from typing import TYPE_CHECKING, Any
 
 import openai
-import tiktoken
 
 from excelmanus.engine_utils import _AUX_NO_THINKING_EXTRA_BODY
 from excelmanus.memory_models import MemoryCategory, MemoryEntry
+from excelmanus.token_cache import get_token_cache
 
 if TYPE_CHECKING:
     from excelmanus.embedding.client import EmbeddingClient
@@ -64,10 +64,6 @@ _MAX_MESSAGES = 120
 _MAX_TOTAL_CHARS = 48_000
 _MAX_TOTAL_TOKENS = 12_000
 _MIN_USER_MESSAGES = 3  # 少于此数的对话不值得提取记忆
-try:
-    _TOKEN_ENCODING = tiktoken.get_encoding("o200k_base")
-except Exception:
-    _TOKEN_ENCODING = tiktoken.get_encoding("cl100k_base")
 
 
 # 语义去重阈值：cosine similarity 超过此值视为重复记忆
@@ -261,13 +257,8 @@ class MemoryExtractor:
 
     @staticmethod
     def _count_tokens(text: str) -> int:
-        if not text:
-            return 0
-        try:
-            return len(_TOKEN_ENCODING.encode(text))
-        except Exception:
-            # tiktoken 异常时回退为字符近似，避免阻断主流程。
-            return max(1, len(text) // 3)
+        # 经由进程级缓存计数；tiktoken 不可用时缓存内部回退为字符近似。
+        return get_token_cache().count(text)
 
     def _trim_to_token_budget(self, text: str, token_budget: int) -> str:
         """在超 token 预算时保留末尾内容并回收到预算内。"""
@@ -276,13 +267,34 @@ class MemoryExtractor:
         if self._count_tokens(text) <= token_budget:
             return text
 
-        # 二分查找可保留的最大尾部字符数，O(log n) 次 tiktoken 调用
+        # 只编码一次，直接取末尾 token_budget 个 token 解码；解码边界可能产生
+        # 替换字符导致重新计数略超，按实测超出量收缩。候选文本都是一次性的，
+        # 计数不经 LRU，避免挤掉真正会复用的条目。
+        cache = get_token_cache()
+
+        def _count_candidate(candidate: str) -> int:
+            return cache.count_batch([candidate], cache=False)[0]
+
+        try:
+            tokens = cache.encode(text)
+            keep = token_budget
+            while keep > 0:
+                candidate = cache.encoding.decode(tokens[-keep:])
+                overshoot = _count_candidate(candidate) - token_budget
+                if overshoot <= 0:
+                    return candidate
+                keep -= overshoot
+            return ""
+        except Exception:
+            pass
+
+        # 编码不可用：二分查找可保留的最大尾部字符数
         left, right = 1, len(text)
         best = ""
         while left <= right:
             mid = (left + right) // 2
             candidate = text[-mid:]
-            if self._count_tokens(candidate) <= token_budget:
+            if _count_candidate(candidate) <= token_budget:
                 best = candidate
                 left = mid + 1
             else:
@@ -13,6 +13,7 @@ from typing import TYPE_CHECKING
 from excelmanus.excel_extensions import EXCEL_EXTENSIONS
 from excelmanus.mentions.parser import Mention, ResolvedMention
 from excelmanus.security.guard import FileAccessGuard, SecurityViolationError
+from excelmanus.token_cache import get_token_cache
 
 if TYPE_CHECKING:
     from excelmanus.mcp.manager import MCPManager
@@ -26,28 +27,18 @@ _EXCLUDED_NAMES = {".venv", "node_modules", "__pycache__"}
 
 
 def _count_tokens(text: str) -> int:
-    """使用 tiktoken 计算 token 数，失败时降级为字符估算。"""
-    try:
-        import tiktoken
-
-        enc = tiktoken.get_encoding("o200k_base")
-        return len(enc.encode(text))
-    except Exception:
-        # 降级：1 token ≈ 4 字符
-        return len(text) // 4
+    """通过进程级 token 计数缓存计算 token 数（编码不可用时为字符估算）。"""
+    return get_token_cache().count(text)
 
 
 def _truncate_to_tokens(text: str, max_tokens: int) -> str:
     """将文本截断到 max_tokens 以内，按行截断。"""
+    cache = get_token_cache()
+    if cache.count(text) <= max_tokens:
+        return text
     try:
-        import tiktoken
-
-        enc = tiktoken.get_encoding("o200k_base")
-        tokens = enc.encode(text)
-        if len(tokens) <= max_tokens:
-            return text
-        truncated = enc.decode(tokens[:max_tokens])
-        return truncated
+        tokens = cache.encode(text)
+        return cache.encoding.decode(tokens[:max_tokens])
     except Exception:
         # 降级：1 token ≈ 4 字符
         max_chars = max_tokens * 4
@@ -2,9 +2,17 @@
 from __future__ import annotations
 
 import contextvars
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING
 
 from .models import CellNode, WorkbookRefIndex
 
+if TYPE_CHECKING:
+    from .dependency_graph import FormulaDependencyGraph
+
 _current_cache: contextvars.ContextVar["RefCache | None"] = contextvars.ContextVar(
     "_current_ref_cache", default=None,
 )
@@ -12,6 +20,35 @@ _current_cache: contextvars.ContextVar["RefCache | None"] = contextvars.ContextV
 _fallback_cache: RefCache | None = None
 
 
+_HASH_CHUNK = 1 << 20
+# 内容哈希记忆的最大文件数（LRU），长时间运行的服务不随访问过的文件数无限增长
+_HASH_MEMO_MAX_ENTRIES = 4096
+_hash_memo: OrderedDict[str, tuple[int, int, str]] = OrderedDict()
+_hash_lock = threading.Lock()
+
+
+def file_content_hash(file_path: str) -> str:
+    """返回文件内容 SHA-256（按 size+mtime 记忆，文件未变时不重复读取）。"""
+    st = os.stat(file_path)
+    with _hash_lock:
+        memo = _hash_memo.get(file_path)
+        if memo is not None:
+            _hash_memo.move_to_end(file_path)
+    if memo is not None and memo[0] == st.st_size and memo[1] == st.st_mtime_ns:
+        return memo[2]
+    h = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK), b""):
+            h.update(chunk)
+    digest = h.hexdigest()
+    with _hash_lock:
+        _hash_memo[file_path] = (st.st_size, st.st_mtime_ns, digest)
+        _hash_memo.move_to_end(file_path)
+        while len(_hash_memo) > _HASH_MEMO_MAX_ENTRIES:
+            _hash_memo.popitem(last=False)
+    return digest
+
+
 def get_session_cache() -> "RefCache":
     """获取当前上下文的 RefCache 实例。
 
@@ -43,6 +80,7 @@ class RefCache:
     def __init__(self) -> None:
         self._tier1: dict[str, WorkbookRefIndex] = {}
         self._tier2: dict[str, CellNode] = {}
+        self._graphs: dict[str, FormulaDependencyGraph] = {}
 
     def get_tier1(self, file_path: str) -> WorkbookRefIndex | None:
         return self._tier1.get(file_path)
@@ -59,8 +97,19 @@ class RefCache:
     def put_tier2(self, file_path: str, sheet: str, address: str, node: CellNode) -> None:
         self._tier2[self._tier2_key(file_path, sheet, address)] = node
 
+    def get_graph(self, file_path: str, content_hash: str) -> "FormulaDependencyGraph | None":
+        """返回与当前文件内容哈希一致的依赖图；内容已变化时返回 None。"""
+        graph = self._graphs.get(file_path)
+        if graph is None or graph.content_hash != content_hash:
+            return None
+        return graph
+
+    def put_graph(self, file_path: str, graph: "FormulaDependencyGraph") -> None:
+        self._graphs[file_path] = graph
+
     def invalidate(self, file_path: str) -> None:
         self._tier1.pop(file_path, None)
+        self._graphs.pop(file_path, None)
         prefix = f"{file_path}|"
         keys = [k for k in self._tier2 if k.startswith(prefix)]
         for k in keys:
@@ -69,6 +118,7 @@ class RefCache:
     def invalidate_all(self) -> None:
         self._tier1.clear()
         self._tier2.clear()
+        self._graphs.clear()
 
     def all_tier1(self) -> dict[str, WorkbookRefIndex]:
         return dict(self._tier1)
@@ -0,0 +1,173 @@
+"""单元格级公式依赖图 — 一次遍历构建，供 Tier 2 查询复用。
+
+正向：``(sheet, address) → 公式 / precedents``，O(1) 查找。
+反向：精确引用走哈希表；区域引用按列分桶，桶内按起始行排序，
+查询时二分定位候选区间，避免每一跳都重解析整个工作簿的公式。
+"""
+from __future__ import annotations
+
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from typing import Any
+
+from .formula_parser import FormulaRefExtractor, _col_to_num, _parse_cell
+from .models import CellRef
+
+# 区域跨越列数超过该值时不按列分桶，改放入宽区域列表线性检查
+_WIDE_RANGE_COLS = 64
+_MAX_ROW = 1_048_576
+_MAX_COL = 16_384
+
+# (row_lo, row_hi, col_lo, col_hi, formula_ordinal)
+_Interval = tuple[int, int, int, int, int]
+
+
+def _parse_range_bounds(cell_or_range: str) -> tuple[int, int, int, int] | None:
+    """将 'A1:C10' / 'A:C' / '1:5' 解析为 (row_lo, row_hi, col_lo, col_hi)。"""
+    if ":" not in cell_or_range:
+        return None
+    left, right = cell_or_range.split(":", 1)
+    if left.isalpha() and right.isalpha():
+        c1, c2 = _col_to_num(left), _col_to_num(right)
+        return 1, _MAX_ROW, min(c1, c2), max(c1, c2)
+    if left.isdigit() and right.isdigit():
+        r1, r2 = int(left), int(right)
+        return min(r1, r2), max(r1, r2), 1, _MAX_COL
+    p_left = _parse_cell(left)
+    p_right = _parse_cell(right)
+    if not p_left or not p_right:
+        return None
+    c1, c2 = _col_to_num(p_left[0]), _col_to_num(p_right[0])
+    r1, r2 = p_left[1], p_right[1]
+    return min(r1, r2), max(r1, r2), min(c1, c2), max(c1, c2)
+
+
+@dataclass
+class _SheetRangeIndex:
+    """单个目标工作表的区域引用区间索引。"""
+
+    buckets: dict[int, list[_Interval]] = field(default_factory=dict)
+    bucket_starts: dict[int, list[int]] = field(default_factory=dict)
+    wide: list[_Interval] = field(default_factory=list)
+
+    def add(self, interval: _Interval) -> None:
+        _, _, col_lo, col_hi, _ = interval
+        if col_hi - col_lo + 1 > _WIDE_RANGE_COLS:
+            self.wide.append(interval)
+            return
+        for col in range(col_lo, col_hi + 1):
+            self.buckets.setdefault(col, []).append(interval)
+
+    def freeze(self) -> None:
+        for col, items in self.buckets.items():
+            items.sort(key=lambda iv: iv[0])
+            self.bucket_starts[col] = [iv[0] for iv in items]
+
+    def query(self, row: int, col: int) -> list[int]:
+        hits: list[int] = []
+        items = self.buckets.get(col)
+        if items:
+            end = bisect_right(self.bucket_starts[col], row)
+            for row_lo, row_hi, _, _, ordinal in items[:end]:
+                if row_lo <= row <= row_hi:
+                    hits.append(ordinal)
+        for row_lo, row_hi, col_lo, col_hi, ordinal in self.wide:
+            if row_lo <= row <= row_hi and col_lo <= col <= col_hi:
+                hits.append(ordinal)
+        return hits
+
+
+class FormulaDependencyGraph:
+    """工作簿公式依赖图（cell → precedents，及反向 dependents 索引）。"""
+
+    def __init__(self, content_hash: str = "") -> None:
+        self.content_hash = content_hash
+        self._formulas: dict[tuple[str, str], str] = {}
+        self._precedents: dict[tuple[str, str], list[CellRef]] = {}
+        # 公式单元格按工作簿遍历顺序编号，保证 dependents 输出顺序稳定
+        self._cells: list[tuple[str, str]] = []
+        self._exact: dict[tuple[str, str], list[int]] = {}
+        self._ranges: dict[str, _SheetRangeIndex] = {}
+
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def build(
+        cls,
+        wb: Any,
+        *,
+        content_hash: str = "",
+        extractor: FormulaRefExtractor | None = None,
+    ) -> "FormulaDependencyGraph":
+        """遍历工作簿一次，解析全部公式并构建正反向索引。"""
+        extractor = extractor or FormulaRefExtractor()
+        graph = cls(content_hash)
+        for ws_name in wb.sheetnames:
+            ws = wb[ws_name]
+            for row in ws.iter_rows():
+                for cell in row:
+                    val = cell.value
+                    if not isinstance(val, str) or not val.startswith("="):
+                        continue
+                    coord = cell.coordinate if hasattr(cell, "coordinate") else ""
+                    if not coord:
+                        continue
+                    graph._add_formula(ws_name, coord, val, extractor.extract(val))
+        for index in graph._ranges.values():
+            index.freeze()
+        return graph
+
+    def _add_formula(
+        self, sheet: str, address: str, formula: str, refs: list[CellRef],
+    ) -> None:
+        key = (sheet, address)
+        ordinal = len(self._cells)
+        self._cells.append(key)
+        self._formulas[key] = formula
+        self._precedents[key] = refs
+        for ref in refs:
+            if ref.file_path:
+                continue
+            target_sheet = ref.sheet_name or sheet
+            self._exact.setdefault((target_sheet, ref.cell_or_range), []).append(ordinal)
+            bounds = _parse_range_bounds(ref.cell_or_range)
+            if bounds is None:
+                continue
+            index = self._ranges.get(target_sheet)
+            if index is None:
+                index = self._ranges[target_sheet] = _SheetRangeIndex()
+            index.add((*bounds, ordinal))
+
+    # ------------------------------------------------------------------
+
+    @property
+    def formula_count(self) -> int:
+        return len(self._cells)
+
+    def formula_at(self, sheet: str, address: str) -> str | None:
+        """读取指定单元格的公式（无公式返回 None）。"""
+        return self._formulas.get((sheet, address))
+
+    def precedents_of(self, sheet: str, address: str) -> list[CellRef]:
+        """返回指定单元格公式的直接引用（无公式返回空列表）。"""
+        return list(self._precedents.get((sheet, address), ()))
+
+    def dependent_cells(self, sheet: str, address: str) -> list[tuple[str, str]]:
+        """返回直接引用了 sheet!address 的公式单元格 ``(sheet, address)`` 列表。"""
+        ordinals = set(self._exact.get((sheet, address), ()))
+        if ":" not in address:
+            parsed = _parse_cell(address)
+            index = self._ranges.get(sheet)
+            if parsed and index is not None:
+                ordinals.update(index.query(parsed[1], _col_to_num(parsed[0])))
+        return [self._cells[i] for i in sorted(ordinals)]
+
+    def dependents_of(self, sheet: str, address: str) -> list[CellRef]:
+        """返回引用了指定单元格的所有公式单元格（同表省略 sheet_name）。"""
+        return [
+            CellRef(
+                sheet_name=ws_name if ws_name != sheet else None,
+                cell_or_range=coord,
+            )
+            for ws_name, coord in self.dependent_cells(sheet, address)
+        ]
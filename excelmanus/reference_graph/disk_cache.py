@@ -0,0 +1,311 @@
+"""Tier 1 引用索引磁盘缓存 — 跨会话 / 跨进程共享。
+
+按文件内容 SHA-256（size+mtime 记忆）为键，将 :class:`WorkbookRefIndex`
+序列化为 JSON 存放到 ``~/.excelmanus/ref_cache/``。同一份工作簿无论被
+哪个会话或 API worker 打开，都只需执行一次 ``Tier1Scanner.scan``。
+
+容量按字节数做 LRU 淘汰：命中时刷新文件 mtime，写入后按 mtime
+从旧到新删除，直到总大小回落到上限以内。
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from .cache import file_content_hash
+from .models import (
+    ExternalRef,
+    RefType,
+    SheetRefEdge,
+    SheetRefSummary,
+    WorkbookRefIndex,
+)
+
+if TYPE_CHECKING:
+    from .scanner import Tier1Scanner
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_CACHE_DIR = Path.home() / ".excelmanus" / "ref_cache"
+_DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+_FORMAT_VERSION = 1
+_SUFFIX = ".json"
+
+
+# ── 序列化 ───────────────────────────────────────────────
+
+
+def _edge_to_dict(edge: SheetRefEdge) -> dict[str, Any]:
+    return {
+        "source_sheet": edge.source_sheet,
+        "target_sheet": edge.target_sheet,
+        "ref_type": edge.ref_type.value,
+        "ref_count": edge.ref_count,
+        "sample_formulas": list(edge.sample_formulas),
+        "column_pairs": [list(p) for p in edge.column_pairs],
+    }
+
+
+def index_to_dict(index: WorkbookRefIndex) -> dict[str, Any]:
+    """将 WorkbookRefIndex 转为可 JSON 化的 dict（边只存一份）。"""
+    return {
+        "version": _FORMAT_VERSION,
+        "sheets": [
+            {
+                "sheet_name": s.sheet_name,
+                "formula_count": s.formula_count,
+                "self_refs": s.self_refs,
+                "formula_patterns": list(s.formula_patterns),
+            }
+            for s in index.sheets.values()
+        ],
+        "cross_sheet_edges": [_edge_to_dict(e) for e in index.cross_sheet_edges],
+        "external_refs": [
+            {
+                "book_name": r.book_name,
+                "sheet_name": r.sheet_name,
+                "cell_or_range": r.cell_or_range,
+                "source_sheet": r.source_sheet,
+                "source_cell": r.source_cell,
+            }
+            for r in index.external_refs
+        ],
+        "named_ranges": dict(index.named_ranges),
+        "built_at": index.built_at,
+    }
+
+
+def index_from_dict(file_path: str, data: dict[str, Any]) -> WorkbookRefIndex:
+    """从 :func:`index_to_dict` 的输出重建 WorkbookRefIndex，并恢复边的引用关系。"""
+    sheets: dict[str, SheetRefSummary] = {}
+    for s in data.get("sheets", []):
+        sheets[s["sheet_name"]] = SheetRefSummary(
+            sheet_name=s["sheet_name"],
+            formula_count=s["formula_count"],
+            self_refs=s.get("self_refs", 0),
+            formula_patterns=list(s.get("formula_patterns", [])),
+        )
+
+    edges: list[SheetRefEdge] = []
+    for e in data.get("cross_sheet_edges", []):
+        edge = SheetRefEdge(
+            source_sheet=e["source_sheet"],
+            target_sheet=e["target_sheet"],
+            ref_type=RefType(e["ref_type"]),
+            ref_count=e["ref_count"],
+            sample_formulas=list(e.get("sample_formulas", [])),
+            column_pairs=[tuple(p) for p in e.get("column_pairs", [])],
+        )
+        edges.append(edge)
+        if edge.source_sheet in sheets:
+            sheets[edge.source_sheet].outgoing_refs.append(edge)
+        if edge.target_sheet in sheets:
+            sheets[edge.target_sheet].incoming_refs.append(edge)
+
+    return WorkbookRefIndex(
+        file_path=file_path,
+        sheets=sheets,
+        cross_sheet_edges=edges,
+        external_refs=[ExternalRef(**r) for r in data.get("external_refs", [])],
+        named_ranges=dict(data.get("named_ranges", {})),
+        built_at=data.get("built_at", time.time()),
+    )
+
+
+# ── 磁盘缓存 ─────────────────────────────────────────────
+
+
+class RefIndexDiskCache:
+    """按内容哈希存储的 WorkbookRefIndex 磁盘缓存（字节预算 LRU）。"""
+
+    def __init__(
+        self,
+        cache_dir: str | Path | None = None,
+        *,
+        max_bytes: int = _DEFAULT_MAX_BYTES,
+    ) -> None:
+        self._dir = Path(cache_dir) if cache_dir is not None else _DEFAULT_CACHE_DIR
+        self._max_bytes = max(0, int(max_bytes))
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._writes = 0
+        self._evictions = 0
+
+    @property
+    def cache_dir(self) -> Path:
+        return self._dir
+
+    def _entry_path(self, content_hash: str) -> Path:
+        return self._dir / f"{content_hash}{_SUFFIX}"
+
+    def get(self, file_path: str) -> WorkbookRefIndex | None:
+        """按文件当前内容查找缓存索引；未命中返回 None。"""
+        try:
+            content_hash = file_content_hash(file_path)
+        except OSError:
+            return None
+        entry = self._entry_path(content_hash)
+        try:
+            data = json.loads(entry.read_text(encoding="utf-8"))
+            if data.get("version") != _FORMAT_VERSION:
+                raise ValueError("ref cache format mismatch")
+            index = index_from_dict(file_path, data)
+        except FileNotFoundError:
+            self._count("_misses")
+            return None
+        except Exception:
+            logger.debug("引用索引磁盘缓存损坏，丢弃: %s", entry, exc_info=True)
+            self._discard(entry)
+            self._count("_misses")
+            return None
+        try:
+            os.utime(entry)
+        except OSError:
+            pass
+        self._count("_hits")
+        return index
+
+    def put(self, file_path: str, index: WorkbookRefIndex) -> None:
+        """写入缓存（原子替换），随后按字节预算淘汰最久未用的条目。"""
+        if self._max_bytes <= 0:
+            return
+        try:
+            content_hash = file_content_hash(file_path)
+            payload = json.dumps(index_to_dict(index), ensure_ascii=False)
+            if len(payload.encode("utf-8")) > self._max_bytes:
+                return
+            self._dir.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self._dir, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    f.write(payload)
+                os.replace(tmp, self._entry_path(content_hash))
+            except BaseException:
+                self._discard(Path(tmp))
+                raise
+        except Exception:
+            logger.debug("引用索引写入磁盘缓存失败: %s", file_path, exc_info=True)
+            return
+        self._count("_writes")
+        self._evict()
+
+    def clear(self) -> None:
+        for entry in self._iter_entries():
+            self._discard(entry)
+
+    def stats(self) -> dict[str, Any]:
+        """返回命中/未命中计数与当前占用。"""
+        entries = list(self._iter_entries())
+        total = 0
+        for entry in entries:
+            try:
+                total += entry.stat().st_size
+            except OSError:
+                pass
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": round(self._hits / lookups, 4) if lookups else 0.0,
+                "writes": self._writes,
+                "evictions": self._evictions,
+                "entries": len(entries),
+                "bytes": total,
+                "max_bytes": self._max_bytes,
+            }
+
+    # ------------------------------------------------------------------
+
+    def _count(self, attr: str, n: int = 1) -> None:
+        with self._lock:
+            setattr(self, attr, getattr(self, attr) + n)
+
+    def _iter_entries(self):
+        try:
+            yield from self._dir.glob(f"*{_SUFFIX}")
+        except OSError:
+            return
+
+    @staticmethod
+    def _discard(path: Path) -> None:
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+    def _evict(self) -> None:
+        stats: list[tuple[float, int, Path]] = []
+        total = 0
+        for entry in self._iter_entries():
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            stats.append((st.st_mtime, st.st_size, entry))
+            total += st.st_size
+        if total <= self._max_bytes:
+            return
+        stats.sort(key=lambda t: t[0])
+        evicted = 0
+        for _mtime, size, entry in stats:
+            if total <= self._max_bytes:
+                break
+            self._discard(entry)
+            total -= size
+            evicted += 1
+        if evicted:
+            self._count("_evictions", evicted)
+
+
+_disk_cache: RefIndexDiskCache | None = None
+_disk_cache_lock = threading.Lock()
+
+
+def get_disk_cache() -> RefIndexDiskCache | None:
+    """返回进程级磁盘缓存单例。
+
+    ``EXCELMANUS_REF_CACHE_DIR`` 覆盖目录，``EXCELMANUS_REF_CACHE_MAX_MB``
+    设置容量上限（设为 0 关闭磁盘缓存）。
+    """
+    global _disk_cache
+    if _disk_cache is not None:
+        return _disk_cache
+    raw_mb = os.environ.get("EXCELMANUS_REF_CACHE_MAX_MB", "").strip()
+    try:
+        max_bytes = int(float(raw_mb) * 1024 * 1024) if raw_mb else _DEFAULT_MAX_BYTES
+    except ValueError:
+        max_bytes = _DEFAULT_MAX_BYTES
+    if max_bytes <= 0:
+        return None
+    cache_dir = os.environ.get("EXCELMANUS_REF_CACHE_DIR", "").strip() or None
+    with _disk_cache_lock:
+        if _disk_cache is None:
+            _disk_cache = RefIndexDiskCache(cache_dir, max_bytes=max_bytes)
+    return _disk_cache
+
+
+def set_disk_cache(cache: RefIndexDiskCache | None) -> None:
+    """替换进程级磁盘缓存（测试或自定义目录时使用）。"""
+    global _disk_cache
+    _disk_cache = cache
+
+
+def load_or_scan(file_path: str, scanner: "Tier1Scanner") -> WorkbookRefIndex:
+    """优先从磁盘缓存读取 Tier 1 索引，未命中时扫描并回写。"""
+    disk = get_disk_cache()
+    if disk is not None:
+        cached = disk.get(file_path)
+        if cached is not None:
+            return cached
+    index = scanner.scan(file_path)
+    if disk is not None:
+        disk.put(file_path, index)
+    return index
@@ -5,7 +5,9 @@ import time
 from collections import Counter, defaultdict
 from typing import Any
 
-from .formula_parser import FormulaRefExtractor, address_in_ref
+from .cache import file_content_hash, get_session_cache
+from .dependency_graph import FormulaDependencyGraph
+from .formula_parser import FormulaRefExtractor
 from .models import (
     CellNode,
     CellRef,
@@ -129,7 +131,11 @@ class Tier1Scanner:
 
 
 class Tier2Resolver:
-    """单元格级深度引用解析（按需调用）。"""
+    """单元格级深度引用解析（按需调用）。
+
+    首次查询时一次遍历构建 :class:`FormulaDependencyGraph`，按文件内容哈希
+    缓存在会话 RefCache 中；此后每一跳 precedents/dependents 都是索引查找。
+    """
 
     _MAX_DEPTH = 5
 
@@ -145,61 +151,61 @@ class Tier2Resolver:
         direction: str = "both",
         depth: int = 1,
     ) -> CellNode:
+        graph = self.get_graph(file_path)
+        return self._resolve(graph, sheet_name, address, direction,
+                             min(depth, self._MAX_DEPTH))
+
+    def get_graph(self, file_path: str) -> FormulaDependencyGraph:
+        """获取文件的公式依赖图（内容哈希未变时复用缓存）。"""
+        content_hash = file_content_hash(file_path)
+        cache = get_session_cache()
+        graph = cache.get_graph(file_path, content_hash)
+        if graph is not None:
+            return graph
+
         from openpyxl import load_workbook
 
         wb = load_workbook(file_path, data_only=False, read_only=True)
         try:
-            return self._resolve(wb, sheet_name, address, direction,
-                                 min(depth, self._MAX_DEPTH))
+            graph = FormulaDependencyGraph.build(
+                wb, content_hash=content_hash, extractor=self._extractor,
+            )
         finally:
             wb.close()
+        cache.put_graph(file_path, graph)
+        return graph
 
     # ------------------------------------------------------------------
 
-    def _find_formula(self, wb: Any, sheet_name: str, address: str) -> str | None:
-        """读取指定单元格的公式（无公式返回 None）。"""
-        if sheet_name not in wb.sheetnames:
-            return None
-        ws = wb[sheet_name]
-        for row in ws.iter_rows():
-            for cell in row:
-                coord = cell.coordinate if hasattr(cell, "coordinate") else ""
-                if coord == address:
-                    val = cell.value
-                    if isinstance(val, str) and val.startswith("="):
-                        return val
-                    return None
-        return None
-
     def _resolve(
         self,
-        wb: Any,
+        graph: FormulaDependencyGraph,
         sheet_name: str,
         address: str,
         direction: str,
         depth: int,
     ) -> CellNode:
-        formula = self._find_formula(wb, sheet_name, address)
+        formula = graph.formula_at(sheet_name, address)
 
         direct_prec: list[CellRef] = []
         if formula and direction in ("both", "precedents"):
-            direct_prec = self._extractor.extract(formula)
+            direct_prec = graph.precedents_of(sheet_name, address)
 
         direct_deps: list[CellRef] = []
         if direction in ("both", "dependents"):
-            direct_deps = self._find_dependents(wb, sheet_name, address)
+            direct_deps = graph.dependents_of(sheet_name, address)
 
         all_prec = list(direct_prec)
         all_deps = list(direct_deps)
 
         if depth > 1 and direction in ("both", "precedents"):
             all_prec = self._expand_precedents(
-                wb, sheet_name, direct_prec, depth - 1,
+                graph, sheet_name, direct_prec, depth - 1,
             )
 
         if depth > 1 and direction in ("both", "dependents"):
             all_deps = self._expand_dependents(
-                wb, sheet_name, address, direct_deps, depth - 1,
+                graph, sheet_name, address, direct_deps, depth - 1,
             )
 
         return CellNode(
@@ -214,7 +220,7 @@ class Tier2Resolver:
 
     def _expand_precedents(
         self,
-        wb: Any,
+        graph: FormulaDependencyGraph,
         origin_sheet: str,
         direct: list[CellRef],
         remaining_depth: int,
@@ -229,14 +235,10 @@ class Tier2Resolver:
                 break
             next_frontier: list[CellRef] = []
             for ref in frontier:
-                if ":" in ref.cell_or_range:
+                if ":" in ref.cell_or_range or ref.file_path:
                     continue
                 ref_sheet = ref.sheet_name or origin_sheet
-                sub_formula = self._find_formula(wb, ref_sheet, ref.cell_or_range)
-                if not sub_formula:
-                    continue
-                sub_refs = self._extractor.extract(sub_formula)
-                for sr in sub_refs:
+                for sr in graph.precedents_of(ref_sheet, ref.cell_or_range):
                     key = sr.display()
                     if key not in seen:
                         seen.add(key)
@@ -247,7 +249,7 @@ class Tier2Resolver:
 
     def _expand_dependents(
         self,
-        wb: Any,
+        graph: FormulaDependencyGraph,
         origin_sheet: str,
         origin_address: str,
         direct: list[CellRef],
@@ -268,8 +270,7 @@ class Tier2Resolver:
             next_frontier: list[CellRef] = []
             for ref in frontier:
                 ref_sheet = ref.sheet_name or origin_sheet
-                sub_deps = self._find_dependents(wb, ref_sheet, ref.cell_or_range)
-                for sd in sub_deps:
+                for sd in graph.dependents_of(ref_sheet, ref.cell_or_range):
                     key = f"{(sd.sheet_name or ref_sheet)}!{sd.cell_or_range}"
                     if key not in seen:
                         seen.add(key)
@@ -277,33 +278,3 @@ class Tier2Resolver:
                         next_frontier.append(sd)
             frontier = next_frontier
         return result
-
-    # ------------------------------------------------------------------
-
-    def _find_dependents(
-        self, wb: Any, sheet_name: str, address: str,
-    ) -> list[CellRef]:
-        """在工作簿中搜索引用了指定单元格的所有公式。"""
-        results: list[CellRef] = []
-        seen: set[str] = set()
-
-        for ws_name in wb.sheetnames:
-            ws = wb[ws_name]
-            for row in ws.iter_rows():
-                for cell in row:
-                    val = cell.value
-                    if not isinstance(val, str) or not val.startswith("="):
-                        continue
-                    refs = self._extractor.extract(val)
-                    for ref in refs:
-                        ref_sheet = ref.sheet_name or ws_name
-                        if ref_sheet == sheet_name and address_in_ref(address, ref.cell_or_range):
-                            coord = cell.coordinate if hasattr(cell, "coordinate") else ""
-                            key = f"{ws_name}!{coord}"
-                            if coord and key not in seen:
-                                seen.add(key)
-                                results.append(CellRef(
-                                    sheet_name=ws_name if ws_name != sheet_name else None,
-                                    cell_or_range=coord,
-                                ))
-        return results
@@ -42,10 +42,13 @@ class CowWriter:
         return resolved
 
     def atomic_save_workbook(self, wb: Any, target: Path) -> None:
-        """openpyxl Workbook 原子写入（tempfile + os.replace）。"""
+        """openpyxl Workbook 原子写入（tempfile + os.replace），并清除该文件的解析缓存。"""
+        from excelmanus.tools._read_cache import invalidate_file
+
         target.parent.mkdir(parents=True, exist_ok=True)
         if not target.exists():
             wb.save(str(target))
+            invalidate_file(target)
             return
         fd, tmp = tempfile.mkstemp(suffix=".xlsx", dir=str(target.parent))
         os.close(fd)
@@ -55,6 +58,7 @@ class CowWriter:
         except BaseException:
             Path(tmp).unlink(missing_ok=True)
             raise
+        invalidate_file(target)
 
     # ── 内部实现 ──────────────────────────────────────────────
 
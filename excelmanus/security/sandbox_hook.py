@@ -226,6 +226,12 @@ def _patch_openpyxl_save():
     _Wb.save = _atomic_save
 _patch_openpyxl_save()
 
+# ── 标准输出行缓冲：run_code 按行增量读取进度输出 ──
+try:
+    sys.stdout.reconfigure(line_buffering=True)
+except (AttributeError, ValueError):
+    pass
+
 # ── 执行用户脚本 ──
 if len(sys.argv) < 2:
     print("Usage: wrapper.py <script.py> [args...]", file=sys.stderr)
@@ -533,6 +539,12 @@ try:
 except ImportError:
     pass
 
+# ── 标准输出行缓冲：run_code 按行增量读取进度输出 ──
+try:
+    sys.stdout.reconfigure(line_buffering=True)
+except (AttributeError, ValueError):
+    pass
+
 # ── 执行用户脚本 ──
 if len(sys.argv) < 2:
     print("Usage: wrapper.py <script.py> [args...]", file=sys.stderr)
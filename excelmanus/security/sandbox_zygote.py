@@ -0,0 +1,204 @@
+"""沙盒解释器 zygote：由 run_code 解释器池以独立脚本方式启动（仅依赖标准库）。
+
+协议（控制管道，每行一个 JSON）：
+
+1. 启动后读取初始化消息 ``{"blocked", "tier", "preload", "limits", "wrapper"}``：
+   先按风险等级安装与 wrapper 相同的导入守卫，再在守卫下预导入
+   pandas/numpy/openpyxl 等重型依赖，编译 wrapper 源码，回复 ``{"ready": ...}``；
+2. 之后每行一个运行请求 ``{"argv", "cwd", "env", "limits", "stdout", "stderr"}``：
+   fork 出子进程并回复 ``{"pid"}``，回收后回复 ``{"exit"}``。
+
+子进程新建会话、设置资源限制、重定向标准输入输出、切换工作目录并整体替换
+环境变量后执行 wrapper，与冷启动的 ``python -I wrapper.py script.py`` 等价。
+zygote 自身从不执行用户代码，每次运行都从同一份干净的预热状态 fork。
+"""
+import builtins
+import json
+import os
+import sys
+
+
+class _ImportBlocker:
+    """与 wrapper Layer 1 相同的导入守卫，保证预导入阶段也不会加载被封禁模块。"""
+
+    def __init__(self, blocked, tier):
+        self._blocked = tuple(blocked)
+        self._tier = tier
+
+    def find_spec(self, fullname, path=None, target=None):
+        for blocked in self._blocked:
+            if fullname == blocked or fullname.startswith(blocked + "."):
+                raise ImportError(f"模块 {fullname} 被安全策略禁止 [等级: {self._tier}]")
+        return None
+
+
+def _send(fd, message):
+    data = (json.dumps(message, ensure_ascii=False) + "\n").encode("utf-8")
+    while data:
+        written = os.write(fd, data)
+        data = data[written:]
+
+
+def _apply_limits(limits):
+    try:
+        import resource
+    except ImportError:
+        return
+    for name, desired in limits:
+        res_code = getattr(resource, name, None)
+        if res_code is None:
+            continue
+        try:
+            soft, hard = resource.getrlimit(res_code)
+            target = int(desired)
+            if soft != resource.RLIM_INFINITY:
+                target = min(target, int(soft))
+            if hard != resource.RLIM_INFINITY:
+                target = min(target, int(hard))
+            resource.setrlimit(res_code, (target, target))
+        except Exception:
+            continue
+
+
+def _exit_code(exc):
+    """按解释器对未捕获 SystemExit 的处理方式换算退出码。"""
+    code = exc.code
+    if code is None:
+        return 0
+    if isinstance(code, int):
+        return code & 0xFF
+    try:
+        print(code, file=sys.stderr)
+    except Exception:
+        pass
+    return 1
+
+
+def _reseed():
+    # random 模块自带 at-fork 重播种；numpy 全局 RandomState 在导入时播种，需手动刷新
+    np_random = sys.modules.get("numpy.random")
+    if np_random is not None:
+        try:
+            np_random.seed()
+        except Exception:
+            pass
+
+
+def _finish(code):
+    """模拟解释器正常退出：等待非守护线程、执行 atexit、刷新输出。"""
+    threading = sys.modules.get("threading")
+    if threading is not None:
+        try:
+            threading._shutdown()
+        except Exception:
+            pass
+    try:
+        import atexit
+        atexit._run_exitfuncs()
+    except Exception:
+        pass
+    for stream in (sys.stdout, sys.stderr):
+        try:
+            stream.flush()
+        except Exception:
+            pass
+    os._exit(code)
+
+
+def _run_child(request, wrapper_code, ctl_fds):
+    try:
+        os.setsid()
+        for fd in ctl_fds:
+            os.close(fd)
+        flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC
+        stdin_fd = os.open(os.devnull, os.O_RDONLY)
+        stdout_fd = os.open(request["stdout"], flags, 0o600)
+        stderr_fd = os.open(request["stderr"], flags, 0o600)
+        for src, dst in ((stdin_fd, 0), (stdout_fd, 1), (stderr_fd, 2)):
+            os.dup2(src, dst)
+            os.close(src)
+        _apply_limits(request.get("limits") or [])
+        os.chdir(request["cwd"])
+        os.environ.clear()
+        os.environ.update(request["env"])
+        import tempfile
+        tempfile.tempdir = None
+        _reseed()
+        sys.argv = ["<sandbox-wrapper>", *request["argv"]]
+        main = type(sys)("__main__")
+        main.__builtins__ = builtins
+        sys.modules["__main__"] = main
+    except BaseException:
+        os._exit(125)
+
+    code = 0
+    try:
+        exec(wrapper_code, main.__dict__)
+    except SystemExit as exc:
+        code = _exit_code(exc)
+    except BaseException as exc:
+        # 跳过本帧，使回溯与冷启动一致（从 wrapper 开始）
+        if exc.__traceback__ is not None:
+            exc = exc.with_traceback(exc.__traceback__.tb_next)
+        try:
+            sys.excepthook(type(exc), exc, exc.__traceback__)
+        except Exception:
+            pass
+        code = 1
+    _finish(code)
+
+
+def _serve(reader, ctl_out, wrapper_code, ctl_fds):
+    while True:
+        line = reader.readline()
+        if not line:
+            return
+        try:
+            request = json.loads(line)
+        except ValueError:
+            _send(ctl_out, {"error": "bad request"})
+            continue
+        try:
+            pid = os.fork()
+        except OSError as exc:
+            _send(ctl_out, {"error": f"fork 失败: {exc}"})
+            continue
+        if pid == 0:
+            _run_child(request, wrapper_code, ctl_fds)
+        _send(ctl_out, {"pid": pid})
+        _, status = os.waitpid(pid, 0)
+        _send(ctl_out, {"exit": os.waitstatus_to_exitcode(status)})
+
+
+def main():
+    # 控制管道转移到私有 fd，标准输入输出指向 devnull，避免预导入时的输出污染协议
+    ctl_in = os.dup(0)
+    ctl_out = os.dup(1)
+    devnull = os.open(os.devnull, os.O_RDWR)
+    os.dup2(devnull, 0)
+    os.dup2(devnull, 1)
+    os.close(devnull)
+    reader = os.fdopen(ctl_in, "rb")
+
+    init = json.loads(reader.readline() or b"{}")
+    _apply_limits(init.get("limits") or [])
+    if init.get("blocked"):
+        sys.meta_path.insert(0, _ImportBlocker(init["blocked"], init.get("tier", "")))
+    preloaded = []
+    for name in init.get("preload") or ():
+        try:
+            __import__(name)
+            preloaded.append(name)
+        except Exception:
+            continue
+    try:
+        wrapper_code = compile(init["wrapper"], "<sandbox-wrapper>", "exec")
+    except Exception as exc:
+        _send(ctl_out, {"error": f"wrapper 编译失败: {exc}"})
+        return
+    _send(ctl_out, {"ready": True, "preloaded": preloaded})
+    _serve(reader, ctl_out, wrapper_code, (ctl_in, ctl_out))
+
+
+if __name__ == "__main__":
+    main()
@@ -13,6 +13,7 @@ from typing import Any
 
 from excelmanus.config import ExcelManusConfig, ModelProfile
 from excelmanus.engine import AgentEngine
+from excelmanus.engine_pool import EnginePool, PooledEngine
 from excelmanus.logger import get_logger
 from excelmanus.mcp.manager import MCPManager
 from excelmanus.skillpacks import SkillRouter
@@ -126,6 +127,14 @@ class SessionManager:
                 logger.debug("SessionSummaryStore 初始化失败", exc_info=True)
         self._mcp_initialized: bool = False
         self._mcp_init_lock = asyncio.Lock()
+        # 预热引擎池：按隔离用户 ID 预构造引擎，acquire 时只做会话级绑定
+        self._engine_pool = EnginePool(
+            self._build_pooled_engine,
+            size=config.engine_pool_size,
+            max_idle_seconds=config.engine_pool_max_idle_seconds,
+            fingerprint=self._engine_fingerprint,
+            dispose=self._dispose_pooled_engine,
+        )
         self._sessions: dict[str, _SessionEntry] = {}
         self._pending_creates: set[str] = set()  # B2: 正在锁外创建的会话 ID
         self._lock = asyncio.Lock()
@@ -160,6 +169,7 @@ class SessionManager:
     def set_credential_resolver(self, resolver: Any) -> None:
         """注入 CredentialResolver 实例（运行时凭证解析）。"""
         self._credential_resolver = resolver
+        self._engine_pool.invalidate()
 
     def sync_user_subscription_profiles(
         self,
@@ -222,6 +232,7 @@ class SessionManager:
         aux_base_url: str | None = None,
     ) -> None:
         """向所有活跃会话广播 AUX 配置变更（锁保护）。"""
+        self._engine_pool.invalidate()
         async with self._lock:
             for entry in self._sessions.values():
                 entry.engine.update_aux_config(
@@ -233,6 +244,7 @@ class SessionManager:
 
     async def broadcast_model_profiles(self, profiles: tuple) -> None:
         """向所有活跃会话广播模型档案列表变更（锁保护）。"""
+        self._engine_pool.invalidate()
         async with self._lock:
             for entry in self._sessions.values():
                 entry.engine.sync_model_profiles(profiles)
@@ -243,6 +255,7 @@ class SessionManager:
         同时同步到所有活跃会话，使已有会话无需重建即可生效。
         """
         self._sandbox_config = SandboxConfig(docker_enabled=enabled)
+        self._engine_pool.invalidate()
         async with self._lock:
             for entry in self._sessions.values():
                 engine = entry.engine
@@ -448,6 +461,17 @@ class SessionManager:
         scope: UserScope | None = None,
     ) -> AgentEngine:
         """创建 AgentEngine 并可选地注入历史消息。"""
+        engine = self._build_engine(user_id=user_id, scope=scope)
+        self._bind_engine(engine, session_id, history_messages, user_id=user_id)
+        return engine
+
+    def _build_engine(
+        self,
+        *,
+        user_id: str | None = None,
+        scope: UserScope | None = None,
+    ) -> AgentEngine:
+        """构造 AgentEngine（与具体会话无关的部分，可在工作线程中执行）。"""
         # 解析工作区：认证启用时按用户隔离，否则共享。
         auth_enabled = user_id is not None
         isolated_ws = IsolatedWorkspace.resolve(
@@ -522,10 +546,24 @@ class SessionManager:
             workspace=isolated_ws,
             user_id=user_id,
         )
-        self.sync_user_subscription_profiles(engine, user_id)
         # 注入 CredentialResolver 到引擎，支持 LLM 调用前自动刷新 OAuth token
         if self._credential_resolver is not None:
             engine._credential_resolver = self._credential_resolver
+        # 注入历史会话摘要存储（供 engine 在 chat() 中检索历史摘要）
+        if self._session_summary_store is not None:
+            engine._session_summary_store = self._session_summary_store
+        return engine
+
+    def _bind_engine(
+        self,
+        engine: AgentEngine,
+        session_id: str,
+        history_messages: list[dict] | None = None,
+        *,
+        user_id: str | None = None,
+    ) -> None:
+        """将引擎绑定到具体会话：订阅凭证、历史、激活模型与能力缓存。"""
+        self.sync_user_subscription_profiles(engine, user_id)
         if history_messages:
             engine.inject_history(history_messages)
             # 恢复 checkpoint（SessionState + TaskStore）
@@ -556,11 +594,51 @@ class SessionManager:
                     engine.set_model_capabilities(caps)
             except Exception:
                 logger.debug("加载模型能力缓存失败", exc_info=True)
-        # 注入历史会话摘要存储（供 engine 在 chat() 中检索历史摘要）
-        if self._session_summary_store is not None:
-            engine._session_summary_store = self._session_summary_store
         engine.start_registry_scan()
-        return engine
+
+    # ── 预热引擎池 ────────────────────────────────────────
+
+    def _engine_fingerprint(self, user_id: str | None) -> tuple:
+        """引擎构造所依赖、且可能在运行期变化的配置指纹。"""
+        cfg = self._config
+        user_part: tuple = ()
+        if user_id is not None and self._user_store is not None:
+            try:
+                user_rec = self._user_store.get_by_id(user_id)
+            except Exception:
+                user_rec = None
+            if user_rec is not None:
+                user_part = (user_rec.llm_api_key, user_rec.llm_base_url, user_rec.llm_model)
+        return (cfg.model, cfg.base_url, cfg.api_key, cfg.protocol, user_part)
+
+    def _build_pooled_engine(self, user_id: str | None) -> PooledEngine:
+        """在工作线程中为 user_id 预构造一个引擎。"""
+        fingerprint = self._engine_fingerprint(user_id)
+        scope: UserScope | None = None
+        if self._database is not None:
+            scope = UserScope.create(
+                user_id, self._database, self._config.workspace_root,
+                data_root=self._config.data_root,
+            )
+        engine = self._build_engine(user_id=user_id, scope=scope)
+        return PooledEngine(engine=engine, fingerprint=fingerprint, scope=scope)
+
+    async def _dispose_pooled_engine(self, engine: AgentEngine) -> None:
+        """回收未被使用的预热引擎（不提取记忆：它从未承载过对话）。"""
+        if self._shared_mcp_manager is None:
+            try:
+                await engine.shutdown_mcp()
+            except Exception:
+                logger.debug("预热引擎 MCP 关闭失败", exc_info=True)
+
+    async def prewarm_engines(self, user_id: str | None = None) -> int:
+        """为 user_id（默认匿名）补足预热引擎，返回新增数量。"""
+        return await self._engine_pool.refill(user_id)
+
+    def engine_pool_stats(self) -> dict[str, Any]:
+        """预热池状态与池命中/冷启动两条路径的就绪、首 token 耗时统计。"""
+        return self._engine_pool.stats()
+
 
 
     async def acquire_for_chat(
@@ -581,6 +659,7 @@ class SessionManager:
                 （用于 rollback 等不应受上限约束的场景）。
         """
         # ── Phase 1: 锁内快速路径 ──────────────────────────────
+        _acquire_started = time.monotonic()
         _need_create = False
         new_id: str = ""
         async with self._lock:
@@ -636,8 +715,9 @@ class SessionManager:
             _need_create = True
 
         # ── Phase 2: 锁外执行重量级操作 ────────────────────────
-        engine: AgentEngine | None = None
+        engine: AgentEngine
         scope: UserScope | None = None
+        pooled: PooledEngine | None = None
         restored = False
         try:
             # SQLite 历史检查 & 消息加载
@@ -657,19 +737,31 @@ class SessionManager:
                     history_messages = self._chat_history.load_messages(session_id)
                     restored = True
 
-            # 创建 UserScope（统一的用户作用域）
-            if self._database is not None:
-                scope = UserScope.create(
-                    user_id, self._database, self._config.workspace_root,
-                    data_root=self._config.data_root,
+            # 优先使用预热池中已构造好的引擎，仅做会话级绑定
+            pooled = self._engine_pool.take(user_id)
+            if pooled is not None:
+                scope = pooled.scope
+                try:
+                    self._bind_engine(pooled.engine, new_id, history_messages, user_id=user_id)
+                except Exception:
+                    # 绑定失败的预热引擎不会再被使用，回收其 MCP 等资源
+                    await self._dispose_pooled_engine(pooled.engine)
+                    raise
+                engine = pooled.engine
+            else:
+                # 创建 UserScope（统一的用户作用域）
+                if self._database is not None:
+                    scope = UserScope.create(
+                        user_id, self._database, self._config.workspace_root,
+                        data_root=self._config.data_root,
+                    )
+                # 引擎创建（耗时操作：文件系统、DB、LLM client 等）
+                engine = self._create_engine_with_history(
+                    new_id,
+                    history_messages,
+                    user_id=user_id,
+                    scope=scope,
                 )
-            # 引擎创建（耗时操作：文件系统、DB、LLM client 等）
-            engine = self._create_engine_with_history(
-                new_id,
-                history_messages,
-                user_id=user_id,
-                scope=scope,
-            )
             engine._session_id = new_id
             engine._approval.set_session_id(new_id)
             engine.set_message_snapshot_index(
@@ -691,13 +783,17 @@ class SessionManager:
                 user_id=user_id,
                 scope=scope,
             )
+            _engine_source = "pooled" if pooled is not None else "cold"
             if restored:
                 logger.info(
-                    "从历史恢复会话 %s（%d 条消息，当前总数: %d）",
-                    new_id, len(history_messages or []), len(self._sessions),
+                    "从历史恢复会话 %s（%d 条消息，当前总数: %d，引擎: %s）",
+                    new_id, len(history_messages or []), len(self._sessions), _engine_source,
                 )
             else:
-                logger.info("创建新会话并加锁 %s（当前总数: %d）", new_id, len(self._sessions))
+                logger.info(
+                    "创建新会话并加锁 %s（当前总数: %d，引擎: %s）",
+                    new_id, len(self._sessions), _engine_source,
+                )
                 # F2: 新建（非恢复）会话立即写入 SQLite，防止 TTL 清理或进程重启导致会话丢失
                 if self._chat_history is not None:
                     try:
@@ -735,6 +831,20 @@ class SessionManager:
         except Exception:
             logger.debug("prompt cache 预热任务创建失败，跳过", exc_info=True)
 
+        # ── Phase 6: 预热池统计与补充 ──────────────────────────
+        _pooled = pooled is not None
+        self._engine_pool.record_ready(
+            _pooled, (time.monotonic() - _acquire_started) * 1000,
+        )
+
+        def _on_first_token() -> None:
+            self._engine_pool.record_first_token(
+                _pooled, (time.monotonic() - _acquire_started) * 1000,
+            )
+
+        engine._on_first_token = _on_first_token
+        self._engine_pool.schedule_refill(user_id)
+
         return new_id, engine
 
     async def release_for_chat(self, session_id: str) -> None:
@@ -1069,6 +1179,7 @@ class SessionManager:
     async def shutdown(self) -> None:
         """关闭 SessionManager：清空会话并收尾 MCP 生命周期。"""
         await self.stop_background_cleanup()
+        await self._engine_pool.close()
 
         active_engines: list[tuple[str, AgentEngine]] = []
         async with self._lock:
@@ -1103,6 +1214,13 @@ class SessionManager:
             finally:
                 self._mcp_initialized = False
 
+        # 审计日志写后队列：落盘剩余记录
+        if self._database is not None:
+            try:
+                await asyncio.to_thread(self._database.close_audit_sink)
+            except Exception:
+                logger.warning("审计日志队列落盘失败", exc_info=True)
+
     def get_engine(self, session_id: str, *, user_id: str | None = None) -> "AgentEngine | None":
         """同步获取指定会话的 AgentEngine（无锁，仅用于只读查询）。
 
@@ -0,0 +1,209 @@
+"""AuditSink：审计日志写后（write-behind）批量落盘队列。
+
+ToolCallStore / LLMCallStore 每次调用都在事件循环内同步执行 INSERT + commit，
+并发会话多时会在共享连接上串行排队。AuditSink 将记录先放入内存队列，
+由后台写线程按批（``executemany`` + 一次 commit）落盘：
+
+- 队列达到 ``batch_size`` 或距上次落盘超过 ``flush_interval`` 秒时触发写入；
+- 队列达到 ``max_queue`` 时新记录直接丢弃并计入 ``dropped``，提交方
+  （通常在事件循环内）从不阻塞，内存保持有界；
+- 每批在独立保存点（SAVEPOINT）内写入：失败时只撤销本批记录，不影响共享
+  连接上其他 Store 尚未提交的语句，随后逐条重试，只丢弃自身写不进去的记录；
+- ``flush()`` 同步落盘全部积压记录（查询前调用，保证读到自己的写入）；
+- ``close()`` / ``aclose()`` 停止写线程并落盘剩余记录。
+
+批大小等参数可通过环境变量 ``EXCELMANUS_AUDIT_BATCH_SIZE``、
+``EXCELMANUS_AUDIT_FLUSH_INTERVAL``、``EXCELMANUS_AUDIT_MAX_QUEUE`` 调整。
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import threading
+from collections import deque
+from typing import Any, Sequence
+
+from excelmanus.db_adapter import ConnectionAdapter
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_BATCH_SIZE = 100
+_DEFAULT_FLUSH_INTERVAL = 1.0
+_DEFAULT_MAX_QUEUE = 10000
+_SAVEPOINT = "audit_sink"
+
+
+def _env_number(name: str, default: float, cast: type = int) -> Any:
+    raw = os.environ.get(name, "").strip()
+    if not raw:
+        return default
+    try:
+        value = cast(raw)
+    except ValueError:
+        return default
+    return value if value > 0 else default
+
+
+class AuditSink:
+    """按 SQL 分组批量写入的审计记录队列（线程安全）。"""
+
+    def __init__(
+        self,
+        conn: ConnectionAdapter,
+        *,
+        batch_size: int = _DEFAULT_BATCH_SIZE,
+        flush_interval: float = _DEFAULT_FLUSH_INTERVAL,
+        max_queue: int = _DEFAULT_MAX_QUEUE,
+    ) -> None:
+        self._conn = conn
+        self._batch_size = max(1, int(batch_size))
+        self._flush_interval = max(0.01, float(flush_interval))
+        self._max_queue = max(self._batch_size, int(max_queue))
+        self._queue: deque[tuple[str, Sequence[Any]]] = deque()
+        self._cond = threading.Condition()
+        # 写线程与同步 flush 共用，保证落盘顺序与 flush 返回时无在途批次
+        self._write_lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._closed = False
+        self._written = 0
+        self._batches = 0
+        self._failed = 0
+        self._dropped = 0
+
+    @classmethod
+    def from_env(cls, conn: ConnectionAdapter) -> "AuditSink":
+        return cls(
+            conn,
+            batch_size=_env_number("EXCELMANUS_AUDIT_BATCH_SIZE", _DEFAULT_BATCH_SIZE),
+            flush_interval=_env_number(
+                "EXCELMANUS_AUDIT_FLUSH_INTERVAL", _DEFAULT_FLUSH_INTERVAL, float,
+            ),
+            max_queue=_env_number("EXCELMANUS_AUDIT_MAX_QUEUE", _DEFAULT_MAX_QUEUE),
+        )
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def submit(self, sql: str, params: Sequence[Any]) -> None:
+        """入队一条记录（不阻塞）；队列已满时丢弃并计数，关闭后直接同步写入。"""
+        if self._closed:
+            self._write([(sql, params)])
+            return
+        with self._cond:
+            if len(self._queue) >= self._max_queue:
+                self._dropped += 1
+                self._cond.notify_all()
+                dropped = self._dropped
+            else:
+                dropped = 0
+                self._queue.append((sql, params))
+                if len(self._queue) in (1, self._batch_size):
+                    self._cond.notify_all()
+        if dropped:
+            if dropped == 1 or dropped % self._max_queue == 0:
+                logger.warning("审计日志队列已满，已丢弃 %d 条记录", dropped)
+            return
+        self._ensure_thread()
+
+    def flush(self) -> None:
+        """同步落盘全部积压记录。"""
+        with self._write_lock:
+            batch = self._drain()
+            if batch:
+                self._write_unlocked(batch)
+
+    def close(self) -> None:
+        """停止写线程并落盘剩余记录（幂等）。"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=10)
+        self.flush()
+
+    async def aclose(self) -> None:
+        """异步关闭：在线程池中等待写线程退出，不阻塞事件循环。"""
+        await asyncio.to_thread(self.close)
+
+    def stats(self) -> dict[str, int]:
+        with self._cond:
+            queued = len(self._queue)
+        return {
+            "queued": queued,
+            "written": self._written,
+            "batches": self._batches,
+            "failed": self._failed,
+            "dropped": self._dropped,
+        }
+
+    # ── 内部 ──────────────────────────────────────────────
+
+    def _ensure_thread(self) -> None:
+        if self._thread is not None:
+            return
+        with self._cond:
+            if self._thread is None and not self._closed:
+                self._thread = threading.Thread(
+                    target=self._run, name="excelmanus-audit-sink", daemon=True,
+                )
+                self._thread.start()
+
+    def _drain(self) -> list[tuple[str, Sequence[Any]]]:
+        with self._cond:
+            batch = list(self._queue)
+            self._queue.clear()
+            self._cond.notify_all()
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._queue or self._closed)
+                if self._closed:
+                    return
+                # 首条记录入队后开始计时：凑满一批或超时即落盘
+                self._cond.wait_for(
+                    lambda: len(self._queue) >= self._batch_size or self._closed,
+                    timeout=self._flush_interval,
+                )
+                if self._closed:
+                    return
+            self.flush()
+
+    def _write(self, batch: list[tuple[str, Sequence[Any]]]) -> None:
+        with self._write_lock:
+            self._write_unlocked(batch)
+
+    def _write_unlocked(self, batch: list[tuple[str, Sequence[Any]]]) -> None:
+        grouped: dict[str, list[Sequence[Any]]] = {}
+        for sql, params in batch:
+            grouped.setdefault(sql, []).append(params)
+        try:
+            with self._conn.savepoint(_SAVEPOINT):
+                for sql, rows in grouped.items():
+                    self._conn.executemany(sql, rows)
+            self._conn.commit()
+        except Exception:
+            logger.warning(
+                "审计日志批量写入失败（%d 条），改为逐条写入", len(batch), exc_info=True,
+            )
+            self._write_rows(batch)
+            return
+        self._written += len(batch)
+        self._batches += 1
+
+    def _write_rows(self, batch: list[tuple[str, Sequence[Any]]]) -> None:
+        """逐条写入并提交，单条失败只丢弃该条。"""
+        for sql, params in batch:
+            try:
+                with self._conn.savepoint(_SAVEPOINT):
+                    self._conn.execute(sql, params)
+                self._conn.commit()
+            except Exception:
+                self._failed += 1
+                logger.debug("审计日志单条写入失败", exc_info=True)
+                continue
+            self._written += 1
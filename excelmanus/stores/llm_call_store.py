@@ -5,34 +5,66 @@ import logging
 from datetime import datetime, timezone
 from typing import TYPE_CHECKING, Any, overload
 
-from excelmanus.db_adapter import ConnectionAdapter, user_filter_clause
+from excelmanus.db_adapter import (
+    ConnectionAdapter,
+    register_prepared_statement,
+    user_filter_clause,
+)
 
 if TYPE_CHECKING:
     from excelmanus.database import Database
+    from excelmanus.stores.audit_sink import AuditSink
 
 logger = logging.getLogger(__name__)
 
+_INSERT_SQL = (
+    "INSERT INTO llm_call_log "
+    "(session_id, turn, iteration, model, "
+    " prompt_tokens, completion_tokens, cached_tokens, total_tokens, "
+    " has_tool_calls, thinking_chars, stream, latency_ms, "
+    " ttft_ms, cache_creation_tokens, cache_read_tokens, "
+    " error, created_at, user_id) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+register_prepared_statement(_INSERT_SQL)
+
 
 class LLMCallStore:
     """LLM 调用审计日志（支持 SQLite / PostgreSQL）。"""
 
     @overload
-    def __init__(self, conn: ConnectionAdapter, *, user_id: str | None = None) -> None: ...
+    def __init__(
+        self, conn: ConnectionAdapter, *, user_id: str | None = None,
+        sink: "AuditSink | None" = None,
+    ) -> None: ...
     @overload
-    def __init__(self, conn: "Database", *, user_id: str | None = None) -> None: ...
-
-    def __init__(self, conn: Any, *, user_id: str | None = None) -> None:
+    def __init__(
+        self, conn: "Database", *, user_id: str | None = None,
+        sink: "AuditSink | None" = None,
+    ) -> None: ...
+
+    def __init__(
+        self, conn: Any, *, user_id: str | None = None,
+        sink: "AuditSink | None" = None,
+    ) -> None:
         if isinstance(conn, ConnectionAdapter):
             self._conn = conn
         else:
             self._conn = conn.conn
         self._user_id = user_id
+        # 传入 sink 时 log() 写后批量落盘，否则逐条同步写入
+        self._sink = sink
         self._uid_clause, self._uid_params = user_filter_clause("user_id", user_id)
 
     @staticmethod
     def _now_iso() -> str:
         return datetime.now(timezone.utc).isoformat()
 
+    def _flush_pending(self) -> None:
+        """查询前落盘写后队列中的记录，保证读到自己的写入。"""
+        if self._sink is not None:
+            self._sink.flush()
+
     def log(
         self,
         *,
@@ -55,35 +87,30 @@ class LLMCallStore:
     ) -> None:
         """写入一条 LLM 调用记录。"""
         try:
-            self._conn.execute(
-                "INSERT INTO llm_call_log "
-                "(session_id, turn, iteration, model, "
-                " prompt_tokens, completion_tokens, cached_tokens, total_tokens, "
-                " has_tool_calls, thinking_chars, stream, latency_ms, "
-                " ttft_ms, cache_creation_tokens, cache_read_tokens, "
-                " error, created_at, user_id) "
-                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
-                (
-                    session_id,
-                    turn,
-                    iteration,
-                    model,
-                    prompt_tokens,
-                    completion_tokens,
-                    cached_tokens,
-                    total_tokens if total_tokens else prompt_tokens + completion_tokens,
-                    1 if has_tool_calls else 0,
-                    thinking_chars,
-                    1 if stream else 0,
-                    round(latency_ms, 1),
-                    round(ttft_ms, 1),
-                    cache_creation_tokens,
-                    cache_read_tokens,
-                    (error or "")[:500] if error else None,
-                    self._now_iso(),
-                    self._user_id,
-                ),
+            params = (
+                session_id,
+                turn,
+                iteration,
+                model,
+                prompt_tokens,
+                completion_tokens,
+                cached_tokens,
+                total_tokens if total_tokens else prompt_tokens + completion_tokens,
+                1 if has_tool_calls else 0,
+                thinking_chars,
+                1 if stream else 0,
+                round(latency_ms, 1),
+                round(ttft_ms, 1),
+                cache_creation_tokens,
+                cache_read_tokens,
+                (error or "")[:500] if error else None,
+                self._now_iso(),
+                self._user_id,
             )
+            if self._sink is not None:
+                self._sink.submit(_INSERT_SQL, params)
+                return
+            self._conn.execute(_INSERT_SQL, params)
             self._conn.commit()
         except Exception:
             logger.debug("写入 LLM 调用日志失败", exc_info=True)
@@ -97,6 +124,7 @@ class LLMCallStore:
         offset: int = 0,
     ) -> list[dict[str, Any]]:
         """查询 LLM 调用记录。"""
+        self._flush_pending()
         conditions: list[str] = [self._uid_clause]
         params: list[Any] = list(self._uid_params)
 
@@ -118,6 +146,7 @@ class LLMCallStore:
 
     def stats(self, session_id: str | None = None) -> dict[str, Any]:
         """聚合统计：调用次数、总 token、平均延迟、按模型分组。"""
+        self._flush_pending()
         conditions: list[str] = [self._uid_clause]
         params: list[Any] = list(self._uid_params)
         if session_id:
@@ -5,34 +5,63 @@ import logging
 from datetime import datetime, timezone
 from typing import TYPE_CHECKING, Any, overload
 
-from excelmanus.db_adapter import ConnectionAdapter, user_filter_clause
+from excelmanus.db_adapter import (
+    ConnectionAdapter,
+    register_prepared_statement,
+    user_filter_clause,
+)
 
 if TYPE_CHECKING:
     from excelmanus.database import Database
+    from excelmanus.stores.audit_sink import AuditSink
 
 logger = logging.getLogger(__name__)
 
+_INSERT_SQL = (
+    "INSERT INTO tool_call_log "
+    "(session_id, turn, iteration, tool_name, arguments_hash, "
+    " success, duration_ms, result_chars, error_type, error_preview, created_at, user_id) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+register_prepared_statement(_INSERT_SQL)
+
 
 class ToolCallStore:
     """工具调用审计日志（支持 SQLite / PostgreSQL）。"""
 
     @overload
-    def __init__(self, conn: ConnectionAdapter, *, user_id: str | None = None) -> None: ...
+    def __init__(
+        self, conn: ConnectionAdapter, *, user_id: str | None = None,
+        sink: "AuditSink | None" = None,
+    ) -> None: ...
     @overload
-    def __init__(self, conn: "Database", *, user_id: str | None = None) -> None: ...
-
-    def __init__(self, conn: Any, *, user_id: str | None = None) -> None:
+    def __init__(
+        self, conn: "Database", *, user_id: str | None = None,
+        sink: "AuditSink | None" = None,
+    ) -> None: ...
+
+    def __init__(
+        self, conn: Any, *, user_id: str | None = None,
+        sink: "AuditSink | None" = None,
+    ) -> None:
         if isinstance(conn, ConnectionAdapter):
             self._conn = conn
         else:
             self._conn = conn.conn
         self._user_id = user_id
+        # 传入 sink 时 log() 写后批量落盘，否则逐条同步写入
+        self._sink = sink
         self._uid_clause, self._uid_params = user_filter_clause("user_id", user_id)
 
     @staticmethod
     def _now_iso() -> str:
         return datetime.now(timezone.utc).isoformat()
 
+    def _flush_pending(self) -> None:
+        """查询前落盘写后队列中的记录，保证读到自己的写入。"""
+        if self._sink is not None:
+            self._sink.flush()
+
     def log(
         self,
         *,
@@ -49,26 +78,24 @@ class ToolCallStore:
     ) -> None:
         """写入一条工具调用记录。"""
         try:
-            self._conn.execute(
-                "INSERT INTO tool_call_log "
-                "(session_id, turn, iteration, tool_name, arguments_hash, "
-                " success, duration_ms, result_chars, error_type, error_preview, created_at, user_id) "
-                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
-                (
-                    session_id,
-                    turn,
-                    iteration,
-                    tool_name,
-                    arguments_hash,
-                    1 if success else 0,
-                    round(duration_ms, 1),
-                    result_chars,
-                    error_type,
-                    (error_preview or "")[:200] if error_preview else None,
-                    self._now_iso(),
-                    self._user_id,
-                ),
+            params = (
+                session_id,
+                turn,
+                iteration,
+                tool_name,
+                arguments_hash,
+                1 if success else 0,
+                round(duration_ms, 1),
+                result_chars,
+                error_type,
+                (error_preview or "")[:200] if error_preview else None,
+                self._now_iso(),
+                self._user_id,
             )
+            if self._sink is not None:
+                self._sink.submit(_INSERT_SQL, params)
+                return
+            self._conn.execute(_INSERT_SQL, params)
             self._conn.commit()
         except Exception:
             logger.debug("写入工具调用日志失败", exc_info=True)
@@ -83,6 +110,7 @@ class ToolCallStore:
         offset: int = 0,
     ) -> list[dict[str, Any]]:
         """查询工具调用记录。"""
+        self._flush_pending()
         conditions: list[str] = [self._uid_clause]
         params: list[Any] = list(self._uid_params)
 
@@ -107,6 +135,7 @@ class ToolCallStore:
 
     def stats(self, session_id: str | None = None) -> dict[str, Any]:
         """聚合统计：调用次数、成功率、平均耗时、top 失败工具。"""
+        self._flush_pending()
         conditions: list[str] = [self._uid_clause]
         params: list[Any] = list(self._uid_params)
         if session_id:
@@ -0,0 +1,226 @@
+"""进程级 token 计数服务：按内容哈希缓存 tiktoken 编码结果。
+
+system prompt、窗口感知文本、记忆条目等在一个会话的多轮之间大量重复，
+各子系统（ConversationMemory、ContextBuilder、窗口感知、mention 解析、
+记忆提取）此前各自调用 tiktoken 重新编码。本模块提供统一入口：
+
+- ``count`` / ``count_batch``：按 blake2b 内容哈希查 LRU，未命中的文本
+  逐条 ``encode``，数量与总长度都足够大时才走 ``encode_batch``（后者每次
+  调用都会新建线程池，小批量反而慢得多）；
+- ``stats``：命中率、编码耗时与按平均编码速度估算的节省耗时。
+
+容量上限由 ``EXCELMANUS_TOKEN_CACHE_ENTRIES`` 控制（默认 8192，0 关闭缓存）。
+tiktoken 编码不可用时降级为字符估算（约 4 字符 1 token）。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Sequence
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_MAX_ENTRIES = 8192
+_ENCODING_NAMES = ("o200k_base", "cl100k_base")
+_FALLBACK_CHARS_PER_TOKEN = 4
+# 未命中文本达到该条数且总字符数达到该值时才走 encode_batch
+_BATCH_MIN_TEXTS = 8
+_BATCH_MIN_CHARS = 64 * 1024
+
+
+def _content_key(text: str) -> bytes:
+    return hashlib.blake2b(
+        text.encode("utf-8", "surrogatepass"), digest_size=16,
+    ).digest()
+
+
+class TokenCountCache:
+    """内容哈希 → token 数的有界 LRU。"""
+
+    def __init__(self, max_entries: int, encoding: Any = None) -> None:
+        self._max_entries = max(0, int(max_entries))
+        self._encoding = encoding
+        self._encoding_loaded = encoding is not None
+        self._entries: OrderedDict[bytes, int] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._hit_chars = 0
+        self._encoded_chars = 0
+        self._encode_seconds = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self._max_entries > 0
+
+    @property
+    def encoding(self) -> Any:
+        """tiktoken 编码对象（首次访问时加载），不可用时为 None。"""
+        if not self._encoding_loaded:
+            for name in _ENCODING_NAMES:
+                try:
+                    import tiktoken
+
+                    self._encoding = tiktoken.get_encoding(name)
+                    break
+                except Exception:
+                    logger.debug("加载 tiktoken 编码 %s 失败", name, exc_info=True)
+            self._encoding_loaded = True
+        return self._encoding
+
+    def encode(self, text: str) -> list[int]:
+        """返回 token 序列（不缓存，供按 token 截断使用）。"""
+        enc = self.encoding
+        if enc is None:
+            raise RuntimeError("tiktoken 编码不可用")
+        return enc.encode(text)
+
+    def count(self, text: str) -> int:
+        """计算单段文本的 token 数。"""
+        if not text:
+            return 0
+        return self.count_batch([text])[0]
+
+    def count_batch(self, texts: Sequence[str], *, cache: bool = True) -> list[int]:
+        """批量计算 token 数；未命中的文本去重后统一编码。
+
+        ``cache=False`` 时直接编码、不查也不写 LRU，用于 role、消息 ID
+        等短小或唯一的字段，避免它们挤占缓存。
+        """
+        if not cache:
+            non_empty = [text for text in texts if text]
+            direct_counts = iter(self._encode_counts(non_empty) if non_empty else [])
+            return [next(direct_counts) if text else 0 for text in texts]
+        results: list[int] = [0] * len(texts)
+        pending: dict[bytes, list[int]] = {}
+        pending_texts: list[str] = []
+        with self._lock:
+            for i, text in enumerate(texts):
+                if not text:
+                    continue
+                key = _content_key(text)
+                cached = self._entries.get(key) if self.enabled else None
+                if cached is not None:
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    self._hit_chars += len(text)
+                    results[i] = cached
+                    continue
+                slots = pending.get(key)
+                if slots is None:
+                    pending[key] = [i]
+                    pending_texts.append(text)
+                else:
+                    slots.append(i)
+        if not pending:
+            return results
+
+        counts = self._encode_counts(pending_texts)
+        with self._lock:
+            for (key, slots), text, n in zip(pending.items(), pending_texts, counts):
+                self._misses += len(slots)
+                for i in slots:
+                    results[i] = n
+                if not self.enabled:
+                    continue
+                self._entries[key] = n
+                self._entries.move_to_end(key)
+                if len(self._entries) > self._max_entries:
+                    self._entries.popitem(last=False)
+                    self._evictions += 1
+        return results
+
+    def _encode_counts(self, texts: list[str]) -> list[int]:
+        enc = self.encoding
+        start = time.perf_counter()
+        try:
+            if enc is None:
+                raise RuntimeError("tiktoken 编码不可用")
+            if (
+                len(texts) >= _BATCH_MIN_TEXTS
+                and sum(len(t) for t in texts) >= _BATCH_MIN_CHARS
+            ):
+                counts = [len(tokens) for tokens in enc.encode_batch(texts)]
+            else:
+                counts = [len(enc.encode(t)) for t in texts]
+        except Exception:
+            counts = [max(1, len(t) // _FALLBACK_CHARS_PER_TOKEN) for t in texts]
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self._encode_seconds += elapsed
+            self._encoded_chars += sum(len(t) for t in texts)
+        return counts
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            per_char = (
+                self._encode_seconds / self._encoded_chars
+                if self._encoded_chars else 0.0
+            )
+            return {
+                "entries": len(self._entries),
+                "max_entries": self._max_entries,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": round(self._hits / lookups, 4) if lookups else 0.0,
+                "evictions": self._evictions,
+                "encode_seconds": round(self._encode_seconds, 6),
+                "saved_seconds_estimate": round(self._hit_chars * per_char, 6),
+            }
+
+
+def stats_delta(before: dict[str, Any], after: dict[str, Any]) -> dict[str, Any]:
+    """两次 ``stats()`` 快照之差（用于按轮统计）。"""
+    hits = after["hits"] - before["hits"]
+    misses = after["misses"] - before["misses"]
+    lookups = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+        "encode_seconds": round(after["encode_seconds"] - before["encode_seconds"], 6),
+        "saved_seconds_estimate": round(
+            after["saved_seconds_estimate"] - before["saved_seconds_estimate"], 6,
+        ),
+    }
+
+
+_cache: TokenCountCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_token_cache() -> TokenCountCache:
+    """返回进程级 token 计数缓存单例（首次调用时读取 EXCELMANUS_TOKEN_CACHE_ENTRIES）。"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                raw = os.environ.get("EXCELMANUS_TOKEN_CACHE_ENTRIES", "").strip()
+                try:
+                    max_entries = int(raw) if raw else _DEFAULT_MAX_ENTRIES
+                except ValueError:
+                    max_entries = _DEFAULT_MAX_ENTRIES
+                _cache = TokenCountCache(max_entries)
+    return _cache
+
+
+def set_token_cache(cache: TokenCountCache | None) -> None:
+    """替换进程级缓存（测试使用；传 None 时下次按环境变量重建）。"""
+    global _cache
+    _cache = cache
+
+
+def count_tokens(text: str) -> int:
+    """便捷入口：``get_token_cache().count(text)``。"""
+    return get_token_cache().count(text)
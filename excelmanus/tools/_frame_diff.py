@@ -0,0 +1,326 @@
+"""DataFrame 向量化对比引擎 — compare_excel 的差异计算核心。
+
+两种对齐方式：
+
+- 行号对齐：A/B 第 i 行互相比较，多出的行计为新增/删除；
+- 关键列对齐：按 key_columns 的文本值 join（重复键取首行），
+  只在 A 中存在计删除，只在 B 中存在计新增。任一关键列为空（NaN 或
+  空白文本）的行没有可比的身份，不参与 join，同样计为删除/新增。
+
+对齐后的行先用 ``hash_pandas_object`` 做整行哈希过滤，仅对哈希不同的
+行逐列计算差异掩码。两个单元格值相等（如 ``3`` 与 ``3.0``）、同为空，
+或序列化文本相同（如 ``"3"`` 与 ``3``）时视为无差异。
+
+统计信息（新增/删除/修改行数、每列差异数）在掩码上直接求和得到，
+不构建逐条记录；明细通过 :meth:`FrameDiff.iter_chunks` 按块惰性生成，
+调用方取够即停。
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Any, Iterator
+
+import numpy as np
+import pandas as pd
+
+from excelmanus.logger import get_logger
+
+logger = get_logger("tools.frame_diff")
+
+# 多关键列拼接键文本时使用的分隔符（单元格中几乎不会出现）
+_KEY_SEP = "\x1f"
+
+
+def _cell_text(value: Any) -> str:
+    """与 ``str(_serialize_cell_value(v))`` 同口径的比较文本。"""
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return str(value)
+
+
+def _display_value(value: Any) -> Any:
+    """差异明细中展示的 JSON 兼容值（空值统一为 None）。"""
+    if isinstance(value, np.generic):
+        value = value.item()
+    try:
+        if pd.isna(value):
+            return None
+    except (TypeError, ValueError):
+        pass
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, (int, float, bool)):
+        return value
+    return str(value)
+
+
+def _changed_mask(a: pd.Series, b: pd.Series) -> np.ndarray:
+    """逐行比较两列（已按行对齐），返回"值不等且文本不同"的布尔掩码。"""
+    av = a.to_numpy()
+    bv = b.to_numpy()
+    if a.dtype == b.dtype and a.dtype.kind in "biufmM":
+        # 同类型数值/时间列：值相等即文本相等，两侧同为空视为相同
+        changed = av != bv
+        if a.dtype.kind in "fmM":
+            changed &= ~(pd.isna(av) & pd.isna(bv))
+        return np.asarray(changed, dtype=bool)
+
+    try:
+        candidates = ~np.asarray(av == bv, dtype=bool)
+    except (TypeError, ValueError):
+        candidates = np.ones(len(av), dtype=bool)
+    changed = np.zeros(len(av), dtype=bool)
+    for i in np.flatnonzero(candidates):
+        changed[i] = _cell_text(av[i]) != _cell_text(bv[i])
+    return changed
+
+
+def _row_hashes(frame: pd.DataFrame) -> np.ndarray | None:
+    try:
+        return pd.util.hash_pandas_object(frame, index=False).to_numpy()
+    except Exception:
+        logger.debug("行哈希计算失败，跳过哈希过滤", exc_info=True)
+        return None
+
+
+def _key_text(series: pd.Series) -> np.ndarray:
+    """把关键列转为 join 用的文本数组；整数值的浮点列（含空值导致的 float）按整数格式化。"""
+    if series.dtype.kind == "f":
+        finite = series.dropna()
+        if len(finite) and bool((finite == finite.round()).all()):
+            series = series.astype("Int64")
+    text = series.astype(str).to_numpy(dtype=object)
+    text[series.isna().to_numpy()] = ""
+    return text
+
+
+def _blank_key_mask(series: pd.Series) -> np.ndarray:
+    """关键列为空的行：NaN/None 或去除空白后为空的文本。"""
+    blank = series.isna().to_numpy()
+    if series.dtype.kind == "O":
+        text = series.astype(str).str.strip().to_numpy(dtype=object)
+        blank = blank | (text == "")
+    return blank
+
+
+def _first_rows(codes: np.ndarray, n_codes: int) -> tuple[np.ndarray, np.ndarray]:
+    """返回 (按行序排列的各键首行位置, 键编码 → 首行位置映射；缺失为 -1)。"""
+    _, first = np.unique(codes, return_index=True)
+    first = np.sort(first)
+    mapping = np.full(n_codes, -1, dtype=np.int64)
+    mapping[codes[first]] = first
+    return first, mapping
+
+
+@dataclass
+class FrameDiff:
+    """两个 DataFrame 的差异结果：全量统计 + 惰性明细。"""
+
+    frame_a: pd.DataFrame
+    frame_b: pd.DataFrame
+    columns: list[str]
+    key_columns: list[str] | None = None
+    rows_added: int = 0
+    rows_deleted: int = 0
+    rows_modified: int = 0
+    # 关键列为空、未参与 join 的行数（已分别计入 rows_deleted / rows_added）
+    blank_key_rows_a: int = 0
+    blank_key_rows_b: int = 0
+    cells_different: int = 0
+    total_cells_compared: int = 0
+    column_stats: dict[str, dict[str, int]] = field(default_factory=dict)
+    # 有差异的行在 A/B 中的位置，以及 (行 × columns) 的差异掩码
+    _rows_a: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int64))
+    _rows_b: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int64))
+    _changed: np.ndarray = field(default_factory=lambda: np.zeros((0, 0), dtype=bool))
+    _added_rows: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int64))
+
+    def _col_pos(self, frame: pd.DataFrame) -> dict[str, int]:
+        return {str(c): i for i, c in enumerate(frame.columns)}
+
+    def _key_label(self, row_a: int, pos_a: dict[str, int]) -> str:
+        values = tuple(
+            _display_value(self.frame_a.iat[row_a, pos_a[k]]) for k in self.key_columns or []
+        )
+        return str(values[0]) if len(values) == 1 else str(values)
+
+    def iter_chunks(self, chunk_size: int = 1000) -> Iterator[list[dict[str, Any]]]:
+        """按块生成逐单元格差异记录（修改在前，行号模式下新增行单元格在后）。"""
+        from openpyxl.utils import get_column_letter
+
+        chunk_size = max(1, int(chunk_size))
+        pos_a = self._col_pos(self.frame_a)
+        pos_b = self._col_pos(self.frame_b)
+        rows, cols = np.nonzero(self._changed)
+        for start in range(0, len(rows), chunk_size):
+            chunk: list[dict[str, Any]] = []
+            for r, c in zip(rows[start:start + chunk_size], cols[start:start + chunk_size]):
+                row_a = int(self._rows_a[r])
+                row_b = int(self._rows_b[r])
+                col = self.columns[c]
+                old = _display_value(self.frame_a.iat[row_a, pos_a[col]])
+                new = _display_value(self.frame_b.iat[row_b, pos_b[col]])
+                if self.key_columns:
+                    chunk.append({
+                        "key": self._key_label(row_a, pos_a),
+                        "column": col,
+                        "old": old,
+                        "new": new,
+                    })
+                else:
+                    chunk.append({
+                        "cell": f"{get_column_letter(pos_a[col] + 1)}{row_a + 2}",
+                        "old": old,
+                        "new": new,
+                    })
+            yield chunk
+
+        if self.key_columns or not len(self._added_rows):
+            return
+        chunk = []
+        names_b = [str(c) for c in self.frame_b.columns]
+        added = self.frame_b.iloc[self._added_rows]
+        for row_b, values in zip(self._added_rows, added.itertuples(index=False, name=None)):
+            for col, value in zip(names_b, values):
+                shown = _display_value(value)
+                if shown is None or shown == "":
+                    continue
+                chunk.append({"cell": f"R{int(row_b) + 2}:{col}", "old": None, "new": shown})
+                if len(chunk) >= chunk_size:
+                    yield chunk
+                    chunk = []
+        if chunk:
+            yield chunk
+
+    def head(self, n: int) -> list[dict[str, Any]]:
+        """返回前 n 条差异记录（只物化这部分）。"""
+        out: list[dict[str, Any]] = []
+        if n <= 0:
+            return out
+        for chunk in self.iter_chunks(n):
+            out.extend(chunk)
+            if len(out) >= n:
+                break
+        return out[:n]
+
+
+def diff_frames(
+    frame_a: pd.DataFrame,
+    frame_b: pd.DataFrame,
+    columns: list[str],
+    *,
+    key_columns: list[str] | None = None,
+) -> FrameDiff:
+    """计算两个 DataFrame 的差异。
+
+    Args:
+        frame_a: 基准数据。
+        frame_b: 对比数据。
+        columns: 两侧共有、参与逐格对比的列名（字符串形式，按输出顺序）。
+        key_columns: 关键列；为空时按行号对齐。
+    """
+    map_a = {str(c): c for c in frame_a.columns}
+    map_b = {str(c): c for c in frame_b.columns}
+    result = FrameDiff(
+        frame_a=frame_a,
+        frame_b=frame_b,
+        columns=[c for c in columns if not key_columns or c not in key_columns],
+        key_columns=list(key_columns) if key_columns else None,
+    )
+
+    if key_columns:
+        def _keys(frame: pd.DataFrame, mapping: dict[str, Any]) -> np.ndarray:
+            keys = _key_text(frame[mapping[key_columns[0]]])
+            for k in key_columns[1:]:
+                keys = keys + _KEY_SEP + _key_text(frame[mapping[k]])
+            return keys
+
+        def _blank(frame: pd.DataFrame, mapping: dict[str, Any]) -> np.ndarray:
+            mask = np.zeros(len(frame), dtype=bool)
+            for k in key_columns:
+                mask |= _blank_key_mask(frame[mapping[k]])
+            return mask
+
+        blank_a = _blank(frame_a, map_a)
+        blank_b = _blank(frame_b, map_b)
+        keyed_a = np.flatnonzero(~blank_a)
+        keyed_b = np.flatnonzero(~blank_b)
+        # 两侧键文本统一编码为整数，后续 join 全部在 NumPy 整数数组上完成
+        codes, uniques = pd.factorize(
+            np.concatenate([_keys(frame_a, map_a)[keyed_a], _keys(frame_b, map_b)[keyed_b]]),
+        )
+        codes_a, codes_b = codes[: len(keyed_a)], codes[len(keyed_a):]
+        first_a, map_first_a = _first_rows(codes_a, len(uniques))
+        first_b, map_first_b = _first_rows(codes_b, len(uniques))
+        partner = map_first_b[codes_a[first_a]]
+        in_b = partner >= 0
+        pairs_a = keyed_a[first_a[in_b]]
+        pairs_b = keyed_b[partner[in_b]]
+        deleted_rows = np.sort(np.concatenate([
+            keyed_a[first_a[~in_b]], np.flatnonzero(blank_a),
+        ]))
+        added_rows = np.sort(np.concatenate([
+            keyed_b[first_b[map_first_a[codes_b[first_b]] < 0]], np.flatnonzero(blank_b),
+        ]))
+        result.blank_key_rows_a = int(blank_a.sum())
+        result.blank_key_rows_b = int(blank_b.sum())
+    else:
+        shared = min(len(frame_a), len(frame_b))
+        pairs_a = pairs_b = np.arange(shared)
+        deleted_rows = np.arange(shared, len(frame_a))
+        added_rows = np.arange(shared, len(frame_b))
+
+    result.rows_added = len(added_rows)
+    result.rows_deleted = len(deleted_rows)
+    result._added_rows = added_rows
+    value_cols = result.columns
+    result.total_cells_compared = len(pairs_a) * len(value_cols)
+
+    per_column_changed = np.zeros(len(value_cols), dtype=np.int64)
+    if len(pairs_a) and value_cols:
+        sub_a = frame_a.iloc[pairs_a][[map_a[c] for c in value_cols]].reset_index(drop=True)
+        sub_b = frame_b.iloc[pairs_b][[map_b[c] for c in value_cols]].reset_index(drop=True)
+        hash_a = _row_hashes(sub_a)
+        hash_b = _row_hashes(sub_b)
+        if hash_a is not None and hash_b is not None:
+            candidates = np.flatnonzero(hash_a != hash_b)
+        else:
+            candidates = np.arange(len(sub_a))
+        logger.debug("行哈希过滤：%d/%d 行待逐列比较", len(candidates), len(sub_a))
+
+        changed = np.zeros((len(candidates), len(value_cols)), dtype=bool)
+        if len(candidates):
+            for j in range(len(value_cols)):
+                changed[:, j] = _changed_mask(
+                    sub_a.iloc[candidates, j], sub_b.iloc[candidates, j],
+                )
+        row_changed = changed.any(axis=1)
+        result._changed = changed[row_changed]
+        result._rows_a = pairs_a[candidates[row_changed]]
+        result._rows_b = pairs_b[candidates[row_changed]]
+        result.rows_modified = int(row_changed.sum())
+        per_column_changed = changed.sum(axis=0)
+
+    result.cells_different = int(per_column_changed.sum())
+
+    added_counts = frame_b.iloc[added_rows].notna().sum() if len(added_rows) else None
+    removed_counts = frame_a.iloc[deleted_rows].notna().sum() if len(deleted_rows) else None
+    if not key_columns and added_counts is not None:
+        # 行号模式下新增行的非空单元格也计入差异（与明细一致）
+        result.cells_different += int(added_counts.sum())
+        result.total_cells_compared += len(added_rows) * len(frame_b.columns)
+
+    stats: dict[str, dict[str, int]] = {}
+    for j, col in enumerate(value_cols):
+        if per_column_changed[j]:
+            stats.setdefault(col, {})["changed"] = int(per_column_changed[j])
+    for counts, label in ((added_counts, "added"), (removed_counts, "removed")):
+        if counts is None:
+            continue
+        for col, n in counts.items():
+            if n:
+                stats.setdefault(str(col), {})[label] = int(n)
+    result.column_stats = stats
+    return result
@@ -0,0 +1,246 @@
+"""进程级解析结果缓存：同一文件版本的 workbook / DataFrame 只解析一次。
+
+一个 agent 轮次内 read_excel → filter_data → group_aggregate 等工具往往
+反复解析同一个大文件。本模块按 ``(路径, mtime, size, 类型, 参数)`` 缓存
+解析结果，文件一旦被改写（mtime/size 变化）旧条目自然失效；
+写入路径另外调用 :func:`invalidate_file` 主动清理。
+
+容量按估算字节数做 LRU 淘汰，上限由 ``EXCELMANUS_READ_CACHE_MB`` 控制
+（默认 256，设为 0 关闭缓存）。
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Callable, Generic, Hashable, Iterator, TypeVar
+
+T = TypeVar("T")
+
+_DEFAULT_MAX_MB = 256
+# 无法精确估算大小的对象的兜底字节数
+_FALLBACK_OBJECT_BYTES = 1024
+# 行列表中单个单元格的估算字节数（Python 对象 + tuple 槽位）
+_CELL_BYTES_ESTIMATE = 64
+# 每行 list/tuple 容器本身的估算字节数
+_ROW_OVERHEAD_BYTES = 64
+# 估算嵌套行列表时用于推算平均单元格大小的抽样行数
+_SIZE_SAMPLE_ROWS = 200
+# openpyxl 完整对象模型中每个单元格（Cell 对象 + 坐标字典槽位 + 值）的实测字节数
+_WORKBOOK_CELL_BYTES = 360
+
+
+def file_signature(path: str | Path) -> tuple[str, int, int] | None:
+    """返回 ``(绝对路径, mtime_ns, size)``，文件不存在时返回 None。"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return os.path.abspath(str(path)), st.st_mtime_ns, st.st_size
+
+
+class Guarded(Generic[T]):
+    """带访问锁的缓存值：用于非线程安全、调用方必须串行访问的共享对象。"""
+
+    __slots__ = ("value", "lock")
+
+    def __init__(self, value: T) -> None:
+        self.value = value
+        self.lock = threading.RLock()
+
+
+def _estimate_rows_size(rows: list[Any]) -> int:
+    """估算行列表（``list[list]`` / ``list[tuple]``）的字节数。
+
+    单元格总数精确统计；字符串的额外长度按前若干行抽样后外推。
+    """
+    cells = 0
+    sample_cells = 0
+    sample_bytes = 0
+    for idx, row in enumerate(rows):
+        cells += len(row)
+        if idx < _SIZE_SAMPLE_ROWS:
+            sample_cells += len(row)
+            sample_bytes += sum(
+                _CELL_BYTES_ESTIMATE + (len(v) if isinstance(v, str) else 0)
+                for v in row
+            )
+    per_cell = sample_bytes / sample_cells if sample_cells else _CELL_BYTES_ESTIMATE
+    return max(int(cells * per_cell) + len(rows) * _ROW_OVERHEAD_BYTES, 64)
+
+
+def _estimate_workbook_size(wb: Any) -> int:
+    """按已解析单元格数估算完整模式 workbook 的字节数（read_only 工作表不常驻单元格）。"""
+    cells = sum(len(getattr(ws, "_cells", ())) for ws in wb.worksheets)
+    return max(cells * _WORKBOOK_CELL_BYTES, _FALLBACK_OBJECT_BYTES)
+
+
+def estimate_size(obj: Any) -> int:
+    """粗略估算缓存对象占用的字节数。"""
+    import pandas as pd
+
+    if isinstance(obj, pd.DataFrame):
+        try:
+            return int(obj.memory_usage(index=True, deep=True).sum())
+        except Exception:
+            return _FALLBACK_OBJECT_BYTES
+    if isinstance(obj, Guarded):
+        return estimate_size(obj.value)
+    if isinstance(obj, tuple):
+        return sum(estimate_size(item) for item in obj)
+    if isinstance(obj, dict):
+        return sum(estimate_size(v) for v in obj.values()) or 64
+    if isinstance(obj, list):
+        if obj and isinstance(obj[0], (list, tuple)):
+            return _estimate_rows_size(obj)
+        return max(len(obj) * _CELL_BYTES_ESTIMATE, 64)
+    if isinstance(obj, (int, float, str, bool)) or obj is None:
+        return 64
+    if hasattr(obj, "sheetnames"):
+        return _estimate_workbook_size(obj)
+    return _FALLBACK_OBJECT_BYTES
+
+
+class ParsedFileCache:
+    """按文件版本缓存解析结果的字节预算 LRU。"""
+
+    def __init__(self, max_bytes: int) -> None:
+        self._max_bytes = max(0, int(max_bytes))
+        self._entries: OrderedDict[tuple, tuple[Any, int]] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self._max_bytes > 0
+
+    def get_or_load(
+        self,
+        path: str | Path,
+        kind: str,
+        params: Hashable,
+        loader: Callable[[], T],
+    ) -> T:
+        """命中则返回缓存对象，否则调用 loader 解析并写入缓存。
+
+        返回的对象在调用方之间共享，调用方不得原地修改。
+        """
+        sig = file_signature(path)
+        if sig is None or not self.enabled:
+            return loader()
+        key = (*sig, kind, params)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry[0]
+            self._misses += 1
+
+        value = loader()
+        size = estimate_size(value)
+        if size > self._max_bytes:
+            return value
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+            while self._bytes > self._max_bytes and self._entries:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self._evictions += 1
+        return value
+
+    def invalidate(self, path: str | Path) -> int:
+        """移除某个文件所有版本的缓存条目，返回移除数量。"""
+        abs_path = os.path.abspath(str(path))
+        with self._lock:
+            keys = [k for k in self._entries if k[0] == abs_path]
+            for k in keys:
+                _, size = self._entries.pop(k)
+                self._bytes -= size
+        return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self._max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": round(self._hits / lookups, 4) if lookups else 0.0,
+                "evictions": self._evictions,
+            }
+
+
+_cache: ParsedFileCache | None = None
+_cache_lock = threading.Lock()
+# private_read_cache() 作用域内使用的独立缓存
+_scoped_cache: ContextVar[ParsedFileCache | None] = ContextVar(
+    "excelmanus_scoped_read_cache", default=None,
+)
+
+
+def get_read_cache() -> ParsedFileCache:
+    """返回解析缓存：``private_read_cache()`` 作用域内为独立实例，否则为进程级单例。
+
+    进程级单例在首次调用时读取 EXCELMANUS_READ_CACHE_MB。
+    """
+    scoped = _scoped_cache.get()
+    if scoped is not None:
+        return scoped
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                raw = os.environ.get("EXCELMANUS_READ_CACHE_MB", "").strip()
+                try:
+                    max_mb = float(raw) if raw else _DEFAULT_MAX_MB
+                except ValueError:
+                    max_mb = _DEFAULT_MAX_MB
+                _cache = ParsedFileCache(int(max_mb * 1024 * 1024))
+    return _cache
+
+
+@contextmanager
+def private_read_cache() -> Iterator[ParsedFileCache]:
+    """在当前上下文中改用独立的解析缓存，退出时丢弃。
+
+    供后台任务（如列式旁路构建）使用：解析出的 workbook 只属于该任务，
+    不与工具线程共享对象，也不挤占进程级缓存。
+    """
+    cache = ParsedFileCache(_DEFAULT_MAX_MB * 1024 * 1024)
+    token = _scoped_cache.set(cache)
+    try:
+        yield cache
+    finally:
+        _scoped_cache.reset(token)
+        cache.clear()
+
+
+def set_read_cache(cache: ParsedFileCache | None) -> None:
+    """替换进程级缓存（测试使用；传 None 时下次按环境变量重建）。"""
+    global _cache
+    _cache = cache
+
+
+def invalidate_file(path: str | Path) -> None:
+    """写入路径调用：清除该文件的全部解析缓存。"""
+    if _cache is not None:
+        _cache.invalidate(path)
@@ -0,0 +1,305 @@
+"""run_code 输出增量采集：有界尾部缓冲 + 进度行转发。
+
+脚本的 stdout/stderr 按块增量读取、增量解码，只保留最近若干行作为尾部，
+内存占用与输出总量无关；需要完整输出时（``stdout_file``/``stderr_file``）
+边读边写入磁盘。完整行按节流批次转发给当前上下文的输出监听器
+（由工具调度器注入，转为 ``TOOL_OUTPUT_DELTA`` 事件经 SSE 推送）。
+"""
+
+from __future__ import annotations
+
+import codecs
+import contextvars
+import os
+import queue
+import selectors
+import subprocess
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import IO, Any, Callable
+
+# (stream, text)：stream 为 "stdout" / "stderr"，text 为若干完整行
+OutputListener = Callable[[str, str], None]
+
+_FLUSH_INTERVAL = 0.2
+_MAX_EVENT_LINES = 40
+_MAX_EVENT_CHARS = 4000
+_MAX_LINE_CHARS = 4000
+_MIN_TAIL_LINES = 200
+_READ_CHUNK = 65536
+# 超时杀进程后继续收集残余输出的最长时间
+_DRAIN_SECONDS = 2.0
+# Windows 的 select 只支持套接字，管道改用读线程
+_SELECT_PIPES = os.name != "nt"
+
+_listener_var: contextvars.ContextVar[OutputListener | None] = contextvars.ContextVar(
+    "_run_output_listener", default=None,
+)
+
+
+def set_output_listener(listener: OutputListener | None) -> contextvars.Token:
+    """设置当前上下文的输出监听器，返回恢复 token。"""
+    return _listener_var.set(listener)
+
+
+def reset_output_listener(token: contextvars.Token) -> None:
+    _listener_var.reset(token)
+
+
+def get_output_listener() -> OutputListener | None:
+    return _listener_var.get(None)
+
+
+class _StreamTail:
+    """单路输出：增量解码、按行保留尾部、可选落盘。"""
+
+    def __init__(self, max_lines: int, spill: IO[str] | None) -> None:
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._lines: deque[str] = deque(maxlen=max_lines)
+        self._partial = ""
+        self._spill = spill
+        self._pending: list[str] = []
+        self.total_lines = 0
+        self.total_bytes = 0
+
+    def feed(self, data: bytes, *, final: bool = False) -> None:
+        self.total_bytes += len(data)
+        text = self._decoder.decode(data, final=final)
+        if not text:
+            return
+        if self._spill is not None:
+            self._spill.write(text)
+        parts = (self._partial + text).split("\n")
+        self._partial = parts.pop()
+        # 回车覆盖（进度条）只保留最新状态；超长无换行内容按固定长度切行
+        for line in parts:
+            self._add_line(line.rstrip("\r").rsplit("\r", 1)[-1])
+        if "\r" in self._partial:
+            self._partial = self._partial.rsplit("\r", 1)[-1]
+        while len(self._partial) > _MAX_LINE_CHARS:
+            self._add_line(self._partial[:_MAX_LINE_CHARS])
+            self._partial = self._partial[_MAX_LINE_CHARS:]
+
+    def close(self) -> None:
+        self.feed(b"", final=True)
+        if self._partial:
+            self._add_line(self._partial)
+            self._partial = ""
+
+    def _add_line(self, line: str) -> None:
+        if len(line) > _MAX_LINE_CHARS:
+            line = line[:_MAX_LINE_CHARS] + "...(truncated)"
+        self._lines.append(line)
+        self._pending.append(line)
+        self.total_lines += 1
+
+    def take_pending(self) -> list[str]:
+        pending, self._pending = self._pending, []
+        return pending
+
+    def text(self) -> str:
+        """保留的尾部行（close 之后包含末尾不完整的一行）。"""
+        return "\n".join(self._lines)
+
+
+class OutputCapture:
+    """stdout/stderr 两路采集，并按节流批次把完整行转发给监听器。"""
+
+    def __init__(
+        self,
+        *,
+        tail_lines: int,
+        stdout_path: Path | None = None,
+        stderr_path: Path | None = None,
+        listener: OutputListener | None = None,
+    ) -> None:
+        max_lines = max(int(tail_lines), _MIN_TAIL_LINES)
+        self._files: list[IO[str]] = []
+        self._streams = {
+            "stdout": _StreamTail(max_lines, self._open_spill(stdout_path)),
+            "stderr": _StreamTail(max_lines, self._open_spill(stderr_path)),
+        }
+        self._listener = listener
+        self._last_flush = time.monotonic()
+        self._closed = False
+        self.events_sent = 0
+        self.lines_skipped = 0
+
+    def _open_spill(self, path: Path | None) -> IO[str] | None:
+        if path is None:
+            return None
+        path.parent.mkdir(parents=True, exist_ok=True)
+        handle = open(path, "w", encoding="utf-8")
+        self._files.append(handle)
+        return handle
+
+    def feed(self, stream: str, data: bytes) -> None:
+        if data:
+            self._streams[stream].feed(data)
+
+    def pump(self, *, force: bool = False) -> None:
+        """到达节流间隔（或 force）时把积累的完整行转发给监听器。"""
+        now = time.monotonic()
+        if not force and now - self._last_flush < _FLUSH_INTERVAL:
+            return
+        self._last_flush = now
+        for name, stream in self._streams.items():
+            lines = stream.take_pending()
+            if not lines or self._listener is None:
+                continue
+            # 单个事件的行数与字符数有上限，超出部分只计数（仍保留在尾部缓冲中）
+            skipped = max(0, len(lines) - _MAX_EVENT_LINES)
+            text = "\n".join(lines[-_MAX_EVENT_LINES:])[-_MAX_EVENT_CHARS:]
+            if skipped:
+                text = f"...(省略 {skipped} 行)\n{text}"
+                self.lines_skipped += skipped
+            try:
+                self._listener(name, text)
+                self.events_sent += 1
+            except Exception:
+                self._listener = None
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        for stream in self._streams.values():
+            stream.close()
+        self.pump(force=True)
+        for handle in self._files:
+            try:
+                handle.close()
+            except OSError:
+                pass
+
+    @property
+    def stdout(self) -> str:
+        return self._streams["stdout"].text()
+
+    @property
+    def stderr(self) -> str:
+        return self._streams["stderr"].text()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            name: {"lines": s.total_lines, "bytes": s.total_bytes}
+            for name, s in self._streams.items()
+        }
+
+
+def run_streaming(
+    command: list[str],
+    *,
+    capture: OutputCapture,
+    timeout: float,
+    **popen_kwargs: Any,
+) -> tuple[int, bool]:
+    """启动子进程并增量读取输出，返回 (退出码, 是否超时)。
+
+    POSIX 下用 selectors 在当前线程多路读取两路管道；Windows 的 select
+    不支持管道，改为每路管道一个读线程，经队列交回当前线程写入 capture。
+    """
+    proc = subprocess.Popen(
+        command,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        **popen_kwargs,
+    )
+    assert proc.stdout is not None and proc.stderr is not None
+    deadline = time.monotonic() + timeout
+    try:
+        if _SELECT_PIPES:
+            timed_out = _pump_selector(proc, capture, deadline)
+        else:
+            timed_out = _pump_threads(proc, capture, deadline)
+        if not timed_out:
+            try:
+                proc.wait(timeout=max(0.0, deadline - time.monotonic()))
+            except subprocess.TimeoutExpired:
+                timed_out = True
+                proc.kill()
+    finally:
+        for pipe in (proc.stdout, proc.stderr):
+            pipe.close()
+        if proc.poll() is None:
+            proc.kill()
+        proc.wait()
+    return (124 if timed_out else proc.returncode), timed_out
+
+
+def _pump_selector(proc: subprocess.Popen, capture: OutputCapture, deadline: float) -> bool:
+    """读取两路管道直到 EOF 或超时，返回是否超时（超时已杀进程并收集残余输出）。"""
+    selector = selectors.DefaultSelector()
+    try:
+        selector.register(proc.stdout, selectors.EVENT_READ, "stdout")
+        selector.register(proc.stderr, selectors.EVENT_READ, "stderr")
+        while selector.get_map():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                proc.kill()
+                drain_until = time.monotonic() + _DRAIN_SECONDS
+                while selector.get_map() and time.monotonic() < drain_until:
+                    _read_ready(selector, capture, _FLUSH_INTERVAL)
+                return True
+            _read_ready(selector, capture, min(remaining, _FLUSH_INTERVAL))
+            capture.pump()
+        return False
+    finally:
+        selector.close()
+
+
+def _read_ready(selector: selectors.BaseSelector, capture: OutputCapture, timeout: float) -> None:
+    for key, _events in selector.select(timeout):
+        data = os.read(key.fd, _READ_CHUNK)
+        if not data:
+            selector.unregister(key.fileobj)
+            continue
+        capture.feed(key.data, data)
+
+
+def _pump_threads(proc: subprocess.Popen, capture: OutputCapture, deadline: float) -> bool:
+    """``_pump_selector`` 的读线程版本（Windows），语义相同。"""
+    chunks: queue.Queue[tuple[str, bytes]] = queue.Queue()
+    for name, pipe in (("stdout", proc.stdout), ("stderr", proc.stderr)):
+        threading.Thread(
+            target=_read_pipe, args=(pipe, name, chunks),
+            name=f"run-output-{name}", daemon=True,
+        ).start()
+    open_pipes = 2
+    timed_out = False
+    limit = deadline
+    while open_pipes:
+        now = time.monotonic()
+        if now >= limit:
+            if timed_out:
+                break
+            timed_out = True
+            proc.kill()
+            limit = now + _DRAIN_SECONDS
+        try:
+            name, data = chunks.get(timeout=min(limit - now, _FLUSH_INTERVAL))
+        except queue.Empty:
+            capture.pump()
+            continue
+        if data:
+            capture.feed(name, data)
+        else:
+            open_pipes -= 1
+        if not timed_out:
+            capture.pump()
+    return timed_out
+
+
+def _read_pipe(pipe: IO[bytes], name: str, chunks: queue.Queue) -> None:
+    """读线程：按块读取管道，EOF（或管道被关闭）时放入空块。"""
+    try:
+        while True:
+            data = os.read(pipe.fileno(), _READ_CHUNK)
+            if not data:
+                break
+            chunks.put((name, data))
+    except (OSError, ValueError):
+        pass
+    chunks.put((name, b""))
@@ -0,0 +1,491 @@
+"""run_code 预热解释器池：按（解释器, 风险等级, 工作区）复用 zygote 进程。
+
+冷启动的 run_code 每次都要新起解释器、写 wrapper 并重新导入
+pandas/openpyxl/numpy，纯启动开销约 1~2 秒。池中每个 zygote
+（见 ``excelmanus.security.sandbox_zygote``）启动时已安装对应等级的导入守卫、
+预导入重型依赖并编译好 wrapper；每次运行从 zygote fork 出全新子进程，
+子进程内设置资源限制、环境变量与工作目录后执行 wrapper，
+CoW 日志、暂存映射、临时目录等环境约定与冷启动完全一致。
+子进程输出写入临时文件，父进程等待期间增量读取。
+
+- 首次遇到某个 key 时走冷启动路径，同时在后台线程启动 zygote；
+- zygote 累计 fork ``max_runs`` 次或闲置超时后回收；
+- 仅 Linux 启用（依赖 fork），``EXCELMANUS_RUN_CODE_POOL_SIZE=0`` 关闭。
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import select
+import signal
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Hashable
+
+from excelmanus.logger import get_logger
+from excelmanus.tools._run_output import OutputCapture
+
+logger = get_logger("sandbox_pool")
+
+_ZYGOTE_SCRIPT = Path(__file__).resolve().parent.parent / "security" / "sandbox_zygote.py"
+_PRELOAD_MODULES = ("numpy", "pandas", "openpyxl")
+_DEFAULT_SIZE = 1
+_DEFAULT_MAX_RUNS = 50
+_MAX_IDLE_SECONDS = 300.0
+# 全进程最多保留的空闲 zygote 数（按最近使用淘汰）
+_MAX_IDLE_TOTAL = 8
+# zygote 启动（含预导入）与控制消息的超时
+_READY_TIMEOUT = 60.0
+_CONTROL_TIMEOUT = 10.0
+# 等待子进程期间读取输出文件的间隔
+_POLL_INTERVAL = 0.2
+_READ_CHUNK = 65536
+# 同一 key 连续启动失败达到该次数后不再尝试
+_MAX_SPAWN_FAILURES = 3
+
+
+class ZygoteError(RuntimeError):
+    """zygote 通信失败（子进程尚未启动，调用方可改走冷启动路径）。"""
+
+
+@dataclass
+class PooledRun:
+    """池内一次运行的结果（输出已写入调用方的 OutputCapture）。"""
+
+    return_code: int
+    timed_out: bool
+
+
+@dataclass(frozen=True)
+class ZygoteSpec:
+    """启动 zygote 所需的参数（key 相同的运行共享同一份 spec）。"""
+
+    command: tuple[str, ...]
+    tier: str
+    blocked: tuple[str, ...]
+    wrapper_src: str
+    cwd: str
+    env: tuple[tuple[str, str], ...]
+    limits: tuple[tuple[str, int], ...] = ()
+
+
+class _Zygote:
+    def __init__(self, key: Hashable, spec: ZygoteSpec, proc: subprocess.Popen[bytes]) -> None:
+        self.key = key
+        self.spec = spec
+        self.proc = proc
+        self.runs = 0
+        self.last_used = time.monotonic()
+        self.preloaded: list[str] = []
+        self.broken = False
+        self._buf = b""
+
+    @property
+    def alive(self) -> bool:
+        return self.proc.poll() is None
+
+    def send(self, message: dict[str, Any]) -> None:
+        assert self.proc.stdin is not None
+        try:
+            self.proc.stdin.write((json.dumps(message, ensure_ascii=False) + "\n").encode("utf-8"))
+            self.proc.stdin.flush()
+        except (OSError, ValueError) as exc:
+            raise ZygoteError(f"写入 zygote 失败: {exc}") from exc
+
+    def read(self, timeout: float) -> dict[str, Any] | None:
+        """读取一条控制消息；超时返回 None，管道关闭抛出 ZygoteError。"""
+        assert self.proc.stdout is not None
+        fd = self.proc.stdout.fileno()
+        deadline = time.monotonic() + max(0.0, timeout)
+        while b"\n" not in self._buf:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            ready, _, _ = select.select([fd], [], [], remaining)
+            if not ready:
+                return None
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                raise ZygoteError("zygote 已退出")
+            self._buf += chunk
+        line, self._buf = self._buf.split(b"\n", 1)
+        try:
+            return json.loads(line)
+        except ValueError as exc:
+            raise ZygoteError(f"无法解析 zygote 消息: {line[:200]!r}") from exc
+
+    def run(
+        self,
+        *,
+        argv: list[str],
+        cwd: str,
+        env: dict[str, str],
+        limits: list[tuple[str, int]],
+        timeout: float,
+        output_dir: Path,
+        capture: OutputCapture,
+    ) -> PooledRun:
+        """执行一次运行；子进程输出写入临时文件，等待期间增量读入 capture。"""
+        stem = output_dir / f"_rc_{uuid.uuid4().hex[:12]}"
+        paths = {"stdout": Path(f"{stem}.out"), "stderr": Path(f"{stem}.err")}
+        readers: dict[str, Any] = {}
+        try:
+            for name, path in paths.items():
+                path.touch(mode=0o600)
+                readers[name] = open(path, "rb")
+            self.send({
+                "argv": argv, "cwd": cwd, "env": env, "limits": limits,
+                "stdout": str(paths["stdout"]), "stderr": str(paths["stderr"]),
+            })
+            reply = self.read(_CONTROL_TIMEOUT)
+            if reply is None or "pid" not in reply:
+                raise ZygoteError(f"zygote 未能启动子进程: {reply}")
+            self.runs += 1
+            pid = int(reply["pid"])
+            deadline = time.monotonic() + timeout
+            timed_out = False
+            try:
+                reply = None
+                while reply is None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    reply = self.read(min(remaining, _POLL_INTERVAL))
+                    _pump_files(readers, capture)
+                if reply is None:
+                    timed_out = True
+                    _kill_group(pid)
+                    reply = self.read(_CONTROL_TIMEOUT)
+                    if reply is None:
+                        raise ZygoteError("超时后 zygote 未回收子进程")
+            except ZygoteError as exc:
+                # 子进程已开始执行，不能再重跑；按失败返回并回收 zygote
+                self.broken = True
+                _kill_group(pid)
+                reply = {"exit": 1}
+                _pump_files(readers, capture)
+                capture.feed("stderr", f"\n[沙盒解释器异常: {exc}]\n".encode("utf-8"))
+            _pump_files(readers, capture)
+            return PooledRun(
+                return_code=124 if timed_out else int(reply.get("exit", 1)),
+                timed_out=timed_out,
+            )
+        finally:
+            self.last_used = time.monotonic()
+            for reader in readers.values():
+                reader.close()
+            for path in paths.values():
+                path.unlink(missing_ok=True)
+
+    def close(self) -> None:
+        try:
+            if self.proc.stdin is not None:
+                self.proc.stdin.close()
+        except OSError:
+            pass
+        try:
+            self.proc.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+            try:
+                self.proc.wait(timeout=1)
+            except subprocess.TimeoutExpired:
+                pass
+        if self.proc.stdout is not None:
+            self.proc.stdout.close()
+
+
+def _kill_group(pid: int) -> None:
+    try:
+        os.killpg(pid, signal.SIGKILL)
+    except OSError:
+        try:
+            os.kill(pid, signal.SIGKILL)
+        except OSError:
+            pass
+
+
+def _pump_files(readers: dict[str, Any], capture: OutputCapture) -> None:
+    for name, reader in readers.items():
+        while True:
+            chunk = reader.read(_READ_CHUNK)
+            if not chunk:
+                break
+            capture.feed(name, chunk)
+    capture.pump()
+
+
+class SandboxInterpreterPool:
+    """按 key 维护 zygote 进程的池。
+
+    ``acquire`` 只返回已就绪的空闲 zygote；没有时按需在后台启动一个并返回
+    None，由调用方走冷启动路径。
+    """
+
+    def __init__(
+        self,
+        *,
+        size: int,
+        max_runs: int,
+        max_idle_seconds: float = _MAX_IDLE_SECONDS,
+    ) -> None:
+        self.size = max(0, int(size))
+        self.max_runs = max(1, int(max_runs))
+        self._max_idle = max_idle_seconds
+        self._lock = threading.Lock()
+        self._idle: OrderedDict[Hashable, list[_Zygote]] = OrderedDict()
+        self._busy: dict[Hashable, int] = {}
+        self._starting: dict[Hashable, int] = {}
+        self._failures: dict[Hashable, int] = {}
+        self._closed = False
+        self._hits = 0
+        self._misses = 0
+        self._spawned = 0
+        self._recycled = 0
+
+    # ── 取出与归还 ────────────────────────────────────────
+
+    def acquire(self, key: Hashable, spec: ZygoteSpec) -> _Zygote | None:
+        if self.size <= 0 or self._closed:
+            return None
+        stale: list[_Zygote] = []
+        found: _Zygote | None = None
+        spawn = False
+        now = time.monotonic()
+        with self._lock:
+            stale.extend(self._expire_locked(now))
+            items = self._idle.get(key)
+            while items:
+                zygote = items.pop()
+                if zygote.alive:
+                    found = zygote
+                    break
+                stale.append(zygote)
+            if key in self._idle and not self._idle[key]:
+                del self._idle[key]
+            if found is not None:
+                self._hits += 1
+                self._busy[key] = self._busy.get(key, 0) + 1
+            else:
+                self._misses += 1
+                spawn = self._reserve_spawn_locked(key)
+        for zygote in stale:
+            zygote.close()
+        if spawn:
+            self._start_spawn(key, spec)
+        return found
+
+    def release(self, zygote: _Zygote, *, broken: bool = False) -> None:
+        key = zygote.key
+        retire = broken or not zygote.alive or zygote.runs >= self.max_runs
+        evicted: list[_Zygote] = []
+        spawn = False
+        with self._lock:
+            left = self._busy.get(key, 1) - 1
+            if left > 0:
+                self._busy[key] = left
+            else:
+                self._busy.pop(key, None)
+            if retire or self._closed:
+                self._recycled += 1
+                # 回收后立即补一个，避免下一次运行落到冷启动
+                spawn = not self._closed and self._reserve_spawn_locked(key)
+            else:
+                self._idle.setdefault(key, []).append(zygote)
+                self._idle.move_to_end(key)
+                evicted = self._evict_locked()
+        if retire or self._closed:
+            zygote.close()
+        for item in evicted:
+            item.close()
+        if spawn:
+            self._start_spawn(key, zygote.spec)
+
+    def _reserve_spawn_locked(self, key: Hashable) -> bool:
+        if self._failures.get(key, 0) >= _MAX_SPAWN_FAILURES:
+            return False
+        total = (
+            len(self._idle.get(key, ()))
+            + self._busy.get(key, 0)
+            + self._starting.get(key, 0)
+        )
+        if total >= self.size:
+            return False
+        self._starting[key] = self._starting.get(key, 0) + 1
+        return True
+
+    def _expire_locked(self, now: float) -> list[_Zygote]:
+        expired: list[_Zygote] = []
+        for key in list(self._idle):
+            items = self._idle[key]
+            keep = [z for z in items if now - z.last_used <= self._max_idle]
+            expired.extend(z for z in items if now - z.last_used > self._max_idle)
+            if keep:
+                self._idle[key] = keep
+            else:
+                del self._idle[key]
+        self._recycled += len(expired)
+        return expired
+
+    def _evict_locked(self) -> list[_Zygote]:
+        evicted: list[_Zygote] = []
+        while sum(len(items) for items in self._idle.values()) > _MAX_IDLE_TOTAL:
+            key, items = next(iter(self._idle.items()))
+            evicted.append(items.pop(0))
+            if not items:
+                del self._idle[key]
+        self._recycled += len(evicted)
+        return evicted
+
+    # ── 启动 ──────────────────────────────────────────────
+
+    def _start_spawn(self, key: Hashable, spec: ZygoteSpec) -> None:
+        threading.Thread(
+            target=self._spawn, args=(key, spec), name="sandbox-zygote", daemon=True,
+        ).start()
+
+    def _spawn(self, key: Hashable, spec: ZygoteSpec) -> None:
+        zygote: _Zygote | None = None
+        try:
+            zygote = start_zygote(key, spec)
+        except Exception as exc:  # noqa: BLE001
+            logger.info("启动沙盒 zygote 失败 (tier=%s): %s", spec.tier, exc)
+        evicted: list[_Zygote] = []
+        with self._lock:
+            left = self._starting.pop(key, 1) - 1
+            if left > 0:
+                self._starting[key] = left
+            if zygote is None:
+                self._failures[key] = self._failures.get(key, 0) + 1
+            elif self._closed:
+                evicted.append(zygote)
+            else:
+                self._failures.pop(key, None)
+                self._spawned += 1
+                self._idle.setdefault(key, []).append(zygote)
+                self._idle.move_to_end(key)
+                evicted = self._evict_locked()
+        for item in evicted:
+            item.close()
+
+    def wait_ready(self, timeout: float = _READY_TIMEOUT) -> bool:
+        """等待后台启动全部结束，返回是否有就绪的空闲 zygote（测试与预热使用）。"""
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._lock:
+                if not self._starting:
+                    return bool(self._idle)
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.02)
+
+    # ── 关闭与统计 ────────────────────────────────────────
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._closed = True
+            items = [z for zs in self._idle.values() for z in zs]
+            self._idle.clear()
+        for zygote in items:
+            zygote.close()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "size": self.size,
+                "max_runs": self.max_runs,
+                "idle": sum(len(items) for items in self._idle.values()),
+                "busy": sum(self._busy.values()),
+                "starting": sum(self._starting.values()),
+                "hits": self._hits,
+                "misses": self._misses,
+                "spawned": self._spawned,
+                "recycled": self._recycled,
+            }
+
+
+def start_zygote(key: Hashable, spec: ZygoteSpec) -> _Zygote:
+    """同步启动一个 zygote 并等待其预导入完成。"""
+    proc = subprocess.Popen(
+        [*spec.command, str(_ZYGOTE_SCRIPT)],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        cwd=spec.cwd,
+        env=dict(spec.env),
+        close_fds=True,
+        start_new_session=True,
+    )
+    zygote = _Zygote(key, spec, proc)
+    try:
+        zygote.send({
+            "tier": spec.tier,
+            "blocked": list(spec.blocked),
+            "limits": [list(item) for item in spec.limits],
+            "preload": list(_PRELOAD_MODULES),
+            "wrapper": spec.wrapper_src,
+        })
+        reply = zygote.read(_READY_TIMEOUT)
+        if not reply or not reply.get("ready"):
+            raise ZygoteError(f"zygote 未就绪: {reply}")
+        zygote.preloaded = list(reply.get("preloaded") or [])
+    except BaseException:
+        zygote.close()
+        raise
+    return zygote
+
+
+# ── 进程级共享 ────────────────────────────────────────────
+
+_pool: SandboxInterpreterPool | None = None
+_pool_lock = threading.Lock()
+
+
+def _int_from_env(name: str, default: int) -> int:
+    raw = os.environ.get(name, "").strip()
+    try:
+        return int(raw) if raw else default
+    except ValueError:
+        return default
+
+
+def pool_supported() -> bool:
+    return sys.platform.startswith("linux") and hasattr(os, "fork")
+
+
+def get_sandbox_pool() -> SandboxInterpreterPool | None:
+    """返回（必要时创建）进程级解释器池；被禁用或平台不支持时返回 None。"""
+    global _pool
+    if not pool_supported():
+        return None
+    size = _int_from_env("EXCELMANUS_RUN_CODE_POOL_SIZE", _DEFAULT_SIZE)
+    max_runs = _int_from_env("EXCELMANUS_RUN_CODE_POOL_MAX_RUNS", _DEFAULT_MAX_RUNS)
+    with _pool_lock:
+        current = _pool
+        if current is not None and (current.size, current.max_runs) == (max(0, size), max(1, max_runs)):
+            return current if current.size > 0 else None
+        _pool = SandboxInterpreterPool(size=size, max_runs=max_runs)
+        created = _pool
+    if current is not None:
+        current.shutdown()
+    return created if created.size > 0 else None
+
+
+def reset_sandbox_pool() -> None:
+    """关闭并丢弃进程级解释器池（测试与进程退出时使用）。"""
+    global _pool
+    with _pool_lock:
+        current, _pool = _pool, None
+    if current is not None:
+        current.shutdown()
+
+
+atexit.register(reset_sandbox_pool)
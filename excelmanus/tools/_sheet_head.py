@@ -0,0 +1,341 @@
+"""轻量表头探测：直接读取 xlsx 压缩包内的 XML，获取各工作表尺寸与前 N 行。
+
+FileRegistry 扫描与 ``inspect_excel_files`` 只需要每个工作表的
+``max_row`` / ``max_column`` 和开头几行取值，却要 openpyxl 只读打开整个
+工作簿（构建样式表对象、一次性加载全部共享字符串等）。本模块：
+
+- 从 workbook.xml + rels 定位工作表 part，读取开头的 ``<dimension>``；
+  缺失或只有单个单元格时流式扫描整张表求实际范围（同 ``_sheet_probe``）；
+- 用 ``iterparse`` 流式解析工作表 XML，读到第 N 行之后立即停止，
+  只解压工作表 part 的开头部分；
+- 共享字符串按需流式读取，只解析到前 N 行引用的最大下标；
+- 样式只解析 cellXfs 的 numFmtId 以识别日期格式。
+
+取值口径与 openpyxl ``load_workbook(read_only=True, data_only=True)`` 的
+``iter_rows(values_only=True)`` 一致（公式取缓存值，日期格式转为 datetime）。
+结果按文件版本 ``(路径, mtime_ns, size)`` 缓存。非 zip 文件或结构异常时
+返回 None，由调用方回退到 openpyxl。
+"""
+
+from __future__ import annotations
+
+import zipfile
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+from xml.etree import ElementTree
+
+from excelmanus.tools._read_cache import file_signature
+from excelmanus.tools._sheet_probe import (
+    _DIMENSION_RE,
+    _DIMENSION_SCAN_BYTES,
+    _NS_MAIN,
+    _SHEET_DATA_RE,
+    _cached,
+    _sheet_parts,
+)
+from excelmanus.tools._xlsx_snapshot import (
+    _SST_PART,
+    _STYLES_PART,
+    _TAG_C,
+    _TAG_IS,
+    _TAG_ROW,
+    _TAG_SI,
+    _TAG_V,
+    _cast_number,
+    _text_content,
+)
+
+_TAG_NUM_FMT = f"{{{_NS_MAIN}}}numFmt"
+_TAG_CELL_XFS = f"{{{_NS_MAIN}}}cellXfs"
+_TAG_XF = f"{{{_NS_MAIN}}}xf"
+_TAG_WORKBOOK_PR = f"{{{_NS_MAIN}}}workbookPr"
+
+
+@dataclass
+class SheetHead:
+    """单个工作表的尺寸与开头若干行（values_only 口径）。"""
+
+    name: str
+    max_row: int
+    max_column: int
+    # rows[i] 对应第 i+1 行，宽度为 min(max_cols, max_column)；缺失的行/列补 None
+    rows: list[list[Any]] = field(default_factory=list)
+
+
+@dataclass
+class _RawCell:
+    """待解析的单元格：共享字符串 / 日期要等工作簿级数据就绪后再取值。"""
+
+    data_type: str
+    raw: Any
+    style_id: int
+
+
+def _sheet_extent(head: bytes) -> tuple[int, int] | None:
+    """从工作表 XML 开头解析 dimension 的 (max_row, max_column)；单格或缺失时返回 None。"""
+    from openpyxl.utils.cell import range_boundaries
+
+    data_at = _SHEET_DATA_RE.search(head)
+    match = _DIMENSION_RE.search(head[: data_at.start()] if data_at else head)
+    if match is None:
+        return None
+    ref = match.group(1).decode("ascii", "replace")
+    if ":" not in ref:
+        return None
+    try:
+        _min_col, _min_row, max_col, max_row = range_boundaries(ref)
+    except (TypeError, ValueError):
+        return None
+    if max_row is None or max_col is None:
+        return None
+    return max_row, max_col
+
+
+def _iter_cells(src: Any):
+    """流式产出 (row, column, element)；每个 ``<c>`` 在 end 事件时产出后清空。"""
+    from openpyxl.utils.cell import coordinate_to_tuple
+
+    row_counter = 0
+    col_counter = 0
+    for event, elem in ElementTree.iterparse(src, events=("start", "end")):
+        tag = elem.tag
+        if event == "start":
+            if tag == _TAG_ROW:
+                r = elem.get("r")
+                row_counter = int(r) if r else row_counter + 1
+                col_counter = 0
+                yield row_counter, 0, None
+            continue
+        if tag == _TAG_C:
+            coordinate = elem.get("r")
+            if coordinate:
+                row, column = coordinate_to_tuple(coordinate)
+                col_counter = column
+            else:
+                col_counter += 1
+                row, column = row_counter, col_counter
+            yield row, column, elem
+            elem.clear()
+        elif tag == _TAG_ROW:
+            elem.clear()
+
+
+def _scan_extent(zf: zipfile.ZipFile, part: str) -> tuple[int, int]:
+    """无可靠 dimension 时流式扫描整张表，返回 (最大行号, 最大列号)。"""
+    max_row = 0
+    max_col = 0
+    with zf.open(part) as src:
+        for row, column, elem in _iter_cells(src):
+            max_row = max(max_row, row)
+            if elem is not None:
+                max_col = max(max_col, column)
+    return max_row, max_col
+
+
+def _read_head_cells(
+    zf: zipfile.ZipFile, part: str, max_rows: int, max_cols: int,
+) -> tuple[dict[tuple[int, int], _RawCell], int]:
+    """读取前 max_rows 行内的单元格，返回 (单元格, 已见到的最大行号)。"""
+    cells: dict[tuple[int, int], _RawCell] = {}
+    last_row = 0
+    if max_rows <= 0:
+        return cells, last_row
+    with zf.open(part) as src:
+        for row, column, elem in _iter_cells(src):
+            if row > max_rows:
+                last_row = row
+                break  # 之后的内容不再解压
+            last_row = max(last_row, row)
+            if elem is None or column > max_cols:
+                continue
+            data_type = elem.get("t", "n")
+            if data_type == "inlineStr":
+                node = elem.find(_TAG_IS)
+                raw: Any = _text_content(node) if node is not None else None
+            else:
+                raw = elem.findtext(_TAG_V) or None
+            if raw is None:
+                continue
+            cells[(row, column)] = _RawCell(data_type, raw, int(elem.get("s") or 0))
+    return cells, last_row
+
+
+def _read_shared_strings(zf: zipfile.ZipFile, upto: int) -> list[str]:
+    """流式读取共享字符串表的前 upto+1 项。"""
+    strings: list[str] = []
+    if upto < 0 or _SST_PART not in zf.namelist():
+        return strings
+    with zf.open(_SST_PART) as src:
+        for _event, elem in ElementTree.iterparse(src):
+            if elem.tag == _TAG_SI:
+                strings.append(_text_content(elem))
+                elem.clear()
+                if len(strings) > upto:
+                    break
+    return strings
+
+
+def _date_style_ids(zf: zipfile.ZipFile) -> tuple[set[int], set[int]]:
+    """返回 (日期格式的 cellXfs 下标, 时长格式的 cellXfs 下标)，判定规则同 openpyxl。"""
+    from openpyxl.styles.numbers import (
+        BUILTIN_FORMATS_REVERSE,
+        builtin_format_code,
+        is_date_format,
+        is_timedelta_format,
+    )
+
+    dates: set[int] = set()
+    timedeltas: set[int] = set()
+    if _STYLES_PART not in zf.namelist():
+        return dates, timedeltas
+    root = ElementTree.fromstring(zf.read(_STYLES_PART))
+    custom: dict[int, str] = {}
+    for fmt in root.iter(_TAG_NUM_FMT):
+        try:
+            custom[int(fmt.get("numFmtId", ""))] = fmt.get("formatCode", "")
+        except ValueError:
+            continue
+    cell_xfs = root.find(_TAG_CELL_XFS)
+    if cell_xfs is None:
+        return dates, timedeltas
+    for idx, xf in enumerate(cell_xfs.findall(_TAG_XF)):
+        try:
+            fmt_id = int(xf.get("numFmtId", "0"))
+        except ValueError:
+            fmt_id = 0
+        if fmt_id in custom:
+            code = custom[fmt_id]
+            if code in BUILTIN_FORMATS_REVERSE:
+                code = builtin_format_code(BUILTIN_FORMATS_REVERSE[code])
+        else:
+            code = builtin_format_code(fmt_id)
+        if code and is_date_format(code):
+            dates.add(idx)
+        if code and is_timedelta_format(code):
+            timedeltas.add(idx)
+    return dates, timedeltas
+
+
+def _epoch(zf: zipfile.ZipFile) -> Any:
+    from openpyxl.utils.datetime import CALENDAR_MAC_1904, CALENDAR_WINDOWS_1900
+
+    wb_pr = ElementTree.fromstring(zf.read("xl/workbook.xml")).find(_TAG_WORKBOOK_PR)
+    if wb_pr is not None and wb_pr.get("date1904") in ("1", "true"):
+        return CALENDAR_MAC_1904
+    return CALENDAR_WINDOWS_1900
+
+
+class _ValueResolver:
+    """把 _RawCell 转为 openpyxl data_only 口径的取值（工作簿级数据懒加载）。"""
+
+    def __init__(self, zf: zipfile.ZipFile, max_sst_index: int) -> None:
+        self._zf = zf
+        self._max_sst_index = max_sst_index
+        self._strings: list[str] | None = None
+        self._styles: tuple[set[int], set[int]] | None = None
+        self._epoch: Any = None
+
+    def value(self, cell: _RawCell) -> Any:
+        data_type, raw = cell.data_type, cell.raw
+        if data_type == "inlineStr":
+            return raw
+        if data_type == "n":
+            number = _cast_number(raw)
+            if self._styles is None:
+                self._styles = _date_style_ids(self._zf)
+            dates, timedeltas = self._styles
+            if cell.style_id in dates:
+                from openpyxl.utils.datetime import from_excel
+
+                if self._epoch is None:
+                    self._epoch = _epoch(self._zf)
+                try:
+                    return from_excel(number, self._epoch, timedelta=cell.style_id in timedeltas)
+                except (OverflowError, ValueError):
+                    return "#VALUE!"
+            return number
+        if data_type == "s":
+            if self._strings is None:
+                self._strings = _read_shared_strings(self._zf, self._max_sst_index)
+            return self._strings[int(raw)]
+        if data_type == "b":
+            return bool(int(raw))
+        if data_type == "d":
+            from openpyxl.utils.datetime import from_ISO8601
+
+            return from_ISO8601(raw)
+        return raw
+
+
+def _probe_heads(path: str | Path, max_rows: int, max_cols: int) -> list[SheetHead] | None:
+    if not zipfile.is_zipfile(path):
+        return None
+    with zipfile.ZipFile(path) as zf:
+        try:
+            sheets, _active = _sheet_parts(zf)
+        except (KeyError, ElementTree.ParseError):
+            return None
+        names = set(zf.namelist())
+
+        parsed: list[tuple[str, int, int, dict[tuple[int, int], _RawCell], int]] = []
+        max_sst_index = -1
+        for name, part in sheets:
+            if part.startswith("xl/chartsheets/"):
+                continue  # 图表工作表没有单元格
+            if not part.startswith("xl/worksheets/") or part not in names:
+                return None
+            with zf.open(part) as src:
+                head = src.read(_DIMENSION_SCAN_BYTES)
+            extent = _sheet_extent(head) or _scan_extent(zf, part)
+            total_rows, total_cols = extent
+            width = min(max_cols, total_cols)
+            cells, last_row = _read_head_cells(zf, part, min(max_rows, total_rows), width)
+            for cell in cells.values():
+                if cell.data_type == "s":
+                    max_sst_index = max(max_sst_index, int(cell.raw))
+            parsed.append((name, total_rows, total_cols, cells, last_row))
+
+        resolver = _ValueResolver(zf, max_sst_index)
+        heads: list[SheetHead] = []
+        for name, total_rows, total_cols, cells, last_row in parsed:
+            width = min(max_cols, total_cols)
+            # 与 openpyxl iter_rows(max_row=N) 一致：输出到 min(N, 最后一行)，中间缺行补空
+            row_count = min(max_rows, total_rows, last_row)
+            rows = [[None] * width for _ in range(row_count)]
+            for (row, column), cell in cells.items():
+                if row <= row_count:
+                    rows[row - 1][column - 1] = resolver.value(cell)
+            heads.append(SheetHead(name=name, max_row=total_rows, max_column=total_cols, rows=rows))
+        return heads
+
+
+def read_sheet_heads(
+    path: str | Path, *, max_rows: int = 5, max_cols: int = 30,
+) -> list[SheetHead] | None:
+    """读取 xlsx/xlsm 每个工作表的尺寸与前 max_rows 行（每行最多 max_cols 列）。
+
+    顺序与 workbook.xml 一致（跳过图表工作表）；无法解析时返回 None。
+    """
+    sig = file_signature(path)
+    if sig is None:
+        return None
+    try:
+        return _cached(
+            (*sig, "heads", max_rows, max_cols),
+            lambda: _probe_heads(path, max_rows, max_cols),
+        )
+    except (OSError, zipfile.BadZipFile, ValueError, IndexError, ElementTree.ParseError):
+        return None
+
+
+def read_sheet_names(path: str | Path) -> list[str] | None:
+    """只读取 workbook.xml 中的工作表名称（不解压任何工作表）。"""
+    try:
+        if not zipfile.is_zipfile(path):
+            return None
+        with zipfile.ZipFile(path) as zf:
+            sheets, _active = _sheet_parts(zf)
+    except (OSError, KeyError, zipfile.BadZipFile, ElementTree.ParseError):
+        return None
+    return [name for name, _part in sheets]
@@ -0,0 +1,205 @@
+"""轻量工作表行数探测：不经过 openpyxl，直接读取 xlsx 压缩包内的 XML。
+
+``_get_sheet_total_rows`` 只需要一个行数，却要 openpyxl 打开整个工作簿
+（解析 workbook.xml、样式表、共享字符串等）。本模块：
+
+- xlsx/xlsm：从 workbook.xml + rels 定位工作表 part，读取开头的
+  ``<dimension ref="A1:D100"/>``；缺失或只有单个单元格时，流式扫描
+  ``<row r="N">`` 标签取最大行号（与 openpyxl 的 ``max_row`` 口径一致）；
+- CSV/TSV：按块统计换行字节，不做解码。
+
+结果按文件版本 ``(路径, mtime_ns, size)`` 缓存，文件改写后自然失效。
+无法识别的文件返回 None，由调用方回退到 openpyxl。
+"""
+
+from __future__ import annotations
+
+import posixpath
+import re
+import threading
+import zipfile
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+from xml.etree import ElementTree
+
+from excelmanus.tools._read_cache import file_signature
+
+_CHUNK_BYTES = 1 << 20
+# dimension 位于 sheetData 之前，只需读取开头这一段
+_DIMENSION_SCAN_BYTES = 64 * 1024
+_CACHE_MAX_ENTRIES = 1024
+
+_NS_MAIN = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+_NS_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+_NS_PKG_REL = "http://schemas.openxmlformats.org/package/2006/relationships"
+
+_DIMENSION_RE = re.compile(rb'<(?:\w+:)?dimension\s[^>]*?ref="([^"]+)"')
+_SHEET_DATA_RE = re.compile(rb"<(?:\w+:)?sheetData[\s>/]")
+_ROW_TAG_RE = re.compile(rb"<(?:\w+:)?row(?=[\s>/])([^>]*)>")
+_ROW_NUM_RE = re.compile(rb'\sr="(\d+)"')
+_CELL_ROW_RE = re.compile(r"[A-Za-z]*(\d+)$")
+
+_cache: OrderedDict[tuple, Any] = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _cached(key: tuple, compute: Any) -> Any:
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+    value = compute()
+    if value is None:
+        return None
+    with _cache_lock:
+        _cache[key] = value
+        while len(_cache) > _CACHE_MAX_ENTRIES:
+            _cache.popitem(last=False)
+    return value
+
+
+def clear_probe_cache() -> None:
+    with _cache_lock:
+        _cache.clear()
+
+
+# ── CSV ──────────────────────────────────────────────────
+
+
+def _count_lines(path: str | Path) -> int:
+    newlines = 0
+    carriage = 0
+    last = b""
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(_CHUNK_BYTES)
+            if not chunk:
+                break
+            newlines += chunk.count(b"\n")
+            if not newlines:
+                carriage += chunk.count(b"\r")
+            last = chunk[-1:]
+    if not newlines and carriage:
+        # 仅使用 \r 换行的旧式文件
+        return carriage + (0 if last == b"\r" else 1)
+    if last and last != b"\n":
+        return newlines + 1
+    return newlines
+
+
+def count_csv_rows(path: str | Path) -> int | None:
+    """CSV/TSV 数据行数（总行数减去表头行）。"""
+    sig = file_signature(path)
+    if sig is None:
+        return None
+    return _cached((*sig, "csv"), lambda: max(_count_lines(path) - 1, 0))
+
+
+# ── xlsx ─────────────────────────────────────────────────
+
+
+def _sheet_parts(zf: zipfile.ZipFile) -> tuple[list[tuple[str, str]], int]:
+    """返回 ([(sheet 名, part 路径)], activeTab)，顺序与 workbook.xml 一致。"""
+    workbook = ElementTree.fromstring(zf.read("xl/workbook.xml"))
+    rels_root = ElementTree.fromstring(zf.read("xl/_rels/workbook.xml.rels"))
+    targets: dict[str, str] = {}
+    for rel in rels_root.iter(f"{{{_NS_PKG_REL}}}Relationship"):
+        target = rel.get("Target", "")
+        if target.startswith("/"):
+            part = target.lstrip("/")
+        else:
+            part = posixpath.normpath(posixpath.join("xl", target))
+        targets[rel.get("Id", "")] = part
+
+    sheets: list[tuple[str, str]] = []
+    for sheet in workbook.iter(f"{{{_NS_MAIN}}}sheet"):
+        rid = sheet.get(f"{{{_NS_REL}}}id", "")
+        sheets.append((sheet.get("name", ""), targets.get(rid, "")))
+
+    active = 0
+    view = workbook.find(f"{{{_NS_MAIN}}}bookViews/{{{_NS_MAIN}}}workbookView")
+    if view is not None:
+        try:
+            active = int(view.get("activeTab", "0"))
+        except ValueError:
+            active = 0
+    return sheets, active
+
+
+def _dimension_max_row(head: bytes) -> int | None:
+    """从工作表 XML 开头解析 dimension 的最大行号；单格或缺失时返回 None。"""
+    match = _DIMENSION_RE.search(head)
+    if match is None:
+        return None
+    ref = match.group(1).decode("ascii", "replace")
+    if ":" not in ref:
+        return None
+    row = _CELL_ROW_RE.search(ref.split(":", 1)[1])
+    return int(row.group(1)) if row else None
+
+
+def _scan_max_row(zf: zipfile.ZipFile, part: str) -> int:
+    """流式扫描 ``<row>`` 标签，返回最大行号（无 r 属性的行按顺序递增）。"""
+    max_row = 0
+    current = 0
+    tail = b""
+    with zf.open(part) as src:
+        while True:
+            chunk = src.read(_CHUNK_BYTES)
+            if not chunk:
+                break
+            buf = tail + chunk
+            consumed = 0
+            for match in _ROW_TAG_RE.finditer(buf):
+                num = _ROW_NUM_RE.search(match.group(1))
+                current = int(num.group(1)) if num else current + 1
+                max_row = max(max_row, current)
+                consumed = match.end()
+            # 保留末尾可能被截断的标签
+            rest = buf[consumed:]
+            cut = rest.rfind(b"<")
+            tail = rest[cut:] if cut >= 0 else b""
+    return max_row
+
+
+def _probe_xlsx_rows(path: str | Path, sheet_name: str | None) -> int | None:
+    if not zipfile.is_zipfile(path):
+        return None
+    with zipfile.ZipFile(path) as zf:
+        try:
+            sheets, active = _sheet_parts(zf)
+        except (KeyError, ElementTree.ParseError):
+            return None
+        names = [name for name, _ in sheets]
+        if sheet_name and sheet_name in names:
+            part = sheets[names.index(sheet_name)][1]
+        elif 0 <= active < len(sheets):
+            part = sheets[active][1]
+        else:
+            return None
+        if not part.startswith("xl/worksheets/") or part not in zf.namelist():
+            # chartsheet 等非数据表交给 openpyxl 处理
+            return None
+
+        with zf.open(part) as src:
+            head = src.read(_DIMENSION_SCAN_BYTES)
+        data_at = _SHEET_DATA_RE.search(head)
+        max_row = _dimension_max_row(head[: data_at.start()] if data_at else head)
+        if max_row is not None:
+            return max_row
+        return _scan_max_row(zf, part)
+
+
+def count_sheet_rows(path: str | Path, sheet_name: str | None) -> int | None:
+    """xlsx/xlsm 工作表的最大行号（含表头），与 openpyxl ``ws.max_row`` 口径一致。
+
+    sheet_name 为空或不存在时取活动工作表；无法探测时返回 None。
+    """
+    sig = file_signature(path)
+    if sig is None:
+        return None
+    try:
+        return _cached((*sig, "xlsx", sheet_name), lambda: _probe_xlsx_rows(path, sheet_name))
+    except (OSError, zipfile.BadZipFile, ValueError):
+        return None
@@ -0,0 +1,415 @@
+"""上传工作簿的列式旁路文件（Arrow IPC，读取时内存映射）。
+
+xlsx 每次读取都要完整解析 XML，大文件需要数秒。上传时在后台把每个
+sheet 转成两份 Arrow IPC 文件，之后的工具调用直接内存映射读取：
+
+- ``frame_<i>.arrow``：``_read_df`` 自动检测表头后的 DataFrame，
+  供 read_excel / filter_data / group_aggregate 等复用；
+- ``cells_<i>.arrow``：按行保存的单元格字符串网格，
+  供 search_excel_values 逐格匹配。
+
+旁路文件按源文件内容 SHA-256 存放在 ``~/.excelmanus/sidecar/<hash>/``，
+源文件内容一变哈希即变，旧旁路文件自然失效，随后按字节预算 LRU 淘汰。
+
+依赖可选的 ``pyarrow``；未安装时所有入口静默退化为原有解析路径。
+环境变量：``EXCELMANUS_SIDECAR_ENABLED``（默认开启）、
+``EXCELMANUS_SIDECAR_DIR``、``EXCELMANUS_SIDECAR_MAX_MB``（默认 1024）。
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+
+from excelmanus.logger import get_logger
+from excelmanus.reference_graph.cache import file_content_hash
+from excelmanus.tools._read_cache import private_read_cache
+
+logger = get_logger("tools.sidecar")
+
+_DEFAULT_DIR = Path.home() / ".excelmanus" / "sidecar"
+_DEFAULT_MAX_MB = 1024
+_FORMAT_VERSION = 1
+_MANIFEST = "manifest.json"
+_SIDECAR_EXTENSIONS = frozenset({".xlsx", ".xlsm"})
+
+
+def _import_pyarrow() -> Any | None:
+    try:
+        import pyarrow as pa
+        import pyarrow.ipc  # noqa: F401
+    except ImportError:
+        return None
+    return pa
+
+
+# ── 读写单个 Arrow 文件 ─────────────────────────────────
+
+
+def _write_table(pa: Any, table: Any, path: Path) -> None:
+    with pa.OSFile(str(path), "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+
+def _read_table(pa: Any, path: Path) -> Any:
+    with pa.memory_map(str(path), "r") as source:
+        return pa.ipc.open_file(source).read_all()
+
+
+def _frame_to_table(pa: Any, df: pd.DataFrame) -> tuple[Any, list[Any]] | None:
+    """DataFrame → Arrow 表；列名只支持 str/int（保存在 manifest 中）。"""
+    names = list(df.columns)
+    if not all(isinstance(n, (str, int)) and not isinstance(n, bool) for n in names):
+        return None
+    renamed = df.copy(deep=False)
+    renamed.columns = [f"c{i}" for i in range(len(names))]
+    try:
+        table = pa.Table.from_pandas(renamed, preserve_index=False)
+    except (pa.ArrowException, TypeError, ValueError):
+        return None
+    return table, names
+
+
+def _table_to_frame(table: Any, names: list[Any]) -> pd.DataFrame:
+    df = table.to_pandas()
+    df.columns = names
+    return df
+
+
+def _cells_to_table(pa: Any, rows: list[tuple[Any, ...]]) -> Any:
+    """单元格网格 → 全字符串列的 Arrow 表（None 保存为 null）。"""
+    width = max((len(r) for r in rows), default=0)
+    columns: dict[str, list[str | None]] = {f"c{j}": [] for j in range(width)}
+    for row in rows:
+        for j in range(width):
+            value = row[j] if j < len(row) else None
+            columns[f"c{j}"].append(None if value is None else str(value))
+    if not width:
+        return pa.table({"_empty": pa.array([None] * len(rows), type=pa.string())})
+    return pa.table({k: pa.array(v, type=pa.string()) for k, v in columns.items()})
+
+
+# ── 旁路文件存储 ─────────────────────────────────────────
+
+
+def _touch(entry_dir: Path) -> None:
+    """命中时刷新目录 mtime，使容量淘汰按最近使用（LRU）而非构建时间。"""
+    try:
+        os.utime(entry_dir)
+    except OSError:
+        pass
+
+
+class ColumnarSidecar:
+    """按源文件内容哈希组织的 Arrow 旁路文件目录。"""
+
+    def __init__(
+        self,
+        root_dir: str | Path | None = None,
+        *,
+        max_bytes: int = _DEFAULT_MAX_MB * 1024 * 1024,
+    ) -> None:
+        self._root = Path(root_dir) if root_dir is not None else _DEFAULT_DIR
+        self._max_bytes = max(0, int(max_bytes))
+        self._lock = threading.Lock()
+        self._manifests: dict[str, dict[str, Any]] = {}
+        self._executor: ThreadPoolExecutor | None = None
+        self._pending: dict[str, Future] = {}
+
+    @property
+    def root_dir(self) -> Path:
+        return self._root
+
+    # ------------------------------------------------------------------
+    # 构建
+
+    def build(self, file_path: str | Path) -> bool:
+        """同步为 xlsx 构建旁路文件；已存在或无法构建时返回 False。"""
+        pa = _import_pyarrow()
+        if pa is None or Path(file_path).suffix.lower() not in _SIDECAR_EXTENSIONS:
+            return False
+        try:
+            content_hash = file_content_hash(str(file_path))
+        except OSError:
+            return False
+        target = self._root / content_hash
+        if (target / _MANIFEST).exists():
+            return False
+        # 上次构建中断留下的残缺目录
+        shutil.rmtree(target, ignore_errors=True)
+
+        from openpyxl import load_workbook
+
+        self._root.mkdir(parents=True, exist_ok=True)
+        staging = Path(tempfile.mkdtemp(dir=self._root, prefix=".build-"))
+        try:
+            wb = load_workbook(file_path, read_only=True, data_only=True)
+            try:
+                sheet_names = list(wb.sheetnames)
+                active_index = wb.index(wb.active) if wb.active is not None else 0
+                sheets: list[dict[str, Any]] = []
+                for i, ws in enumerate(wb.worksheets):
+                    rows = list(ws.iter_rows(min_row=1, values_only=True))
+                    _write_table(pa, _cells_to_table(pa, rows), staging / f"cells_{i}.arrow")
+                    sheets.append({
+                        "name": ws.title,
+                        "cells": f"cells_{i}.arrow",
+                        "first_row_width": len(rows[0]) if rows else 0,
+                        "frame": None,
+                    })
+            finally:
+                wb.close()
+
+            # 独立解析缓存：不与工具线程共享 workbook 对象，也不占用进程级缓存
+            with private_read_cache():
+                for i, meta in enumerate(sheets):
+                    meta["frame"] = self._build_frame(pa, file_path, meta["name"], staging, i)
+
+            manifest = {
+                "version": _FORMAT_VERSION,
+                "sheet_names": sheet_names,
+                "active_index": active_index,
+                "sheets": sheets,
+            }
+            (staging / _MANIFEST).write_text(
+                json.dumps(manifest, ensure_ascii=False, default=str), encoding="utf-8",
+            )
+            try:
+                os.replace(staging, target)
+            except OSError:
+                # 并发构建已抢先完成
+                return False
+        except Exception:
+            logger.debug("列式旁路文件构建失败: %s", file_path, exc_info=True)
+            return False
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+        logger.info("列式旁路文件已生成: %s (%d sheets)", file_path, len(sheet_names))
+        self._evict(keep=content_hash)
+        return True
+
+    @staticmethod
+    def _build_frame(
+        pa: Any, file_path: str | Path, sheet: str, staging: Path, index: int,
+    ) -> dict[str, Any] | None:
+        """保存自动表头检测后的 DataFrame；往返结果不完全一致时放弃。"""
+        from excelmanus.tools.data_tools import _read_df
+
+        try:
+            df, header = _read_df(file_path, sheet)
+        except Exception:
+            return None
+        converted = _frame_to_table(pa, df)
+        if converted is None:
+            return None
+        table, names = converted
+        path = staging / f"frame_{index}.arrow"
+        _write_table(pa, table, path)
+        restored = _table_to_frame(_read_table(pa, path), names)
+        if not (restored.equals(df) and list(restored.dtypes) == list(df.dtypes)):
+            path.unlink(missing_ok=True)
+            return None
+        return {
+            "file": path.name,
+            "columns": names,
+            "header_row": header,
+            "attrs": df.attrs.get("formula_resolution"),
+        }
+
+    def schedule(self, file_path: str | Path) -> Future | None:
+        """在后台线程构建旁路文件（同一文件并发提交只执行一次）。"""
+        if _import_pyarrow() is None or Path(file_path).suffix.lower() not in _SIDECAR_EXTENSIONS:
+            return None
+        key = os.path.abspath(str(file_path))
+        with self._lock:
+            pending = self._pending.get(key)
+            if pending is not None and not pending.done():
+                return pending
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix="excelmanus-sidecar",
+                )
+            future = self._executor.submit(self.build, key)
+            self._pending[key] = future
+        return future
+
+    # ------------------------------------------------------------------
+    # 读取
+
+    def _manifest(self, file_path: str | Path) -> tuple[dict[str, Any], Path] | None:
+        if Path(file_path).suffix.lower() not in _SIDECAR_EXTENSIONS:
+            return None
+        try:
+            content_hash = file_content_hash(str(file_path))
+        except OSError:
+            return None
+        entry_dir = self._root / content_hash
+        with self._lock:
+            manifest = self._manifests.get(content_hash)
+        if manifest is None:
+            try:
+                manifest = json.loads((entry_dir / _MANIFEST).read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                return None
+            if manifest.get("version") != _FORMAT_VERSION:
+                return None
+            with self._lock:
+                self._manifests[content_hash] = manifest
+        return manifest, entry_dir
+
+    @staticmethod
+    def _sheet_meta(manifest: dict[str, Any], sheet_name: str | None) -> dict[str, Any] | None:
+        sheets = manifest["sheets"]
+        if sheet_name is None:
+            # pd.read_excel 读第一个 sheet、表头检测读活动 sheet，两者一致时才可替代
+            if (
+                not sheets
+                or manifest.get("active_index", 0) != 0
+                or sheets[0]["name"] != manifest["sheet_names"][0]
+            ):
+                return None
+            return sheets[0]
+        for meta in sheets:
+            if meta["name"] == sheet_name:
+                return meta
+        return None
+
+    def load_frame(
+        self, file_path: str | Path, sheet_name: str | None,
+    ) -> tuple[pd.DataFrame, int] | None:
+        """读取 ``_read_df(file_path, sheet_name)`` 的旁路结果，未命中返回 None。"""
+        pa = _import_pyarrow()
+        if pa is None:
+            return None
+        found = self._manifest(file_path)
+        if found is None:
+            return None
+        manifest, entry_dir = found
+        meta = self._sheet_meta(manifest, sheet_name)
+        if meta is None or not meta.get("frame"):
+            return None
+        frame = meta["frame"]
+        try:
+            df = _table_to_frame(_read_table(pa, entry_dir / frame["file"]), frame["columns"])
+        except (OSError, pa.ArrowException):
+            return None
+        if frame.get("attrs") is not None:
+            df.attrs["formula_resolution"] = frame["attrs"]
+        _touch(entry_dir)
+        return df, frame["header_row"]
+
+    def sheet_names(self, file_path: str | Path) -> list[str] | None:
+        """返回有旁路文件的工作表名（与 ``wb.worksheets`` 顺序一致，不含图表页）。"""
+        found = self._manifest(file_path)
+        return [m["name"] for m in found[0]["sheets"]] if found is not None else None
+
+    def cell_rows(
+        self, file_path: str | Path, sheet_name: str,
+    ) -> list[tuple[str | None, ...]] | None:
+        """按行返回单元格字符串（None 表示空单元格），与 values_only 遍历逐行对齐。"""
+        pa = _import_pyarrow()
+        found = self._manifest(file_path) if pa is not None else None
+        if found is None:
+            return None
+        manifest, entry_dir = found
+        meta = self._sheet_meta(manifest, sheet_name)
+        if meta is None:
+            return None
+        try:
+            table = _read_table(pa, entry_dir / meta["cells"])
+        except (OSError, pa.ArrowException):
+            return None
+        _touch(entry_dir)
+        if table.column_names == ["_empty"]:
+            return [() for _ in range(table.num_rows)]
+        return list(zip(*(col.to_pylist() for col in table.columns)))
+
+    def first_row_width(self, file_path: str | Path, sheet_name: str) -> int:
+        found = self._manifest(file_path)
+        meta = self._sheet_meta(found[0], sheet_name) if found is not None else None
+        return int(meta.get("first_row_width", 0)) if meta else 0
+
+    # ------------------------------------------------------------------
+    # 容量管理
+
+    def _evict(self, *, keep: str) -> None:
+        entries: list[tuple[float, int, Path]] = []
+        total = 0
+        try:
+            children = [p for p in self._root.iterdir() if p.is_dir() and not p.name.startswith(".")]
+        except OSError:
+            return
+        for entry in children:
+            size = 0
+            try:
+                files = list(entry.iterdir())
+                mtime = entry.stat().st_mtime
+            except OSError:
+                # 并发淘汰 / 清理已删除该目录
+                continue
+            for f in files:
+                try:
+                    if f.is_file():
+                        size += f.stat().st_size
+                except OSError:
+                    continue
+            entries.append((mtime, size, entry))
+            total += size
+        if total <= self._max_bytes:
+            return
+        entries.sort(key=lambda t: t[0])
+        for _mtime, size, entry in entries:
+            if total <= self._max_bytes:
+                break
+            if entry.name == keep:
+                continue
+            shutil.rmtree(entry, ignore_errors=True)
+            with self._lock:
+                self._manifests.pop(entry.name, None)
+            total -= size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._manifests.clear()
+        shutil.rmtree(self._root, ignore_errors=True)
+
+
+_sidecar: ColumnarSidecar | None = None
+_sidecar_lock = threading.Lock()
+
+
+def get_sidecar() -> ColumnarSidecar | None:
+    """返回进程级旁路文件存储；未安装 pyarrow 或被禁用时返回 None。"""
+    global _sidecar
+    if _sidecar is not None:
+        return _sidecar
+    enabled = os.environ.get("EXCELMANUS_SIDECAR_ENABLED", "").strip().lower()
+    if enabled in ("0", "false", "no", "off") or _import_pyarrow() is None:
+        return None
+    raw_mb = os.environ.get("EXCELMANUS_SIDECAR_MAX_MB", "").strip()
+    try:
+        max_mb = float(raw_mb) if raw_mb else _DEFAULT_MAX_MB
+    except ValueError:
+        max_mb = _DEFAULT_MAX_MB
+    if max_mb <= 0:
+        return None
+    root = os.environ.get("EXCELMANUS_SIDECAR_DIR", "").strip() or None
+    with _sidecar_lock:
+        if _sidecar is None:
+            _sidecar = ColumnarSidecar(root, max_bytes=int(max_mb * 1024 * 1024))
+    return _sidecar
+
+
+def set_sidecar(sidecar: ColumnarSidecar | None) -> None:
+    """替换进程级旁路文件存储（测试或自定义目录时使用）。"""
+    global _sidecar
+    _sidecar = sidecar
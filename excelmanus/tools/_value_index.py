@@ -0,0 +1,637 @@
+"""工作区单元格值倒排索引 — 让 search_excel_values 不必每次重扫 xlsx。
+
+FileRegistry 注册 / 重新扫描 Excel 文件时，后台读取一次全部单元格，
+建立：
+
+- 去重后的单元格字符串表（``str(cell)``，与扫描搜索的匹配口径一致）；
+- 小写二元组（bigram）→ 字符串 ID 的倒排表，用于子串候选过滤；
+- 字符串 ID → 单元格位置的 postings，以及按行保存的 ID 网格（用于上下文）。
+
+查询时先用 bigram 交集求候选，再用与扫描路径完全相同的匹配函数逐一
+校验，因此 contains / exact / startswith / fuzzy 的结果与全表扫描一致；
+regex 无法求必含子串，仍回退扫描。
+
+索引按文件 ``(mtime_ns, size)`` 校验新鲜度，过期即视为未命中并后台重建。
+建好的索引按工作区持久化到 ``~/.excelmanus/value_index/``（JSON，只存
+字符串表与 ID 网格，倒排表加载时重建），进程重启后按需从磁盘加载；
+内存中常驻的索引按估算字节数做全局 LRU 淘汰。
+
+环境变量：
+
+- ``EXCELMANUS_VALUE_INDEX_ENABLED=0`` 关闭；
+- ``EXCELMANUS_VALUE_INDEX_MAX_MB`` 内存常驻上限（默认 256）；
+- ``EXCELMANUS_VALUE_INDEX_DISK_MAX_MB`` 磁盘占用上限（默认 512，0 表示不持久化）；
+- ``EXCELMANUS_VALUE_INDEX_DIR`` 持久化目录。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable
+
+from excelmanus.logger import get_logger
+
+logger = get_logger("tools.value_index")
+
+_INDEXED_EXTENSIONS = frozenset({".xlsx", ".xlsm"})
+_DEFAULT_MAX_MB = 256
+_DEFAULT_DISK_MAX_MB = 512
+_DEFAULT_CACHE_DIR = Path.home() / ".excelmanus" / "value_index"
+_FORMAT_VERSION = 1
+_SUFFIX = ".json"
+# 超过该长度的字符串不拆 bigram，查询时总是参与校验
+_MAX_GRAM_TEXT_LEN = 256
+_NO_VALUE = -1
+
+
+def _bigrams(text: str) -> set[str]:
+    return {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+@dataclass
+class _SheetIndex:
+    name: str
+    first_row_width: int
+    # 每行一个 tuple，元素为字符串 ID（空单元格为 -1），与 values_only 遍历逐行对齐
+    rows: list[tuple[int, ...]]
+
+
+@dataclass
+class FileValueIndex:
+    """单个工作簿的单元格值索引。"""
+
+    path: str
+    signature: tuple[int, int]
+    sheets: list[_SheetIndex] = field(default_factory=list)
+    values: list[str] = field(default_factory=list)
+    # 字符串 ID → [(sheet_idx, row_idx0, col_idx)]
+    postings: list[list[tuple[int, int, int]]] = field(default_factory=list)
+    grams: dict[str, set[int]] = field(default_factory=dict)
+    long_values: list[int] = field(default_factory=list)
+
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def build(cls, path: str, rows_by_sheet: list[tuple[str, list[tuple[Any, ...]]]]) -> "FileValueIndex":
+        st = os.stat(path)
+        index = cls(path=path, signature=(st.st_mtime_ns, st.st_size))
+        ids: dict[str, int] = {}
+        for name, rows in rows_by_sheet:
+            encoded: list[tuple[int, ...]] = []
+            for row in rows:
+                row_ids: list[int] = []
+                for value in row:
+                    if value is None:
+                        row_ids.append(_NO_VALUE)
+                        continue
+                    text = str(value)
+                    vid = ids.get(text)
+                    if vid is None:
+                        vid = ids[text] = len(index.values)
+                        index.values.append(text)
+                    row_ids.append(vid)
+                encoded.append(tuple(row_ids))
+            index.sheets.append(_SheetIndex(
+                name=name,
+                first_row_width=len(rows[0]) if rows else 0,
+                rows=encoded,
+            ))
+        index._build_lookup()
+        return index
+
+    def _build_lookup(self) -> None:
+        """由字符串表与 ID 网格生成 postings 与 bigram 倒排表。"""
+        self.postings = [[] for _ in self.values]
+        self.grams = {}
+        self.long_values = []
+        for vid, text in enumerate(self.values):
+            self._index_text(vid, text)
+        for sheet_idx, sheet in enumerate(self.sheets):
+            for row_idx, row in enumerate(sheet.rows):
+                for col_idx, vid in enumerate(row):
+                    if vid != _NO_VALUE:
+                        self.postings[vid].append((sheet_idx, row_idx, col_idx))
+
+    def to_dict(self) -> dict[str, Any]:
+        """持久化格式：只保存字符串表与 ID 网格。"""
+        return {
+            "version": _FORMAT_VERSION,
+            "path": self.path,
+            "signature": list(self.signature),
+            "values": self.values,
+            "sheets": [
+                {
+                    "name": sheet.name,
+                    "first_row_width": sheet.first_row_width,
+                    "rows": [list(row) for row in sheet.rows],
+                }
+                for sheet in self.sheets
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "FileValueIndex":
+        if data.get("version") != _FORMAT_VERSION:
+            raise ValueError("value index format mismatch")
+        mtime_ns, size = data["signature"]
+        index = cls(
+            path=str(data["path"]),
+            signature=(int(mtime_ns), int(size)),
+            sheets=[
+                _SheetIndex(
+                    name=str(sheet["name"]),
+                    first_row_width=int(sheet["first_row_width"]),
+                    rows=[tuple(row) for row in sheet["rows"]],
+                )
+                for sheet in data["sheets"]
+            ],
+            values=[str(v) for v in data["values"]],
+        )
+        index._build_lookup()
+        return index
+
+    def estimated_bytes(self) -> int:
+        """粗略估算常驻内存（字符串表 + ID 网格 + postings + 倒排表）。"""
+        cells = sum(len(p) for p in self.postings)
+        rows = sum(len(sheet.rows) for sheet in self.sheets)
+        gram_refs = sum(len(ids) for ids in self.grams.values())
+        return (
+            sum(len(v) + 56 for v in self.values)
+            + cells * 80
+            + rows * 64
+            + gram_refs * 40
+            + len(self.grams) * 280
+        )
+
+    def _index_text(self, vid: int, text: str) -> None:
+        lowered = text.lower()
+        if len(lowered) > _MAX_GRAM_TEXT_LEN:
+            self.long_values.append(vid)
+            return
+        for gram in _bigrams(lowered):
+            self.grams.setdefault(gram, set()).add(vid)
+
+    # ------------------------------------------------------------------
+
+    def _candidates_for(self, needle: str) -> set[int]:
+        """可能包含 needle（忽略大小写）的字符串 ID 超集。"""
+        needle = needle.lower()
+        if len(needle) < 2:
+            return set(range(len(self.values)))
+        result: set[int] | None = None
+        for gram in _bigrams(needle):
+            ids = self.grams.get(gram)
+            if not ids:
+                result = set()
+                break
+            result = set(ids) if result is None else result & ids
+            if not result:
+                break
+        result = result or set()
+        result.update(self.long_values)
+        return result
+
+    def matching_values(
+        self, match: Callable[[str], bool], required: list[list[str]],
+    ) -> list[int]:
+        """返回满足 match 的字符串 ID。
+
+        required 为"每组至少包含一个子串"的必要条件（组内 OR、组间 AND），
+        用于倒排过滤；最终结果以 match 校验为准。
+        """
+        candidates: set[int] | None = None
+        for group in required:
+            group_ids: set[int] = set()
+            for needle in group:
+                group_ids |= self._candidates_for(needle)
+            candidates = group_ids if candidates is None else candidates & group_ids
+            if not candidates:
+                return []
+        if candidates is None:
+            candidates = set(range(len(self.values)))
+        return [vid for vid in candidates if match(self.values[vid])]
+
+    def search(
+        self,
+        match: Callable[[str], bool],
+        required: list[list[str]],
+        *,
+        sheets: list[str] | None,
+        columns: list[str] | None,
+        max_results: int,
+    ) -> dict[str, Any]:
+        """返回与 ``data_tools._search_file_values`` 完全一致的原生结果。"""
+        from openpyxl.utils import get_column_letter
+
+        target_sheets = {s.lower() for s in sheets} if sheets else None
+        col_set_lower = {c.lower() for c in columns} if columns else None
+        headers: dict[int, list[str]] = {}
+        allowed_cols: dict[int, set[int] | None] = {}
+        sheets_searched = 0
+        for sheet_idx, sheet in enumerate(self.sheets):
+            if target_sheets and sheet.name.lower() not in target_sheets:
+                continue
+            sheets_searched += 1
+            first = sheet.rows[0][: sheet.first_row_width] if sheet.rows else ()
+            header = [
+                self.values[v] if v != _NO_VALUE else f"Col_{i}" for i, v in enumerate(first)
+            ]
+            headers[sheet_idx] = header
+            if col_set_lower is not None:
+                allowed = {i for i, h in enumerate(header) if h.lower() in col_set_lower}
+                if not allowed:
+                    continue
+                allowed_cols[sheet_idx] = allowed
+            else:
+                allowed_cols[sheet_idx] = None
+
+        hits: list[tuple[int, int, int]] = []
+        for vid in self.matching_values(match, required):
+            for pos in self.postings[vid]:
+                if pos[0] not in allowed_cols:
+                    continue
+                allowed = allowed_cols[pos[0]]
+                if allowed is not None and pos[2] not in allowed:
+                    continue
+                hits.append(pos)
+        hits.sort()
+
+        matches: list[dict[str, Any]] = []
+        sheet_match_counts: dict[str, int] = {}
+        total_matches = 0
+        full_at_row: tuple[int, int] | None = None
+        for sheet_idx, row_idx, col_idx in hits:
+            if full_at_row is None and len(matches) >= max_results:
+                break
+            if full_at_row is not None and (sheet_idx, row_idx) != full_at_row:
+                # 与扫描路径一致：收集满后只统计当前行剩余的命中
+                break
+            sheet = self.sheets[sheet_idx]
+            total_matches += 1
+            sheet_match_counts[sheet.name] = sheet_match_counts.get(sheet.name, 0) + 1
+            if len(matches) >= max_results:
+                continue
+            header = headers[sheet_idx]
+            row_ids = sheet.rows[row_idx]
+            context: dict[str, str] = {}
+            ctx_count = 0
+            for ci, cv in enumerate(row_ids):
+                if ci == col_idx or cv == _NO_VALUE:
+                    continue
+                h = header[ci] if ci < len(header) else f"Col_{ci}"
+                context[h] = self.values[cv][:100]
+                ctx_count += 1
+                if ctx_count >= 5:
+                    break
+            value = self.values[row_ids[col_idx]]
+            matches.append({
+                "sheet": sheet.name,
+                "row": row_idx + 1,
+                "column": header[col_idx] if col_idx < len(header) else f"Col_{col_idx}",
+                "value": value[:200],
+                "cell_ref": f"{get_column_letter(col_idx + 1)}{row_idx + 1}",
+                "context": context,
+            })
+            if len(matches) >= max_results:
+                full_at_row = (sheet_idx, row_idx)
+
+        return {
+            "matches": matches,
+            "sheet_match_counts": sheet_match_counts,
+            "total_matches": total_matches,
+            "sheets_searched": sheets_searched,
+        }
+
+
+def _read_cell_rows(path: str) -> list[tuple[str, list[tuple[Any, ...]]]]:
+    """按 search_excel_values 的口径读取全部工作表行（优先使用列式旁路文件）。"""
+    from excelmanus.tools._sidecar import get_sidecar
+
+    sidecar = get_sidecar()
+    names = sidecar.sheet_names(path) if sidecar is not None else None
+    if names is not None:
+        out: list[tuple[str, list[tuple[Any, ...]]]] = []
+        for name in names:
+            rows = sidecar.cell_rows(path, name)
+            if rows is None:
+                break
+            out.append((name, rows))
+        else:
+            return out
+
+    from openpyxl import load_workbook
+
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        return [
+            (ws.title, list(ws.iter_rows(min_row=1, values_only=True)))
+            for ws in wb.worksheets
+        ]
+    finally:
+        wb.close()
+
+
+class _ResidentIndexes:
+    """进程内常驻的文件索引（所有工作区共用的字节预算 LRU）。"""
+
+    def __init__(self, max_bytes: int) -> None:
+        self._max_bytes = max(0, int(max_bytes))
+        self._entries: OrderedDict[str, tuple[FileValueIndex, int]] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._evictions = 0
+
+    def get(self, path: str) -> FileValueIndex | None:
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None:
+                return None
+            self._entries.move_to_end(path)
+            return entry[0]
+
+    def put(self, index: FileValueIndex) -> None:
+        size = index.estimated_bytes()
+        with self._lock:
+            old = self._entries.pop(index.path, None)
+            if old is not None:
+                self._bytes -= old[1]
+            if size > self._max_bytes:
+                return
+            self._entries[index.path] = (index, size)
+            self._bytes += size
+            while self._bytes > self._max_bytes and self._entries:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+                self._evictions += 1
+
+    def pop(self, path: str) -> None:
+        with self._lock:
+            old = self._entries.pop(path, None)
+            if old is not None:
+                self._bytes -= old[1]
+
+    def items_under(self, root: str) -> list[FileValueIndex]:
+        prefix = root + os.sep
+        with self._lock:
+            return [idx for p, (idx, _) in self._entries.items() if p.startswith(prefix)]
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "resident_files": len(self._entries),
+                "resident_bytes": self._bytes,
+                "max_bytes": self._max_bytes,
+                "evictions": self._evictions,
+            }
+
+
+class WorkspaceValueIndex:
+    """单个工作区内所有 Excel 文件的单元格值索引。"""
+
+    def __init__(
+        self,
+        workspace_root: str | Path,
+        *,
+        resident: _ResidentIndexes | None = None,
+        cache_dir: str | Path | None = None,
+        disk_max_bytes: int = _DEFAULT_DISK_MAX_MB * 1024 * 1024,
+    ) -> None:
+        self._root = os.path.abspath(str(workspace_root))
+        self._resident = resident or _ResidentIndexes(_DEFAULT_MAX_MB * 1024 * 1024)
+        base = Path(cache_dir) if cache_dir is not None else _DEFAULT_CACHE_DIR
+        self._disk_root = base
+        self._disk_dir = base / hashlib.sha256(self._root.encode("utf-8")).hexdigest()[:16]
+        self._disk_max_bytes = max(0, int(disk_max_bytes))
+        self._lock = threading.Lock()
+        self._executor: ThreadPoolExecutor | None = None
+        self._pending: dict[str, Future] = {}
+
+    @property
+    def workspace_root(self) -> str:
+        return self._root
+
+    def contains(self, path: str | Path) -> bool:
+        abs_path = os.path.abspath(str(path))
+        return abs_path == self._root or abs_path.startswith(self._root + os.sep)
+
+    def get(self, path: str | Path) -> FileValueIndex | None:
+        """返回与文件当前版本一致的索引；过期或缺失时返回 None。
+
+        内存未命中时尝试从磁盘加载（版本一致才采用）。
+        """
+        abs_path = os.path.abspath(str(path))
+        try:
+            st = os.stat(abs_path)
+        except OSError:
+            return None
+        signature = (st.st_mtime_ns, st.st_size)
+        index = self._resident.get(abs_path)
+        if index is not None:
+            if index.signature == signature:
+                return index
+            self._resident.pop(abs_path)
+        index = self._load_from_disk(abs_path, signature)
+        if index is not None:
+            self._resident.put(index)
+        return index
+
+    def build(self, path: str | Path) -> bool:
+        """同步（重新）索引一个文件；文件未变时跳过。"""
+        abs_path = os.path.abspath(str(path))
+        if Path(abs_path).suffix.lower() not in _INDEXED_EXTENSIONS:
+            return False
+        if self.get(abs_path) is not None:
+            return False
+        try:
+            index = FileValueIndex.build(abs_path, _read_cell_rows(abs_path))
+        except Exception:
+            logger.debug("单元格值索引构建失败: %s", abs_path, exc_info=True)
+            return False
+        self._resident.put(index)
+        self._save_to_disk(index)
+        logger.debug("单元格值索引已更新: %s (%d 个不同值)", abs_path, len(index.values))
+        return True
+
+    def schedule(self, path: str | Path) -> Future | None:
+        """后台索引文件（同一文件排队中时不重复提交）。"""
+        abs_path = os.path.abspath(str(path))
+        if Path(abs_path).suffix.lower() not in _INDEXED_EXTENSIONS:
+            return None
+        if self.get(abs_path) is not None:
+            return None
+        with self._lock:
+            pending = self._pending.get(abs_path)
+            if pending is not None and not pending.done():
+                return pending
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix="excelmanus-value-index",
+                )
+            future = self._executor.submit(self.build, abs_path)
+            self._pending[abs_path] = future
+        return future
+
+    def remove(self, path: str | Path) -> None:
+        abs_path = os.path.abspath(str(path))
+        self._resident.pop(abs_path)
+        self._discard(self._entry_path(abs_path))
+
+    def stats(self) -> dict[str, Any]:
+        files = self._resident.items_under(self._root)
+        return {
+            "files": len(files),
+            "distinct_values": sum(len(f.values) for f in files),
+            "cells": sum(len(p) for f in files for p in f.postings),
+            **self._resident.stats(),
+        }
+
+    # ------------------------------------------------------------------
+    # 磁盘持久化
+
+    def _entry_path(self, abs_path: str) -> Path:
+        digest = hashlib.sha256(abs_path.encode("utf-8")).hexdigest()[:32]
+        return self._disk_dir / f"{digest}{_SUFFIX}"
+
+    def _load_from_disk(
+        self, abs_path: str, signature: tuple[int, int],
+    ) -> FileValueIndex | None:
+        if self._disk_max_bytes <= 0:
+            return None
+        entry = self._entry_path(abs_path)
+        try:
+            data = json.loads(entry.read_text(encoding="utf-8"))
+            if tuple(data.get("signature") or ()) != signature or data.get("path") != abs_path:
+                return None
+            index = FileValueIndex.from_dict(data)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            logger.debug("单元格值索引磁盘缓存损坏，丢弃: %s", entry, exc_info=True)
+            self._discard(entry)
+            return None
+        try:
+            os.utime(entry)
+        except OSError:
+            pass
+        return index
+
+    def _save_to_disk(self, index: FileValueIndex) -> None:
+        if self._disk_max_bytes <= 0:
+            return
+        try:
+            payload = json.dumps(index.to_dict(), ensure_ascii=False)
+            if len(payload.encode("utf-8")) > self._disk_max_bytes:
+                return
+            self._disk_dir.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self._disk_dir, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    f.write(payload)
+                os.replace(tmp, self._entry_path(index.path))
+            except BaseException:
+                self._discard(Path(tmp))
+                raise
+        except Exception:
+            logger.debug("单元格值索引写入磁盘失败: %s", index.path, exc_info=True)
+            return
+        self._evict_disk()
+
+    def _evict_disk(self) -> None:
+        """按最近使用时间淘汰持久化条目（预算覆盖全部工作区）。"""
+        stats: list[tuple[float, int, Path]] = []
+        total = 0
+        try:
+            entries = list(self._disk_root.glob(f"*/*{_SUFFIX}"))
+        except OSError:
+            return
+        for entry in entries:
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            stats.append((st.st_mtime, st.st_size, entry))
+            total += st.st_size
+        if total <= self._disk_max_bytes:
+            return
+        stats.sort(key=lambda t: t[0])
+        for _mtime, size, entry in stats:
+            if total <= self._disk_max_bytes:
+                break
+            self._discard(entry)
+            total -= size
+
+    @staticmethod
+    def _discard(path: Path) -> None:
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+
+_indexes: dict[str, WorkspaceValueIndex] = {}
+_indexes_lock = threading.Lock()
+_resident: _ResidentIndexes | None = None
+
+
+def _env_mb(name: str, default: float) -> float:
+    raw = os.environ.get(name, "").strip()
+    try:
+        return float(raw) if raw else default
+    except ValueError:
+        return default
+
+
+def value_index_enabled() -> bool:
+    raw = os.environ.get("EXCELMANUS_VALUE_INDEX_ENABLED", "").strip().lower()
+    return raw not in ("0", "false", "no", "off")
+
+
+def get_value_index(workspace_root: str | Path) -> WorkspaceValueIndex | None:
+    """返回（必要时创建）工作区的单元格值索引；被禁用时返回 None。"""
+    if not value_index_enabled():
+        return None
+    global _resident
+    key = os.path.abspath(str(workspace_root))
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            if _resident is None:
+                max_mb = _env_mb("EXCELMANUS_VALUE_INDEX_MAX_MB", _DEFAULT_MAX_MB)
+                _resident = _ResidentIndexes(int(max_mb * 1024 * 1024))
+            disk_mb = _env_mb("EXCELMANUS_VALUE_INDEX_DISK_MAX_MB", _DEFAULT_DISK_MAX_MB)
+            index = _indexes[key] = WorkspaceValueIndex(
+                key,
+                resident=_resident,
+                cache_dir=os.environ.get("EXCELMANUS_VALUE_INDEX_DIR", "").strip() or None,
+                disk_max_bytes=int(disk_mb * 1024 * 1024),
+            )
+    return index
+
+
+def lookup_file_index(path: str | Path) -> FileValueIndex | None:
+    """在已注册的工作区索引中查找文件的最新索引。"""
+    if not value_index_enabled():
+        return None
+    with _indexes_lock:
+        candidates = [idx for idx in _indexes.values() if idx.contains(path)]
+    for index in candidates:
+        found = index.get(path)
+        if found is not None:
+            return found
+    return None
+
+
+def reset_value_indexes() -> None:
+    """清空所有工作区索引（测试使用）。"""
+    global _resident
+    with _indexes_lock:
+        _indexes.clear()
+        _resident = None
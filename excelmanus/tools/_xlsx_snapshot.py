@@ -0,0 +1,431 @@
+"""run_code 前后的 xlsx 快照：按 zip part 指纹跳过未变化的工作表。
+
+原实现在写入前后各用 ``load_workbook(read_only=False)`` 完整加载工作簿
+（对象模型 + 样式），逐表扫描 500×50 单元格，即使该表未被修改。本模块：
+
+- 快照只读取一次文件字节，并记录每个工作表 part 的指纹：zip 目录中的
+  CRC32 + 解压大小，叠加 sharedStrings.xml / styles.xml 的指纹与日期纪元
+  （共享字符串原地改动时工作表 XML 可能不变）；
+- diff 时只解析指纹变化的工作表，用 ``iterparse`` 流式读取工作表 XML，
+  单元格取值口径与 openpyxl（``data_only=False``）一致，样式经
+  :func:`extract_cell_style` 生成，输出格式与原快照相同；
+- 快照按文件内容哈希缓存（字节预算 LRU），上一次写入后的快照即下一次
+  写入前的快照；解析结果按工作表指纹缓存。
+
+非 zip 文件（或结构异常）返回 None，由调用方回退到 openpyxl。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import re
+import threading
+import zipfile
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+from xml.etree import ElementTree
+
+from excelmanus.tools._sheet_probe import _NS_MAIN, _sheet_parts
+
+MAX_ROWS = 500
+MAX_COLS = 50
+
+_SNAPSHOT_CACHE_BYTES = 128 * 1024 * 1024
+_SHEET_CACHE_ENTRIES = 64
+
+_SST_PART = "xl/sharedStrings.xml"
+_STYLES_PART = "xl/styles.xml"
+
+_TAG_ROW = f"{{{_NS_MAIN}}}row"
+_TAG_C = f"{{{_NS_MAIN}}}c"
+_TAG_V = f"{{{_NS_MAIN}}}v"
+_TAG_F = f"{{{_NS_MAIN}}}f"
+_TAG_IS = f"{{{_NS_MAIN}}}is"
+_TAG_T = f"{{{_NS_MAIN}}}t"
+_TAG_R = f"{{{_NS_MAIN}}}r"
+_TAG_SI = f"{{{_NS_MAIN}}}si"
+_TAG_MERGE = f"{{{_NS_MAIN}}}mergeCell"
+_TAG_WORKBOOK_PR = f"{{{_NS_MAIN}}}workbookPr"
+_DATE1904_RE = re.compile(rb'date1904="(?:1|true)"')
+
+SheetData = tuple[list[dict], list[dict]]  # (cells, merges)
+
+
+def _part_fingerprint(zf: zipfile.ZipFile, name: str) -> tuple[int, int] | None:
+    try:
+        info = zf.getinfo(name)
+    except KeyError:
+        return None
+    return info.CRC, info.file_size
+
+
+def _text_content(node: ElementTree.Element) -> str:
+    """``<si>`` / ``<is>`` 的纯文本（与 openpyxl ``Text.content`` 一致，忽略 rPh）。"""
+    parts: list[str] = []
+    plain = node.find(_TAG_T)
+    if plain is not None and plain.text:
+        parts.append(plain.text)
+    for run in node.findall(_TAG_R):
+        t = run.find(_TAG_T)
+        if t is not None and t.text:
+            parts.append(t.text)
+    return "".join(parts)
+
+
+def _cast_number(value: str) -> int | float:
+    if "." in value or "E" in value or "e" in value:
+        return float(value)
+    return int(value)
+
+
+class _WorkbookContext:
+    """一次解析所需的工作簿级数据：共享字符串、样式、日期纪元。"""
+
+    def __init__(self, zf: zipfile.ZipFile) -> None:
+        from openpyxl.utils.datetime import CALENDAR_MAC_1904, CALENDAR_WINDOWS_1900
+
+        self.shared_strings: list[str] = []
+        if _SST_PART in zf.namelist():
+            root = ElementTree.fromstring(zf.read(_SST_PART))
+            self.shared_strings = [_text_content(si) for si in root.iter(_TAG_SI)]
+
+        self.epoch = CALENDAR_WINDOWS_1900
+        try:
+            wb_pr = ElementTree.fromstring(zf.read("xl/workbook.xml")).find(_TAG_WORKBOOK_PR)
+        except KeyError:
+            wb_pr = None
+        if wb_pr is not None and wb_pr.get("date1904") in ("1", "true"):
+            self.epoch = CALENDAR_MAC_1904
+
+        self._stylesheet: Any = None
+        self.date_formats: set[int] = set()
+        self.timedelta_formats: set[int] = set()
+        if _STYLES_PART in zf.namelist():
+            try:
+                from openpyxl.styles.stylesheet import Stylesheet
+
+                self._stylesheet = Stylesheet.from_tree(
+                    ElementTree.fromstring(zf.read(_STYLES_PART))
+                )
+                self.date_formats = self._stylesheet.date_formats
+                self.timedelta_formats = self._stylesheet.timedelta_formats
+            except Exception:
+                self._stylesheet = None
+        self._style_cache: dict[int, dict | None] = {}
+
+    def style(self, style_id: int) -> dict | None:
+        """按 cellXfs 下标返回 :func:`extract_cell_style` 格式的样式。"""
+        if style_id in self._style_cache:
+            return self._style_cache[style_id]
+        result: dict | None = None
+        sheet = self._stylesheet
+        if sheet is not None and 0 <= style_id < len(sheet.cell_styles):
+            from openpyxl.styles.numbers import BUILTIN_FORMATS, BUILTIN_FORMATS_MAX_SIZE
+
+            from excelmanus.tools._style_extract import extract_cell_style
+
+            xf = sheet.cell_styles[style_id]
+            fmt_id = xf.numFmtId
+            if fmt_id < BUILTIN_FORMATS_MAX_SIZE:
+                number_format = BUILTIN_FORMATS.get(fmt_id, "General")
+            else:
+                number_format = sheet.number_formats[fmt_id - BUILTIN_FORMATS_MAX_SIZE]
+            proxy = _CellStyleView(
+                font=_at(sheet.fonts, xf.fontId),
+                fill=_at(sheet.fills, xf.fillId),
+                border=_at(sheet.borders, xf.borderId),
+                alignment=_at(sheet.alignments, xf.alignmentId),
+                number_format=number_format,
+            )
+            result = extract_cell_style(proxy)
+        self._style_cache[style_id] = result
+        return result
+
+
+def _at(seq: Any, idx: int) -> Any:
+    try:
+        return seq[idx]
+    except (IndexError, TypeError):
+        return None
+
+
+@dataclass
+class _CellStyleView:
+    """供 extract_cell_style 读取的最小单元格样式视图。"""
+
+    font: Any
+    fill: Any
+    border: Any
+    alignment: Any
+    number_format: str
+
+
+def _parse_sheet(zf: zipfile.ZipFile, part: str, ctx: _WorkbookContext) -> SheetData:
+    """iterparse 流式解析工作表 XML，返回前 MAX_ROWS×MAX_COLS 的非空单元格与合并区域。"""
+    from openpyxl.formula.translate import Translator
+    from openpyxl.utils.cell import coordinate_to_tuple, get_column_letter, range_boundaries
+    from openpyxl.utils.datetime import from_excel
+
+    cells: list[dict] = []
+    merges: list[dict] = []
+    shared_formulae: dict[str, Translator] = {}
+    row_counter = 0
+    col_counter = 0
+
+    with zf.open(part) as src:
+        for event, elem in ElementTree.iterparse(src, events=("start", "end")):
+            tag = elem.tag
+            if event == "start":
+                if tag == _TAG_ROW:
+                    r = elem.get("r")
+                    row_counter = int(r) if r else row_counter + 1
+                    col_counter = 0
+                continue
+
+            if tag == _TAG_C:
+                coordinate = elem.get("r")
+                if coordinate:
+                    row, column = coordinate_to_tuple(coordinate)
+                    col_counter = column
+                else:
+                    col_counter += 1
+                    row, column = row_counter, col_counter
+                if row <= MAX_ROWS and column <= MAX_COLS:
+                    value = _cell_value(
+                        elem, ctx, coordinate or f"{get_column_letter(column)}{row}",
+                        shared_formulae, Translator, from_excel,
+                    )
+                    if value is not None:
+                        ref = f"{get_column_letter(column)}{row}"
+                        if isinstance(value, (int, float, bool, str)):
+                            entry: dict = {"cell": ref, "value": value}
+                        else:
+                            entry = {"cell": ref, "value": str(value)}
+                        style_id = int(elem.get("s") or 0)
+                        style = ctx.style(style_id)
+                        if style:
+                            entry["style"] = style
+                        cells.append(entry)
+                else:
+                    # 窗口外的共享公式主单元格仍需登记，供窗口内的从属单元格平移
+                    formula = elem.find(_TAG_F)
+                    if (
+                        formula is not None
+                        and formula.get("t") == "shared"
+                        and formula.text
+                        and formula.get("si") not in shared_formulae
+                    ):
+                        shared_formulae[formula.get("si")] = Translator(
+                            "=" + formula.text,
+                            coordinate or f"{get_column_letter(column)}{row}",
+                        )
+                elem.clear()
+            elif tag == _TAG_ROW:
+                elem.clear()
+            elif tag == _TAG_MERGE:
+                ref = elem.get("ref", "")
+                if ref:
+                    min_col, min_row, max_col, max_row = range_boundaries(ref)
+                    merges.append({
+                        "min_row": min_row,
+                        "min_col": min_col,
+                        "max_row": max_row,
+                        "max_col": max_col,
+                    })
+    return cells, merges
+
+
+def _cell_value(
+    elem: ElementTree.Element,
+    ctx: _WorkbookContext,
+    coordinate: str,
+    shared_formulae: dict[str, Any],
+    translator: Any,
+    from_excel: Any,
+) -> Any:
+    """单元格取值，口径与 openpyxl ``WorkSheetParser.parse_cell`` 相同。"""
+    data_type = elem.get("t", "n")
+    formula = elem.find(_TAG_F)
+    if formula is not None:
+        value = "=" + (formula.text or "")
+        if formula.get("t") == "shared":
+            idx = formula.get("si")
+            if idx in shared_formulae:
+                value = shared_formulae[idx].translate_formula(coordinate)
+            elif value != "=":
+                shared_formulae[idx] = translator(value, coordinate)
+        return value
+
+    if data_type == "inlineStr":
+        node = elem.find(_TAG_IS)
+        return _text_content(node) if node is not None else None
+
+    raw = elem.findtext(_TAG_V) or None
+    if raw is None:
+        return None
+    if data_type == "n":
+        number = _cast_number(raw)
+        style_id = int(elem.get("s") or 0)
+        if style_id in ctx.date_formats:
+            try:
+                return from_excel(
+                    number, ctx.epoch, timedelta=style_id in ctx.timedelta_formats,
+                )
+            except (OverflowError, ValueError):
+                return "#VALUE!"
+        return number
+    if data_type == "s":
+        return ctx.shared_strings[int(raw)]
+    if data_type == "b":
+        return bool(int(raw))
+    if data_type == "d":
+        from openpyxl.utils.datetime import from_ISO8601
+
+        return from_ISO8601(raw)
+    return raw
+
+
+@dataclass(frozen=True)
+class SheetPart:
+    name: str
+    part: str
+    fingerprint: tuple
+
+
+class WorkbookSnapshot:
+    """一个文件版本的快照：原始字节 + 各工作表 part 指纹，单元格按需解析。"""
+
+    def __init__(self, data: bytes, file_hash: str, sheets: list[SheetPart]) -> None:
+        self._data = data
+        self.file_hash = file_hash
+        self.sheets = sheets
+        self._ctx: _WorkbookContext | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def size(self) -> int:
+        return len(self._data)
+
+    def sheet(self, name: str) -> SheetPart | None:
+        for sp in self.sheets:
+            if sp.name == name:
+                return sp
+        return None
+
+    def sheet_data(self, name: str) -> SheetData:
+        """解析（或从指纹缓存取出）指定工作表；不存在时返回空。"""
+        sp = self.sheet(name)
+        if sp is None:
+            return [], []
+        cached = _sheet_cache_get(sp.fingerprint)
+        if cached is not None:
+            return cached
+        with self._lock, zipfile.ZipFile(io.BytesIO(self._data)) as zf:
+            if self._ctx is None:
+                self._ctx = _WorkbookContext(zf)
+            data = _parse_sheet(zf, sp.part, self._ctx)
+        _sheet_cache_put(sp.fingerprint, data)
+        return data
+
+    def materialize(self) -> list[tuple[str, list[dict], list[dict]]]:
+        """解析全部工作表，返回旧快照格式 ``[(sheet, cells, merges)]``。"""
+        return [(sp.name, *self.sheet_data(sp.name)) for sp in self.sheets]
+
+
+def changed_sheets(
+    before: WorkbookSnapshot, after: WorkbookSnapshot,
+) -> dict[str, tuple[SheetData, SheetData]]:
+    """返回指纹不同的工作表 ``{sheet: ((b_cells, b_merges), (a_cells, a_merges))}``。"""
+    result: dict[str, tuple[SheetData, SheetData]] = {}
+    if before.file_hash == after.file_hash:
+        return result
+    names = [sp.name for sp in before.sheets]
+    names += [sp.name for sp in after.sheets if sp.name not in names]
+    for name in names:
+        b_sp = before.sheet(name)
+        a_sp = after.sheet(name)
+        if b_sp is not None and a_sp is not None and b_sp.fingerprint == a_sp.fingerprint:
+            continue
+        result[name] = (before.sheet_data(name), after.sheet_data(name))
+    return result
+
+
+def _build_snapshot(data: bytes, file_hash: str) -> WorkbookSnapshot | None:
+    try:
+        with zipfile.ZipFile(io.BytesIO(data)) as zf:
+            sheets, _ = _sheet_parts(zf)
+            workbook_xml = zf.read("xl/workbook.xml")
+            shared = (
+                _part_fingerprint(zf, _SST_PART),
+                _part_fingerprint(zf, _STYLES_PART),
+                _DATE1904_RE.search(workbook_xml) is not None,
+            )
+            parts: list[SheetPart] = []
+            for name, part in sheets:
+                fp = _part_fingerprint(zf, part)
+                if fp is None or not part.startswith("xl/worksheets/"):
+                    # chartsheet 等没有单元格数据
+                    continue
+                parts.append(SheetPart(name, part, (part, fp, shared)))
+    except (zipfile.BadZipFile, KeyError, ElementTree.ParseError):
+        return None
+    return WorkbookSnapshot(data, file_hash, parts)
+
+
+# ── 缓存 ─────────────────────────────────────────────────
+
+_snapshots: OrderedDict[str, WorkbookSnapshot] = OrderedDict()
+_snapshot_bytes = 0
+_sheet_cache: OrderedDict[tuple, SheetData] = OrderedDict()
+_lock = threading.Lock()
+
+
+def _sheet_cache_get(key: tuple) -> SheetData | None:
+    with _lock:
+        data = _sheet_cache.get(key)
+        if data is not None:
+            _sheet_cache.move_to_end(key)
+        return data
+
+
+def _sheet_cache_put(key: tuple, data: SheetData) -> None:
+    with _lock:
+        _sheet_cache[key] = data
+        while len(_sheet_cache) > _SHEET_CACHE_ENTRIES:
+            _sheet_cache.popitem(last=False)
+
+
+def snapshot_workbook(path: str | Path) -> WorkbookSnapshot | None:
+    """读取 xlsx/xlsm 并返回快照（按文件内容哈希缓存）；非 zip 文件返回 None。"""
+    global _snapshot_bytes
+    data = Path(path).read_bytes()
+    if not data.startswith(b"PK"):
+        return None
+    file_hash = hashlib.blake2b(data, digest_size=20).hexdigest()
+    with _lock:
+        cached = _snapshots.get(file_hash)
+        if cached is not None:
+            _snapshots.move_to_end(file_hash)
+            return cached
+    snap = _build_snapshot(data, file_hash)
+    if snap is None or snap.size > _SNAPSHOT_CACHE_BYTES:
+        return snap
+    with _lock:
+        if file_hash not in _snapshots:
+            _snapshots[file_hash] = snap
+            _snapshot_bytes += snap.size
+        while _snapshot_bytes > _SNAPSHOT_CACHE_BYTES and _snapshots:
+            _, evicted = _snapshots.popitem(last=False)
+            _snapshot_bytes -= evicted.size
+    return snap
+
+
+def clear_snapshot_cache() -> None:
+    global _snapshot_bytes
+    with _lock:
+        _snapshots.clear()
+        _sheet_cache.clear()
+        _snapshot_bytes = 0
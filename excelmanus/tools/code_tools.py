@@ -9,16 +9,22 @@ import re
 import shutil
 import subprocess
 import sys
+import threading
 import time
 import uuid
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Callable
+from typing import TYPE_CHECKING, Any, Callable
 
+from excelmanus.latency import LatencyStat
 from excelmanus.security import FileAccessGuard
 from excelmanus.tools._guard_ctx import get_guard as _get_ctx_guard
+from excelmanus.tools._run_output import OutputCapture, get_output_listener, run_streaming
 from excelmanus.tools.registry import ToolDef
 
+if TYPE_CHECKING:
+    from excelmanus.tools._sandbox_pool import PooledRun
+
 # ── 模块级 FileAccessGuard（延迟初始化） ─────────────────
 
 _guard: FileAccessGuard | None = None
@@ -256,14 +262,146 @@ def _probe_environment(
     )
 
 
+# ── 解释器探测缓存 ───────────────────────────────────────
+# 探测需要起子进程导入 pandas/openpyxl（约 1 秒），结果按
+# （命令, 解释器真实路径与 mtime, 是否校验依赖, 安全等级）缓存；
+# 失败结果只缓存 _PROBE_FAILURE_TTL 秒，避免 auto 模式每次都重新探测
+# 不可用的候选；运行出现导入类失败时作废对应条目。
+
+_DEFAULT_PROBE_CACHE_TTL = 600.0
+_PROBE_FAILURE_TTL = 30.0
+_ENV_FAILURE_RE = re.compile(r"ModuleNotFoundError|ImportError|No module named")
+
+_probe_cache: dict[tuple[Any, ...], tuple[float, _InterpreterProbe]] = {}
+_probe_cache_lock = threading.Lock()
+_probe_cache_counters = {"hits": 0, "misses": 0, "invalidations": 0}
+_resolve_latency = {"cached": LatencyStat(), "probed": LatencyStat()}
+
+
+def _probe_cache_ttl() -> float:
+    raw = os.environ.get("EXCELMANUS_RUN_PYTHON_PROBE_TTL", "").strip()
+    try:
+        return float(raw) if raw else _DEFAULT_PROBE_CACHE_TTL
+    except ValueError:
+        return _DEFAULT_PROBE_CACHE_TTL
+
+
+def _interpreter_identity(command: list[str]) -> tuple[str, int] | None:
+    """解释器可执行文件的真实路径与 mtime；不存在时返回 None。"""
+    executable = command[0]
+    if _is_path_like(executable):
+        path: str | None = str(Path(executable).expanduser())
+    else:
+        path = shutil.which(executable)
+    if not path:
+        return None
+    try:
+        real = os.path.realpath(path)
+        return real, os.stat(real).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _probe_environment_cached(
+    command: list[str], *,
+    require_excel_deps: bool,
+    sandbox_tier: str = "RED",
+) -> tuple[_InterpreterProbe, bool]:
+    """带缓存的 ``_probe_environment``，返回 (探测结果, 是否命中缓存)。"""
+    ttl = _probe_cache_ttl()
+    identity = _interpreter_identity(command) if ttl > 0 else None
+    key: tuple[Any, ...] | None = None
+    if identity is not None:
+        key = (
+            tuple(command), identity, require_excel_deps,
+            sandbox_tier if require_excel_deps else "",
+        )
+        with _probe_cache_lock:
+            entry = _probe_cache.get(key)
+            if entry is not None:
+                max_age = ttl if entry[1].status == "ok" else min(ttl, _PROBE_FAILURE_TTL)
+                if time.monotonic() - entry[0] <= max_age:
+                    _probe_cache_counters["hits"] += 1
+                    return entry[1], True
+            _probe_cache.pop(key, None)
+            _probe_cache_counters["misses"] += 1
+    probe = _probe_environment(command, require_excel_deps=require_excel_deps, sandbox_tier=sandbox_tier)
+    if key is not None:
+        with _probe_cache_lock:
+            _probe_cache[key] = (time.monotonic(), probe)
+    return probe, False
+
+
+def _invalidate_probe_cache(command: list[str]) -> int:
+    """作废某个解释器命令的全部探测缓存，返回作废条目数。"""
+    target = tuple(command)
+    with _probe_cache_lock:
+        stale = [key for key in _probe_cache if key[0] == target]
+        for key in stale:
+            del _probe_cache[key]
+        _probe_cache_counters["invalidations"] += len(stale)
+    return len(stale)
+
+
+def clear_interpreter_probe_cache() -> None:
+    """清空解释器探测缓存与统计（测试使用）。"""
+    with _probe_cache_lock:
+        _probe_cache.clear()
+        for name in _probe_cache_counters:
+            _probe_cache_counters[name] = 0
+        for name in _resolve_latency:
+            _resolve_latency[name] = LatencyStat()
+
+
+def run_code_stats() -> dict[str, Any]:
+    """run_code 运行时统计：解释器解析耗时（缓存命中/实际探测）与预热解释器池。"""
+    from excelmanus.tools._sandbox_pool import get_sandbox_pool
+
+    with _probe_cache_lock:
+        probe_stats: dict[str, Any] = {
+            **_probe_cache_counters,
+            "entries": len(_probe_cache),
+            "resolve": {k: v.to_dict() for k, v in _resolve_latency.items()},
+        }
+    pool = get_sandbox_pool()
+    return {
+        "interpreter_probe": probe_stats,
+        "interpreter_pool": pool.stats() if pool is not None else None,
+    }
+
+
 def _resolve_python_command(
     python_command: str, *,
     require_excel_deps: bool,
     sandbox_tier: str = "RED",
+) -> tuple[list[str], list[_InterpreterProbe], str]:
+    """解析可用解释器；探测结果走缓存，并按是否实际探测记录解析耗时。"""
+    started = time.perf_counter()
+    probed = False
+
+    def _probe(command: list[str]) -> _InterpreterProbe:
+        nonlocal probed
+        probe, hit = _probe_environment_cached(
+            command, require_excel_deps=require_excel_deps, sandbox_tier=sandbox_tier,
+        )
+        probed = probed or not hit
+        return probe
+
+    try:
+        return _select_python_command(python_command, _probe)
+    finally:
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with _probe_cache_lock:
+            _resolve_latency["probed" if probed else "cached"].record(elapsed_ms)
+
+
+def _select_python_command(
+    python_command: str,
+    probe_fn: Callable[[list[str]], _InterpreterProbe],
 ) -> tuple[list[str], list[_InterpreterProbe], str]:
     if python_command != "auto":
         command = _parse_python_command(python_command)
-        probe = _probe_environment(command, require_excel_deps=require_excel_deps, sandbox_tier=sandbox_tier)
+        probe = probe_fn(command)
         if probe.status != "ok":
             raise RuntimeError(
                 f"指定解释器不可用: {_command_to_text(command)}; {probe.status}: {probe.detail}"
@@ -296,7 +434,7 @@ def _resolve_python_command(
 
     probes: list[_InterpreterProbe] = []
     for command in deduped:
-        probe = _probe_environment(command, require_excel_deps=require_excel_deps, sandbox_tier=sandbox_tier)
+        probe = probe_fn(command)
         probes.append(probe)
         if probe.status == "ok":
             return command, probes, "auto"
@@ -356,6 +494,16 @@ def _ensure_isolated_python(command: list[str]) -> tuple[list[str], bool]:
     return [*command, "-I"], True
 
 
+def _unix_limit_plan(timeout_seconds: int) -> list[tuple[str, int]]:
+    """子进程资源限制计划（冷启动 preexec 与预热解释器池共用）。"""
+    return [
+        ("RLIMIT_CPU", max(1, min(timeout_seconds, 300))),
+        ("RLIMIT_AS", 512 * 1024 * 1024),
+        ("RLIMIT_NOFILE", 64),
+        ("RLIMIT_NPROC", 32),
+    ]
+
+
 def _build_unix_limits_preexec(
     timeout_seconds: int,
 ) -> tuple[Callable[[], None] | None, bool, list[str]]:
@@ -372,13 +520,7 @@ def _build_unix_limits_preexec(
         return None, False, warnings
 
     candidates: list[tuple[int, int, str]] = []
-    limit_plan = [
-        ("RLIMIT_CPU", max(1, min(timeout_seconds, 300))),
-        ("RLIMIT_AS", 512 * 1024 * 1024),
-        ("RLIMIT_NOFILE", 64),
-        ("RLIMIT_NPROC", 32),
-    ]
-    for name, value in limit_plan:
+    for name, value in _unix_limit_plan(timeout_seconds):
         if hasattr(resource, name):
             candidates.append((getattr(resource, name), value, name))
         else:
@@ -404,6 +546,68 @@ def _build_unix_limits_preexec(
     return _preexec, True, warnings
 
 
+def _run_in_sandbox_pool(
+    *,
+    python_cmd: list[str],
+    sandbox_tier: str,
+    wrapper_src: str,
+    workspace_root: Path,
+    base_env: dict[str, str],
+    run_env: dict[str, str],
+    workdir: Path,
+    argv: list[str],
+    timeout_seconds: int,
+    output_dir: Path,
+    capture: OutputCapture,
+) -> PooledRun | None:
+    """尝试在预热解释器池中执行；池未就绪或不可用时返回 None（走冷启动）。"""
+    from excelmanus.tools._sandbox_pool import ZygoteError, ZygoteSpec, get_sandbox_pool
+
+    pool = get_sandbox_pool()
+    if pool is None:
+        return None
+    if sandbox_tier == "GREEN":
+        from excelmanus.security.sandbox_hook import _GREEN_BLOCKED as blocked
+    elif sandbox_tier == "YELLOW":
+        from excelmanus.security.sandbox_hook import _YELLOW_BLOCKED as blocked
+    else:
+        blocked = ()
+    limits = _unix_limit_plan(timeout_seconds)
+    key = (
+        tuple(python_cmd), _interpreter_identity(python_cmd), sandbox_tier,
+        str(workspace_root), tuple(sorted(base_env.items())),
+    )
+    spec = ZygoteSpec(
+        command=tuple(python_cmd),
+        tier=sandbox_tier,
+        blocked=tuple(blocked),
+        wrapper_src=wrapper_src,
+        cwd=str(workspace_root),
+        env=tuple(sorted(run_env.items())),
+        # zygote 预导入阶段即受同样的地址空间上限约束，与冷启动一致
+        limits=tuple(item for item in limits if item[0] == "RLIMIT_AS"),
+    )
+    zygote = pool.acquire(key, spec)
+    if zygote is None:
+        return None
+    broken = False
+    try:
+        return zygote.run(
+            argv=argv,
+            cwd=str(workdir),
+            env=run_env,
+            limits=limits,
+            timeout=timeout_seconds,
+            output_dir=output_dir,
+            capture=capture,
+        )
+    except ZygoteError:
+        broken = True
+        return None
+    finally:
+        pool.release(zygote, broken=broken or zygote.broken)
+
+
 # ── 工具函数 ──────────────────────────────────────────────
 
 
@@ -966,6 +1170,7 @@ def _execute_script(
     )
     sandbox_python_cmd, isolated_python = _ensure_isolated_python(python_cmd)
     sandbox_env, env_warnings = _build_sandbox_env()
+    base_env = dict(sandbox_env)
     preexec_fn, limits_applied, limit_warnings = _build_unix_limits_preexec(
         timeout_seconds
     )
@@ -1003,67 +1208,75 @@ def _execute_script(
     temp_wrapper: Path | None = None
     from excelmanus.security.sandbox_hook import generate_wrapper_script
     wrapper_src = generate_wrapper_script(sandbox_tier, str(guard.workspace_root))
-    temp_dir = guard.workspace_root / "scripts" / "temp"
-    temp_dir.mkdir(parents=True, exist_ok=True)
-    temp_wrapper = temp_dir / f"_sw_{uuid.uuid4().hex[:12]}.py"
-    temp_wrapper.write_text(wrapper_src, encoding="utf-8")
-    command = [*sandbox_python_cmd, str(temp_wrapper), str(script_safe), *safe_args]
+
+    # 完整输出需要落盘时边读边写，内存中只保留尾部
+    stdout_safe = guard.resolve_and_validate(stdout_file) if stdout_file else None
+    stderr_safe = guard.resolve_and_validate(stderr_file) if stderr_file else None
+    capture = OutputCapture(
+        tail_lines=tail_lines,
+        stdout_path=stdout_safe,
+        stderr_path=stderr_safe,
+        listener=get_output_listener(),
+    )
 
     started = time.time()
     timed_out = False
     return_code = 1
-    stdout = ""
-    stderr = ""
 
     try:
-        run_kwargs: dict[str, Any] = {
-            "cwd": workdir_safe,
-            "capture_output": True,
-            "text": True,
-            "encoding": "utf-8",
-            "errors": "replace",
-            "timeout": timeout_seconds,
-            "check": False,
-            "env": sandbox_env,
-            "stdin": subprocess.DEVNULL,
-            "close_fds": True,
-            "start_new_session": True,
-        }
-        if preexec_fn is not None:
-            run_kwargs["preexec_fn"] = preexec_fn
-        completed = subprocess.run(
-            command,
-            **run_kwargs,
-        )
-        return_code = completed.returncode
-        stdout = completed.stdout or ""
-        stderr = completed.stderr or ""
-    except subprocess.TimeoutExpired as exc:
-        timed_out = True
-        return_code = 124
-        stdout = (
-            exc.stdout.decode(errors="replace")
-            if isinstance(exc.stdout, bytes)
-            else exc.stdout
-        ) or ""
-        stderr = (
-            exc.stderr.decode(errors="replace")
-            if isinstance(exc.stderr, bytes)
-            else exc.stderr
-        ) or ""
+        # ── 预热解释器池：命中时从 zygote fork 执行，跳过解释器启动与依赖导入 ──
+        pooled = None
+        if limits_applied:
+            pooled = _run_in_sandbox_pool(
+                python_cmd=sandbox_python_cmd,
+                sandbox_tier=sandbox_tier,
+                wrapper_src=wrapper_src,
+                workspace_root=guard.workspace_root,
+                base_env=base_env,
+                run_env=sandbox_env,
+                workdir=workdir_safe,
+                argv=[str(script_safe), *safe_args],
+                timeout_seconds=timeout_seconds,
+                output_dir=Path(sandbox_tmpdir),
+                capture=capture,
+            )
+        if pooled is not None:
+            return_code = pooled.return_code
+            timed_out = pooled.timed_out
+        else:
+            temp_dir = guard.workspace_root / "scripts" / "temp"
+            temp_dir.mkdir(parents=True, exist_ok=True)
+            temp_wrapper = temp_dir / f"_sw_{uuid.uuid4().hex[:12]}.py"
+            temp_wrapper.write_text(wrapper_src, encoding="utf-8")
+            command = [*sandbox_python_cmd, str(temp_wrapper), str(script_safe), *safe_args]
+
+            run_kwargs: dict[str, Any] = {
+                "cwd": workdir_safe,
+                "env": sandbox_env,
+                "stdin": subprocess.DEVNULL,
+                "close_fds": True,
+                "start_new_session": True,
+            }
+            if preexec_fn is not None:
+                run_kwargs["preexec_fn"] = preexec_fn
+            try:
+                return_code, timed_out = run_streaming(
+                    command,
+                    capture=capture,
+                    timeout=timeout_seconds,
+                    **run_kwargs,
+                )
+            except OSError:
+                # 解释器无法启动（被删除/替换等），作废探测缓存后抛出
+                _invalidate_probe_cache(python_cmd)
+                raise
+    finally:
+        capture.close()
+    stdout = capture.stdout
+    stderr = capture.stderr
 
-    stdout_saved: str | None = None
-    stderr_saved: str | None = None
-    if stdout_file:
-        stdout_safe = guard.resolve_and_validate(stdout_file)
-        stdout_safe.parent.mkdir(parents=True, exist_ok=True)
-        stdout_safe.write_text(stdout, encoding="utf-8")
-        stdout_saved = str(stdout_safe.relative_to(guard.workspace_root))
-    if stderr_file:
-        stderr_safe = guard.resolve_and_validate(stderr_file)
-        stderr_safe.parent.mkdir(parents=True, exist_ok=True)
-        stderr_safe.write_text(stderr, encoding="utf-8")
-        stderr_saved = str(stderr_safe.relative_to(guard.workspace_root))
+    stdout_saved = str(stdout_safe.relative_to(guard.workspace_root)) if stdout_safe else None
+    stderr_saved = str(stderr_safe.relative_to(guard.workspace_root)) if stderr_safe else None
 
     if timed_out:
         status = "timed_out"
@@ -1071,6 +1284,9 @@ def _execute_script(
         status = "success"
     else:
         status = "failed"
+        # 导入类失败可能是解释器环境变化（依赖被卸载等），下次运行重新探测
+        if _ENV_FAILURE_RE.search(stderr):
+            _invalidate_probe_cache(python_cmd)
         
     cow_mapping = {}
     if cow_log_path.exists():
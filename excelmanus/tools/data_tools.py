@@ -4,9 +4,14 @@ from __future__ import annotations
 
 import functools
 import json
+import os
+import re
 import shutil
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
 from datetime import date, datetime
-from typing import Any
+from typing import Any, Callable, Iterator, NamedTuple
 
 import pandas as pd
 
@@ -16,6 +21,17 @@ from excelmanus.logger import get_logger
 from excelmanus.security import FileAccessGuard
 from excelmanus.tools._guard_ctx import get_guard as _get_ctx_guard
 from excelmanus.tools._helpers import check_file_exists, get_worksheet, resolve_sheet_name
+from excelmanus.tools._frame_diff import diff_frames
+from excelmanus.tools._read_cache import (
+    Guarded,
+    ParsedFileCache,
+    get_read_cache,
+    invalidate_file,
+    set_read_cache,
+)
+from excelmanus.tools._sheet_probe import count_csv_rows, count_sheet_rows
+from excelmanus.tools._sidecar import get_sidecar
+from excelmanus.tools._value_index import lookup_file_index
 from excelmanus.tools.registry import ToolDef
 
 logger = get_logger("tools.data")
@@ -203,6 +219,226 @@ def init_guard(workspace_root: str) -> None:
     _guard = FileAccessGuard(workspace_root)
 
 
+# ── 解析缓存（同一文件版本只解析一次） ─────────────────────
+
+
+def _load_full_workbook(safe_path: Any, *, data_only: bool = True) -> Guarded[Any]:
+    """加载完整对象模型的 workbook（按文件版本缓存）。
+
+    openpyxl 完整模式非线程安全（访问未缓存坐标会改写内部字典），
+    而工具调用在工作线程中并行执行，因此返回带锁的共享实例：
+    调用方只能在持有 ``.lock`` 期间读取 ``.value``，且遍历时不得越过
+    ``ws.max_row`` / ``ws.max_column``。
+    """
+    from openpyxl import load_workbook
+
+    return get_read_cache().get_or_load(
+        safe_path, "workbook", (bool(data_only),),
+        lambda: Guarded(load_workbook(safe_path, read_only=False, data_only=data_only)),
+    )
+
+
+def _convert_raw_cell(cell: Any) -> Any:
+    """按 pandas openpyxl 引擎的规则转换单元格值，保证与 pd.read_excel 结果一致。"""
+    from openpyxl.cell.cell import TYPE_ERROR, TYPE_NUMERIC
+
+    value = cell.value
+    if value is None:
+        return ""
+    if cell.data_type == TYPE_ERROR:
+        return float("nan")
+    if cell.data_type == TYPE_NUMERIC:
+        as_int = int(value)
+        return as_int if as_int == value else float(value)
+    return value
+
+
+class _SheetScan(NamedTuple):
+    """一次 read_only 流式扫描的结果，供表头检测与 DataFrame 构建共用。"""
+
+    rows: list[list[Any]]  # 按 pandas 规则转换的原始行（已裁尾部空值/空行）
+    header_rows: list[list[Any]]  # 前 _HEADER_SCAN_ROWS 行的规范化值（表头检测用）
+    max_row: int | None  # 工作表声明的尺寸（dimension），缺失时为 None
+    max_column: int | None
+    merged: list[tuple[int, int, int, int]]  # 合并区域 (min_col, min_row, max_col, max_row)
+
+
+# _share_scans() 作用域内已完成的扫描：超出缓存预算的大表在一次调用内也只解析一次
+_shared_scans: ContextVar[dict[tuple, _SheetScan] | None] = ContextVar(
+    "excelmanus_shared_scans", default=None,
+)
+
+_MERGE_REF_RE = re.compile(rb'<(?:\w+:)?mergeCell\b[^>]*?\bref="([A-Za-z]+[0-9]+(?::[A-Za-z]+[0-9]+)?)"')
+_MERGE_SCAN_CHUNK = 1 << 20
+
+
+def _read_only_merged_ranges(ws: Any) -> list[tuple[int, int, int, int]]:
+    """直接从 read_only 工作表的 XML 中提取合并区域。
+
+    read_only 模式不解析 ``<mergeCells>``；为避免仅为合并信息加载完整对象模型，
+    这里按块流式扫描工作表 XML，只匹配 ``mergeCell`` 的 ref 属性。
+    """
+    from openpyxl.utils.cell import range_boundaries
+
+    ranges: list[tuple[int, int, int, int]] = []
+    tail = b""
+    with ws._get_source() as src:
+        while True:
+            chunk = src.read(_MERGE_SCAN_CHUNK)
+            if not chunk:
+                break
+            buf = tail + chunk
+            last_end = 0
+            if b"mergeCell" in buf:
+                for match in _MERGE_REF_RE.finditer(buf):
+                    ranges.append(range_boundaries(match.group(1).decode("ascii")))
+                    last_end = match.end()
+            # 保留块尾，避免标签被切分在两个块之间
+            tail = buf[max(last_end, len(buf) - 256):]
+    return ranges
+
+
+def _sheet_row_limit(header: int | None, nrows: int | None) -> int | None:
+    """计算一次扫描需要读取的行数上限，None 表示整表。
+
+    至少覆盖表头检测窗口（前 _HEADER_SCAN_ROWS 行），使表头检测、
+    DataFrame 构建与 Unnamed 回退（header 不超过检测窗口）落在同一缓存条目上。
+    """
+    if nrows is None:
+        return None
+    return max((header or 0) + 1, _HEADER_SCAN_ROWS) + nrows
+
+
+def _scan_sheet(
+    safe_path: Any, sheet_name: str | int | None, max_row: int | None,
+) -> _SheetScan:
+    """以 read_only 模式流式读取工作表前 ``max_row`` 行（按文件版本 + sheet + 行数缓存）。
+
+    sheet_name 语义与 ``pd.read_excel`` 一致：None/0 为第一个工作表，
+    名称不存在时抛出 ValueError。
+    """
+    from openpyxl import load_workbook
+
+    def _load() -> _SheetScan:
+        wb = load_workbook(safe_path, read_only=True, data_only=True)
+        try:
+            if sheet_name is None or isinstance(sheet_name, int):
+                ws = wb.worksheets[sheet_name or 0]
+            elif sheet_name in wb.sheetnames:
+                ws = wb[sheet_name]
+            else:
+                raise ValueError(f"Worksheet named '{sheet_name}' not found")
+            dim_rows, dim_cols = ws.max_row, ws.max_column
+            merged = _read_only_merged_ranges(ws)
+            # 与 pandas openpyxl 引擎一致：不信任 dimension 声明，按实际内容读取
+            ws.reset_dimensions()
+            rows: list[list[Any]] = []
+            header_rows: list[list[Any]] = []
+            last_non_empty = -1
+            for idx, row in enumerate(ws.iter_rows(max_row=max_row)):
+                if idx < _HEADER_SCAN_ROWS:
+                    header_rows.append(
+                        [_normalize_cell(c.value) for c in row[:_HEADER_SCAN_COLS]]
+                    )
+                converted = [_convert_raw_cell(c) for c in row]
+                while converted and converted[-1] == "":
+                    converted.pop()
+                if converted:
+                    last_non_empty = idx
+                rows.append(converted)
+        finally:
+            wb.close()
+        return _SheetScan(rows[: last_non_empty + 1], header_rows, dim_rows, dim_cols, merged)
+
+    shared = _shared_scans.get()
+    key = (str(safe_path), sheet_name, max_row)
+    if shared is not None and key in shared:
+        return shared[key]
+    scan = get_read_cache().get_or_load(
+        safe_path, "sheet_scan", (sheet_name, max_row), _load,
+    )
+    if shared is not None:
+        shared[key] = scan
+    return scan
+
+
+@contextmanager
+def _share_scans() -> Iterator[None]:
+    """作用域内复用已完成的扫描结果（不受解析缓存预算影响），可嵌套。"""
+    if _shared_scans.get() is not None:
+        yield
+        return
+    token = _shared_scans.set({})
+    try:
+        yield
+    finally:
+        _shared_scans.reset(token)
+
+
+def _load_raw_sheet_rows(
+    safe_path: Any, sheet_name: str | int | None, max_row: int | None = None,
+) -> list[list[Any]]:
+    """返回工作表原始行（见 :func:`_scan_sheet`），``max_row`` 为 None 时读取整表。
+
+    每行已裁掉尾部空单元格、末尾空行已去除，但未补齐列宽——补齐依赖
+    读取的行数，由 :func:`_read_excel_frame` 按需完成。
+    """
+    return _scan_sheet(safe_path, sheet_name, max_row).rows
+
+
+def _read_excel_frame(**kwargs: Any) -> pd.DataFrame:
+    """``pd.read_excel`` 的等价替代：基于流式扫描的原始行构建 DataFrame。
+
+    接受 :func:`_build_read_kwargs` 生成的参数（io / sheet_name / header / nrows）。
+    指定 nrows 时只读取所需的前若干行；不同 header 的重试复用同一次扫描，
+    不再重复解析 xlsx。
+    """
+    from pandas.errors import EmptyDataError
+    from pandas.io.parsers import TextParser
+
+    header = kwargs.get("header", 0)
+    nrows = kwargs.get("nrows")
+    raw_rows = _load_raw_sheet_rows(
+        kwargs["io"], kwargs.get("sheet_name"), _sheet_row_limit(header, nrows),
+    )
+    if nrows is not None:
+        raw_rows = raw_rows[: (1 + (header or 0)) + nrows]
+    end = len(raw_rows)
+    while end > 0 and not raw_rows[end - 1]:
+        end -= 1
+    if end == 0:
+        return pd.DataFrame()
+    width = max(len(r) for r in raw_rows[:end])
+    data = [r + [""] * (width - len(r)) for r in raw_rows[:end]]
+    try:
+        parser = TextParser(data, header=header, nrows=nrows, skip_blank_lines=False)
+        return parser.read(nrows=nrows)
+    except EmptyDataError:
+        return pd.DataFrame()
+
+
+def _get_sheet_names(safe_path: Any) -> list[str]:
+    """读取工作表名列表（按文件版本缓存）。"""
+    from openpyxl import load_workbook
+
+    def _load() -> list[str]:
+        wb = load_workbook(safe_path, read_only=True, data_only=True)
+        try:
+            return list(wb.sheetnames)
+        finally:
+            wb.close()
+
+    return list(get_read_cache().get_or_load(safe_path, "sheet_names", (), _load))
+
+
+def _get_sheet_rows(safe_path: Any, ws: Any) -> list[tuple[Any, ...]]:
+    """读取 read_only 工作表的全部行值（按文件版本 + sheet 缓存）。"""
+    return get_read_cache().get_or_load(
+        safe_path, "sheet_rows", (ws.title,),
+        lambda: list(ws.iter_rows(min_row=1, values_only=True)),
+    )
+
+
 def _is_date_like(value: Any) -> bool:
     """判断值是否为日期/时间类型。"""
     return isinstance(value, (date, datetime, pd.Timestamp))
@@ -272,60 +508,69 @@ def _is_form_type_document(
     Returns:
         (is_form_document, reason) 元组
     """
-    try:
-        from openpyxl import load_workbook
-        wb = load_workbook(safe_path, read_only=False, data_only=True)
-    except Exception:
+    scan = _scan_for_detection(safe_path, sheet_name, max_scan, 0)
+    if scan is None:
         return False, ""
+    return _form_type_from_scan(scan, max_scan)
 
+
+def _scan_for_detection(
+    safe_path: Any, sheet_name: str | None, max_scan: int, nrows: int | None,
+) -> _SheetScan | None:
+    """为表头/表单检测取得工作表扫描结果；sheet 名支持模糊匹配，失败返回 None。"""
+    limit = None if nrows is None else max(max_scan, _HEADER_SCAN_ROWS) + nrows
     try:
-        if sheet_name:
-            resolved = resolve_sheet_name(sheet_name, wb.sheetnames)
-            ws = wb[resolved] if resolved else wb.active
-        else:
-            ws = wb.active
-        if ws is None:
-            return False, ""
+        return _scan_sheet(safe_path, sheet_name, limit)
+    except ValueError:
+        pass
+    except Exception:
+        return None
+    try:
+        resolved = resolve_sheet_name(sheet_name, _get_sheet_names(safe_path))
+        if resolved is None or resolved == sheet_name:
+            return None
+        return _scan_sheet(safe_path, resolved, limit)
+    except Exception:
+        return None
 
-        max_row = min(max_scan, ws.max_row or max_scan)
-        max_col = ws.max_column or 10
 
-        # 统计合并单元格占比
-        total_cells = max_row * max_col
-        merged_cells = 0
-        for merged_range in ws.merged_cells.ranges:
-            merged_cells += (merged_range.max_row - merged_range.min_row + 1) * \
-                           (merged_range.max_col - merged_range.min_col + 1)
+def _form_type_from_scan(scan: _SheetScan, max_scan: int) -> tuple[bool, str]:
+    """按合并单元格占比与标签行占比判断工作表是否为表单类文档。"""
+    max_row = min(max_scan, scan.max_row or max_scan)
+    max_col = scan.max_column or 10
 
-        merged_ratio = merged_cells / max(total_cells, 1)
+    # 统计合并单元格占比
+    total_cells = max_row * max_col
+    merged_cells = 0
+    for min_col, min_row, merged_max_col, merged_max_row in scan.merged:
+        merged_cells += (merged_max_row - min_row + 1) * (merged_max_col - min_col + 1)
 
-        # 统计标签行（包含表单标签关键词的非空行）占比
-        label_rows = 0
-        total_scannable_rows = 0
+    merged_ratio = merged_cells / max(total_cells, 1)
 
-        for row in ws.iter_rows(min_row=1, max_row=max_scan, min_col=1, max_col=max_col, values_only=True):
-            row_values = [_normalize_cell(c) for c in row]
-            non_empty = [v for v in row_values if v is not None]
+    # 统计标签行（包含表单标签关键词的非空行）占比
+    label_rows = 0
+    total_scannable_rows = 0
 
-            if len(non_empty) >= 2:  # 至少2个非空单元格才计入
-                total_scannable_rows += 1
-                # 检查是否包含表单标签关键词（精确匹配单元格值，避免数据行误判）
-                cell_texts = {str(v).strip() for v in non_empty if isinstance(v, str)}
-                if any(ct in _FORM_LABEL_KEYWORDS for ct in cell_texts):
-                    label_rows += 1
+    for row_values in scan.header_rows[:max_row]:
+        non_empty = [v for v in row_values[:max_col] if v is not None]
 
-        label_ratio = label_rows / max(total_scannable_rows, 1)
+        if len(non_empty) >= 2:  # 至少2个非空单元格才计入
+            total_scannable_rows += 1
+            # 检查是否包含表单标签关键词（精确匹配单元格值，避免数据行误判）
+            cell_texts = {str(v).strip() for v in non_empty if isinstance(v, str)}
+            if any(ct in _FORM_LABEL_KEYWORDS for ct in cell_texts):
+                label_rows += 1
 
-        # 判断逻辑
-        if merged_ratio > _FORM_MERGED_CELL_RATIO_THRESHOLD:
-            return True, f"合并单元格占比 {merged_ratio:.1%} 超过阈值 {_FORM_MERGED_CELL_RATIO_THRESHOLD:.1%}"
+    label_ratio = label_rows / max(total_scannable_rows, 1)
 
-        if label_ratio > _FORM_LABEL_RATIO_THRESHOLD:
-            return True, f"表单标签行占比 {label_ratio:.1%} 超过阈值 {_FORM_LABEL_RATIO_THRESHOLD:.1%}"
+    # 判断逻辑
+    if merged_ratio > _FORM_MERGED_CELL_RATIO_THRESHOLD:
+        return True, f"合并单元格占比 {merged_ratio:.1%} 超过阈值 {_FORM_MERGED_CELL_RATIO_THRESHOLD:.1%}"
 
-        return False, ""
-    finally:
-        wb.close()
+    if label_ratio > _FORM_LABEL_RATIO_THRESHOLD:
+        return True, f"表单标签行占比 {label_ratio:.1%} 超过阈值 {_FORM_LABEL_RATIO_THRESHOLD:.1%}"
+
+    return False, ""
 
 
 def _header_row_score(
@@ -399,6 +644,8 @@ def _detect_header_row(
     sheet_name: str | None,
     max_scan: int = _HEADER_SCAN_ROWS,
     max_scan_columns: int = _HEADER_SCAN_COLS,
+    *,
+    nrows: int | None = 0,
 ) -> int | None:
     """启发式检测 header 行号（0-indexed）。
 
@@ -408,60 +655,43 @@ def _detect_header_row(
     3. 对每一行按"文本占比、关键字、唯一性、数据行特征"打分；
     4. 选择分数最高者作为表头。
 
+    ``nrows`` 传入随后读取 DataFrame 时的行数（None 为整表），
+    使检测与 :func:`_read_excel_frame` 复用同一次流式扫描；默认只读检测窗口。
+
     Returns:
         检测到的 header 行号（从0开始），无法确定时返回 None。
         返回 -1 表示检测为表单类文档，不应使用 header。
     """
+    scan = _scan_for_detection(safe_path, sheet_name, max_scan, nrows)
+    if scan is None:
+        return None
+
     # 首先检测是否为表单类文档
-    is_form, reason = _is_form_type_document(safe_path, sheet_name, max_scan)
+    is_form, reason = _form_type_from_scan(scan, max_scan)
     if is_form:
         logger.info("检测为表单类文档：%s", reason)
         return -1  # 特殊标记：表单类文档，不使用 header
 
-    try:
-        from openpyxl import load_workbook
-        wb = load_workbook(safe_path, read_only=False, data_only=True)
-    except Exception:
-        return None
-
-    try:
-        if sheet_name:
-            resolved = resolve_sheet_name(sheet_name, wb.sheetnames)
-            if resolved:
-                ws = wb[resolved]
-            else:
-                ws = wb.active
-        else:
-            ws = wb.active
-        if ws is None:
-            return None
+    return _header_row_from_scan(scan, max_scan, max_scan_columns)
 
-        # 收集宽合并行（列跨度 > 50% 总列数）
-        scan_cols = max(1, min(max_scan_columns, ws.max_column or max_scan_columns))
-        wide_merged_rows: set[int] = set()
-        for merged_range in ws.merged_cells.ranges:
-            col_span = merged_range.max_col - merged_range.min_col + 1
-            if col_span > scan_cols * 0.5:
-                for r in range(merged_range.min_row, merged_range.max_row + 1):
-                    if r <= max_scan:
-                        wide_merged_rows.add(r - 1)  # 转为 0-indexed
 
-        rows: list[list[Any]] = []
-        for row in ws.iter_rows(
-            min_row=1,
-            max_row=max_scan,
-            min_col=1,
-            max_col=scan_cols,
-            values_only=True,
-        ):
-            rows.append([_normalize_cell(c) for c in row])
+def _header_row_from_scan(scan: _SheetScan, max_scan: int, max_scan_columns: int) -> int | None:
+    """基于扫描结果的前若干行，跳过宽合并标题行后猜测 header 行号。"""
+    # 收集宽合并行（列跨度 > 50% 总列数）
+    scan_cols = max(1, min(max_scan_columns, scan.max_column or max_scan_columns))
+    wide_merged_rows: set[int] = set()
+    for min_col, min_row, max_col, max_row in scan.merged:
+        col_span = max_col - min_col + 1
+        if col_span > scan_cols * 0.5:
+            for r in range(min_row, max_row + 1):
+                if r <= max_scan:
+                    wide_merged_rows.add(r - 1)  # 转为 0-indexed
 
-        if not rows:
-            return None
+    rows = [row[:scan_cols] for row in scan.header_rows[:max_scan]]
+    if not rows:
+        return None
 
-        return _guess_header_row_from_rows(rows, max_scan=max_scan, skip_rows=wide_merged_rows)
-    finally:
-        wb.close()
+    return _guess_header_row_from_rows(rows, max_scan=max_scan, skip_rows=wide_merged_rows)
 
 
 def _build_read_kwargs(
@@ -500,7 +730,7 @@ def _build_read_kwargs(
             kwargs["header"] = header_row
     else:
         # 启发式自动检测 header 行（仅当用户未显式指定时）
-        detected = _detect_header_row(safe_path, sheet_name)
+        detected = _detect_header_row(safe_path, sheet_name, nrows=max_rows)
         if detected is not None:
             if detected == -1:
                 # 表单类文档，不使用 header
@@ -548,91 +778,104 @@ def _resolve_formula_columns(
         df.attrs["formula_resolution"] = formula_meta
         return df
 
-    wb = load_workbook(safe_path, data_only=False, read_only=True)
-    try:
+    excel_header_row = header_row + 1  # 0-indexed → 1-indexed
+    first_data_row = excel_header_row + 1
+    col_names = list(df.columns)
+
+    def _load_formula_row() -> tuple[Any, ...] | None:
+        wb = load_workbook(safe_path, data_only=False, read_only=True)
         try:
-            ws = get_worksheet(wb, sheet_name)
-        except ValueError:
-            df.attrs["formula_resolution"] = formula_meta
-            return df
-
-        excel_header_row = header_row + 1  # 0-indexed → 1-indexed
-        first_data_row = excel_header_row + 1
-
-        # 列字母 → DataFrame 列索引映射
-        col_names = list(df.columns)
-        letter_to_idx: dict[str, int] = {}
-        for i in range(len(col_names)):
-            letter_to_idx[get_column_letter(i + 1)] = i
-
-        cell_ref_pattern = re.compile(r'([A-Z]+)(\d+)')
-        data_row_str = str(first_data_row)
-
-        resolved_cols: set[str] = set()
-        unresolved: dict[str, str] = {}
-
-        for col_idx in nan_cols_idx:
-            col_name = str(col_names[col_idx])
-            cell = ws.cell(row=first_data_row, column=col_idx + 1)
-            formula = cell.value
-            if not isinstance(formula, str) or not formula.startswith('='):
-                continue
+            try:
+                ws = get_worksheet(wb, sheet_name)
+            except ValueError:
+                return None
+            for row in ws.iter_rows(
+                min_row=first_data_row, max_row=first_data_row,
+                min_col=1, max_col=len(col_names), values_only=True,
+            ):
+                return tuple(row)
+            return ()
+        finally:
+            wb.close()
+
+    formula_row = get_read_cache().get_or_load(
+        safe_path, "formula_row", (sheet_name, first_data_row, len(col_names)),
+        _load_formula_row,
+    )
+    if formula_row is None:
+        df.attrs["formula_resolution"] = formula_meta
+        return df
 
-            formula_body = formula[1:]
+    # 列字母 → DataFrame 列索引映射
+    letter_to_idx: dict[str, int] = {}
+    for i in range(len(col_names)):
+        letter_to_idx[get_column_letter(i + 1)] = i
 
-            # 提取所有单元格引用
-            refs = cell_ref_pattern.findall(formula_body)
-            if not refs:
-                unresolved[col_name] = "不支持的公式结构（无单元格引用）"
-                continue
+    cell_ref_pattern = re.compile(r'([A-Z]+)(\d+)')
+    data_row_str = str(first_data_row)
 
-            # 仅处理同行引用
-            if not all(row_num == data_row_str for _, row_num in refs):
-                unresolved[col_name] = "不支持跨行/跨区引用公式"
-                continue
+    resolved_cols: set[str] = set()
+    unresolved: dict[str, str] = {}
 
-            # 检查所有引用列是否存在
-            all_valid = True
-            for letter, _ in refs:
-                if letter not in letter_to_idx:
-                    all_valid = False
-                    break
-            if not all_valid:
-                unresolved[col_name] = "公式引用超出可读列范围"
-                continue
+    for col_idx in nan_cols_idx:
+        col_name = str(col_names[col_idx])
+        formula = formula_row[col_idx] if col_idx < len(formula_row) else None
+        if not isinstance(formula, str) or not formula.startswith('='):
+            continue
 
-            # 构建求值表达式：将单元格引用替换为变量名
-            expr = formula_body
-            namespace: dict[str, Any] = {}
-            # 按字母长度降序替换，避免 A 替换 AA 的子串问题
-            sorted_refs = sorted(set(refs), key=lambda r: (-len(r[0]), r[0]))
-            for letter, row_num in sorted_refs:
-                ref_idx = letter_to_idx[letter]
-                var_name = f'_c{ref_idx}'
-                namespace[var_name] = df.iloc[:, ref_idx]
-                expr = expr.replace(f'{letter}{row_num}', var_name)
+        formula_body = formula[1:]
 
-            try:
-                result = eval(expr, {"__builtins__": {}}, namespace)  # noqa: S307
-                if isinstance(result, pd.Series):
-                    df.iloc[:, col_idx] = result
-                    resolved_cols.add(col_name)
-                    unresolved.pop(col_name, None)
-                    logger.info(
-                        "公式列 '%s' 求值成功 (formula=%s)",
-                        col_names[col_idx], formula,
-                    )
-                else:
-                    unresolved[col_name] = "公式求值未返回可用序列"
-            except Exception:
-                unresolved[col_name] = "公式求值失败"
-                logger.debug(
-                    "公式列 '%s' 求值失败 (formula=%s), 已跳过",
+        # 提取所有单元格引用
+        refs = cell_ref_pattern.findall(formula_body)
+        if not refs:
+            unresolved[col_name] = "不支持的公式结构（无单元格引用）"
+            continue
+
+        # 仅处理同行引用
+        if not all(row_num == data_row_str for _, row_num in refs):
+            unresolved[col_name] = "不支持跨行/跨区引用公式"
+            continue
+
+        # 检查所有引用列是否存在
+        all_valid = True
+        for letter, _ in refs:
+            if letter not in letter_to_idx:
+                all_valid = False
+                break
+        if not all_valid:
+            unresolved[col_name] = "公式引用超出可读列范围"
+            continue
+
+        # 构建求值表达式：将单元格引用替换为变量名
+        expr = formula_body
+        namespace: dict[str, Any] = {}
+        # 按字母长度降序替换，避免 A 替换 AA 的子串问题
+        sorted_refs = sorted(set(refs), key=lambda r: (-len(r[0]), r[0]))
+        for letter, row_num in sorted_refs:
+            ref_idx = letter_to_idx[letter]
+            var_name = f'_c{ref_idx}'
+            namespace[var_name] = df.iloc[:, ref_idx]
+            expr = expr.replace(f'{letter}{row_num}', var_name)
+
+        try:
+            result = eval(expr, {"__builtins__": {}}, namespace)  # noqa: S307
+            if isinstance(result, pd.Series):
+                df.iloc[:, col_idx] = result
+                resolved_cols.add(col_name)
+                unresolved.pop(col_name, None)
+                logger.info(
+                    "公式列 '%s' 求值成功 (formula=%s)",
                     col_names[col_idx], formula,
                 )
-                continue
-    finally:
-        wb.close()
+            else:
+                unresolved[col_name] = "公式求值未返回可用序列"
+        except Exception:
+            unresolved[col_name] = "公式求值失败"
+            logger.debug(
+                "公式列 '%s' 求值失败 (formula=%s), 已跳过",
+                col_names[col_idx], formula,
+            )
+            continue
 
     formula_meta["resolved_columns"] = sorted(resolved_cols)
     formula_meta["unresolved_columns"] = sorted(unresolved)
@@ -643,14 +886,22 @@ def _resolve_formula_columns(
 
 
 def _get_sheet_total_rows(safe_path: Any, sheet_name: str | None) -> int | None:
-    """快速获取 sheet/CSV 总行数（不加载全部数据）。"""
+    """快速获取 sheet/CSV 总行数（不加载全部数据）。
+
+    优先读取 xlsx 内工作表 XML 的 dimension / CSV 换行字节数，
+    无法探测时才回退到 openpyxl 只读打开工作簿。
+    """
     if _is_csv_file(safe_path):
         try:
-            with open(safe_path, encoding="utf-8", errors="replace") as f:
-                return max(sum(1 for _ in f) - 1, 0)  # 减去 header 行
+            return count_csv_rows(safe_path)
         except Exception:
             return None
-    try:
+
+    probed = count_sheet_rows(safe_path, sheet_name)
+    if probed is not None:
+        return probed
+
+    def _load() -> int:
         from openpyxl import load_workbook
         wb = load_workbook(safe_path, read_only=True, data_only=True)
         try:
@@ -661,6 +912,9 @@ def _get_sheet_total_rows(safe_path: Any, sheet_name: str | None) -> int | None:
             return ws.max_row or 0
         finally:
             wb.close()
+
+    try:
+        return get_read_cache().get_or_load(safe_path, "total_rows", (sheet_name,), _load)
     except Exception:
         return None
 
@@ -691,7 +945,20 @@ def _read_csv_df(
     max_rows: int | None = None,
     header_row: int | None = None,
 ) -> tuple[pd.DataFrame, int]:
-    """读取 CSV/TSV 文件为 DataFrame，含 header 自动检测。"""
+    """读取 CSV/TSV 文件为 DataFrame，含 header 自动检测（按文件版本缓存）。"""
+    df, effective_header = get_read_cache().get_or_load(
+        safe_path, "csv", (max_rows, header_row),
+        lambda: _parse_csv_df(safe_path, max_rows=max_rows, header_row=header_row),
+    )
+    return df.copy(), effective_header
+
+
+def _parse_csv_df(
+    safe_path: Any,
+    max_rows: int | None = None,
+    header_row: int | None = None,
+) -> tuple[pd.DataFrame, int]:
+    """解析 CSV/TSV（不经缓存），供 :func:`_read_csv_df` 调用。"""
     from pathlib import Path
 
     p = Path(safe_path) if not isinstance(safe_path, Path) else safe_path
@@ -728,6 +995,10 @@ def _read_df(
     当检测为表单类文档时（header_row=-1），使用 header=None 读取全部数据，
     不执行 Unnamed 回退逻辑。
 
+    xlsx 只解析一次：表头检测、DataFrame 构建和 Unnamed 回退共用同一次
+    read_only 流式扫描（见 :func:`_scan_sheet`），指定 max_rows 时只读取前若干行。
+    结果按文件版本缓存为 DataFrame（远比原始行 / workbook 紧凑，大文件也能常驻）。
+
     Returns:
         (DataFrame, effective_header_row) 元组。
         effective_header 为 -1 表示表单类文档，None 表示使用默认 header=0。
@@ -736,6 +1007,29 @@ def _read_df(
     if _is_csv_file(safe_path):
         return _read_csv_df(safe_path, max_rows=max_rows, header_row=header_row)
 
+    # 上传时已生成列式旁路文件：直接内存映射读取，跳过 xlsx 解析。
+    # 截断读取（max_rows）的类型推断基于部分行，与整表结果可能不同，仍走原路径。
+    if max_rows is None:
+        sidecar = get_sidecar()
+        hit = sidecar.load_frame(safe_path, sheet_name) if sidecar is not None else None
+        if hit is not None and (header_row is None or header_row == hit[1]):
+            return hit
+
+    with _share_scans():
+        df, effective_header = get_read_cache().get_or_load(
+            safe_path, "frame", (sheet_name, max_rows, header_row),
+            lambda: _parse_excel_df(safe_path, sheet_name, max_rows=max_rows, header_row=header_row),
+        )
+    return df.copy(), effective_header
+
+
+def _parse_excel_df(
+    safe_path: Any,
+    sheet_name: str | None,
+    max_rows: int | None = None,
+    header_row: int | None = None,
+) -> tuple[pd.DataFrame, int]:
+    """解析 xlsx 为 DataFrame（不经 frame 缓存），供 :func:`_read_df` 调用。"""
     kwargs = _build_read_kwargs(safe_path, sheet_name, max_rows=max_rows, header_row=header_row)
     # 注意=None 时 kwargs.get("header") 返回 None，不是 0
     # 我们需要区分：用户指定 header=None（不使用header）和表单类文档（header=None）
@@ -750,7 +1044,7 @@ def _read_df(
             effective_header = 0  # 用户显式指定 header=None，使用默认值
     # 移除内部标记，避免传给 pd.read_excel
     kwargs.pop("_form_type_document", None)
-    df = pd.read_excel(**kwargs)
+    df = _read_excel_frame(**kwargs)
 
     # 表单类文档（header=-1）不使用 Unnamed 回退逻辑
     # 仅在自动检测模式下（用户未显式指定 header_row）执行 Unnamed 回退
@@ -767,7 +1061,7 @@ def _read_df(
             for try_header in range(effective_header + 1, min(effective_header + 6, 30)):
                 retry_kwargs = {**kwargs, "header": try_header}
                 try:
-                    df_retry = pd.read_excel(**retry_kwargs)
+                    df_retry = _read_excel_frame(**retry_kwargs)
                 except Exception:
                     break
                 if df_retry.empty:
@@ -975,20 +1269,19 @@ def read_excel(
     # 合并单元格警告：高合并率时提醒 LLM 注意值传播
     if not _is_csv_file(safe_path):
         try:
-            from openpyxl import load_workbook as _lw
-            _wb_mc = _lw(safe_path, read_only=False, data_only=True)
-            try:
+            _shared_mc = _load_full_workbook(safe_path, data_only=True)
+            with _shared_mc.lock:
+                _wb_mc = _shared_mc.value
                 _ws_mc = (
                     _wb_mc[sheet_name]
                     if sheet_name and sheet_name in _wb_mc.sheetnames
                     else _wb_mc.active
                 )
-                if _ws_mc is not None:
-                    _mc_summary = _collect_merged_cell_summary(_ws_mc)
-                    if _mc_summary:
-                        summary["merged_cell_summary"] = _mc_summary
-            finally:
-                _wb_mc.close()
+                _mc_summary = (
+                    _collect_merged_cell_summary(_ws_mc) if _ws_mc is not None else None
+                )
+            if _mc_summary:
+                summary["merged_cell_summary"] = _mc_summary
         except Exception:
             pass
 
@@ -1081,6 +1374,7 @@ def write_excel(file_path: str, data: list[dict], sheet_name: str = "Sheet1") ->
         sep = "\t" if p.suffix.lower() == ".tsv" else ","
         safe_path.parent.mkdir(parents=True, exist_ok=True)
         df.to_csv(safe_path, index=False, sep=sep)
+        invalidate_file(safe_path)
         return json.dumps(
             {"status": "success", "file": str(safe_path.name), "rows": len(df), "columns": len(df.columns)},
             ensure_ascii=False,
@@ -1104,6 +1398,7 @@ def write_excel(file_path: str, data: list[dict], sheet_name: str = "Sheet1") ->
     else:
         # 新文件：直接写入
         df.to_excel(safe_path, sheet_name=sheet_name, index=False)
+    invalidate_file(safe_path)
 
     return json.dumps(
         {"status": "success", "file": str(safe_path.name), "rows": len(df), "columns": len(df.columns)},
@@ -1410,6 +1705,7 @@ def transform_data(
         _sep = "\t" if _p.suffix.lower() == ".tsv" else ","
         out_safe.parent.mkdir(parents=True, exist_ok=True)
         df.to_csv(out_safe, index=False, sep=_sep)
+        invalidate_file(out_safe)
         return json.dumps({
             "status": "success",
             "file": str(out_safe.name),
@@ -1446,6 +1742,7 @@ def transform_data(
             df.to_excel(writer, index=False, sheet_name=target_sheet)
     else:
         df.to_excel(out_safe, index=False, sheet_name=target_sheet)
+    invalidate_file(out_safe)
 
     result = {
         "status": "success",
@@ -1487,8 +1784,8 @@ def inspect_excel_files(
 ) -> str:
     """批量扫描目录下所有 Excel 文件，返回轻量级概览，可按需附加额外维度。
 
-    使用 openpyxl 只读模式，仅读取 sheet 元信息和少量预览行，
-    避免加载完整 DataFrame，适合快速了解工作区全貌。
+    直接解析 xlsx 内的 XML，仅读取 sheet 元信息和少量预览行（无法解析时
+    回退到 openpyxl 只读模式），避免加载完整 DataFrame，适合快速了解工作区全貌。
 
     Args:
         directory: 扫描目录（相对于工作目录），默认当前目录。
@@ -1509,6 +1806,7 @@ def inspect_excel_files(
 
     from openpyxl import load_workbook
     from excelmanus.tools._helpers import ensure_openpyxl_compatible as _compat
+    from excelmanus.tools._sheet_head import read_sheet_heads, read_sheet_names
 
     include_set: set[str] = set(include) if include else set()
     invalid_dims = include_set - set(_SCAN_FILES_DIMENSIONS)
@@ -1557,18 +1855,21 @@ def inspect_excel_files(
             if len(matched) >= max_files:
                 break
             try:
-                wb_peek = load_workbook(_compat(fp), read_only=True, data_only=True)
-                try:
-                    for sn in wb_peek.sheetnames:
-                        sn_lower = sn.lower()
-                        if sheet_lower and sheet_lower in sn_lower:
-                            matched.append(fp)
-                            break
-                        if search_lower and search_lower in sn_lower:
-                            matched.append(fp)
-                            break
-                finally:
-                    wb_peek.close()
+                peek_names = read_sheet_names(fp)
+                if peek_names is None:
+                    wb_peek = load_workbook(_compat(fp), read_only=True, data_only=True)
+                    try:
+                        peek_names = list(wb_peek.sheetnames)
+                    finally:
+                        wb_peek.close()
+                for sn in peek_names:
+                    sn_lower = sn.lower()
+                    if sheet_lower and sheet_lower in sn_lower:
+                        matched.append(fp)
+                        break
+                    if search_lower and search_lower in sn_lower:
+                        matched.append(fp)
+                        break
             except Exception:  # noqa: BLE001
                 continue
         excel_paths = matched
@@ -1622,29 +1923,48 @@ def inspect_excel_files(
                     }
                     sheets_info.append(csv_sheet)
             else:
-                # ── Excel 分支：用 openpyxl 读取 ──
-                wb = load_workbook(_compat(fp), read_only=not needs_full, data_only=True)
-                for sn in wb.sheetnames:
-                    ws = wb[sn]
-                    total_cols = ws.max_column or 0
-                    sheet_data: dict[str, Any] = {
-                        "name": sn,
-                        "rows": ws.max_row or 0,
-                        "columns": total_cols,
-                    }
-
-                    # 读取抽样行，用于表头识别与预览
-                    scan_rows = max(8, preview_rows + 8)
-                    scan_cols = max(1, min(total_cols if total_cols > 0 else _HEADER_SCAN_COLS, _HEADER_SCAN_COLS))
-                    rows_raw: list[list[Any]] = []
-                    for row in ws.iter_rows(
-                        min_row=1,
-                        max_row=scan_rows,
-                        min_col=1,
-                        max_col=scan_cols,
-                        values_only=True,
-                    ):
-                        rows_raw.append([_normalize_cell(c) for c in row])
+                # 读取抽样行，用于表头识别与预览
+                scan_rows = max(8, preview_rows + 8)
+                # ── Excel 分支：无额外维度时直接解析 XML 头部，否则用 openpyxl ──
+                heads = None
+                if not needs_full:
+                    heads = read_sheet_heads(
+                        fp, max_rows=scan_rows, max_cols=_HEADER_SCAN_COLS,
+                    )
+                wb = None
+                if heads is None:
+                    wb = load_workbook(_compat(fp), read_only=not needs_full, data_only=True)
+                    sheet_items = [(sn, None) for sn in wb.sheetnames]
+                else:
+                    sheet_items = [(head.name, head) for head in heads]
+                for sn, head in sheet_items:
+                    if head is not None:
+                        sheet_data: dict[str, Any] = {
+                            "name": sn,
+                            "rows": head.max_row,
+                            "columns": head.max_column,
+                        }
+                        rows_raw: list[list[Any]] = [
+                            [_normalize_cell(c) for c in row] for row in head.rows
+                        ]
+                    else:
+                        ws = wb[sn]
+                        total_cols = ws.max_column or 0
+                        sheet_data = {
+                            "name": sn,
+                            "rows": ws.max_row or 0,
+                            "columns": total_cols,
+                        }
+                        scan_cols = max(1, min(total_cols if total_cols > 0 else _HEADER_SCAN_COLS, _HEADER_SCAN_COLS))
+                        rows_raw = []
+                        for row in ws.iter_rows(
+                            min_row=1,
+                            max_row=scan_rows,
+                            min_col=1,
+                            max_col=scan_cols,
+                            values_only=True,
+                        ):
+                            rows_raw.append([_normalize_cell(c) for c in row])
 
                     if rows_raw:
                         header_idx = _guess_header_row_from_rows(rows_raw, max_scan=scan_rows)
@@ -1681,7 +2001,8 @@ def inspect_excel_files(
                             sheet_data["column_widths"] = _collect_column_widths(ws)
 
                     sheets_info.append(sheet_data)
-                wb.close()
+                if wb is not None:
+                    wb.close()
         except Exception as exc:  # noqa: BLE001
             file_info["error"] = f"无法读取: {exc}"
 
@@ -2680,15 +3001,11 @@ def _load_sheet_as_df(
     header_row: int | None = None,
 ) -> tuple[pd.DataFrame, list[str]]:
     """加载一个 sheet 为 DataFrame，返回 (df, sheet_names)。"""
-    from openpyxl import load_workbook
-
     if _is_csv_file(safe_path):
         df, _ = _read_csv_df(safe_path, max_rows=None, header_row=header_row)
         return df, ["Sheet1"]
 
-    wb = load_workbook(safe_path, read_only=True, data_only=True)
-    sheet_names = list(wb.sheetnames)
-    wb.close()
+    sheet_names = _get_sheet_names(safe_path)
 
     df, _ = _read_df(safe_path, sheet_name, max_rows=None, header_row=header_row)
     return df, sheet_names
@@ -2716,7 +3033,7 @@ def compare_excel(
         sheet_b: file_b 的工作表名（空字符串=第一个）
         ignore_style: 是否忽略样式差异（默认 True）
         key_columns: 关键列名列表（用于行匹配，为空则按行号对齐）
-        max_diffs: 最大差异数量（超出截断）
+        max_diffs: 差异明细上限（超出时 truncated=True；summary 统计始终为全量）
 
     Returns:
         JSON 格式的差异报告。
@@ -2747,18 +3064,12 @@ def compare_excel(
     _sheets_b_hint: list[str] = []
     if not _is_csv_file(safe_a):
         try:
-            from openpyxl import load_workbook as _lw
-            _wb = _lw(safe_a, read_only=True, data_only=True)
-            _sheets_a_hint = list(_wb.sheetnames)
-            _wb.close()
+            _sheets_a_hint = _get_sheet_names(safe_a)
         except Exception:
             pass
     if not _is_csv_file(safe_b):
         try:
-            from openpyxl import load_workbook as _lw2
-            _wb2 = _lw2(safe_b, read_only=True, data_only=True)
-            _sheets_b_hint = list(_wb2.sheetnames)
-            _wb2.close()
+            _sheets_b_hint = _get_sheet_names(safe_b)
         except Exception:
             pass
 
@@ -2791,149 +3102,18 @@ def compare_excel(
     sheets_only_a = sorted(set(sheets_a) - set(sheets_b)) if str(safe_a) != str(safe_b) else []
     sheets_only_b = sorted(set(sheets_b) - set(sheets_a)) if str(safe_a) != str(safe_b) else []
 
-    # ── 4. 数据对比 ──
-    cell_diffs: list[dict[str, Any]] = []
-    rows_added = 0
-    rows_deleted = 0
-    rows_modified = 0
-    total_cells_compared = 0
-
-    if key_columns and all(k in cols_a and k in cols_b for k in key_columns):
-        # ── 4B. 关键列匹配模式 ──
-        str_cols_a = {str(c): c for c in df_a.columns}
-        str_cols_b = {str(c): c for c in df_b.columns}
-
-        # 将 key_columns 映射回原始列名
-        key_a = [str_cols_a[k] for k in key_columns]
-        key_b = [str_cols_b[k] for k in key_columns]
-
-        df_a_keyed = df_a.set_index(key_a)
-        df_b_keyed = df_b.set_index(key_b)
-
-        all_keys = set(df_a_keyed.index.tolist()) | set(df_b_keyed.index.tolist())
-
-        for key_val in all_keys:
-            if len(cell_diffs) >= max_diffs:
-                break
-            key_label = str(key_val)
-            in_a = key_val in df_a_keyed.index
-            in_b = key_val in df_b_keyed.index
-
-            if in_a and not in_b:
-                rows_deleted += 1
-                continue
-            if not in_a and in_b:
-                rows_added += 1
-                continue
-
-            # 两边都有 → 对比 common_cols 中非 key 的列
-            row_a = df_a_keyed.loc[key_val]
-            row_b = df_b_keyed.loc[key_val]
-            # 处理 duplicate key 的情况：取第一行
-            if isinstance(row_a, pd.DataFrame):
-                row_a = row_a.iloc[0]
-            if isinstance(row_b, pd.DataFrame):
-                row_b = row_b.iloc[0]
-
-            row_changed = False
-            for col in common_cols:
-                if col in key_columns:
-                    continue
-                total_cells_compared += 1
-                val_a = _serialize_cell_value(row_a.get(col))
-                val_b = _serialize_cell_value(row_b.get(col))
-                if str(val_a) != str(val_b):
-                    row_changed = True
-                    if len(cell_diffs) < max_diffs:
-                        cell_diffs.append({
-                            "key": key_label,
-                            "column": col,
-                            "old": val_a,
-                            "new": val_b,
-                        })
-            if row_changed:
-                rows_modified += 1
-
-    else:
-        # ── 4A. 行号对齐模式 ──
-        rows_added = max(0, len(df_b) - len(df_a))
-        rows_deleted = max(0, len(df_a) - len(df_b))
-        min_rows = min(len(df_a), len(df_b))
-
-        # 大文件优化：先做行级 hash 快速过滤
-        use_hash_filter = min_rows > 10000
-        diff_row_indices: set[int] | None = None
-
-        if use_hash_filter and common_cols:
-            hash_a = df_a[list(df_a.columns)].iloc[:min_rows].astype(str).apply(
-                lambda r: hash(tuple(r)), axis=1
-            )
-            hash_b = df_b[list(df_b.columns)].iloc[:min_rows].astype(str).apply(
-                lambda r: hash(tuple(r)), axis=1
-            )
-            diff_row_indices = set((hash_a != hash_b).to_numpy().nonzero()[0])
-            logger.info(
-                "行级 hash 过滤：%d/%d 行有差异",
-                len(diff_row_indices), min_rows,
-            )
-
-        for row_idx in _builtin_range(min_rows):
-            if len(cell_diffs) >= max_diffs:
-                break
-            if diff_row_indices is not None and row_idx not in diff_row_indices:
-                total_cells_compared += len(common_cols)
-                continue
-
-            row_changed = False
-            for col in common_cols:
-                total_cells_compared += 1
-                orig_col_a = col_map_a.get(col)
-                orig_col_b = col_map_b.get(col)
-                val_a = _serialize_cell_value(
-                    df_a.at[row_idx, orig_col_a] if orig_col_a is not None else None
-                )
-                val_b = _serialize_cell_value(
-                    df_b.at[row_idx, orig_col_b] if orig_col_b is not None else None
-                )
-                if str(val_a) != str(val_b):
-                    row_changed = True
-                    if len(cell_diffs) < max_diffs:
-                        from openpyxl.utils import get_column_letter
-                        try:
-                            col_idx = list(str(c) for c in df_a.columns).index(col)
-                            cell_ref = f"{get_column_letter(col_idx + 1)}{row_idx + 2}"
-                        except (ValueError, IndexError):
-                            cell_ref = f"R{row_idx + 2}:{col}"
-                        cell_diffs.append({
-                            "cell": cell_ref,
-                            "old": val_a,
-                            "new": val_b,
-                        })
-            if row_changed:
-                rows_modified += 1
-
-        # 统计超出部分行的额外单元格
-        if len(df_b) > len(df_a):
-            for extra_idx in _builtin_range(len(df_a), min(len(df_b), len(df_a) + max_diffs)):
-                if len(cell_diffs) >= max_diffs:
-                    break
-                for col in cols_b:
-                    total_cells_compared += 1
-                    orig_col = col_map_b.get(col)
-                    val = _serialize_cell_value(df_b.at[extra_idx, orig_col] if orig_col is not None else None)
-                    if val is not None and str(val) != "":
-                        cell_diffs.append({
-                            "cell": f"R{extra_idx + 2}:{col}",
-                            "old": None,
-                            "new": val,
-                        })
+    # ── 4. 数据对比（向量化：行哈希过滤 + 逐列掩码，统计为全量） ──
+    use_keys = bool(key_columns) and all(k in cols_a and k in cols_b for k in key_columns)
+    diff = diff_frames(df_a, df_b, common_cols, key_columns=key_columns if use_keys else None)
+    rows_added = diff.rows_added
+    rows_deleted = diff.rows_deleted
+    cells_different = diff.cells_different
 
     # ── 5. 构建结果 ──
-    truncated = len(cell_diffs) >= max_diffs
-    cells_different = len(cell_diffs)
+    truncated = cells_different > max_diffs
 
-    # 选取前 10 个 sample_diffs 供 LLM 参考
-    sample_diffs = cell_diffs[:10]
+    # 选取前 10 个 sample_diffs 供 LLM 参考（只物化这部分明细）
+    sample_diffs = diff.head(min(10, max_diffs))
 
     is_same_file = str(safe_a) == str(safe_b)
     diff_mode = "cross_sheet" if is_same_file and (sheet_a or sheet_b) else "cross_file"
@@ -2946,11 +3126,12 @@ def compare_excel(
         "sheet_a": sheet_a or "(默认)",
         "sheet_b": sheet_b or "(默认)",
         "summary": {
-            "total_cells_compared": total_cells_compared,
+            "total_cells_compared": diff.total_cells_compared,
             "cells_different": cells_different,
             "rows_added": rows_added,
             "rows_deleted": rows_deleted,
-            "rows_modified": rows_modified,
+            "rows_modified": diff.rows_modified,
+            "column_stats": diff.column_stats,
             "columns_added": columns_added,
             "columns_deleted": columns_deleted,
             "sheets_only_in_a": sheets_only_a,
@@ -2960,6 +3141,12 @@ def compare_excel(
         "truncated": truncated,
     }
 
+    if diff.blank_key_rows_a or diff.blank_key_rows_b:
+        result["summary"]["blank_key_rows"] = {
+            "a": diff.blank_key_rows_a,
+            "b": diff.blank_key_rows_b,
+        }
+
     if cells_different == 0 and rows_added == 0 and rows_deleted == 0:
         result["hint"] = "两个文件（或 Sheet）的数据完全相同。"
     else:
@@ -2974,6 +3161,11 @@ def compare_excel(
             parts.append(f"新增列: {', '.join(columns_added)}")
         if columns_deleted:
             parts.append(f"删除列: {', '.join(columns_deleted)}")
+        if diff.blank_key_rows_a or diff.blank_key_rows_b:
+            parts.append(
+                f"关键列为空的行无法匹配（A {diff.blank_key_rows_a} 行、"
+                f"B {diff.blank_key_rows_b} 行，已计入删除/新增）"
+            )
         result["hint"] = f"共发现 {'、'.join(parts)}。完整 diff 已通过前端展示。"
 
     return json.dumps(result, ensure_ascii=False, indent=2, default=str)
@@ -3358,27 +3550,28 @@ def scan_excel_snapshot(
 
     # 检测公式和合并单元格（需要非 read_only 模式，但只读前几行）
     try:
-        wb_full = load_workbook(safe_path, read_only=False, data_only=False)
-        for i, ws in enumerate(wb_full.worksheets[:_SNAPSHOT_MAX_SHEETS]):
-            if i < len(sheet_metas):
-                has_merged = len(ws.merged_cells.ranges) > 0
-                sheet_metas[i]["has_merged_cells"] = has_merged
-                # 合并单元格摘要：语义分类 + 合并率 + 处理建议
-                if has_merged:
-                    merged_summary = _collect_merged_cell_summary(ws)
-                    if merged_summary:
-                        sheet_metas[i]["merged_cell_summary"] = merged_summary
-                # 检测公式：扫描前 20 行
-                has_formulas = False
-                for row in ws.iter_rows(min_row=1, max_row=min(20, ws.max_row or 0), values_only=False):
-                    for cell in row:
-                        if isinstance(cell.value, str) and cell.value.startswith("="):
-                            has_formulas = True
+        shared_full = _load_full_workbook(safe_path, data_only=False)
+        with shared_full.lock:
+            wb_full = shared_full.value
+            for i, ws in enumerate(wb_full.worksheets[:_SNAPSHOT_MAX_SHEETS]):
+                if i < len(sheet_metas):
+                    has_merged = len(ws.merged_cells.ranges) > 0
+                    sheet_metas[i]["has_merged_cells"] = has_merged
+                    # 合并单元格摘要：语义分类 + 合并率 + 处理建议
+                    if has_merged:
+                        merged_summary = _collect_merged_cell_summary(ws)
+                        if merged_summary:
+                            sheet_metas[i]["merged_cell_summary"] = merged_summary
+                    # 检测公式：扫描前 20 行
+                    has_formulas = False
+                    for row in ws.iter_rows(min_row=1, max_row=min(20, ws.max_row or 0), values_only=False):
+                        for cell in row:
+                            if isinstance(cell.value, str) and cell.value.startswith("="):
+                                has_formulas = True
+                                break
+                        if has_formulas:
                             break
-                    if has_formulas:
-                        break
-                sheet_metas[i]["has_formulas"] = has_formulas
-        wb_full.close()
+                    sheet_metas[i]["has_formulas"] = has_formulas
     except Exception:
         for meta in sheet_metas:
             meta.setdefault("has_formulas", False)
@@ -3398,7 +3591,7 @@ def scan_excel_snapshot(
         try:
             read_kwargs = _build_read_kwargs(safe_path, sheet_name, max_rows=max_sample_rows if sampled else None)
             form_type = read_kwargs.pop("_form_type_document", False)
-            df = pd.read_excel(**read_kwargs)
+            df = _read_excel_frame(**read_kwargs)
 
             if form_type:
                 df.columns = [f"Col_{i}" for i in range(len(df.columns))]
@@ -3526,95 +3719,20 @@ def _scan_csv_snapshot(
 # ── search_excel_values ──────────────────────────────────────
 
 
-def search_excel_values(
-    file_path: str = "",
-    query: str = "",
-    match_mode: str = "contains",
-    sheets: list[str] | None = None,
-    columns: list[str] | None = None,
-    max_results: int = 50,
-    case_sensitive: bool = False,
-    file_paths: list[str] | None = None,
-) -> str:
-    """跨 Sheet 搜索 Excel 单元格值，类似 ripgrep。
-
-    Args:
-        file_path: Excel 文件路径（相对或绝对）。
-        query: 搜索字符串或正则表达式。
-        match_mode: 匹配模式："contains"（默认）| "exact" | "regex" | "startswith"。
-        sheets: 限定搜索的 Sheet 列表（默认全部）。
-        columns: 限定搜索的列名列表（默认全部）。
-        max_results: 最大返回匹配数（默认 50）。
-        case_sensitive: 是否区分大小写（默认 False）。
-        file_paths: 多文件搜索路径列表（与 file_path 互补，传入此参数时跨文件搜索）。
+def _build_search_matcher(
+    query: str, match_mode: str, case_sensitive: bool,
+) -> Callable[[str], bool]:
+    """按匹配模式编译单元格字符串匹配函数。
 
-    Returns:
-        JSON 格式的搜索结果。
+    Raises:
+        ValueError: regex 模式下正则表达式无效。
     """
-    # 跨文件搜索：当 file_paths 包含多个文件时，逐文件搜索并合并结果
-    if file_paths and len(file_paths) > 1:
-        all_matches: list[dict[str, Any]] = []
-        all_summary: list[dict[str, Any]] = []
-        total = 0
-        files_searched = 0
-        per_file_max = max(10, max_results // len(file_paths))
-        for fp in file_paths[:10]:  # 最多搜索 10 个文件
-            sub_result_str = search_excel_values(
-                file_path=fp, query=query, match_mode=match_mode,
-                sheets=sheets, columns=columns, max_results=per_file_max,
-                case_sensitive=case_sensitive,
-            )
-            try:
-                sub = json.loads(sub_result_str)
-                if "error" in sub:
-                    continue
-                files_searched += 1
-                sub_total = sub.get("total_matches", 0)
-                total += sub_total
-                for m in sub.get("matches", []):
-                    m["file"] = fp
-                    all_matches.append(m)
-                for s in sub.get("summary_by_sheet", []):
-                    s["file"] = fp
-                    all_summary.append(s)
-            except (json.JSONDecodeError, ValueError):
-                continue
-        # 按文件+sheet排序，截断到 max_results
-        all_matches = all_matches[:max_results]
-        return json.dumps({
-            "query": query, "match_mode": match_mode,
-            "total_matches": total, "returned": len(all_matches),
-            "truncated": total > len(all_matches),
-            "files_searched": files_searched,
-            "matches": all_matches,
-            "summary_by_sheet": all_summary,
-        }, ensure_ascii=False, separators=(",", ":"), default=str)
-
-    # 单文件搜索：兼容 file_paths=[单个文件] 的情况
-    if not file_path and file_paths:
-        file_path = file_paths[0]
-    if not file_path:
-        return json.dumps(
-            {"error": "必须提供 file_path 或 file_paths 参数"},
-            ensure_ascii=False,
-        )
     import re as _re
 
-    guard = _get_guard()
-    safe_path = guard.resolve_and_validate(file_path)
-
-    not_found = check_file_exists(safe_path, file_path, guard)
-    if not_found is not None:
-        return not_found
-
-    if not query:
-        return json.dumps(
-            {"total_matches": 0, "returned": 0, "truncated": False,
-             "sheets_searched": 0, "matches": [], "summary_by_sheet": []},
-            ensure_ascii=False,
-        )
+    # 命中单元格必须包含的子串（组内 OR、组间 AND），供单元格值索引做候选过滤；
+    # None 表示无法推导（regex），只能全表扫描
+    required: list[list[str]] | None = [[query]]
 
-    # 编译匹配函数
     if match_mode == "fuzzy":
         # 模糊匹配：将 query 拆分为子串 token，单元格值包含所有 token 即匹配
         # 拆分规则：按空格/标点分割，同时将连续中文与连续数字/字母分离
@@ -3668,19 +3786,18 @@ def search_excel_values(
                 if _alt != _tok:
                     _group.append(_alt.lower() if not case_sensitive else _alt)
                 _token_groups.append(_group)
+            required = _token_groups
 
             def _match(cell_str: str) -> bool:
                 _s = cell_str if case_sensitive else cell_str.lower()
                 return all(any(v in _s for v in grp) for grp in _token_groups)
     elif match_mode == "regex":
+        required = None
         try:
             flags = 0 if case_sensitive else _re.IGNORECASE
             pattern = _re.compile(query, flags)
         except _re.error as exc:
-            return json.dumps(
-                {"error": f"正则表达式无效: {exc}"},
-                ensure_ascii=False,
-            )
+            raise ValueError(f"正则表达式无效: {exc}") from exc
         def _match(cell_str: str) -> bool:
             return bool(pattern.search(cell_str))
     elif match_mode == "exact":
@@ -3708,6 +3825,23 @@ def search_excel_values(
             def _match(cell_str: str) -> bool:
                 return _q_lower in cell_str.lower()
 
+    _match.required_substrings = required  # type: ignore[attr-defined]
+    return _match
+
+
+def _search_file_values(
+    safe_path: Any,
+    match: Callable[[str], bool],
+    *,
+    sheets: list[str] | None,
+    columns: list[str] | None,
+    max_results: int,
+) -> dict[str, Any]:
+    """在单个文件中搜索单元格值，返回原生结构（matches / 计数）。
+
+    收集满 max_results 条后即停止扫描，total_matches 为已扫描部分的计数。
+    """
+    _match = match
     from openpyxl.utils import get_column_letter
 
     matches: list[dict[str, Any]] = []
@@ -3777,20 +3911,43 @@ def search_excel_values(
         from excelmanus.tools._helpers import ensure_openpyxl_compatible
         safe_path = ensure_openpyxl_compatible(safe_path)
 
-        wb = load_workbook(safe_path, read_only=True, data_only=True)
+        # 工作区单元格值索引命中时直接查倒排表，结果与下方扫描一致
+        required = getattr(_match, "required_substrings", None)
+        if required is not None:
+            value_index = lookup_file_index(safe_path)
+            if value_index is not None:
+                return value_index.search(
+                    _match, required,
+                    sheets=sheets, columns=columns, max_results=max_results,
+                )
+
+        # 有列式旁路文件时直接读取字符串网格，不再打开 xlsx
+        sidecar = get_sidecar()
+        sidecar_sheets = sidecar.sheet_names(safe_path) if sidecar is not None else None
+        wb = None
+        if sidecar_sheets is None:
+            wb = load_workbook(safe_path, read_only=True, data_only=True)
+        sheet_titles = sidecar_sheets if wb is None else [ws.title for ws in wb.worksheets]
 
         target_sheets = set(s.lower() for s in sheets) if sheets else None
 
-        for ws in wb.worksheets:
-            if target_sheets and ws.title.lower() not in target_sheets:
+        for sheet_title in sheet_titles:
+            if target_sheets and sheet_title.lower() not in target_sheets:
                 continue
             sheets_searched += 1
 
+            if wb is None:
+                sheet_rows = sidecar.cell_rows(safe_path, sheet_title) or []
+                first_row = sheet_rows[0][: sidecar.first_row_width(safe_path, sheet_title)] if sheet_rows else ()
+            else:
+                ws = wb[sheet_title]
+                sheet_rows = _get_sheet_rows(safe_path, ws)
+                first_row = next(ws.iter_rows(min_row=1, max_row=1, values_only=True), ())
+
             # 读取 header 行（仅用于列名标注，不再跳过 row 1 的搜索）
-            header_xl: list[str] = []
-            for row in ws.iter_rows(min_row=1, max_row=1, values_only=True):
-                header_xl = [str(c) if c is not None else f"Col_{i}" for i, c in enumerate(row)]
-                break
+            header_xl: list[str] = [
+                str(c) if c is not None else f"Col_{i}" for i, c in enumerate(first_row)
+            ]
 
             target_col_indices_xl: set[int] | None = None
             if columns:
@@ -3802,9 +3959,7 @@ def search_excel_values(
                     continue
 
             # 逐行扫描（从第 1 行开始，包含 header 行——表单类文档的数据可能从第 1 行起）
-            for row_idx, row in enumerate(
-                ws.iter_rows(min_row=1, values_only=True), start=1
-            ):
+            for row_idx, row in enumerate(sheet_rows, start=1):
                 if len(matches) >= max_results:
                     break
                 row_list = list(row)
@@ -3818,7 +3973,7 @@ def search_excel_values(
                         continue
 
                     total_matches += 1
-                    sheet_match_counts[ws.title] = sheet_match_counts.get(ws.title, 0) + 1
+                    sheet_match_counts[sheet_title] = sheet_match_counts.get(sheet_title, 0) + 1
 
                     if len(matches) < max_results:
                         col_name = header_xl[col_idx] if col_idx < len(header_xl) else f"Col_{col_idx}"
@@ -3837,7 +3992,7 @@ def search_excel_values(
                                 break
 
                         matches.append({
-                            "sheet": ws.title,
+                            "sheet": sheet_title,
                             "row": row_idx,
                             "column": col_name,
                             "value": cell_str[:200],
@@ -3849,7 +4004,299 @@ def search_excel_values(
                 # 继续统计剩余 sheet 的总匹配数（但不收集详情）
                 continue
 
-        wb.close()
+        if wb is not None:
+            wb.close()
+
+    return {
+        "matches": matches,
+        "sheet_match_counts": sheet_match_counts,
+        "total_matches": total_matches,
+        "sheets_searched": sheets_searched,
+    }
+
+
+def _search_file_task(
+    safe_path: str,
+    query: str,
+    match_mode: str,
+    sheets: list[str] | None,
+    columns: list[str] | None,
+    max_results: int,
+    case_sensitive: bool,
+) -> dict[str, Any]:
+    """进程池 worker 入口：在子进程内编译匹配函数并搜索一个文件。"""
+    match = _build_search_matcher(query, match_mode, case_sensitive)
+    return _search_file_values(
+        safe_path, match, sheets=sheets, columns=columns, max_results=max_results,
+    )
+
+
+# ── 多文件并行搜索 ──────────────────────────────────────
+
+# 文件数达到该值才启用进程池（少量文件时进程启动开销大于收益）
+_PARALLEL_SEARCH_MIN_FILES = 3
+_DEFAULT_SEARCH_WORKERS = 8
+
+_search_pool: Any = None
+_search_pool_lock = threading.Lock()
+
+
+def _search_worker_count() -> int:
+    """进程池大小：``EXCELMANUS_SEARCH_WORKERS`` 覆盖，默认 min(CPU, 8)；≤1 表示不并行。"""
+    raw = os.environ.get("EXCELMANUS_SEARCH_WORKERS", "").strip()
+    try:
+        if raw:
+            return int(raw)
+    except ValueError:
+        pass
+    return min(os.cpu_count() or 1, _DEFAULT_SEARCH_WORKERS)
+
+
+def _init_search_worker() -> None:
+    """搜索子进程初始化：关闭解析缓存。
+
+    子进程收不到父进程写入路径的失效通知；保留缓存还会让每个 worker
+    各自常驻最多 ``EXCELMANUS_READ_CACHE_MB`` 的解析结果。
+    """
+    os.environ["EXCELMANUS_READ_CACHE_MB"] = "0"
+    set_read_cache(ParsedFileCache(0))
+
+
+def _get_search_pool(workers: int) -> Any:
+    """返回进程级复用的搜索进程池（spawn 启动，避免 fork 带走事件循环线程状态）。"""
+    global _search_pool
+    with _search_pool_lock:
+        if _search_pool is None:
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+
+            _search_pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_search_worker,
+            )
+        return _search_pool
+
+
+def _reset_search_pool() -> None:
+    """丢弃（已损坏的）搜索进程池，下次调用时重建。"""
+    global _search_pool
+    with _search_pool_lock:
+        pool, _search_pool = _search_pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _empty_file_result() -> dict[str, Any]:
+    return {"matches": [], "sheet_match_counts": {}, "total_matches": 0, "sheets_searched": 0}
+
+
+def _search_many_files(
+    file_paths: list[str],
+    query: str,
+    match_mode: str,
+    *,
+    sheets: list[str] | None,
+    columns: list[str] | None,
+    max_results: int,
+    case_sensitive: bool,
+) -> dict[str, Any]:
+    """并行搜索多个文件（一个 worker 处理一个工作簿）。
+
+    全局收集满 max_results 条后取消尚未开始的文件；结果按 file_paths
+    顺序合并后截断。无法访问或搜索失败的文件计入 files_failed。
+    """
+    from concurrent.futures import FIRST_COMPLETED, wait
+    from concurrent.futures.process import BrokenProcessPool
+
+    base: dict[str, Any] = {"query": query, "match_mode": match_mode}
+    try:
+        matcher = _build_search_matcher(query, match_mode, case_sensitive)
+    except ValueError as exc:
+        return {"error": str(exc)}
+
+    guard = _get_guard()
+    targets: list[tuple[int, str, str]] = []
+    failed = 0
+    for idx, fp in enumerate(file_paths):
+        try:
+            safe_path = guard.resolve_and_validate(fp)
+        except Exception:
+            failed += 1
+            continue
+        if not safe_path.is_file():
+            failed += 1
+            continue
+        targets.append((idx, fp, str(safe_path)))
+
+    results: dict[int, dict[str, Any]] = {}
+    collected = 0
+    not_searched = 0
+    args = (query, match_mode, sheets, columns, max_results, case_sensitive)
+
+    def _run_inline(pending: list[tuple[int, str, str]]) -> None:
+        nonlocal collected, failed, not_searched
+        for pos, (idx, _fp, path) in enumerate(pending):
+            if query and collected >= max_results:
+                not_searched += len(pending) - pos
+                return
+            try:
+                results[idx] = _search_file_task(path, *args) if query else _empty_file_result()
+            except Exception:
+                logger.debug("搜索文件失败: %s", path, exc_info=True)
+                failed += 1
+                continue
+            collected += len(results[idx]["matches"])
+
+    # 已建单元格值索引的文件在本进程直接查倒排表，只把需要解析的文件交给进程池
+    remaining = targets
+    if query and getattr(matcher, "required_substrings", None) is not None:
+        indexed = [t for t in targets if lookup_file_index(t[2]) is not None]
+        if indexed:
+            _run_inline(indexed)
+            remaining = [t for t in targets if t not in indexed]
+            if collected >= max_results:
+                not_searched += len(remaining)
+                remaining = []
+
+    workers = min(_search_worker_count(), len(remaining))
+    if not query or workers <= 1 or len(remaining) < _PARALLEL_SEARCH_MIN_FILES:
+        _run_inline(remaining)
+    else:
+        try:
+            pool = _get_search_pool(workers)
+            futures = {
+                pool.submit(_search_file_task, path, *args): (idx, path)
+                for idx, _fp, path in remaining
+            }
+            pending = set(futures)
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    idx, path = futures[fut]
+                    if fut.cancelled():
+                        continue
+                    try:
+                        results[idx] = fut.result()
+                    except BrokenProcessPool:
+                        raise
+                    except Exception:
+                        logger.debug("搜索文件失败: %s", path, exc_info=True)
+                        failed += 1
+                        continue
+                    collected += len(results[idx]["matches"])
+                if collected >= max_results and pending:
+                    # 全局已满足：取消排队中的文件，只等待已在运行的 worker
+                    for fut in pending:
+                        if fut.cancel():
+                            not_searched += 1
+                    pending = {f for f in pending if not f.cancelled()}
+        except BrokenProcessPool:
+            logger.warning("搜索进程池异常，回退为串行搜索", exc_info=True)
+            _reset_search_pool()
+            _run_inline([t for t in remaining if t[0] not in results])
+
+    all_matches: list[dict[str, Any]] = []
+    all_summary: list[dict[str, Any]] = []
+    total = 0
+    for idx, fp, _path in targets:
+        found = results.get(idx)
+        if found is None:
+            continue
+        total += found["total_matches"]
+        for m in found["matches"]:
+            m["file"] = fp
+            all_matches.append(m)
+        for sheet, count in sorted(found["sheet_match_counts"].items(), key=lambda x: -x[1]):
+            all_summary.append({"sheet": sheet, "matches": count, "file": fp})
+
+    returned = all_matches[:max_results]
+    result = {
+        **base,
+        "total_matches": total,
+        "returned": len(returned),
+        "truncated": bool(not_searched) or total > len(returned),
+        "files_searched": len(results),
+        "matches": returned,
+        "summary_by_sheet": all_summary,
+    }
+    if not_searched:
+        result["files_not_searched"] = not_searched
+    if failed:
+        result["files_failed"] = failed
+    return result
+
+
+def search_excel_values(
+    file_path: str = "",
+    query: str = "",
+    match_mode: str = "contains",
+    sheets: list[str] | None = None,
+    columns: list[str] | None = None,
+    max_results: int = 50,
+    case_sensitive: bool = False,
+    file_paths: list[str] | None = None,
+) -> str:
+    """跨 Sheet 搜索 Excel 单元格值，类似 ripgrep。
+
+    Args:
+        file_path: Excel 文件路径（相对或绝对）。
+        query: 搜索字符串或正则表达式。
+        match_mode: 匹配模式："contains"（默认）| "exact" | "regex" | "startswith"。
+        sheets: 限定搜索的 Sheet 列表（默认全部）。
+        columns: 限定搜索的列名列表（默认全部）。
+        max_results: 最大返回匹配数（默认 50）。
+        case_sensitive: 是否区分大小写（默认 False）。
+        file_paths: 多文件搜索路径列表（与 file_path 互补，传入多个文件时并行跨文件搜索，无数量上限）。
+
+    Returns:
+        JSON 格式的搜索结果。
+    """
+    # 跨文件搜索：并行搜索全部文件，按输入顺序合并原生结果
+    if file_paths and len(file_paths) > 1:
+        return json.dumps(
+            _search_many_files(
+                file_paths, query, match_mode,
+                sheets=sheets, columns=columns,
+                max_results=max_results, case_sensitive=case_sensitive,
+            ),
+            ensure_ascii=False, separators=(",", ":"), default=str,
+        )
+
+    # 单文件搜索：兼容 file_paths=[单个文件] 的情况
+    if not file_path and file_paths:
+        file_path = file_paths[0]
+    if not file_path:
+        return json.dumps(
+            {"error": "必须提供 file_path 或 file_paths 参数"},
+            ensure_ascii=False,
+        )
+    guard = _get_guard()
+    safe_path = guard.resolve_and_validate(file_path)
+
+    not_found = check_file_exists(safe_path, file_path, guard)
+    if not_found is not None:
+        return not_found
+
+    if not query:
+        return json.dumps(
+            {"total_matches": 0, "returned": 0, "truncated": False,
+             "sheets_searched": 0, "matches": [], "summary_by_sheet": []},
+            ensure_ascii=False,
+        )
+
+    try:
+        _match = _build_search_matcher(query, match_mode, case_sensitive)
+    except ValueError as exc:
+        return json.dumps({"error": str(exc)}, ensure_ascii=False)
+
+    found = _search_file_values(
+        safe_path, _match, sheets=sheets, columns=columns, max_results=max_results,
+    )
+    matches = found["matches"]
+    sheet_match_counts = found["sheet_match_counts"]
+    total_matches = found["total_matches"]
+    sheets_searched = found["sheets_searched"]
 
     truncated = total_matches > len(matches)
     summary_by_sheet = [
@@ -4232,7 +4679,7 @@ def discover_file_relationships(
                     try:
                         read_kwargs = _build_read_kwargs(compat_path, sheet_name, max_rows=sample_rows)
                         read_kwargs.pop("_form_type_document", None)
-                        df = pd.read_excel(**read_kwargs)
+                        df = _read_excel_frame(**read_kwargs)
                         cols = [str(c) for c in df.columns if not str(c).startswith("Unnamed")]
                         if cols:
                             sheets_cols[sheet_name] = cols
@@ -4636,7 +5083,7 @@ def get_tools() -> list[ToolDef]:
                     },
                     "max_diffs": {
                         "type": "integer",
-                        "description": "最大差异数量（超出截断）",
+                        "description": "差异明细上限（超出截断；summary 中的行/列统计始终为全量）",
                         "default": 500,
                         "minimum": 1,
                     },
@@ -4705,7 +5152,7 @@ def get_tools() -> list[ToolDef]:
                     "file_paths": {
                         "type": "array",
                         "items": {"type": "string"},
-                        "description": "多文件搜索路径列表（跨文件搜索时使用，最多 10 个文件），与 file_path 二选一",
+                        "description": "多文件搜索路径列表（跨文件并行搜索，不限文件数），与 file_path 二选一",
                     },
                     "query": {
                         "type": "string",
@@ -6,7 +6,7 @@ from pathlib import Path
 from typing import Any
 
 from excelmanus.reference_graph.cache import RefCache, get_session_cache
-from excelmanus.reference_graph.formula_parser import FormulaRefExtractor, address_in_ref
+from excelmanus.reference_graph.disk_cache import load_or_scan
 from excelmanus.reference_graph.models import WorkbookRefIndex
 from excelmanus.reference_graph.scanner import Tier1Scanner, Tier2Resolver
 from excelmanus.tools.registry import ToolDef
@@ -36,7 +36,7 @@ def _ensure_index(file_path: str) -> WorkbookRefIndex:
     cached = cache.get_tier1(abs_path)
     if cached is not None:
         return cached
-    index = _scanner.scan(abs_path)
+    index = load_or_scan(abs_path, _scanner)
     cache.put_tier1(abs_path, index)
     return index
 
@@ -153,36 +153,24 @@ def get_impact_analysis(
         abs_path = _resolve_path(file_path)
         sheet_name, address = _parse_target(target)
 
-        from openpyxl import load_workbook
-        wb = load_workbook(abs_path, data_only=False, read_only=True)
-        try:
-            if sheet_name is None:
+        if sheet_name is None:
+            from openpyxl import load_workbook
+            wb = load_workbook(abs_path, data_only=False, read_only=True)
+            try:
                 sheet_name = wb.sheetnames[0]
+            finally:
+                wb.close()
 
-            extractor = FormulaRefExtractor()
-            direct: list[dict[str, Any]] = []
-            affected_sheets: set[str] = set()
-
-            for ws_name in wb.sheetnames:
-                ws = wb[ws_name]
-                for row in ws.iter_rows():
-                    for cell in row:
-                        val = cell.value
-                        if not isinstance(val, str) or not val.startswith("="):
-                            continue
-                        refs = extractor.extract(val)
-                        for ref in refs:
-                            ref_sheet = ref.sheet_name or ws_name
-                            if ref_sheet == sheet_name and address_in_ref(address, ref.cell_or_range):
-                                coord = cell.coordinate if hasattr(cell, "coordinate") else ""
-                                direct.append({
-                                    "cell": coord,
-                                    "sheet": ws_name,
-                                    "formula": val,
-                                })
-                                affected_sheets.add(ws_name)
-        finally:
-            wb.close()
+        graph = _resolver.get_graph(abs_path)
+        direct: list[dict[str, Any]] = []
+        affected_sheets: set[str] = set()
+        for ws_name, coord in graph.dependent_cells(sheet_name, address):
+            direct.append({
+                "cell": coord,
+                "sheet": ws_name,
+                "formula": graph.formula_at(ws_name, coord),
+            })
+            affected_sheets.add(ws_name)
 
         return json.dumps({
             "target": target,
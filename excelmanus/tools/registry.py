@@ -626,6 +626,13 @@ class ToolRegistry:
         if tools_list:
             logger.info("已批量注册 %d 个工具", len(tools_list))
 
+    def unregister_tools(self, tool_names: Iterable[str]) -> list[str]:
+        """批量注销工具，返回实际被移除的工具名（不存在的名称忽略）。"""
+        removed = [name for name in tool_names if self._tools.pop(name, None) is not None]
+        if removed:
+            logger.info("已注销 %d 个工具", len(removed))
+        return removed
+
     def get_tool(self, tool_name: str) -> ToolDef | None:
         """按名称查找工具定义，未找到返回 None。"""
         return self._tools.get(tool_name)
@@ -0,0 +1,435 @@
+"""WorkspaceWatcher：工作区文件变更监听，供 FileRegistry 增量扫描。
+
+FileRegistry.scan_workspace 每次都要 ``os.walk`` + ``stat`` 全部文件。
+监听器在后台收集变更路径（工作区相对路径），将一段时间内的突发事件
+合并（debounce）后分发给订阅方，已建立基线的注册表只需处理变更过的文件。
+
+后端：
+- ``watchdog``：安装 watchdog（``pip install excelmanus[watch]``）时使用，
+  Linux 下基于 inotify，macOS 下基于 FSEvents；
+- ``poll``：仅在显式指定 ``poll`` 时使用，后台线程定期比较 mtime/size 快照。
+
+``auto`` 模式下 watchdog 不可用（未安装、启动失败或运行中退出）时不启动
+轮询线程，订阅方退回到扫描时按 mtime 重新校验的全量扫描，避免空闲时
+也每隔几秒遍历整个工作区。轮询快照因文件数超过上限而不完整时同样放弃
+监听，因为不完整的快照无法可靠地判断变更。
+
+待分发路径超过 ``_MAX_PENDING`` 或后端异常时分发根路径 ``""``，
+订阅方应退化为一次全量扫描。订阅方以弱引用持有，全部订阅方被回收后
+监听器自动停止。
+
+环境变量：``EXCELMANUS_WORKSPACE_WATCH``（``auto`` / ``watchdog`` / ``poll`` /
+``off``，默认 ``auto``）、``EXCELMANUS_WORKSPACE_WATCH_POLL_INTERVAL``
+（轮询间隔秒数，默认 2）。
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+import weakref
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+from excelmanus.engine_core.workspace_probe import (
+    WorkspaceMtimeIndex,
+    collect_workspace_mtime_index,
+    diff_workspace_mtime_paths,
+)
+from excelmanus.tools.policy import WORKSPACE_SCAN_EXCLUDE_PREFIXES
+
+logger = logging.getLogger(__name__)
+
+ChangeCallback = Callable[[set[str]], None]
+
+ROOT_CHANGED = ""  # 分发该路径表示需要全量扫描
+
+_DEFAULT_DEBOUNCE = 0.3
+_DEFAULT_POLL_INTERVAL = 2.0
+# 首个事件起最长等待时间，避免持续写入时永远不分发
+_MAX_LATENCY = 2.0
+_MAX_PENDING = 5000
+
+
+def _import_watchdog() -> Any | None:
+    try:
+        from watchdog import events as wd_events
+        from watchdog.observers import Observer
+    except ImportError:
+        return None
+    return Observer, wd_events
+
+
+def _is_excluded(rel_path: str) -> bool:
+    first = rel_path.split("/", 1)[0]
+    return first in WORKSPACE_SCAN_EXCLUDE_PREFIXES or first == ".excelmanus"
+
+
+class WorkspaceWatcher:
+    """单个工作区的变更监听器（线程安全，多个订阅方共享）。"""
+
+    def __init__(
+        self,
+        root: str | Path,
+        *,
+        backend: str = "auto",
+        debounce: float = _DEFAULT_DEBOUNCE,
+        poll_interval: float = _DEFAULT_POLL_INTERVAL,
+    ) -> None:
+        self._root = Path(root).expanduser().resolve()
+        self._requested_backend = backend
+        self._backend = ""
+        self._debounce = max(0.0, float(debounce))
+        self._poll_interval = max(0.05, float(poll_interval))
+        self._cond = threading.Condition()
+        self._pending: set[str] = set()
+        self._first_event = 0.0
+        self._last_event = 0.0
+        self._subscribers: list[Callable[[], ChangeCallback | None]] = []
+        self._thread: threading.Thread | None = None
+        self._observer: Any = None
+        self._snapshot: WorkspaceMtimeIndex = {}
+        self._running = False
+        self._ready = threading.Event()
+        self._events = 0
+        self._dispatches = 0
+        self._overflows = 0
+
+    @property
+    def root(self) -> Path:
+        return self._root
+
+    @property
+    def backend(self) -> str:
+        """实际使用的后端（``watchdog`` / ``poll``，未启动时为空）。"""
+        return self._backend
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    @property
+    def ready(self) -> bool:
+        """后端已开始捕获变更（此后发生的变更都会被分发）。"""
+        return self._running and self._ready.is_set()
+
+    # ── 订阅 ─────────────────────────────────────────────
+
+    def subscribe(self, callback: ChangeCallback) -> None:
+        """订阅变更批次；绑定方法以弱引用持有，不延长订阅方生命周期。"""
+        if hasattr(callback, "__self__"):
+            ref: Callable[[], ChangeCallback | None] = weakref.WeakMethod(callback)  # type: ignore[arg-type]
+        else:
+            ref = lambda cb=callback: cb  # noqa: E731
+        with self._cond:
+            self._subscribers.append(ref)
+
+    def unsubscribe(self, callback: ChangeCallback) -> None:
+        with self._cond:
+            self._subscribers = [
+                ref for ref in self._subscribers
+                if ref() is not None and ref() != callback
+            ]
+
+    def _live_callbacks(self) -> list[ChangeCallback]:
+        with self._cond:
+            callbacks = [cb for cb in (ref() for ref in self._subscribers) if cb is not None]
+            if len(callbacks) != len(self._subscribers):
+                self._subscribers = [ref for ref in self._subscribers if ref() is not None]
+        return callbacks
+
+    # ── 生命周期 ─────────────────────────────────────────
+
+    def start(self) -> bool:
+        """启动监听（幂等）。返回是否处于运行状态。
+
+        ``auto`` 模式下 watchdog 不可用时不启动，返回 False。
+        """
+        with self._cond:
+            if self._running:
+                return True
+            if not self._root.is_dir():
+                return False
+            self._running = True
+            self._ready.clear()
+
+        backend = self._requested_backend
+        if backend in ("auto", "watchdog"):
+            try:
+                started = self._start_observer()
+            except Exception:
+                logger.warning("watchdog 监听启动失败", exc_info=True)
+                started = False
+            if started:
+                backend = "watchdog"
+            elif backend == "auto":
+                logger.debug("watchdog 不可用，工作区不启用监听: %s", self._root)
+                with self._cond:
+                    self._running = False
+                return False
+            else:
+                logger.warning("watchdog 不可用，工作区监听回退为轮询")
+                backend = "poll"
+        else:
+            backend = "poll"
+        self._backend = backend
+        if backend == "watchdog":
+            self._ready.set()
+
+        self._thread = threading.Thread(
+            target=self._run, name="excelmanus-workspace-watch", daemon=True,
+        )
+        self._thread.start()
+        return True
+
+    def stop(self) -> None:
+        """停止监听并丢弃未分发的变更（幂等）。"""
+        with self._cond:
+            self._running = False
+            self._pending.clear()
+            self._cond.notify_all()
+            thread, self._thread = self._thread, None
+            observer, self._observer = self._observer, None
+        if observer is not None:
+            try:
+                observer.stop()
+                observer.join(timeout=2)
+            except Exception:
+                logger.debug("watchdog observer 停止失败", exc_info=True)
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=5)
+        self._ready.clear()
+
+    def stats(self) -> dict[str, Any]:
+        with self._cond:
+            pending = len(self._pending)
+            subscribers = len(self._subscribers)
+        return {
+            "backend": self._backend,
+            "running": self._running,
+            "pending": pending,
+            "subscribers": subscribers,
+            "events": self._events,
+            "dispatches": self._dispatches,
+            "overflows": self._overflows,
+        }
+
+    # ── 事件收集 ─────────────────────────────────────────
+
+    def notify(self, paths: Iterable[str]) -> None:
+        """记录变更路径（工作区相对路径或绝对路径）。"""
+        rel_paths: set[str] = set()
+        for raw in paths:
+            rel = self._to_rel(raw)
+            if rel is None or (rel and _is_excluded(rel)):
+                continue
+            rel_paths.add(rel)
+        if not rel_paths:
+            return
+        now = time.monotonic()
+        with self._cond:
+            if not self._running:
+                return
+            if not self._pending:
+                self._first_event = now
+            self._last_event = now
+            self._events += len(rel_paths)
+            if ROOT_CHANGED in self._pending or ROOT_CHANGED in rel_paths:
+                self._pending = {ROOT_CHANGED}
+            else:
+                self._pending |= rel_paths
+                if len(self._pending) > _MAX_PENDING:
+                    self._overflows += 1
+                    self._pending = {ROOT_CHANGED}
+            self._cond.notify_all()
+
+    def _to_rel(self, raw: str) -> str | None:
+        path = str(raw)
+        if os.path.isabs(path):
+            try:
+                path = os.path.relpath(path, self._root)
+            except ValueError:
+                return None
+        rel = path.replace("\\", "/").strip("/")
+        if rel == ".":
+            return ROOT_CHANGED
+        if rel.startswith("../") or rel == "..":
+            return None
+        return rel
+
+    def _start_observer(self) -> bool:
+        imported = _import_watchdog()
+        if imported is None:
+            return False
+        observer_cls, wd_events = imported
+        watcher = self
+
+        class _Handler(wd_events.FileSystemEventHandler):
+            def on_any_event(self, event: Any) -> None:
+                event_type = getattr(event, "event_type", "")
+                if event_type in ("opened", "closed_no_write"):
+                    return
+                # 子项变化时父目录也会收到 modified，子项自身已有事件
+                if event.is_directory and event_type == "modified":
+                    return
+                paths = [event.src_path]
+                dest = getattr(event, "dest_path", "")
+                if dest:
+                    paths.append(dest)
+                watcher.notify(os.fsdecode(p) for p in paths)
+
+        observer = observer_cls()
+        observer.daemon = True
+        observer.schedule(_Handler(), str(self._root), recursive=True)
+        observer.start()
+        self._observer = observer
+        return True
+
+    # ── 后台线程 ─────────────────────────────────────────
+
+    def _run(self) -> None:
+        if self._backend == "poll":
+            snapshot, partial = self._take_snapshot()
+            if partial:
+                self._abandon("工作区文件数超过快照上限")
+                return
+            self._snapshot = snapshot
+            self._ready.set()
+        next_check = time.monotonic() + self._poll_interval
+        while True:
+            batch: set[str] | None = None
+            with self._cond:
+                if not self._running:
+                    return
+                now = time.monotonic()
+                if self._pending:
+                    due = min(self._last_event + self._debounce, self._first_event + _MAX_LATENCY)
+                else:
+                    due = next_check
+                if now < min(due, next_check):
+                    self._cond.wait(timeout=min(due, next_check) - now)
+                    continue
+                if self._pending and now >= due:
+                    batch, self._pending = self._pending, set()
+            if batch is not None:
+                self._dispatch(batch)
+                continue
+            next_check = time.monotonic() + self._poll_interval
+            if not self._live_callbacks():
+                # 订阅方全部被回收：停止监听，下次 get_workspace_watcher 时重建
+                logger.debug("工作区监听无订阅方，停止: %s", self._root)
+                _forget_watcher(self)
+                self.stop()
+                return
+            if self._backend == "poll":
+                if not self._poll_once():
+                    return
+            elif self._observer is not None and not self._observer.is_alive():
+                if self._requested_backend == "auto":
+                    self._abandon("watchdog observer 已退出")
+                    return
+                logger.warning("watchdog observer 已退出，工作区监听回退为轮询")
+                self._observer = None
+                snapshot, partial = self._take_snapshot()
+                if partial:
+                    self._abandon("工作区文件数超过快照上限")
+                    return
+                self._snapshot = snapshot
+                self._backend = "poll"
+                self.notify([ROOT_CHANGED])
+
+    def _abandon(self, reason: str) -> None:
+        """放弃监听：通知订阅方全量扫描后停止，订阅方此后按未监听处理。"""
+        logger.info("%s，停止工作区监听: %s", reason, self._root)
+        self._dispatch({ROOT_CHANGED})
+        _forget_watcher(self)
+        self.stop()
+
+    def _take_snapshot(self) -> tuple[WorkspaceMtimeIndex, bool]:
+        """返回 (快照, 是否因文件数上限而不完整)；失败时沿用上一次快照。"""
+        try:
+            return collect_workspace_mtime_index(self._root)
+        except Exception:
+            logger.debug("工作区快照失败: %s", self._root, exc_info=True)
+            return self._snapshot, False
+
+    def _poll_once(self) -> bool:
+        """比较一次快照并分发变更；快照不完整时放弃监听并返回 False。"""
+        after, partial = self._take_snapshot()
+        if partial:
+            self._abandon("工作区文件数超过快照上限")
+            return False
+        changed = diff_workspace_mtime_paths(self._snapshot, after, max_paths=_MAX_PENDING + 1)
+        self._snapshot = after
+        if len(changed) > _MAX_PENDING:
+            self.notify([ROOT_CHANGED])
+        elif changed:
+            self.notify(changed)
+        return True
+
+    def _dispatch(self, batch: set[str]) -> None:
+        self._dispatches += 1
+        for callback in self._live_callbacks():
+            try:
+                callback(set(batch))
+            except Exception:
+                logger.debug("工作区变更回调异常", exc_info=True)
+
+
+# ── 进程级共享 ────────────────────────────────────────────
+
+_watchers: dict[str, WorkspaceWatcher] = {}
+_watchers_lock = threading.Lock()
+
+
+def watch_mode() -> str:
+    raw = os.environ.get("EXCELMANUS_WORKSPACE_WATCH", "").strip().lower()
+    if raw in ("0", "false", "no", "off"):
+        return "off"
+    if raw in ("watchdog", "poll"):
+        return raw
+    return "auto"
+
+
+def _poll_interval_from_env() -> float:
+    raw = os.environ.get("EXCELMANUS_WORKSPACE_WATCH_POLL_INTERVAL", "").strip()
+    try:
+        value = float(raw) if raw else _DEFAULT_POLL_INTERVAL
+    except ValueError:
+        return _DEFAULT_POLL_INTERVAL
+    return value if value > 0 else _DEFAULT_POLL_INTERVAL
+
+
+def get_workspace_watcher(workspace_root: str | Path) -> WorkspaceWatcher | None:
+    """返回（必要时创建）工作区共享的监听器；被禁用时返回 None。
+
+    返回的监听器尚未启动，由订阅方在订阅后调用 ``start()``。``auto`` 模式
+    下未安装 watchdog 时返回 None，不启动轮询线程。
+    """
+    mode = watch_mode()
+    if mode == "off" or (mode == "auto" and _import_watchdog() is None):
+        return None
+    key = str(Path(workspace_root).expanduser().resolve())
+    with _watchers_lock:
+        watcher = _watchers.get(key)
+        if watcher is None:
+            watcher = _watchers[key] = WorkspaceWatcher(
+                key, backend=mode, poll_interval=_poll_interval_from_env(),
+            )
+    return watcher
+
+
+def _forget_watcher(watcher: WorkspaceWatcher) -> None:
+    with _watchers_lock:
+        if _watchers.get(str(watcher.root)) is watcher:
+            del _watchers[str(watcher.root)]
+
+
+def reset_workspace_watchers() -> None:
+    """停止并清空所有监听器（测试使用）。"""
+    with _watchers_lock:
+        watchers = list(_watchers.values())
+        _watchers.clear()
+    for watcher in watchers:
+        watcher.stop()
@@ -52,6 +52,47 @@ def _isolate_env(monkeypatch: pytest.MonkeyPatch) -> None:
             monkeypatch.delenv(key, raising=False)
 
 
+@pytest.fixture(autouse=True)
+def _isolate_ref_disk_cache(tmp_path_factory: pytest.TempPathFactory) -> None:
+    """将引用索引磁盘缓存重定向到临时目录，避免测试写入 ~/.excelmanus。"""
+    from excelmanus.reference_graph.disk_cache import RefIndexDiskCache, set_disk_cache
+
+    set_disk_cache(RefIndexDiskCache(tmp_path_factory.mktemp("ref_cache")))
+    yield
+    set_disk_cache(None)
+
+
+@pytest.fixture(autouse=True)
+def _disable_columnar_sidecar(monkeypatch: pytest.MonkeyPatch) -> None:
+    """默认关闭列式旁路文件，避免上传类测试触发后台转换或写入 ~/.excelmanus。"""
+    from excelmanus.tools._sidecar import set_sidecar
+
+    monkeypatch.setenv("EXCELMANUS_SIDECAR_ENABLED", "0")
+    set_sidecar(None)
+    yield
+    set_sidecar(None)
+
+
+@pytest.fixture(autouse=True)
+def _disable_value_index(monkeypatch: pytest.MonkeyPatch) -> None:
+    """默认关闭单元格值索引，避免注册类测试启动后台索引线程。"""
+    from excelmanus.tools._value_index import reset_value_indexes
+
+    monkeypatch.setenv("EXCELMANUS_VALUE_INDEX_ENABLED", "0")
+    reset_value_indexes()
+    yield
+    reset_value_indexes()
+
+
+@pytest.fixture(autouse=True)
+def _reset_read_cache() -> None:
+    """每个测试结束后丢弃进程级解析缓存，避免跨测试复用同路径文件的解析结果。"""
+    yield
+    from excelmanus.tools._read_cache import set_read_cache
+
+    set_read_cache(None)
+
+
 @pytest.fixture(autouse=True)
 def _reset_tool_guards() -> None:
     """每个测试结束后重置所有工具模块的模块级 _guard 单例及 contextvar。
@@ -0,0 +1,179 @@
+"""审计日志写后批量落盘队列（AuditSink）测试。"""
+from __future__ import annotations
+
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from excelmanus.database import Database
+from excelmanus.stores.audit_sink import AuditSink
+from excelmanus.stores.llm_call_store import LLMCallStore
+from excelmanus.stores.tool_call_store import ToolCallStore
+
+
+@pytest.fixture()
+def db(tmp_path: Path):
+    database = Database(str(tmp_path / "audit.db"))
+    yield database
+    database.close()
+
+
+def _count(db: Database, table: str) -> int:
+    return db.conn.execute(f"SELECT COUNT(*) AS n FROM {table}").fetchone()["n"]
+
+
+class _RecordingConn:
+    """包装 ConnectionAdapter，记录 executemany / commit 调用。"""
+
+    def __init__(self, inner) -> None:
+        self._inner = inner
+        self.executemany_sizes: list[int] = []
+        self.commits = 0
+        self.gate: threading.Event | None = None
+        self.fail_batches = False
+        self.bad_params: set = set()
+
+    def executemany(self, sql, rows):
+        if self.gate is not None:
+            self.gate.wait(timeout=5)
+        self.executemany_sizes.append(len(rows))
+        if self.fail_batches:
+            raise RuntimeError("batch failed")
+        return self._inner.executemany(sql, rows)
+
+    def execute(self, sql, params=None):
+        if params is not None and tuple(params) in self.bad_params:
+            raise RuntimeError("row failed")
+        return self._inner.execute(sql, params)
+
+    def commit(self) -> None:
+        self.commits += 1
+        self._inner.commit()
+
+    def savepoint(self, name):
+        return self._inner.savepoint(name)
+
+
+class TestAuditSink:
+    def test_records_are_deferred_until_flush(self, db: Database) -> None:
+        sink = AuditSink(db.conn, batch_size=50, flush_interval=60)
+        store = ToolCallStore(db, user_id="u1", sink=sink)
+        for i in range(5):
+            store.log(session_id="s1", tool_name=f"t{i}", success=True)
+        assert _count(db, "tool_call_log") == 0
+        sink.flush()
+        assert _count(db, "tool_call_log") == 5
+        sink.close()
+
+    def test_batch_size_triggers_single_executemany(self, db: Database) -> None:
+        conn = _RecordingConn(db.conn)
+        sink = AuditSink(conn, batch_size=10, flush_interval=60)
+        store = ToolCallStore(db, sink=sink)
+        for i in range(10):
+            store.log(tool_name=f"t{i}", success=i % 2 == 0)
+        deadline = time.monotonic() + 5
+        while sink.stats()["written"] < 10 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert conn.executemany_sizes == [10]
+        assert conn.commits == 1
+        sink.close()
+
+    def test_interval_flushes_partial_batch(self, db: Database) -> None:
+        sink = AuditSink(db.conn, batch_size=100, flush_interval=0.05)
+        ToolCallStore(db, sink=sink).log(tool_name="t", success=True)
+        deadline = time.monotonic() + 5
+        while _count(db, "tool_call_log") == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert _count(db, "tool_call_log") == 1
+        sink.close()
+
+    def test_full_queue_drops_without_blocking(self, db: Database) -> None:
+        conn = _RecordingConn(db.conn)
+        conn.gate = threading.Event()  # 写线程卡在落盘中
+        sink = AuditSink(conn, batch_size=2, flush_interval=60, max_queue=4)
+        store = ToolCallStore(db, sink=sink)
+        start = time.monotonic()
+        for i in range(20):
+            store.log(tool_name=f"t{i}", success=True)
+            assert sink.stats()["queued"] <= 4
+        assert time.monotonic() - start < 1.0
+        conn.gate.set()
+        sink.close()
+        stats = sink.stats()
+        assert stats["dropped"] > 0
+        assert _count(db, "tool_call_log") == 20 - stats["dropped"]
+        assert stats["written"] + stats["dropped"] == 20
+
+    def test_failed_batch_falls_back_to_rows(self, db: Database) -> None:
+        conn = _RecordingConn(db.conn)
+        conn.fail_batches = True
+        sink = AuditSink(conn, batch_size=100, flush_interval=60)
+        sql = (
+            "INSERT INTO tool_call_log (tool_name, success, created_at) "
+            "VALUES (?, ?, 'now')"
+        )
+        for i in range(5):
+            sink.submit(sql, (f"t{i}", 1))
+        conn.bad_params = {("t2", 1)}
+        sink.flush()
+        stats = sink.stats()
+        assert stats["written"] == 4 and stats["failed"] == 1
+        assert _count(db, "tool_call_log") == 4
+        sink.close()
+
+    def test_failed_flush_keeps_other_stores_pending_writes(self, db: Database) -> None:
+        sink = AuditSink(db.conn, batch_size=100, flush_interval=60)
+        good = (
+            "INSERT INTO tool_call_log (tool_name, success, created_at) "
+            "VALUES (?, ?, 'now')"
+        )
+        # 缺少 NOT NULL 的 created_at，整批写入在数据库层失败
+        bad = "INSERT INTO tool_call_log (tool_name, success) VALUES (?, ?)"
+        sink.submit(good, ("audit", 1))
+        sink.submit(bad, ("broken", 1))
+        # 其他 Store 在共享连接上已执行、尚未提交的写入
+        db.conn.execute(good, ("other-store", 1))
+        sink.flush()
+        db.conn.commit()
+        stats = sink.stats()
+        assert stats["written"] == 1 and stats["failed"] == 1
+        names = {
+            r["tool_name"]
+            for r in db.conn.execute("SELECT tool_name FROM tool_call_log").fetchall()
+        }
+        assert names == {"audit", "other-store"}
+        sink.close()
+
+    def test_close_flushes_and_later_writes_are_synchronous(self, db: Database) -> None:
+        sink = AuditSink(db.conn, batch_size=100, flush_interval=60)
+        store = LLMCallStore(db, user_id="u1", sink=sink)
+        store.log(session_id="s1", model="m", prompt_tokens=3, completion_tokens=4)
+        sink.close()
+        assert _count(db, "llm_call_log") == 1
+        store.log(session_id="s1", model="m")
+        assert _count(db, "llm_call_log") == 2
+
+    def test_store_reads_see_pending_writes(self, db: Database) -> None:
+        sink = AuditSink(db.conn, batch_size=100, flush_interval=60)
+        store = LLMCallStore(db, user_id="u1", sink=sink)
+        store.log(session_id="s1", model="m", prompt_tokens=3, completion_tokens=4)
+        assert store.stats()["total_tokens"] == 7
+        assert len(ToolCallStore(db, sink=sink).query()) == 0
+        sink.close()
+
+
+class TestDatabaseAuditSink:
+    def test_shared_sink_flushed_on_close(self, tmp_path: Path) -> None:
+        path = tmp_path / "shared.db"
+        database = Database(str(path))
+        assert database.audit_sink is database.audit_sink
+        ToolCallStore(database, sink=database.audit_sink).log(tool_name="t", success=True)
+        database.close()
+
+        reopened = Database(str(path))
+        try:
+            assert _count(reopened, "tool_call_log") == 1
+        finally:
+            reopened.close()
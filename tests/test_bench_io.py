@@ -0,0 +1,97 @@
+"""I/O 微基准（bench_io）与 _read_df 单次解析测试。"""
+from __future__ import annotations
+
+from pathlib import Path
+
+import pandas as pd
+import pytest
+from openpyxl import Workbook
+
+from excelmanus import bench_io
+from excelmanus.tools import data_tools
+
+
+@pytest.fixture()
+def sample_xlsx(tmp_path: Path) -> Path:
+    return bench_io.make_sample_workbook(tmp_path / "sample.xlsx", rows=50, columns=6)
+
+
+class TestReadDfSinglePass:
+    def test_cold_call_parses_once(self, sample_xlsx: Path) -> None:
+        result = bench_io.bench_read_df(sample_xlsx, rounds=2)
+        assert result.header_row == 1
+        assert result.rows == 50
+        assert result.cold_parses.load_workbook == 1
+        assert result.cold_parses.read_excel == 0
+        assert [c.total for c in result.warm_parses] == [0, 0]
+
+    def test_unnamed_fallback_does_not_reparse(self, tmp_path: Path) -> None:
+        wb = Workbook()
+        ws = wb.active
+        # 前两行只有零散内容，真正表头在第 3 行
+        ws.append(["说明", None, None, None])
+        ws.append([None, None, None, "备注"])
+        ws.append(["编号", "名称", "数量", "金额"])
+        for i in range(10):
+            ws.append([i, f"n{i}", i * 2, i * 3.5])
+        fp = tmp_path / "fallback.xlsx"
+        wb.save(fp)
+
+        with bench_io.count_parses() as counts:
+            df, header = data_tools._read_df(fp, None, header_row=None)
+        assert counts.load_workbook == 1
+        assert list(df.columns) == ["编号", "名称", "数量", "金额"]
+        assert header == 2
+
+    def test_truncated_read_scans_prefix_once(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        fp = bench_io.make_sample_workbook(tmp_path / "big.xlsx", rows=2000, columns=4)
+        limits: list[int | None] = []
+        original = data_tools._scan_sheet
+
+        def _recording(path, sheet_name, max_row):
+            limits.append(max_row)
+            return original(path, sheet_name, max_row)
+
+        monkeypatch.setattr(data_tools, "_scan_sheet", _recording)
+        with bench_io.count_parses() as counts:
+            df, _ = data_tools._read_df(fp, "数据", max_rows=5)
+        assert len(df) == 5
+        assert counts.load_workbook == 1
+        assert limits and set(limits) == {limits[0]}
+        assert limits[0] is not None and limits[0] < 100
+
+    def test_merged_ranges_from_read_only_sheet(self, tmp_path: Path) -> None:
+        wb = Workbook()
+        ws = wb.active
+        ws.title = "合并"
+        ws.append(["标题"])
+        ws.merge_cells("A1:D1")
+        ws.merge_cells("B3:C4")
+        fp = tmp_path / "merged.xlsx"
+        wb.save(fp)
+        scan = data_tools._scan_sheet(fp, "合并", None)
+        assert sorted(scan.merged) == [(1, 1, 4, 1), (2, 3, 3, 4)]
+
+    @pytest.mark.parametrize("header", [0, 1, 2, None])
+    @pytest.mark.parametrize("nrows", [None, 5])
+    def test_frame_matches_read_excel(
+        self, sample_xlsx: Path, header: int | None, nrows: int | None,
+    ) -> None:
+        kwargs = {"io": sample_xlsx, "sheet_name": "数据", "header": header}
+        if nrows is not None:
+            kwargs["nrows"] = nrows
+        pd.testing.assert_frame_equal(
+            data_tools._read_excel_frame(**kwargs), pd.read_excel(**kwargs),
+        )
+
+    def test_missing_sheet_raises(self, sample_xlsx: Path) -> None:
+        with pytest.raises(ValueError, match="not found"):
+            data_tools._read_excel_frame(io=sample_xlsx, sheet_name="不存在")
+
+
+def test_cli_json_output(capsys: pytest.CaptureFixture[str]) -> None:
+    assert bench_io.main(["read-df", "--rows", "20", "--rounds", "1", "--json"]) == 0
+    out = capsys.readouterr().out
+    assert '"load_workbook": 1' in out
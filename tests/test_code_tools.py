@@ -486,3 +486,101 @@ class TestGetTools:
         assert run_code_tool.max_result_chars == 8000
         assert run_code_tool.truncate_head_chars == 5000
         assert run_code_tool.truncate_tail_chars == 3000
+
+
+class TestInterpreterProbeCache:
+    """解释器探测结果缓存。"""
+
+    @pytest.fixture(autouse=True)
+    def _clear_cache(self):
+        code_tools.clear_interpreter_probe_cache()
+        yield
+        code_tools.clear_interpreter_probe_cache()
+
+    @pytest.fixture()
+    def probe_calls(self, monkeypatch: pytest.MonkeyPatch) -> list[list[str]]:
+        calls: list[list[str]] = []
+
+        def _fake_probe(command, *, require_excel_deps, sandbox_tier="RED"):
+            calls.append(list(command))
+            return code_tools._InterpreterProbe(command=command, status="ok", detail="")
+
+        monkeypatch.setattr(code_tools, "_probe_environment", _fake_probe)
+        return calls
+
+    def _resolve(self, command: str, tier: str = "RED") -> list[str]:
+        resolved, _probes, _mode = code_tools._resolve_python_command(
+            command, require_excel_deps=True, sandbox_tier=tier,
+        )
+        return resolved
+
+    def test_repeated_resolve_probes_once(self, probe_calls: list[list[str]]) -> None:
+        assert self._resolve(sys.executable) == [sys.executable]
+        assert self._resolve(sys.executable) == [sys.executable]
+        assert len(probe_calls) == 1
+        # 安全等级不同，导入守卫不同，需要单独探测
+        self._resolve(sys.executable, tier="GREEN")
+        assert len(probe_calls) == 2
+        stats = code_tools.run_code_stats()["interpreter_probe"]
+        assert (stats["hits"], stats["misses"]) == (1, 2)
+        assert stats["resolve"]["cached"]["count"] == 1
+        assert stats["resolve"]["probed"]["count"] == 2
+
+    def test_interpreter_mtime_change_reprobes(
+        self, tmp_path: Path, probe_calls: list[list[str]],
+    ) -> None:
+        import os
+
+        fake = tmp_path / "python-fake"
+        fake.write_text("", encoding="utf-8")
+        self._resolve(str(fake))
+        self._resolve(str(fake))
+        stat = fake.stat()
+        os.utime(fake, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        self._resolve(str(fake))
+        assert len(probe_calls) == 2
+
+    def test_ttl_expiry_and_disable(
+        self, probe_calls: list[list[str]], monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        monkeypatch.setenv("EXCELMANUS_RUN_PYTHON_PROBE_TTL", "60")
+        self._resolve(sys.executable)
+        now = code_tools.time.monotonic()
+        monkeypatch.setattr(code_tools.time, "monotonic", lambda: now + 61)
+        self._resolve(sys.executable)
+        assert len(probe_calls) == 2
+        monkeypatch.setenv("EXCELMANUS_RUN_PYTHON_PROBE_TTL", "0")
+        self._resolve(sys.executable)
+        self._resolve(sys.executable)
+        assert len(probe_calls) == 4
+
+    def test_failed_probe_is_cached_briefly(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        calls: list[str] = []
+
+        def _missing(command, *, require_excel_deps, sandbox_tier="RED"):
+            calls.append(command[0])
+            return code_tools._InterpreterProbe(command=command, status="missing_deps", detail="x")
+
+        monkeypatch.setattr(code_tools, "_probe_environment", _missing)
+        for _ in range(2):
+            with pytest.raises(RuntimeError):
+                self._resolve(sys.executable)
+        assert len(calls) == 1
+        now = code_tools.time.monotonic()
+        monkeypatch.setattr(
+            code_tools.time, "monotonic", lambda: now + code_tools._PROBE_FAILURE_TTL + 1,
+        )
+        with pytest.raises(RuntimeError):
+            self._resolve(sys.executable)
+        assert len(calls) == 2
+
+    def test_import_failure_in_run_invalidates(self, workspace: Path) -> None:
+        ok = json.loads(code_tools.run_code(code="print(1)", python_command=sys.executable))
+        assert ok["status"] == "success"
+        assert code_tools.run_code_stats()["interpreter_probe"]["entries"] == 1
+        failed = json.loads(
+            code_tools.run_code(code="import not_a_real_module_xyz", python_command=sys.executable)
+        )
+        assert failed["status"] == "failed"
+        stats = code_tools.run_code_stats()["interpreter_probe"]
+        assert (stats["entries"], stats["invalidations"]) == (0, 1)
@@ -0,0 +1,171 @@
+"""列式旁路文件（Arrow IPC）测试。"""
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+
+import pandas as pd
+import pytest
+from openpyxl import Workbook
+
+pytest.importorskip("pyarrow")
+
+from excelmanus.tools import data_tools  # noqa: E402
+from excelmanus.tools._sidecar import ColumnarSidecar, set_sidecar  # noqa: E402
+
+
+@pytest.fixture()
+def sidecar(tmp_path: Path) -> ColumnarSidecar:
+    sc = ColumnarSidecar(tmp_path / "sidecar")
+    set_sidecar(sc)
+    yield sc
+    set_sidecar(None)
+
+
+@pytest.fixture()
+def workbook(tmp_path: Path) -> Path:
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "销售"
+    ws.append(["2024年度销售明细"])
+    ws.append(["日期", "产品", "数量", "金额"])
+    for i in range(30):
+        ws.append([f"2024-01-{i % 28 + 1:02d}", f"产品{i % 4}", i, i * 1.5])
+    other = wb.create_sheet("备注")
+    other.append(["说明", "内容"])
+    other.append(["负责人", "张三"])
+    data_dir = tmp_path / "ws"
+    data_dir.mkdir()
+    fp = data_dir / "sales.xlsx"
+    wb.save(fp)
+    return fp
+
+
+def _search(fp: Path, **kwargs) -> dict:
+    data_tools.init_guard(str(fp.parent))
+    return json.loads(data_tools.search_excel_values(file_path=str(fp), **kwargs))
+
+
+class TestBuildAndLoad:
+    def test_frame_roundtrip_matches_read_df(self, workbook: Path, sidecar: ColumnarSidecar) -> None:
+        expected, header = data_tools._read_df(workbook, "销售")
+        assert sidecar.build(workbook) is True
+        hit = sidecar.load_frame(workbook, "销售")
+        assert hit is not None
+        df, hit_header = hit
+        assert hit_header == header == 1
+        pd.testing.assert_frame_equal(df, expected)
+
+    def test_read_df_uses_sidecar(
+        self, workbook: Path, sidecar: ColumnarSidecar, monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        sidecar.build(workbook)
+
+        def _fail(*args, **kwargs):
+            raise AssertionError("不应再解析 xlsx")
+
+        monkeypatch.setattr(data_tools, "_build_read_kwargs", _fail)
+        df, header = data_tools._read_df(workbook, "销售")
+        assert header == 1
+        assert list(df.columns) == ["日期", "产品", "数量", "金额"]
+        # 显式 header_row 与旁路结果一致时同样命中
+        data_tools._read_df(workbook, "销售", header_row=1)
+
+    def test_truncated_and_other_header_fall_back(self, workbook: Path, sidecar: ColumnarSidecar) -> None:
+        sidecar.build(workbook)
+        df, _ = data_tools._read_df(workbook, "销售", max_rows=5)
+        assert len(df) == 5
+        df0, header0 = data_tools._read_df(workbook, "销售", header_row=0)
+        assert header0 == 0
+        assert df0.columns[0] == "2024年度销售明细"
+
+    def test_source_change_invalidates(self, workbook: Path, sidecar: ColumnarSidecar) -> None:
+        sidecar.build(workbook)
+        wb = Workbook()
+        wb.active.title = "销售"
+        wb.active.append(["a", "b", "c"])
+        wb.active.append([1, 2, 3])
+        wb.save(workbook)
+        assert sidecar.load_frame(workbook, "销售") is None
+        assert sidecar.sheet_names(workbook) is None
+
+    def test_hits_refresh_entry_for_lru_eviction(self, workbook: Path, sidecar: ColumnarSidecar) -> None:
+        sidecar.build(workbook)
+        (entry,) = [p for p in sidecar.root_dir.iterdir() if p.is_dir() and not p.name.startswith(".")]
+        os.utime(entry, (1, 1))
+        assert sidecar.load_frame(workbook, "销售") is not None
+        assert entry.stat().st_mtime > 1
+        os.utime(entry, (1, 1))
+        assert sidecar.cell_rows(workbook, "备注") is not None
+        assert entry.stat().st_mtime > 1
+
+    def test_schedule_builds_in_background(self, workbook: Path, sidecar: ColumnarSidecar) -> None:
+        future = sidecar.schedule(workbook)
+        assert future is not None
+        assert future.result(timeout=30) is True
+        assert sidecar.sheet_names(workbook) == ["销售", "备注"]
+
+    def test_build_uses_private_workbook(self, workbook: Path, sidecar: ColumnarSidecar) -> None:
+        from excelmanus.tools._read_cache import ParsedFileCache, set_read_cache
+
+        cache = ParsedFileCache(64 * 1024 * 1024)
+        set_read_cache(cache)
+        shared = data_tools._load_full_workbook(workbook, data_only=True)
+        entries = cache.stats()["entries"]
+        # 工具线程持有共享 workbook 时，后台构建不应等待它
+        with shared.lock:
+            future = sidecar.schedule(workbook)
+            assert future.result(timeout=30) is True
+        assert cache.stats()["entries"] == entries
+
+
+class TestSearchWithSidecar:
+    @pytest.mark.parametrize("kwargs", [
+        {"query": "产品2"},
+        {"query": "张三"},
+        {"query": "1.5", "match_mode": "contains", "columns": ["Col_0"]},
+        {"query": "日期", "match_mode": "exact"},
+        {"query": r"^2024-01-0\d$", "match_mode": "regex", "max_results": 3},
+    ])
+    def test_results_identical(self, workbook: Path, sidecar: ColumnarSidecar, kwargs: dict) -> None:
+        expected = _search(workbook, **kwargs)
+        sidecar.build(workbook)
+        assert _search(workbook, **kwargs) == expected
+
+
+def test_disabled_without_env(monkeypatch: pytest.MonkeyPatch) -> None:
+    from excelmanus.tools._sidecar import get_sidecar
+
+    set_sidecar(None)
+    monkeypatch.setenv("EXCELMANUS_SIDECAR_ENABLED", "0")
+    assert get_sidecar() is None
+
+
+def test_search_skips_workbook_parse(
+    workbook: Path, sidecar: ColumnarSidecar, monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    import openpyxl
+
+    sidecar.build(workbook)
+
+    def _fail(*args, **kwargs):
+        raise AssertionError("不应再解析 xlsx")
+
+    monkeypatch.setattr(openpyxl, "load_workbook", _fail)
+    result = _search(workbook, query="产品1")
+    assert result["total_matches"] == 8
+
+
+def test_register_upload_schedules_build(
+    workbook: Path, sidecar: ColumnarSidecar, tmp_path: Path,
+) -> None:
+    from excelmanus.database import Database
+    from excelmanus.file_registry import FileRegistry
+
+    registry = FileRegistry(Database(str(tmp_path / "t.db")), workbook.parent)
+    registry.register_upload("sales.xlsx", "sales.xlsx", size_bytes=workbook.stat().st_size)
+    future = sidecar.schedule(workbook)
+    assert future is not None
+    future.result(timeout=30)
+    assert sidecar.sheet_names(workbook) == ["销售", "备注"]
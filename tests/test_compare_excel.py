@@ -279,6 +279,99 @@ class TestEdgeCases:
         assert result["summary"]["cells_different"] > 0
 
 
+# ── 向量化对比引擎 ───────────────────────────────────────
+
+class TestVectorizedDiff:
+    """全量统计、按块明细与值等价判定。"""
+
+    def test_full_counts_beyond_max_diffs(self, tmp_path: Path):
+        """统计为全量，不受 max_diffs 截断影响。"""
+        rows_a = [["ID", "金额", "备注"]] + [[i, i * 10, "ok"] for i in range(200)]
+        rows_b = [row[:] for row in rows_a]
+        for i in range(1, 201, 2):
+            rows_b[i][1] = -1
+        fa = _make_xlsx(tmp_path / "a.xlsx", {"Sheet1": rows_a})
+        fb = _make_xlsx(tmp_path / "b.xlsx", {"Sheet1": rows_b})
+
+        result = json.loads(compare_excel(str(fa), str(fb), key_columns=["ID"], max_diffs=5))
+
+        summary = result["summary"]
+        assert summary["rows_modified"] == 100
+        assert summary["cells_different"] == 100
+        assert summary["column_stats"] == {"金额": {"changed": 100}}
+        assert result["truncated"] is True
+        assert len(result["sample_diffs"]) == 5
+        assert result["sample_diffs"][0] == {"key": "0", "column": "金额", "old": 0, "new": -1}
+
+    def test_column_stats_added_removed(self, tmp_path: Path):
+        rows_a = [["ID", "名称", "数量"]] + [[1, "a", 1], [2, "b", None], [3, "c", 3]]
+        rows_b = [["ID", "名称", "数量"]] + [[1, "a", 1], [3, "c", 4], [4, "d", None]]
+        fa = _make_xlsx(tmp_path / "a.xlsx", {"Sheet1": rows_a})
+        fb = _make_xlsx(tmp_path / "b.xlsx", {"Sheet1": rows_b})
+
+        result = json.loads(compare_excel(str(fa), str(fb), key_columns=["ID"]))
+
+        stats = result["summary"]["column_stats"]
+        assert stats["数量"] == {"changed": 1}
+        assert stats["ID"] == {"added": 1, "removed": 1}
+        assert stats["名称"] == {"added": 1, "removed": 1}
+
+    def test_numeric_equivalent_values_not_different(self, tmp_path: Path):
+        """3 与 3.0、"3" 与 3 视为相同。"""
+        rows_a = [["v"], [3], [4.0], ["5"], [None]]
+        rows_b = [["v"], [3.0], ["x"], [5], [None]]
+        fa = _make_xlsx(tmp_path / "a.xlsx", {"Sheet1": rows_a})
+        fb = _make_xlsx(tmp_path / "b.xlsx", {"Sheet1": rows_b})
+
+        result = json.loads(compare_excel(str(fa), str(fb)))
+
+        assert result["summary"]["cells_different"] == 1
+        assert result["sample_diffs"] == [{"cell": "A3", "old": 4.0, "new": "x"}]
+
+    def test_blank_keys_are_not_joined(self):
+        import pandas as pd
+
+        from excelmanus.tools._frame_diff import diff_frames
+
+        df_a = pd.DataFrame({"ID": ["1", None, " ", "2"], "v": [1, 2, 3, 4]})
+        df_b = pd.DataFrame({"ID": ["1", None, "", "2"], "v": [1, 9, 9, 5]})
+        diff = diff_frames(df_a, df_b, ["ID", "v"], key_columns=["ID"])
+
+        assert (diff.blank_key_rows_a, diff.blank_key_rows_b) == (2, 2)
+        assert (diff.rows_deleted, diff.rows_added, diff.rows_modified) == (2, 2, 1)
+        assert diff.head(10) == [{"key": "2", "column": "v", "old": 4, "new": 5}]
+
+    def test_blank_keys_reported(self, tmp_path: Path):
+        rows_a = [["ID", "金额"], [1, 10], [None, 20], [2, 30]]
+        rows_b = [["ID", "金额"], [1, 10], [None, 99], [2, 30]]
+        fa = _make_xlsx(tmp_path / "a.xlsx", {"Sheet1": rows_a})
+        fb = _make_xlsx(tmp_path / "b.xlsx", {"Sheet1": rows_b})
+
+        result = json.loads(compare_excel(str(fa), str(fb), key_columns=["ID"]))
+
+        summary = result["summary"]
+        assert summary["blank_key_rows"] == {"a": 1, "b": 1}
+        assert (summary["rows_added"], summary["rows_deleted"]) == (1, 1)
+        assert summary["cells_different"] == 0
+
+    def test_iter_chunks_streams_all_records(self):
+        import pandas as pd
+
+        from excelmanus.tools._frame_diff import diff_frames
+
+        df_a = pd.DataFrame({"k": range(50), "v": range(50)})
+        df_b = pd.DataFrame({"k": range(55), "v": [x + (x % 3 == 0) for x in range(55)]})
+        diff = diff_frames(df_a, df_b, ["k", "v"])
+
+        chunks = list(diff.iter_chunks(7))
+        records = [r for c in chunks for r in c]
+        assert all(len(c) <= 7 for c in chunks)
+        assert diff.rows_added == 5
+        assert len(records) == diff.cells_different == 17 + 10
+        assert records[0] == {"cell": "B2", "old": 0, "new": 1}
+        assert records[-1] == {"cell": "R56:v", "old": None, "new": 55}
+
+
 # ── Policy 注册测试 ───────────────────────────────────────
 
 class TestPolicyRegistration:
@@ -0,0 +1,293 @@
+"""数据库连接池（SQLite 读连接池 + 串行写连接 / PG 批量写入）测试。"""
+from __future__ import annotations
+
+import contextlib
+import threading
+from pathlib import Path
+
+import pytest
+
+from excelmanus.db_adapter import (
+    _sqlite_to_pg,
+    _translate_pg,
+    create_sqlite_adapter,
+    prepared_statement_name,
+    register_prepared_statement,
+)
+from excelmanus.db_pool import (
+    PgConnectionPool,
+    SqliteConnectionPool,
+    default_pool_size,
+    split_values_template,
+)
+
+
+@pytest.fixture()
+def adapter(tmp_path: Path):
+    conn = create_sqlite_adapter(str(tmp_path / "pool.db"), max_readers=4)
+    conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, val TEXT)")
+    conn.commit()
+    yield conn
+    conn.close()
+
+
+class TestSqlitePool:
+    def test_adapter_uses_pool_for_files(self, adapter) -> None:
+        assert isinstance(adapter.pool, SqliteConnectionPool)
+        assert adapter.pool.max_readers == 4
+
+    def test_memory_database_is_not_pooled(self) -> None:
+        conn = create_sqlite_adapter(":memory:")
+        assert conn.pool is None
+        conn.close()
+
+    def test_committed_reads_use_reader_connection(self, adapter) -> None:
+        adapter.execute("INSERT INTO t (val) VALUES (?)", ("a",))
+        adapter.commit()
+        row = adapter.execute("SELECT val FROM t").fetchone()
+        assert row["val"] == "a"
+        assert adapter.pool.stats()["pooled_reads"] == 1
+
+    def test_uncommitted_writes_are_visible(self, adapter) -> None:
+        adapter.execute("INSERT INTO t (val) VALUES (?)", ("pending",))
+        row = adapter.execute("SELECT COUNT(*) AS n FROM t").fetchone()
+        assert row["n"] == 1
+        assert adapter.pool.stats()["writer_reads"] == 1
+        adapter.commit()
+
+    def test_buffered_cursor_fetch_semantics(self, adapter) -> None:
+        adapter.executemany("INSERT INTO t (val) VALUES (?)", [("a",), ("b",), ("c",)])
+        adapter.commit()
+        cur = adapter.execute("SELECT val FROM t ORDER BY id")
+        assert cur.fetchone()["val"] == "a"
+        assert [r["val"] for r in cur.fetchall()] == ["b", "c"]
+        assert cur.fetchone() is None
+
+    def test_writer_state_functions_stay_on_writer(self, adapter) -> None:
+        adapter.execute("INSERT INTO t (val) VALUES (?)", ("x",))
+        adapter.commit()
+        row = adapter.execute("SELECT last_insert_rowid() AS rid").fetchone()
+        assert row["rid"] == 1
+
+    def test_concurrent_readers_and_writers(self, adapter) -> None:
+        errors: list[BaseException] = []
+
+        def _writer(n: int) -> None:
+            try:
+                for i in range(50):
+                    adapter.execute("INSERT INTO t (val) VALUES (?)", (f"{n}-{i}",))
+                    adapter.commit()
+            except BaseException as exc:  # pragma: no cover - 失败时记录
+                errors.append(exc)
+
+        def _reader() -> None:
+            try:
+                for _ in range(100):
+                    adapter.execute("SELECT COUNT(*) AS n FROM t").fetchone()
+            except BaseException as exc:  # pragma: no cover
+                errors.append(exc)
+
+        threads = [threading.Thread(target=_writer, args=(i,)) for i in range(4)]
+        threads += [threading.Thread(target=_reader) for _ in range(8)]
+        for th in threads:
+            th.start()
+        for th in threads:
+            th.join()
+        assert errors == []
+        assert adapter.execute("SELECT COUNT(*) AS n FROM t").fetchone()["n"] == 200
+        assert adapter.pool.stats()["readers"] <= 4
+
+    def test_row_factory_propagates_to_readers(self, adapter) -> None:
+        adapter.execute("INSERT INTO t (val) VALUES (?)", ("a",))
+        adapter.commit()
+        adapter.execute("SELECT 1").fetchone()  # 预热一条只读连接
+        adapter.row_factory = None
+        assert adapter.execute("SELECT val FROM t").fetchone() == ("a",)
+
+    def test_pool_size_env(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setenv("EXCELMANUS_DB_POOL_SIZE", "3")
+        assert default_pool_size("sqlite") == 3
+        monkeypatch.setenv("EXCELMANUS_DB_POOL_SIZE", "bad")
+        assert default_pool_size("postgres") == 10
+
+
+class TestSplitValuesTemplate:
+    def test_plain_insert(self) -> None:
+        sql = "INSERT INTO t (a, b) VALUES (%s, %s)"
+        assert split_values_template(sql) == ("INSERT INTO t (a, b) VALUES %s", "(%s, %s)")
+
+    def test_on_conflict_tail_kept(self) -> None:
+        sql = "INSERT INTO t (a) VALUES (%s) ON CONFLICT DO NOTHING"
+        assert split_values_template(sql) == (
+            "INSERT INTO t (a) VALUES %s ON CONFLICT DO NOTHING", "(%s)",
+        )
+
+    def test_placeholder_after_values_falls_back(self) -> None:
+        sql = "INSERT INTO t (a) VALUES (%s) ON CONFLICT (a) DO UPDATE SET b = %s"
+        assert split_values_template(sql) is None
+
+    def test_non_insert_falls_back(self) -> None:
+        assert split_values_template("UPDATE t SET a = %s WHERE id = %s") is None
+
+
+class _FakePgCursor:
+    description = None
+    rowcount = 1
+
+    def __init__(self, log: list) -> None:
+        self._log = log
+
+    def execute(self, sql, params=None) -> None:
+        if sql == "FAIL":
+            raise RuntimeError("statement failed")
+        self._log.append((sql, params))
+
+    def close(self) -> None:
+        pass
+
+
+class _FakePgConn:
+    def __init__(self) -> None:
+        self.log: list = []
+        self.closed = False
+        self.autocommit = True
+
+    def cursor(self) -> _FakePgCursor:
+        return _FakePgCursor(self.log)
+
+    def commit(self) -> None:
+        self.log.append(("COMMIT", None))
+
+    def rollback(self) -> None:
+        self.log.append(("ROLLBACK", None))
+
+
+class _FakeThreadedPool:
+    def __init__(self, size: int) -> None:
+        self.idle = [_FakePgConn() for _ in range(size)]
+        self.returned: list = []
+
+    def getconn(self) -> _FakePgConn:
+        if not self.idle:
+            raise RuntimeError("connection pool exhausted")
+        return self.idle.pop()
+
+    def putconn(self, conn, close: bool = False) -> None:
+        self.returned.append(conn)
+        self.idle.append(conn)
+
+
+def _bare_pg_pool(size: int) -> PgConnectionPool:
+    # 绕过 psycopg2 连接池构造，仅验证借还与事务边界
+    pool = PgConnectionPool.__new__(PgConnectionPool)
+    pool._pool = _FakeThreadedPool(size)
+    pool._primary = _FakePgConn()
+    pool._primary_lock = threading.RLock()
+    pool._local = threading.local()
+    pool._closed = False
+    pool._use_prepared = False
+    pool._prepared = {}
+    pool._prepared_lock = threading.Lock()
+    pool.fallbacks = 0
+    pool.prepared_executions = 0
+    return pool
+
+
+class TestPgBorrowPerStatement:
+    def test_statement_commits_and_returns_connection(self) -> None:
+        pool = _bare_pg_pool(1)
+        cursor = pool.execute("UPDATE t SET a = %s", (1,))
+        assert cursor.rowcount == 1
+        conn = pool._pool.returned[0]
+        assert conn.log == [("UPDATE t SET a = %s", (1,)), ("COMMIT", None)]
+        assert pool._pool.idle == [conn]
+
+    def test_failed_statement_rolls_back_and_returns(self) -> None:
+        pool = _bare_pg_pool(1)
+        with pytest.raises(RuntimeError):
+            pool.execute("FAIL")
+        conn = pool._pool.returned[0]
+        assert conn.log == [("ROLLBACK", None)]
+        assert pool._pool.idle == [conn]
+
+    def test_scope_groups_statements_into_one_transaction(self) -> None:
+        pool = _bare_pg_pool(2)
+        with pool.connection() as conn:
+            pool.execute("INSERT 1")
+            pool.execute("INSERT 2")
+        assert conn.log == [("INSERT 1", ()), ("INSERT 2", ()), ("COMMIT", None)]
+        assert pool._pool.returned == [conn]
+
+    def test_connections_are_not_pinned_to_threads(self) -> None:
+        pool = _bare_pg_pool(1)
+        threads = [
+            threading.Thread(target=pool.execute, args=(f"INSERT {i}",))
+            for i in range(4)
+        ]
+        for t in threads:
+            t.start()
+            t.join()
+        assert len(pool._pool.returned) == 4
+        assert pool.fallbacks == 0
+
+    def test_exhausted_pool_falls_back_to_primary(self) -> None:
+        pool = _bare_pg_pool(0)
+        pool.execute("INSERT 1")
+        assert pool.fallbacks == 1
+        assert pool._primary.log == [("INSERT 1", ()), ("COMMIT", None)]
+        assert pool._primary_lock.acquire(blocking=False)
+        pool._primary_lock.release()
+
+
+class TestPgPreparedStatements:
+    def _pool(self, conn: _FakePgConn) -> PgConnectionPool:
+        # 绕过 psycopg2 连接池构造，仅验证 PREPARE / EXECUTE 语句生成
+        pool = PgConnectionPool.__new__(PgConnectionPool)
+        pool._use_prepared = True
+        pool._prepared = {}
+        pool._prepared_lock = threading.Lock()
+        pool.prepared_executions = 0
+        pool.connection = lambda: contextlib.nullcontext(conn)  # type: ignore[method-assign]
+        return pool
+
+    def test_prepare_once_per_connection(self) -> None:
+        conn = _FakePgConn()
+        pool = self._pool(conn)
+        sql = "INSERT INTO t (a, b) VALUES (%s, %s) ON CONFLICT DO NOTHING"
+        pool.execute(sql, (1, 2), prepared="em_x")
+        pool.execute(sql, (3, 4), prepared="em_x")
+        assert conn.log == [
+            ("PREPARE em_x AS INSERT INTO t (a, b) VALUES ($1, $2) ON CONFLICT DO NOTHING", None),
+            ("EXECUTE em_x (%s, %s)", (1, 2)),
+            ("EXECUTE em_x (%s, %s)", (3, 4)),
+        ]
+        assert pool.prepared_executions == 2
+
+    def test_disabled_uses_plain_execute(self) -> None:
+        conn = _FakePgConn()
+        pool = self._pool(conn)
+        pool._use_prepared = False
+        pool.execute("INSERT INTO t (a) VALUES (%s)", (1,), prepared="em_x")
+        assert conn.log == [("INSERT INTO t (a) VALUES (%s)", (1,))]
+
+
+class TestTranslationCache:
+    def test_translation_is_memoized(self) -> None:
+        sql = "INSERT OR IGNORE INTO memo_t (a) VALUES (?)"
+        _translate_pg.cache_clear()
+        first = _translate_pg(sql)
+        second = _translate_pg(sql)
+        assert first is second
+        assert first == _sqlite_to_pg(sql)
+        info = _translate_pg.cache_info()
+        assert info.hits == 1 and info.misses == 1
+
+    def test_registered_statement_names_are_stable(self) -> None:
+        from excelmanus.stores import tool_call_store
+
+        sql = tool_call_store._INSERT_SQL
+        name = register_prepared_statement(sql)
+        assert name == register_prepared_statement(sql)
+        assert prepared_statement_name(sql) == name
+        assert name.startswith("em_") and name.isidentifier()
+        assert prepared_statement_name("SELECT 1") is None
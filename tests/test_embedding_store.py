@@ -9,6 +9,7 @@ from pathlib import Path
 import numpy as np
 import pytest
 
+from excelmanus.embedding.search import cosine_top_k
 from excelmanus.embedding.store import VectorStore
 
 
@@ -160,3 +161,151 @@ class TestVectorStoreHashConsistency:
         added = store.add("hello world", np.zeros(2, dtype=np.float32))
         assert added is False  # 空白归一后相同
         assert store.size == 1
+
+
+def _random_store(
+    store_dir: Path, n: int, dims: int, **kwargs,
+) -> tuple[VectorStore, np.ndarray]:
+    rng = np.random.default_rng(42)
+    vecs = rng.standard_normal((n, dims)).astype(np.float32)
+    store = VectorStore(store_dir, dimensions=dims, **kwargs)
+    store.add_batch([f"t{i}" for i in range(n)], vecs)
+    return store, vecs
+
+
+class TestVectorStoreSearch:
+    """VectorStore.search：精确路径、mmap 持久化与 ANN 索引。"""
+
+    def test_exact_search_matches_cosine_top_k(self, tmp_store_dir: Path):
+        store, vecs = _random_store(tmp_store_dir, 200, 16)
+        query = vecs[7] + 0.01
+        expected = cosine_top_k(query, vecs, k=5, threshold=0.1)
+        results = store.search(query, k=5, threshold=0.1)
+        assert [r.index for r in results] == [r.index for r in expected]
+        for got, want in zip(results, expected):
+            assert got.score == pytest.approx(want.score, abs=1e-5)
+
+    def test_search_sees_appended_vectors(self, tmp_store_dir: Path):
+        store, _ = _random_store(tmp_store_dir, 20, 4)
+        store.search(np.ones(4, dtype=np.float32), k=1)
+        store.add("new", np.array([0, 0, 0, 9], dtype=np.float32))
+        results = store.search(np.array([0, 0, 0, 1], dtype=np.float32), k=1)
+        assert results[0].index == 20
+        assert results[0].score == pytest.approx(1.0)
+
+    def test_zero_query_returns_empty(self, tmp_store_dir: Path):
+        store, _ = _random_store(tmp_store_dir, 5, 4)
+        assert store.search(np.zeros(4, dtype=np.float32)) == []
+
+    def test_invalid_storage_mode(self, tmp_store_dir: Path):
+        with pytest.raises(ValueError):
+            VectorStore(tmp_store_dir, dimensions=2, storage="disk")
+
+    @pytest.mark.parametrize("quantization", ["float32", "float16", "int8"])
+    def test_mmap_roundtrip(self, tmp_store_dir: Path, quantization: str):
+        store, vecs = _random_store(
+            tmp_store_dir, 50, 8, storage="mmap", quantization=quantization,
+        )
+        store.save()
+
+        reloaded = VectorStore(
+            tmp_store_dir, dimensions=8, storage="mmap", quantization=quantization,
+        )
+        assert isinstance(reloaded.normalized_matrix, np.memmap)
+        results = reloaded.search(vecs[3], k=1)
+        assert results[0].index == 3
+        assert results[0].score == pytest.approx(1.0, abs=0.02)
+
+    def test_ann_index_persisted_and_recalls_neighbours(self, tmp_store_dir: Path):
+        store, vecs = _random_store(
+            tmp_store_dir, 600, 8, storage="mmap", ann_min_size=100,
+        )
+        store.save()
+        assert (tmp_store_dir / "ann" / "centroids.npy").exists()
+
+        reloaded = VectorStore(
+            tmp_store_dir, dimensions=8, storage="mmap", ann_min_size=100,
+        )
+        hits = sum(
+            reloaded.search(vecs[i], k=1)[0].index == i for i in range(0, 600, 10)
+        )
+        assert hits >= 57  # 近似检索，允许极少量漏召回
+
+    def test_ann_tail_scanned_after_append(self, tmp_store_dir: Path):
+        store, _ = _random_store(
+            tmp_store_dir, 300, 8, storage="mmap", ann_min_size=100,
+        )
+        store.save()  # 保存时建索引
+        assert store._ann is not None
+        target = np.zeros(8, dtype=np.float32)
+        target[0] = 1.0
+        store.add("needle", target * 5)
+        results = store.search(target, k=1)
+        assert results[0].index == 300
+
+    @pytest.mark.parametrize("quantization", ["int8", "float16"])
+    def test_quantized_ann_scores_and_recall(self, tmp_store_dir: Path, quantization: str):
+        rng = np.random.default_rng(0)
+        centers = rng.standard_normal((40, 64))
+        vecs = (
+            centers[rng.integers(0, 40, 3000)] + 0.5 * rng.standard_normal((3000, 64))
+        ).astype(np.float32)
+        store = VectorStore(
+            tmp_store_dir, dimensions=64, storage="mmap",
+            quantization=quantization, ann_min_size=1000,
+        )
+        store.add_batch([f"t{i}" for i in range(3000)], vecs)
+        store.save()
+        assert store._ann is not None
+        overlap = 0
+        for i in range(0, 3000, 100):
+            results = store.search(vecs[i], k=5)
+            assert results[0].index == i
+            assert all(r.score <= 1.01 for r in results)
+            exact = {r.index for r in cosine_top_k(vecs[i], vecs, k=5)}
+            overlap += len(exact & {r.index for r in results})
+        assert overlap / 150 >= 0.85
+
+    def test_memory_storage_never_builds_ann(self, tmp_store_dir: Path):
+        store, vecs = _random_store(tmp_store_dir, 300, 8, ann_min_size=100)
+        assert store.search(vecs[5], k=1)[0].index == 5
+        assert store._ann is None
+        assert store._ann_thread is None
+
+    def test_ann_built_off_query_path(self, tmp_store_dir: Path):
+        store, vecs = _random_store(
+            tmp_store_dir, 300, 8, storage="mmap", ann_min_size=100,
+        )
+        # 首次查询走精确路径，索引在后台构建
+        assert store.search(vecs[5], k=1)[0].index == 5
+        assert store._ann_thread is not None
+        store._ann_thread.join(timeout=30)
+        assert store._ann is not None and store._ann.size == 300
+
+    def test_ann_rebuilt_when_tail_grows(self, tmp_store_dir: Path):
+        store, _ = _random_store(
+            tmp_store_dir, 200, 8, storage="mmap", ann_min_size=100,
+        )
+        store.save()
+        old_index = store._ann
+        rng = np.random.default_rng(7)
+        extra = rng.standard_normal((50, 8)).astype(np.float32)
+        store.add_batch([f"x{i}" for i in range(50)], extra)
+        store.save()
+        assert store._ann is not old_index
+        assert store._ann.size == 250
+
+    def test_append_keeps_mmap_base(self, tmp_store_dir: Path):
+        store, _ = _random_store(tmp_store_dir, 50, 8, storage="mmap")
+        store.save()
+        reloaded = VectorStore(tmp_store_dir, dimensions=8, storage="mmap")
+        target = np.zeros(8, dtype=np.float32)
+        target[2] = 1.0
+        reloaded.add("needle", target * 3)
+        assert reloaded.search(target, k=1)[0].index == 50
+        assert isinstance(reloaded._normed, np.memmap)
+        assert reloaded._normed_tail.shape == (1, 8)
+        reloaded.save()
+        assert isinstance(reloaded._normed, np.memmap)
+        assert reloaded._normed.shape == (51, 8)
+        assert reloaded._normed_tail is None
@@ -419,6 +419,40 @@ class TestRegistryScan:
             final_status = await engine.chat("/registry status")
             assert "已就绪" in final_status.reply
 
+    @pytest.mark.asyncio
+    async def test_registry_status_reports_scan_progress(self) -> None:
+        config = _make_config()
+        registry = _make_registry_with_tools()
+        engine = AgentEngine(config, registry)
+
+        if engine._file_registry is None:
+            pytest.skip("FileRegistry 未初始化（无 database）")
+
+        gate = threading.Event()
+        reported = threading.Event()
+
+        def _slow_scan(*_args, **kwargs):
+            from excelmanus.file_registry import ScanProgress, ScanResult
+
+            kwargs["on_progress"](ScanProgress("extract", 2, 5, "a.xlsx"))
+            reported.set()
+            gate.wait(timeout=2)
+            return ScanResult(total_files=5)
+
+        with patch.object(engine._file_registry, "scan_workspace", side_effect=_slow_scan):
+            assert engine.start_registry_scan() is True
+            await asyncio.to_thread(reported.wait, 2)
+
+            status = engine.registry_scan_status()
+            assert status["state"] == "building"
+            assert status["progress"]["done"] == 2
+            assert status["progress"]["total"] == 5
+            status_reply = await engine.chat("/registry status")
+            assert "2/5" in status_reply.reply
+
+            gate.set()
+            await engine._registry_scan_task
+
 
 class TestModelSwitchConsistency:
     """模型切换与路由模型一致性测试。"""
@@ -0,0 +1,138 @@
+"""AgentEngine 预热池（EnginePool）测试。"""
+from __future__ import annotations
+
+import asyncio
+import threading
+
+import pytest
+
+from excelmanus import engine_pool as ep
+from excelmanus.engine_pool import EnginePool, PooledEngine
+
+
+class _Factory:
+    def __init__(self) -> None:
+        self.built: list[str | None] = []
+        self.disposed: list[object] = []
+        self.fingerprint: object = "v1"
+        self.threads: set[int] = set()
+
+    def build(self, key: str | None) -> PooledEngine:
+        self.threads.add(threading.get_ident())
+        self.built.append(key)
+        return PooledEngine(engine=object(), fingerprint=self.fingerprint)
+
+    def current(self, key: str | None) -> object:
+        return self.fingerprint
+
+    async def dispose(self, engine: object) -> None:
+        self.disposed.append(engine)
+
+
+def _pool(factory: _Factory, size: int = 2, **kwargs) -> EnginePool:
+    return EnginePool(
+        factory.build,
+        size=size,
+        fingerprint=factory.current,
+        dispose=factory.dispose,
+        **kwargs,
+    )
+
+
+class TestRefillAndTake:
+    @pytest.mark.asyncio
+    async def test_refill_builds_off_loop_up_to_size(self) -> None:
+        factory = _Factory()
+        pool = _pool(factory, size=2)
+        assert await pool.refill(None) == 2
+        assert await pool.refill(None) == 0
+        assert threading.get_ident() not in factory.threads
+        assert pool.take(None) is not None
+        assert pool.take(None) is not None
+        assert pool.take(None) is None
+        stats = pool.stats()
+        assert (stats["hits"], stats["misses"], stats["built"]) == (2, 1, 2)
+
+    @pytest.mark.asyncio
+    async def test_keys_are_isolated(self) -> None:
+        factory = _Factory()
+        pool = _pool(factory, size=1)
+        await pool.refill("alice")
+        assert pool.take("bob") is None
+        assert pool.take("alice") is not None
+
+    @pytest.mark.asyncio
+    async def test_disabled_pool_never_builds(self) -> None:
+        factory = _Factory()
+        pool = _pool(factory, size=0)
+        assert not pool.enabled
+        assert await pool.refill(None) == 0
+        assert pool.take(None) is None
+        assert factory.built == []
+
+
+class TestStaleness:
+    @pytest.mark.asyncio
+    async def test_fingerprint_change_discards_entries(self) -> None:
+        factory = _Factory()
+        pool = _pool(factory, size=1)
+        await pool.refill("alice")
+        factory.fingerprint = "v2"
+        assert pool.take("alice") is None
+        await asyncio.sleep(0)
+        assert len(factory.disposed) == 1
+        assert pool.stats()["discarded"] == 1
+
+    @pytest.mark.asyncio
+    async def test_idle_entries_expire(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        factory = _Factory()
+        pool = _pool(factory, size=1, max_idle_seconds=10)
+        await pool.refill(None)
+        now = ep.time.monotonic()
+        monkeypatch.setattr(ep.time, "monotonic", lambda: now + 11)
+        assert pool.take(None) is None
+
+    @pytest.mark.asyncio
+    async def test_invalidate_drops_in_flight_builds(self) -> None:
+        factory = _Factory()
+        release = threading.Event()
+        original = factory.build
+
+        def _slow(key):
+            release.wait(5)
+            return original(key)
+
+        pool = EnginePool(_slow, size=1, dispose=factory.dispose)
+        task = asyncio.create_task(pool.refill(None))
+        await asyncio.sleep(0.05)
+        pool.invalidate()
+        release.set()
+        assert await task == 0
+        assert pool.take(None) is None
+        assert len(factory.disposed) == 1
+
+    @pytest.mark.asyncio
+    async def test_close_disposes_idle_engines(self) -> None:
+        factory = _Factory()
+        pool = _pool(factory, size=2)
+        await pool.refill(None)
+        await pool.close()
+        assert len(factory.disposed) == 2
+        assert not pool.enabled
+        assert await pool.refill(None) == 0
+
+
+class TestLatencyStats:
+    def test_ready_and_first_token_split_by_path(self) -> None:
+        pool = _pool(_Factory())
+        for ms in (10.0, 20.0, 30.0):
+            pool.record_ready(True, ms)
+        pool.record_ready(False, 200.0)
+        pool.record_first_token(False, 900.0)
+        stats = pool.stats()
+        assert stats["engine_ready"]["pooled"]["count"] == 3
+        assert stats["engine_ready"]["pooled"]["avg_ms"] == 20.0
+        assert stats["engine_ready"]["pooled"]["p50_ms"] == 20.0
+        assert stats["engine_ready"]["cold"]["max_ms"] == 200.0
+        assert stats["first_token"]["cold"]["count"] == 1
+        assert stats["first_token"]["pooled"] == {"count": 0}
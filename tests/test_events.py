@@ -172,6 +172,7 @@ class TestEventTypeEnum:
             ("THINKING_DELTA", "thinking_delta"),
             ("TEXT_DELTA", "text_delta"),
             ("TOOL_CALL_ARGS_DELTA", "tool_call_args_delta"),
+            ("TOOL_OUTPUT_DELTA", "tool_output_delta"),
             ("MODE_CHANGED", "mode_changed"),
             ("EXCEL_PREVIEW", "excel_preview"),
             ("EXCEL_DIFF", "excel_diff"),
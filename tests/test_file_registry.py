@@ -970,6 +970,180 @@ class TestScanUploads:
         assert entry.size_bytes == csv_path.stat().st_size
 
 
+class TestParallelScan:
+    """进程池并行提取元数据 + 批量写入 + 进度事件。"""
+
+    @staticmethod
+    def _make_workbooks(workspace: Path, count: int) -> None:
+        from openpyxl import Workbook
+
+        for i in range(count):
+            wb = Workbook()
+            ws = wb.active
+            ws.title = f"S{i}"
+            ws["A1"] = "Name"
+            ws["B1"] = "Value"
+            ws["A2"] = f"row{i}"
+            ws["B2"] = i
+            wb.save(str(workspace / f"book_{i:02d}.xlsx"))
+            wb.close()
+
+    def test_process_pool_matches_serial(self, tmp_db: Database, tmp_path: Path, workspace: Path):
+        pytest.importorskip("openpyxl")
+        self._make_workbooks(workspace, 10)
+        (workspace / "notes.txt").write_text("hi", encoding="utf-8")
+
+        events: list = []
+        registry = FileRegistry(tmp_db, workspace)
+        result = registry.scan_workspace(workers=2, on_progress=events.append)
+        assert result.new_files == 11
+
+        serial_db = Database(str(tmp_path / "serial.db"))
+        serial = FileRegistry(serial_db, workspace)
+        serial.scan_workspace(workers=1)
+        for i in range(10):
+            path = f"book_{i:02d}.xlsx"
+            assert registry.get_by_path(path).sheet_meta == serial.get_by_path(path).sheet_meta
+            assert registry.get_by_path(path).sheet_meta[0]["name"] == f"S{i}"
+        serial_db.close()
+
+        extract = [e for e in events if e.phase == "extract"]
+        assert [e.done for e in extract] == list(range(1, 12))
+        assert {e.path for e in extract} == {f"book_{i:02d}.xlsx" for i in range(10)} | {"notes.txt"}
+        assert events[-1].phase == "register"
+        assert events[-1].done == events[-1].total == 11
+
+    def test_entries_written_in_single_batch(
+        self, registry: FileRegistry, workspace: Path, monkeypatch: pytest.MonkeyPatch,
+    ):
+        for i in range(5):
+            (workspace / f"f{i}.csv").write_text("a,b\n1,2\n", encoding="utf-8")
+        batches: list[int] = []
+        original = registry._store.upsert_batch
+
+        def _spy(records):
+            batches.append(len(records))
+            return original(records)
+
+        monkeypatch.setattr(registry._store, "upsert_batch", _spy)
+        monkeypatch.setattr(
+            registry._store, "upsert_file",
+            lambda record: pytest.fail("扫描不应逐条 upsert"),
+        )
+        registry.scan_workspace(workers=1)
+        assert batches == [5]
+        assert len(registry.list_all()) == 5
+
+    def test_pool_failure_falls_back_to_serial(
+        self, registry: FileRegistry, workspace: Path, monkeypatch: pytest.MonkeyPatch,
+    ):
+        import excelmanus.file_registry as fr
+
+        pytest.importorskip("openpyxl")
+        self._make_workbooks(workspace, fr._PARALLEL_SCAN_MIN_FILES)
+
+        def _broken(workers: int):
+            raise OSError("no processes")
+
+        monkeypatch.setattr(fr, "_get_scan_pool", _broken)
+        result = registry.scan_workspace(workers=4)
+        assert result.new_files == fr._PARALLEL_SCAN_MIN_FILES
+        assert registry.get_by_path("book_00.xlsx").sheet_meta[0]["headers"] == ["Name", "Value"]
+
+    def test_progress_callback_errors_are_ignored(self, registry: FileRegistry, workspace: Path):
+        (workspace / "a.csv").write_text("x\n1\n", encoding="utf-8")
+
+        def _boom(event):
+            raise RuntimeError("ui gone")
+
+        result = registry.scan_workspace(on_progress=_boom)
+        assert result.new_files == 1
+        assert registry.get_by_path("a.csv") is not None
+
+
+class _FakeWatcher:
+    """手动投递变更的监听器替身。"""
+
+    def __init__(self) -> None:
+        self.running = False
+        self.ready = False
+        self.callbacks: list = []
+
+    def subscribe(self, callback) -> None:
+        self.callbacks.append(callback)
+
+    def unsubscribe(self, callback) -> None:
+        self.callbacks = [cb for cb in self.callbacks if cb != callback]
+
+    def start(self) -> bool:
+        self.running = self.ready = True
+        return True
+
+    def emit(self, *paths: str) -> None:
+        for cb in list(self.callbacks):
+            cb(set(paths))
+
+
+class TestWatcherIncrementalScan:
+    """挂载监听器后，扫描只处理变更路径。"""
+
+    @pytest.fixture()
+    def watched(self, registry: FileRegistry, workspace: Path):
+        (workspace / "a.csv").write_text("x\n1\n", encoding="utf-8")
+        (workspace / "docs").mkdir()
+        (workspace / "docs" / "b.txt").write_text("b", encoding="utf-8")
+        watcher = _FakeWatcher()
+        registry.attach_watcher(watcher)
+        baseline = registry.scan_workspace()
+        assert baseline.new_files == 2
+        return registry, watcher
+
+    def test_scan_without_changes_skips_walk(self, watched, monkeypatch: pytest.MonkeyPatch):
+        registry, _watcher = watched
+        monkeypatch.setattr(
+            registry, "_collect_file_paths",
+            lambda *a, **k: pytest.fail("不应全量遍历"),
+        )
+        result = registry.scan_workspace()
+        assert result.new_files == result.updated_files == result.deleted_files == 0
+        assert result.total_files == 2
+
+    def test_changed_paths_are_applied(self, watched, workspace: Path):
+        registry, watcher = watched
+        (workspace / "a.csv").write_text("x\n1\n2\n", encoding="utf-8")
+        (workspace / "new").mkdir()
+        (workspace / "new" / "c.csv").write_text("y\n", encoding="utf-8")
+        (workspace / "docs" / "b.txt").unlink()
+        watcher.emit("a.csv", "new", "docs/b.txt")
+
+        result = registry.scan_workspace()
+        assert (result.new_files, result.updated_files, result.deleted_files) == (1, 1, 1)
+        assert registry.get_by_path("new/c.csv") is not None
+        assert registry.get_by_path("a.csv").size_bytes == (workspace / "a.csv").stat().st_size
+        assert registry.get_by_path("docs/b.txt").deleted_at is not None
+
+    def test_deleted_directory_removes_entries_below_it(self, watched, workspace: Path):
+        registry, watcher = watched
+        import shutil
+
+        shutil.rmtree(workspace / "docs")
+        watcher.emit("docs")
+        assert registry.scan_workspace().deleted_files == 1
+
+    def test_root_change_falls_back_to_full_scan(self, watched, workspace: Path):
+        registry, watcher = watched
+        (workspace / "unseen.csv").write_text("z\n", encoding="utf-8")
+        watcher.emit("")
+        assert registry.scan_workspace().new_files == 1
+
+    def test_detach_restores_full_walk(self, watched, workspace: Path):
+        registry, watcher = watched
+        registry.detach_watcher()
+        assert watcher.callbacks == []
+        (workspace / "unseen.csv").write_text("z\n", encoding="utf-8")
+        assert registry.scan_workspace().new_files == 1
+
+
 # ── Staging / CoW / Checkpoint 委托层测试 ────────────────
 
 
@@ -135,6 +135,8 @@ class TestParseToolPrefix:
 
 import asyncio
 import logging
+import threading
+from pathlib import Path
 from types import SimpleNamespace
 from unittest.mock import AsyncMock, MagicMock, patch
 
@@ -588,3 +590,274 @@ class TestMCPManagerShutdown:
         assert client.close_calls == 1
         assert manager.connected_servers == []
         assert manager.is_initialized is False
+
+
+class _SlowClient:
+    """connect 耗时可控的 MCP 客户端桩。"""
+
+    def __init__(self, cfg, tools, *, delay: float = 0.0, gate: asyncio.Event | None = None):
+        self._config = cfg
+        self._tools = tools
+        self._delay = delay
+        self._gate = gate
+        self.managed_pids: set[int] = set()
+        self.connected = False
+
+    async def connect(self):
+        if self._gate is not None:
+            await self._gate.wait()
+        await asyncio.sleep(self._delay)
+        self.connected = True
+
+    async def discover_tools(self):
+        return list(self._tools)
+
+    async def close(self):
+        self.connected = False
+
+    async def call_tool(self, name, arguments):
+        return SimpleNamespace(content=[SimpleNamespace(type="text", text=f"{name} ok")])
+
+    def bind_managed_pids(self, pids):
+        self.managed_pids = set(pids)
+
+
+async def _initialize(manager: MCPManager, registry: ToolRegistry, configs, clients) -> None:
+    by_name = {c._config.name: c for c in clients}
+    with (
+        patch("excelmanus.mcp.config.MCPConfigLoader") as mock_loader_cls,
+        patch(
+            "excelmanus.mcp.manager.MCPClientWrapper",
+            side_effect=lambda cfg: by_name[cfg.name],
+        ),
+    ):
+        mock_loader_cls.load.return_value = configs
+        await manager.initialize(registry)
+
+
+class TestMCPManagerConcurrentStartup:
+    """Server 并发连接与单 Server 截止时间。"""
+
+    @pytest.mark.asyncio
+    async def test_servers_connect_concurrently(self):
+        cfgs = [_make_config(name=f"srv{i}", transport="sse", url="http://x") for i in range(3)]
+        clients = [_SlowClient(cfg, [_make_mcp_tool("t")], delay=0.3) for cfg in cfgs]
+        registry = ToolRegistry()
+        manager = MCPManager()
+
+        started = asyncio.get_running_loop().time()
+        await _initialize(manager, registry, cfgs, clients)
+        elapsed = asyncio.get_running_loop().time() - started
+
+        assert elapsed < 0.6
+        assert sorted(manager.connected_servers) == ["srv0", "srv1", "srv2"]
+        assert len(registry.get_tool_names()) == 3
+
+    @pytest.mark.asyncio
+    async def test_slow_server_hits_deadline_without_blocking_others(self):
+        fast_cfg = _make_config(name="fast", transport="sse", url="http://x")
+        slow_cfg = _make_config(name="slow", transport="sse", url="http://y")
+        clients = [
+            _SlowClient(fast_cfg, [_make_mcp_tool("a")]),
+            _SlowClient(slow_cfg, [_make_mcp_tool("b")], delay=30),
+        ]
+        registry = ToolRegistry()
+        manager = MCPManager()
+        manager._connect_timeout = 0.2
+
+        await asyncio.wait_for(_initialize(manager, registry, [slow_cfg, fast_cfg], clients), 5)
+
+        info = {item["name"]: item for item in manager.get_server_info()}
+        assert info["fast"]["status"] == "ready"
+        assert info["slow"]["status"] == "connect_failed"
+        assert "超时" in info["slow"]["last_error"]
+        assert registry.get_tool_names() == ["mcp_fast_a"]
+
+    @pytest.mark.asyncio
+    async def test_conflicts_follow_config_order_not_completion_order(self):
+        cfg_a = _make_config(name="dup", transport="sse", url="http://a")
+        cfg_b = _make_config(name="dup", transport="sse", url="http://b")
+        client_a = _SlowClient(cfg_a, [_make_mcp_tool("x", "from a")], delay=0.2)
+        client_b = _SlowClient(cfg_b, [_make_mcp_tool("x", "from b")])
+        clients = iter([client_a, client_b])
+        registry = ToolRegistry()
+        manager = MCPManager()
+
+        with (
+            patch("excelmanus.mcp.config.MCPConfigLoader") as mock_loader_cls,
+            patch("excelmanus.mcp.manager.MCPClientWrapper", side_effect=lambda cfg: next(clients)),
+        ):
+            mock_loader_cls.load.return_value = [cfg_a, cfg_b]
+            await manager.initialize(registry)
+
+        assert registry.get_tool("mcp_dup_x").description.endswith("from a")
+
+
+class TestMCPManagerSchemaCache:
+    """工具 schema 缓存：先注册、后校正。"""
+
+    def _manager(self, cache_dir: Path) -> MCPManager:
+        manager = MCPManager(
+            app_config=SimpleNamespace(mcp_schema_cache=True, exa_search_enabled=False),
+        )
+        manager._schema_cache_dir = cache_dir
+        return manager
+
+    @pytest.mark.asyncio
+    async def test_cached_tools_registered_before_connect_and_reconciled(self, tmp_path):
+        cfg = _make_config(name="srv", transport="sse", url="http://x")
+        first = self._manager(tmp_path)
+        await _initialize(
+            first, ToolRegistry(), [cfg],
+            [_SlowClient(cfg, [_make_mcp_tool("keep"), _make_mcp_tool("gone")])],
+        )
+        assert list(tmp_path.glob("*.json"))
+
+        gate = asyncio.Event()
+        live = _SlowClient(cfg, [_make_mcp_tool("keep"), _make_mcp_tool("new")], gate=gate)
+        registry = ToolRegistry()
+        manager = self._manager(tmp_path)
+        await _initialize(manager, registry, [cfg], [live])
+
+        # 连接尚未完成：已按缓存注册，调用会等待连接
+        assert sorted(registry.get_tool_names()) == ["mcp_srv_gone", "mcp_srv_keep"]
+        assert manager.get_server_info()[0]["status"] == "connecting"
+        call = asyncio.create_task(registry.get_tool("mcp_srv_keep").async_func())
+        await asyncio.sleep(0.05)
+        assert not call.done()
+
+        gate.set()
+        await asyncio.gather(*manager._background_tasks)
+        assert await call == "keep ok"
+        assert sorted(registry.get_tool_names()) == ["mcp_srv_keep", "mcp_srv_new"]
+        assert manager.get_server_info()[0]["status"] == "ready"
+        assert manager.tool_scopes.keys() == {"mcp_srv_keep", "mcp_srv_new"}
+
+    @pytest.mark.asyncio
+    async def test_conflicts_follow_config_order_with_cached_servers(self, tmp_path):
+        cfg_a = _make_config(name="dup", transport="sse", url="http://a")
+        cfg_b = _make_config(name="dup", transport="sse", url="http://b")
+        # 只有后配置的 b 有 schema 缓存
+        await _initialize(
+            self._manager(tmp_path), ToolRegistry(), [cfg_b],
+            [_SlowClient(cfg_b, [_make_mcp_tool("x", "from b")])],
+        )
+        by_url = {
+            "http://a": _SlowClient(cfg_a, [_make_mcp_tool("x", "from a")], delay=0.1),
+            "http://b": _SlowClient(cfg_b, [_make_mcp_tool("x", "from b")]),
+        }
+        registry = ToolRegistry()
+        manager = self._manager(tmp_path)
+        with (
+            patch("excelmanus.mcp.config.MCPConfigLoader") as mock_loader_cls,
+            patch(
+                "excelmanus.mcp.manager.MCPClientWrapper",
+                side_effect=lambda cfg: by_url[cfg.url],
+            ),
+        ):
+            mock_loader_cls.load.return_value = [cfg_a, cfg_b]
+            await manager.initialize(registry)
+        assert registry.get_tool("mcp_dup_x").description.endswith("from a")
+        await asyncio.gather(*manager._background_tasks)
+
+    @pytest.mark.asyncio
+    async def test_failed_connect_drops_cached_tools(self, tmp_path):
+        cfg = _make_config(name="srv", transport="sse", url="http://x")
+        await _initialize(
+            self._manager(tmp_path), ToolRegistry(), [cfg], [_SlowClient(cfg, [_make_mcp_tool("t")])],
+        )
+        broken = _make_mock_client(config=cfg, connect_error=ConnectionError("down"))
+        registry = ToolRegistry()
+        manager = self._manager(tmp_path)
+        await _initialize(manager, registry, [cfg], [broken])
+        assert registry.get_tool_names() == ["mcp_srv_t"]
+
+        await asyncio.gather(*manager._background_tasks)
+        assert registry.get_tool_names() == []
+        assert manager.get_server_info()[0]["status"] == "connect_failed"
+
+    def test_cache_keyed_on_config(self, tmp_path):
+        from excelmanus.mcp.schema_cache import load_tool_schemas, save_tool_schemas
+
+        cfg = _make_config(name="srv", args=["--a"])
+        assert save_tool_schemas(cfg, [_make_mcp_tool("t")], cache_dir=tmp_path)
+        cached = load_tool_schemas(cfg, cache_dir=tmp_path)
+        assert [(t.name, t.inputSchema) for t in cached] == [("t", {"type": "object", "properties": {}})]
+        assert load_tool_schemas(_make_config(name="srv", args=["--b"]), cache_dir=tmp_path) is None
+        next(tmp_path.glob("*.json")).write_text("{broken", encoding="utf-8")
+        assert load_tool_schemas(cfg, cache_dir=tmp_path) is None
+
+
+class _LoopRecordingClient(_SlowClient):
+    """记录 call_tool 执行所在 event loop 的客户端桩。"""
+
+    def __init__(self, cfg, tools):
+        super().__init__(cfg, tools)
+        self.call_loops: list[asyncio.AbstractEventLoop] = []
+
+    async def call_tool(self, name, arguments):
+        self.call_loops.append(asyncio.get_running_loop())
+        await asyncio.sleep(0.01)
+        return await super().call_tool(name, arguments)
+
+
+class TestMCPManagerSyncCalls:
+    """同步工具调用经长驻 loop 执行，并统计每次调用耗时。"""
+
+    @pytest.mark.asyncio
+    async def test_worker_thread_calls_share_manager_loop(self):
+        cfg = _make_config(name="srv", transport="sse", url="http://x")
+        client = _LoopRecordingClient(cfg, [_make_mcp_tool("t")])
+        registry = ToolRegistry()
+        manager = MCPManager()
+        await _initialize(manager, registry, [cfg], [client])
+        func = registry.get_tool("mcp_srv_t").func
+
+        results = await asyncio.gather(*(asyncio.to_thread(func) for _ in range(8)))
+
+        assert results == ["t ok"] * 8
+        assert client.call_loops == [asyncio.get_running_loop()] * 8
+        stats = manager.call_stats()
+        assert stats["servers"]["srv"]["count"] == 8
+        assert stats["sync"]["count"] == 8
+        assert stats["errors"] == 0
+        assert stats["loop_thread_alive"] is False
+
+        await registry.get_tool("mcp_srv_t").async_func()
+        assert manager.call_stats()["servers"]["srv"]["count"] == 9
+        await manager.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_sync_call_on_loop_thread_raises(self):
+        cfg = _make_config(name="srv", transport="sse", url="http://x")
+        registry = ToolRegistry()
+        manager = MCPManager()
+        await _initialize(manager, registry, [cfg], [_SlowClient(cfg, [_make_mcp_tool("t")])])
+        with pytest.raises(RuntimeError, match="async_func"):
+            registry.get_tool("mcp_srv_t").func()
+        await manager.shutdown()
+
+    def test_fallback_loop_thread_is_reused_and_stopped(self):
+        from excelmanus.mcp.manager import _SyncCallBridge
+
+        cfg = _make_config(name="srv")
+        client = _LoopRecordingClient(cfg, [])
+        bridge = _SyncCallBridge()
+        tool_def = make_tool_def("srv", client, _make_mcp_tool("t"), bridge=bridge)
+
+        assert [tool_def.func() for _ in range(3)] == ["t ok"] * 3
+        assert len(set(client.call_loops)) == 1
+        assert bridge.stats()["loop_thread_alive"] is True
+
+        bridge.close()
+        assert bridge.stats()["loop_thread_alive"] is False
+        assert client.call_loops[0].is_closed()
+
+    def test_unbridged_tool_def_leaves_no_loop_thread(self):
+        cfg = _make_config(name="srv")
+        client = _LoopRecordingClient(cfg, [])
+        tool_def = make_tool_def("srv", client, _make_mcp_tool("t"))
+
+        assert tool_def.func() == "t ok"
+        assert client.call_loops[0].is_closed()
+        assert not any(t.name == "mcp-sync-bridge" for t in threading.enumerate())
@@ -291,6 +291,39 @@ class TestTruncation:
             if msg.get("role") == "tool":
                 assert msg.get("tool_call_id") in call_ids
 
+    def test_truncation_counts_each_message_once(
+        self, config: ExcelManusConfig, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """token 账本：已计数的消息在后续截断中不再重新编码。"""
+        mem = ConversationMemory(config)
+        calls: list[dict] = []
+        original = TokenCounter.count_message
+
+        def _counting(message: dict) -> int:
+            calls.append(message)
+            return original(message)
+
+        monkeypatch.setattr(TokenCounter, "count_message", staticmethod(_counting))
+        for i in range(20):
+            mem.add_user_message(f"用户消息 {i} " * 20)
+        calls.clear()
+        mem.trim_for_request(
+            system_prompts=["系统提示"], max_context_tokens=500, reserve_ratio=0.1,
+        )
+        history_calls = [m for m in calls if m.get("role") != "system"]
+        assert history_calls == []
+
+    def test_replaced_content_is_recounted(self, config: ExcelManusConfig) -> None:
+        """替换消息内容后 token 总数随之更新。"""
+        mem = ConversationMemory(config)
+        mem.add_tool_call("call_1", "read_excel", "{}")
+        mem.add_tool_result("call_1", "短")
+        before = mem._total_tokens()
+        mem.replace_tool_result("call_1", "很长的结果 " * 200)
+        assert mem._total_tokens() > before
+        mem.messages[-1]["content"] = "短"
+        assert mem._total_tokens() == before
+
 
 # ---------------------------------------------------------------------------
 # 多模态支持测试
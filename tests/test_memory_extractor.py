@@ -123,6 +123,39 @@ class TestPrepareMessages:
         # 预算仅允许保留最近两条（4+4 token）
         assert normalized == [("assistant", "bbbb"), ("user", "cccc")]
 
+    def test_trim_steps_down_by_measured_overshoot(
+        self,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        class _FakeTokenCache:
+            def __init__(self) -> None:
+                self.encoding = SimpleNamespace(decode=self._decode)
+                self.decoded: list[int] = []
+                self.cache_flags: list[bool] = []
+
+            def count(self, text: str) -> int:
+                return len(text)
+
+            def count_batch(self, texts, *, cache: bool = True) -> list[int]:
+                self.cache_flags.append(cache)
+                return [len(t) for t in texts]
+
+            def encode(self, text: str) -> list[str]:
+                return list(text)
+
+            def _decode(self, tokens: list[str]) -> str:
+                self.decoded.append(len(tokens))
+                # 模拟解码边界：较长片段解码后多出替换字符
+                return "".join(tokens) + ("??" if len(tokens) > 6 else "")
+
+        fake = _FakeTokenCache()
+        monkeypatch.setattr(memory_extractor_module, "get_token_cache", lambda: fake)
+        extractor, _ = _make_extractor("[]")
+        trimmed = extractor._trim_to_token_budget("abcdefghijklmnop", 8)
+        assert trimmed == "klmnop"
+        assert fake.decoded == [8, 6]
+        assert fake.cache_flags == [False, False]
+
 
 @pytest.mark.asyncio
 async def test_extract_excludes_system_and_tool_from_prompt() -> None:
@@ -0,0 +1,212 @@
+"""进程级解析缓存（_read_cache）测试。"""
+from __future__ import annotations
+
+import os
+import sys
+import threading
+from pathlib import Path
+
+import pandas as pd
+import pytest
+from openpyxl import Workbook
+
+from excelmanus.tools import _read_cache, data_tools
+from excelmanus.tools._read_cache import ParsedFileCache, invalidate_file, set_read_cache
+
+
+@pytest.fixture()
+def cache() -> ParsedFileCache:
+    c = ParsedFileCache(64 * 1024 * 1024)
+    set_read_cache(c)
+    yield c
+    set_read_cache(None)
+
+
+@pytest.fixture()
+def sales_xlsx(tmp_path: Path) -> Path:
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "销售"
+    ws.append(["日期", "产品", "金额"])
+    for i in range(20):
+        ws.append([f"2024-01-{i + 1:02d}", f"P{i % 3}", i * 10])
+    fp = tmp_path / "sales.xlsx"
+    wb.save(fp)
+    return fp
+
+
+class TestParsedFileCache:
+    def test_hit_after_first_load(self, tmp_path: Path, cache: ParsedFileCache) -> None:
+        fp = tmp_path / "a.txt"
+        fp.write_text("x")
+        calls: list[int] = []
+        loader = lambda: calls.append(1) or "value"  # noqa: E731
+        assert cache.get_or_load(fp, "k", (), loader) == "value"
+        assert cache.get_or_load(fp, "k", (), loader) == "value"
+        assert len(calls) == 1
+        assert cache.stats()["hits"] == 1
+
+    def test_file_change_misses(self, tmp_path: Path, cache: ParsedFileCache) -> None:
+        fp = tmp_path / "a.txt"
+        fp.write_text("x")
+        cache.get_or_load(fp, "k", (), lambda: 1)
+        fp.write_text("xy")
+        assert cache.get_or_load(fp, "k", (), lambda: 2) == 2
+
+    def test_invalidate(self, tmp_path: Path, cache: ParsedFileCache) -> None:
+        fp = tmp_path / "a.txt"
+        fp.write_text("x")
+        cache.get_or_load(fp, "k1", (), lambda: 1)
+        cache.get_or_load(fp, "k2", (), lambda: 2)
+        invalidate_file(fp)
+        assert cache.stats()["entries"] == 0
+
+    def test_lru_eviction_by_bytes(self, tmp_path: Path) -> None:
+        df = pd.DataFrame({"a": range(1000)})
+        size = _read_cache.estimate_size(df)
+        small = ParsedFileCache(int(size * 2.5))
+        files = []
+        for i in range(3):
+            fp = tmp_path / f"{i}.txt"
+            fp.write_text(str(i))
+            files.append(fp)
+        small.get_or_load(files[0], "df", (), lambda: df.copy())
+        small.get_or_load(files[1], "df", (), lambda: df.copy())
+        small.get_or_load(files[0], "df", (), lambda: pytest.fail("should hit"))
+        small.get_or_load(files[2], "df", (), lambda: df.copy())
+        stats = small.stats()
+        assert stats["evictions"] == 1
+        assert stats["bytes"] <= stats["max_bytes"]
+        reloaded: list[int] = []
+        small.get_or_load(files[1], "df", (), lambda: reloaded.append(1) or df.copy())
+        assert reloaded == [1]
+
+    def test_nested_row_lists_sized_by_cells(self) -> None:
+        rows = [["x" * 100] * 20 for _ in range(1000)]
+        assert _read_cache.estimate_size(rows) >= 1000 * 20 * 100
+        assert _read_cache.estimate_size(rows) == _read_cache.estimate_size(
+            [tuple(r) for r in rows]
+        )
+
+    def test_disabled_when_zero_budget(self, tmp_path: Path) -> None:
+        fp = tmp_path / "a.txt"
+        fp.write_text("x")
+        disabled = ParsedFileCache(0)
+        calls: list[int] = []
+        disabled.get_or_load(fp, "k", (), lambda: calls.append(1))
+        disabled.get_or_load(fp, "k", (), lambda: calls.append(1))
+        assert len(calls) == 2
+
+
+class TestDataToolsIntegration:
+    def test_read_df_parses_once(
+        self, sales_xlsx: Path, cache: ParsedFileCache, monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        import openpyxl
+
+        calls: list[int] = []
+        real = openpyxl.load_workbook
+
+        def _counting(*args, **kwargs):
+            calls.append(1)
+            return real(*args, **kwargs)
+
+        monkeypatch.setattr(openpyxl, "load_workbook", _counting)
+        df1, _ = data_tools._read_df(sales_xlsx, "销售")
+        df1.iloc[0, 2] = -1  # 修改返回值不影响缓存
+        df2, _ = data_tools._read_df(sales_xlsx, "销售")
+        assert len(calls) == 1
+        assert df2.iloc[0, 2] == 0
+
+    def test_file_near_target_size_is_cached(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        import openpyxl
+
+        # 目标场景为默认预算下缓存 30MB 的 xlsx：按文件体积等比缩小预算
+        wb = Workbook()
+        ws = wb.active
+        ws.title = "明细"
+        ws.append(["编号", "名称", "城市", "数量", "单价", "备注"])
+        for i in range(15000):
+            ws.append([i, f"商品{i}", f"城市{i % 50}", i % 97, i * 1.25, "x" if i % 3 else None])
+        fp = tmp_path / "large.xlsx"
+        wb.save(fp)
+        ratio = fp.stat().st_size / (30 * 1024 * 1024)
+        set_read_cache(ParsedFileCache(int(_read_cache._DEFAULT_MAX_MB * 1024 * 1024 * ratio)))
+
+        calls: list[int] = []
+        real = openpyxl.load_workbook
+
+        def _counting(*args, **kwargs):
+            calls.append(1)
+            return real(*args, **kwargs)
+
+        monkeypatch.setattr(openpyxl, "load_workbook", _counting)
+        try:
+            df1, _ = data_tools._read_df(fp, "明细")
+            df2, _ = data_tools._read_df(fp, "明细")
+        finally:
+            set_read_cache(None)
+        assert len(df1) == len(df2) == 15000
+        assert len(calls) == 1
+
+    def test_write_invalidates(self, sales_xlsx: Path, cache: ParsedFileCache, tmp_path: Path) -> None:
+        data_tools.init_guard(str(tmp_path))
+        df1, _ = data_tools._read_df(sales_xlsx, "销售")
+        assert len(df1) == 20
+        rows = [{"日期": f"d{i}", "产品": "y", "金额": i} for i in range(5)]
+        data_tools.write_excel(str(sales_xlsx), rows, sheet_name="销售")
+        df2, _ = data_tools._read_df(sales_xlsx, "销售")
+        assert len(df2) == 5
+
+    def test_cow_writer_invalidates(self, sales_xlsx: Path, cache: ParsedFileCache) -> None:
+        from openpyxl import load_workbook
+
+        from excelmanus.security.cow_writer import CowWriter
+
+        data_tools._get_sheet_names(sales_xlsx)
+        assert cache.stats()["entries"] == 1
+        wb = load_workbook(sales_xlsx)
+        CowWriter.atomic_save_workbook(object.__new__(CowWriter), wb, sales_xlsx)
+        assert cache.stats()["entries"] == 0
+        assert os.path.exists(sales_xlsx)
+
+    def test_concurrent_reads_of_shared_workbook(
+        self, tmp_path: Path, cache: ParsedFileCache,
+    ) -> None:
+        # 稀疏工作表：openpyxl 完整模式遍历时会补建缺失单元格（改写内部字典）
+        wb = Workbook()
+        ws = wb.active
+        ws.title = "稀疏"
+        ws.append(["编号", "名称", "金额", "备注"])
+        for i in range(3000):
+            ws.append([i, None if i % 2 else f"n{i}", i * 1.5, None if i % 3 else "x"])
+        fp = tmp_path / "sparse.xlsx"
+        wb.save(fp)
+
+        old_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            for _ in range(3):
+                cache.clear()
+                barrier = threading.Barrier(8)
+                errors: list[BaseException] = []
+
+                def _worker() -> None:
+                    barrier.wait()
+                    try:
+                        data_tools._detect_header_row(fp, "稀疏")
+                        data_tools._load_raw_sheet_rows(fp, "稀疏")
+                    except BaseException as exc:  # noqa: BLE001
+                        errors.append(exc)
+
+                threads = [threading.Thread(target=_worker) for _ in range(8)]
+                for t in threads:
+                    t.start()
+                for t in threads:
+                    t.join()
+                assert errors == []
+        finally:
+            sys.setswitchinterval(old_interval)
+        assert len(data_tools._load_raw_sheet_rows(fp, "稀疏")) == 3001
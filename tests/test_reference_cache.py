@@ -106,3 +106,21 @@ class TestSessionCacheIsolation:
         assert get_session_cache() is custom
         reset_session_cache(token)
         assert get_session_cache() is original
+
+
+class TestFileContentHashMemo:
+    def test_memo_is_bounded_lru(self, tmp_path, monkeypatch: pytest.MonkeyPatch) -> None:
+        from excelmanus.reference_graph import cache as cache_mod
+
+        monkeypatch.setattr(cache_mod, "_HASH_MEMO_MAX_ENTRIES", 2)
+        monkeypatch.setattr(cache_mod, "_hash_memo", type(cache_mod._hash_memo)())
+        paths = []
+        for name in ("a", "b", "c"):
+            fp = tmp_path / f"{name}.xlsx"
+            fp.write_bytes(name.encode())
+            paths.append(str(fp))
+        cache_mod.file_content_hash(paths[0])
+        cache_mod.file_content_hash(paths[1])
+        cache_mod.file_content_hash(paths[0])  # 命中后成为最近使用
+        cache_mod.file_content_hash(paths[2])
+        assert list(cache_mod._hash_memo) == [paths[0], paths[2]]
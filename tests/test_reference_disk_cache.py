@@ -0,0 +1,132 @@
+"""RefIndexDiskCache 测试。"""
+from __future__ import annotations
+
+import os
+import time
+from pathlib import Path
+
+import pytest
+from openpyxl import Workbook
+
+from excelmanus.reference_graph.disk_cache import (
+    RefIndexDiskCache,
+    index_from_dict,
+    index_to_dict,
+    load_or_scan,
+    set_disk_cache,
+)
+from excelmanus.reference_graph.scanner import Tier1Scanner
+
+
+def _make_workbook(path: Path, rows: int = 1) -> Path:
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "产品表"
+    ws["A1"] = "ID"
+    ws["B1"] = 10
+    orders = wb.create_sheet("订单表")
+    for i in range(1, rows + 1):
+        orders[f"A{i}"] = f"=产品表!B1*{i}"
+    wb.save(path)
+    return path
+
+
+class _CountingScanner(Tier1Scanner):
+    def __init__(self) -> None:
+        super().__init__()
+        self.calls = 0
+
+    def scan(self, file_path: str):  # type: ignore[override]
+        self.calls += 1
+        return super().scan(file_path)
+
+
+class TestSerialization:
+    def test_round_trip_relinks_edges(self, tmp_path: Path) -> None:
+        fp = _make_workbook(tmp_path / "a.xlsx")
+        index = Tier1Scanner().scan(str(fp))
+        restored = index_from_dict("other.xlsx", index_to_dict(index))
+        assert restored.file_path == "other.xlsx"
+        assert restored.render_summary() == index.render_summary()
+        edge = restored.cross_sheet_edges[0]
+        assert restored.sheets["订单表"].outgoing_refs[0] is edge
+        assert restored.sheets["产品表"].incoming_refs[0] is edge
+
+
+class TestRefIndexDiskCache:
+    def test_miss_then_hit_across_instances(self, tmp_path: Path) -> None:
+        fp = str(_make_workbook(tmp_path / "a.xlsx"))
+        cache_dir = tmp_path / "cache"
+        first = RefIndexDiskCache(cache_dir)
+        assert first.get(fp) is None
+        first.put(fp, Tier1Scanner().scan(fp))
+
+        second = RefIndexDiskCache(cache_dir)
+        hit = second.get(fp)
+        assert hit is not None
+        assert "订单表" in hit.sheets
+        assert first.stats()["misses"] == 1
+        assert second.stats()["hits"] == 1
+
+    def test_same_content_shared_by_hash(self, tmp_path: Path) -> None:
+        fp = _make_workbook(tmp_path / "a.xlsx")
+        copy = tmp_path / "copy.xlsx"
+        copy.write_bytes(fp.read_bytes())
+        cache = RefIndexDiskCache(tmp_path / "cache")
+        cache.put(str(fp), Tier1Scanner().scan(str(fp)))
+        hit = cache.get(str(copy))
+        assert hit is not None
+        assert hit.file_path == str(copy)
+
+    def test_content_change_misses(self, tmp_path: Path) -> None:
+        fp = _make_workbook(tmp_path / "a.xlsx")
+        cache = RefIndexDiskCache(tmp_path / "cache")
+        cache.put(str(fp), Tier1Scanner().scan(str(fp)))
+        _make_workbook(fp, rows=3)
+        assert cache.get(str(fp)) is None
+
+    def test_lru_eviction_by_bytes(self, tmp_path: Path) -> None:
+        paths = [str(_make_workbook(tmp_path / f"f{i}.xlsx", rows=i + 1)) for i in range(3)]
+        probe = RefIndexDiskCache(tmp_path / "probe")
+        probe.put(paths[0], Tier1Scanner().scan(paths[0]))
+        entry_size = probe.stats()["bytes"]
+
+        cache = RefIndexDiskCache(tmp_path / "cache", max_bytes=entry_size * 2 + entry_size // 2)
+        cache.put(paths[0], Tier1Scanner().scan(paths[0]))
+        cache.put(paths[1], Tier1Scanner().scan(paths[1]))
+        old = time.time() - 100
+        for entry in (tmp_path / "cache").glob("*.json"):
+            os.utime(entry, (old, old))
+        assert cache.get(paths[0]) is not None  # 刷新 paths[0] 的 LRU 位置
+        cache.put(paths[2], Tier1Scanner().scan(paths[2]))
+
+        stats = cache.stats()
+        assert stats["evictions"] == 1
+        assert stats["bytes"] <= stats["max_bytes"]
+        assert cache.get(paths[0]) is not None
+        assert cache.get(paths[1]) is None
+
+    def test_corrupt_entry_discarded(self, tmp_path: Path) -> None:
+        fp = str(_make_workbook(tmp_path / "a.xlsx"))
+        cache = RefIndexDiskCache(tmp_path / "cache")
+        cache.put(fp, Tier1Scanner().scan(fp))
+        entry = next((tmp_path / "cache").glob("*.json"))
+        entry.write_text("{not json", encoding="utf-8")
+        assert cache.get(fp) is None
+        assert not entry.exists()
+
+
+class TestLoadOrScan:
+    @pytest.fixture(autouse=True)
+    def _disk_cache(self, tmp_path: Path):
+        cache = RefIndexDiskCache(tmp_path / "cache")
+        set_disk_cache(cache)
+        yield cache
+        set_disk_cache(None)
+
+    def test_scans_once(self, tmp_path: Path) -> None:
+        fp = str(_make_workbook(tmp_path / "a.xlsx"))
+        scanner = _CountingScanner()
+        load_or_scan(fp, scanner)
+        load_or_scan(fp, scanner)
+        assert scanner.calls == 1
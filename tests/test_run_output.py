@@ -0,0 +1,205 @@
+"""run_code 输出增量采集测试：尾部缓冲、节流转发与流式执行。"""
+from __future__ import annotations
+
+import asyncio
+import json
+import sys
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from excelmanus.engine_core.tool_dispatcher import ToolDispatcher
+from excelmanus.events import EventType
+from excelmanus.tools import _run_output as ro
+from excelmanus.tools import code_tools
+
+
+@pytest.fixture()
+def workspace(tmp_path: Path) -> Path:
+    code_tools.init_guard(str(tmp_path))
+    (tmp_path / "scripts" / "temp").mkdir(parents=True, exist_ok=True)
+    return tmp_path
+
+
+class _Collector:
+    def __init__(self) -> None:
+        self.events: list[tuple[str, str]] = []
+
+    def __call__(self, stream: str, text: str) -> None:
+        self.events.append((stream, text))
+
+    def lines(self, stream: str = "stdout") -> list[str]:
+        return [
+            line
+            for name, text in self.events if name == stream
+            for line in text.split("\n")
+        ]
+
+
+class TestOutputCapture:
+    def test_tail_is_bounded_regardless_of_volume(self) -> None:
+        capture = ro.OutputCapture(tail_lines=10)
+        for i in range(50_000):
+            capture.feed("stdout", f"line {i}\n".encode())
+        capture.close()
+        lines = capture.stdout.splitlines()
+        assert len(lines) == ro._MIN_TAIL_LINES
+        assert lines[-1] == "line 49999"
+        assert capture.stats()["stdout"]["lines"] == 50_000
+
+    def test_split_utf8_and_partial_lines(self) -> None:
+        capture = ro.OutputCapture(tail_lines=10)
+        data = "进度：完成\n最后一行".encode("utf-8")
+        for i in range(len(data)):
+            capture.feed("stdout", data[i:i + 1])
+        capture.close()
+        assert capture.stdout == "进度：完成\n最后一行"
+
+    def test_carriage_return_keeps_latest_progress(self) -> None:
+        capture = ro.OutputCapture(tail_lines=10)
+        capture.feed("stdout", b"10%\r50%\r100%\r\ndone\r\n")
+        capture.close()
+        assert capture.stdout.splitlines() == ["100%", "done"]
+
+    def test_overlong_line_is_split(self) -> None:
+        capture = ro.OutputCapture(tail_lines=10)
+        capture.feed("stdout", b"x" * (ro._MAX_LINE_CHARS * 3))
+        assert capture.stats()["stdout"]["lines"] == 2
+        capture.close()
+        assert capture.stats()["stdout"]["lines"] == 3
+        assert len(capture.stdout) < ro._MAX_LINE_CHARS * 3 + 10
+
+    def test_listener_batches_are_throttled_and_capped(self) -> None:
+        collector = _Collector()
+        capture = ro.OutputCapture(tail_lines=10, listener=collector)
+        capture.feed("stdout", b"".join(f"{i}\n".encode() for i in range(100)))
+        capture.feed("stderr", b"warn\n")
+        capture.pump()
+        assert collector.events == []
+        capture.pump(force=True)
+        stdout_text = dict(collector.events)["stdout"]
+        assert stdout_text.startswith("...(省略 60 行)")
+        assert stdout_text.endswith("99")
+        assert dict(collector.events)["stderr"] == "warn"
+
+    def test_failing_listener_is_dropped(self) -> None:
+        def _boom(stream: str, text: str) -> None:
+            raise RuntimeError("closed")
+
+        capture = ro.OutputCapture(tail_lines=10, listener=_boom)
+        capture.feed("stdout", b"a\n")
+        capture.pump(force=True)
+        capture.feed("stdout", b"b\n")
+        capture.close()
+        assert capture.events_sent == 0
+        assert capture.stdout == "a\nb"
+
+    def test_spill_file_keeps_full_output(self, tmp_path: Path) -> None:
+        target = tmp_path / "out" / "full.log"
+        capture = ro.OutputCapture(tail_lines=10, stdout_path=target)
+        for i in range(1000):
+            capture.feed("stdout", f"{i}\n".encode())
+        capture.close()
+        assert len(target.read_text(encoding="utf-8").splitlines()) == 1000
+        assert len(capture.stdout.splitlines()) == ro._MIN_TAIL_LINES
+
+
+class TestRunStreaming:
+    @pytest.fixture(params=["selector", "threads"], autouse=True)
+    def pipe_mode(self, request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch) -> str:
+        # threads 即 Windows 路径，在任何平台都可运行
+        monkeypatch.setattr(ro, "_SELECT_PIPES", request.param == "selector")
+        return request.param
+
+    def test_lines_arrive_before_exit(self) -> None:
+        collector = _Collector()
+        capture = ro.OutputCapture(tail_lines=10, listener=collector)
+        code = (
+            "import sys, time\n"
+            "print('first', flush=True)\n"
+            "time.sleep(0.6)\n"
+            "print('second', file=sys.stderr)\n"
+        )
+        rc, timed_out = ro.run_streaming(
+            [sys.executable, "-c", code], capture=capture, timeout=30,
+        )
+        assert collector.lines("stdout") == ["first"]
+        capture.close()
+        assert (rc, timed_out) == (0, False)
+        assert collector.lines("stderr") == ["second"]
+
+    def test_timeout_returns_124_with_partial_output(self) -> None:
+        capture = ro.OutputCapture(tail_lines=10)
+        code = "import time\nprint('x', flush=True)\ntime.sleep(30)\n"
+        rc, timed_out = ro.run_streaming(
+            [sys.executable, "-c", code], capture=capture, timeout=1,
+        )
+        capture.close()
+        assert (rc, timed_out) == (124, True)
+        assert capture.stdout == "x"
+
+    def test_large_output_on_both_pipes(self) -> None:
+        capture = ro.OutputCapture(tail_lines=10)
+        code = (
+            "import sys\n"
+            "for i in range(20000):\n"
+            "    print(i)\n"
+            "    print(-i, file=sys.stderr)\n"
+        )
+        rc, timed_out = ro.run_streaming(
+            [sys.executable, "-c", code], capture=capture, timeout=60,
+        )
+        capture.close()
+        assert (rc, timed_out) == (0, False)
+        assert capture.stdout.endswith("19999")
+        assert capture.stderr.endswith("-19999")
+        assert capture.stats()["stdout"]["lines"] == 20000
+
+
+class TestRunCodeStreaming:
+    def test_progress_forwarded_to_context_listener(
+        self, workspace: Path, monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        monkeypatch.setenv("EXCELMANUS_RUN_CODE_POOL_SIZE", "0")
+        collector = _Collector()
+        token = ro.set_output_listener(collector)
+        try:
+            result = json.loads(code_tools.run_code(
+                code="for i in range(5000):\n    print('row', i)\n",
+                python_command=sys.executable,
+                require_excel_deps=False,
+                tail_lines=3,
+                stdout_file="outputs/run.log",
+            ))
+        finally:
+            ro.reset_output_listener(token)
+        assert result["status"] == "success"
+        assert result["stdout_tail"] == "row 4997\nrow 4998\nrow 4999"
+        assert collector.lines()[-1] == "row 4999"
+        full = (workspace / "outputs" / "run.log").read_text(encoding="utf-8")
+        assert len(full.splitlines()) == 5000
+
+
+class TestDispatcherOutputListener:
+    def test_worker_thread_output_emitted_on_loop(self) -> None:
+        engine = MagicMock()
+        dispatcher = ToolDispatcher(engine)
+        tc = SimpleNamespace(id="call_1", function=SimpleNamespace(name="run_code"))
+        emitted_on: list[threading.Thread] = []
+        engine.emit.side_effect = lambda *_: emitted_on.append(threading.current_thread())
+
+        async def _main() -> None:
+            listener = dispatcher._make_output_listener(tc, lambda _e: None, 2)
+            await asyncio.to_thread(listener, "stdout", "row 1")
+            await asyncio.sleep(0)
+
+        asyncio.run(_main())
+        assert dispatcher._make_output_listener(tc, None, 2) is None
+        (_, event), _ = engine.emit.call_args
+        assert event.event_type == EventType.TOOL_OUTPUT_DELTA
+        assert (event.tool_call_id, event.tool_name) == ("call_1", "run_code")
+        assert (event.output_stream, event.output_delta, event.iteration) == ("stdout", "row 1", 2)
+        assert emitted_on == [threading.main_thread()]
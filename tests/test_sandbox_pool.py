@@ -0,0 +1,177 @@
+"""run_code 预热解释器池（zygote）测试。"""
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+from excelmanus.tools import _sandbox_pool as sp
+from excelmanus.tools import code_tools
+from excelmanus.tools._run_output import OutputCapture, reset_output_listener, set_output_listener
+
+pytestmark = pytest.mark.skipif(not sp.pool_supported(), reason="解释器池依赖 Linux fork")
+
+
+@pytest.fixture(autouse=True)
+def _reset_pool():
+    sp.reset_sandbox_pool()
+    yield
+    sp.reset_sandbox_pool()
+
+
+@pytest.fixture()
+def workspace(tmp_path: Path) -> Path:
+    code_tools.init_guard(str(tmp_path))
+    (tmp_path / "scripts" / "temp").mkdir(parents=True, exist_ok=True)
+    return tmp_path
+
+
+def _run(code: str, **kwargs) -> dict:
+    kwargs.setdefault("python_command", sys.executable)
+    kwargs.setdefault("require_excel_deps", False)
+    return json.loads(code_tools.run_code(code=code, **kwargs))
+
+
+def _warm(**kwargs) -> sp.SandboxInterpreterPool:
+    """先跑一次冷启动触发 zygote 启动，并等待其就绪。"""
+    assert _run("print('cold')", **kwargs)["status"] == "success"
+    pool = sp.get_sandbox_pool()
+    assert pool is not None and pool.wait_ready()
+    return pool
+
+
+class TestPooledRunCode:
+    def test_second_run_is_served_by_zygote(self, workspace: Path) -> None:
+        pool = _warm()
+        result = _run("import sys; print('hi', sys.argv[1:])", args=["a", "b"])
+        assert result["status"] == "success"
+        assert "hi ['a', 'b']" in result["stdout_tail"]
+        assert pool.stats()["hits"] == 1
+        # 运行期产物（输出文件、wrapper）不残留
+        assert not list((workspace / ".tmp").glob("_rc_*"))
+        assert not list((workspace / "scripts" / "temp").glob("_sw_*"))
+
+    def test_env_contract_matches_cold_path(
+        self, workspace: Path, monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        _warm()
+        monkeypatch.setenv("EXCELMANUS_TEST_SECRET", "TOP_SECRET")
+        (workspace / "sub").mkdir()
+        code = (
+            "import os, tempfile\n"
+            "print(os.getenv('EXCELMANUS_TEST_SECRET'))\n"
+            "print(os.getcwd() == os.environ['EXCELMANUS_WORKDIR'])\n"
+            "print(tempfile.gettempdir())\n"
+            "print(os.environ['EXCELMANUS_COW_LOG'])\n"
+        )
+        first = _run(code, workdir="sub")["stdout_tail"].splitlines()
+        second = _run(code, workdir="sub")["stdout_tail"].splitlines()
+        assert sp.get_sandbox_pool().stats()["hits"] == 2
+        assert first[:3] == ["None", "True", str(workspace / ".tmp")]
+        # CoW 日志路径逐次注入
+        assert first[3] != second[3]
+
+    def test_errors_exit_codes_and_tracebacks(self, workspace: Path) -> None:
+        _warm()
+        failed = _run("raise ValueError('boom')")
+        assert failed["return_code"] == 1
+        assert failed["stderr_tail"].startswith("Traceback")
+        assert "sandbox_zygote" not in failed["stderr_tail"]
+        assert "ValueError: boom" in failed["stderr_tail"]
+        assert _run("import sys; sys.exit(3)")["return_code"] == 3
+
+    def test_timeout_kills_child_and_keeps_zygote(self, workspace: Path) -> None:
+        pool = _warm()
+        result = _run("import time; print('x', flush=True); time.sleep(30)", timeout_seconds=1)
+        assert result["status"] == "timed_out"
+        assert result["return_code"] == 124
+        assert result["stdout_tail"] == "x"
+        assert _run("print('after')")["stdout_tail"] == "after"
+        assert pool.stats()["hits"] == 2
+
+    def test_output_streams_to_listener(self, workspace: Path) -> None:
+        _warm()
+        events: list[tuple[str, str]] = []
+        token = set_output_listener(lambda stream, text: events.append((stream, text)))
+        try:
+            result = _run(
+                "import sys, time\n"
+                "print('step 1')\n"
+                "time.sleep(0.5)\n"
+                "print('warn', file=sys.stderr)\n",
+            )
+        finally:
+            reset_output_listener(token)
+        assert result["status"] == "success"
+        assert events[0] == ("stdout", "step 1")
+        assert ("stderr", "warn") in events
+
+    def test_runs_do_not_share_state(self, workspace: Path) -> None:
+        _warm()
+        code = "import builtins, random; print(hasattr(builtins, '_leak'), random.random()); builtins._leak = 1"
+        first = _run(code)["stdout_tail"].split()
+        second = _run(code)["stdout_tail"].split()
+        assert first[0] == second[0] == "False"
+        assert first[1] != second[1]
+
+
+class TestZygote:
+    def test_import_guard_installed_before_preload(self, tmp_path: Path) -> None:
+        from excelmanus.security.sandbox_hook import _GREEN_BLOCKED, generate_wrapper_script
+
+        spec = sp.ZygoteSpec(
+            command=(sys.executable, "-I"),
+            tier="GREEN",
+            blocked=_GREEN_BLOCKED,
+            wrapper_src=generate_wrapper_script("GREEN", str(tmp_path)),
+            cwd=str(tmp_path),
+            env=(("PATH", "/usr/bin:/bin"),),
+        )
+        zygote = sp.start_zygote("k", spec)
+        try:
+            script = tmp_path / "job.py"
+            script.write_text(
+                "import sys\n"
+                "print('ssl' in sys.modules)\n"
+                "import ssl\n",
+                encoding="utf-8",
+            )
+            capture = OutputCapture(tail_lines=80)
+            result = zygote.run(
+                argv=[str(script)], cwd=str(tmp_path), env={"PATH": "/usr/bin:/bin"},
+                limits=[], timeout=30, output_dir=tmp_path, capture=capture,
+            )
+            capture.close()
+        finally:
+            zygote.close()
+        assert capture.stdout.strip() == "False"
+        assert result.return_code == 1
+        assert "被安全策略禁止" in capture.stderr
+
+
+class TestPoolLifecycle:
+    def test_recycles_after_max_runs(self, workspace: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setenv("EXCELMANUS_RUN_CODE_POOL_MAX_RUNS", "2")
+        pool = _warm()
+        _run("print(1)")
+        _run("print(2)")
+        assert pool.stats()["recycled"] == 1
+        # 回收后立即补充新的 zygote
+        assert pool.wait_ready()
+        _run("print(3)")
+        assert pool.stats()["hits"] == 3
+
+    def test_disabled_by_env(self, workspace: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setenv("EXCELMANUS_RUN_CODE_POOL_SIZE", "0")
+        assert sp.get_sandbox_pool() is None
+        assert _run("print('ok')")["stdout_tail"] == "ok"
+
+    def test_idle_zygotes_expire(self, workspace: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        pool = _warm()
+        now = sp.time.monotonic()
+        monkeypatch.setattr(sp.time, "monotonic", lambda: now + 10_000)
+        assert _run("print('ok')")["status"] == "success"
+        stats = pool.stats()
+        assert (stats["hits"], stats["recycled"]) == (0, 1)
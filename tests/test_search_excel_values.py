@@ -1,6 +1,7 @@
 """search_excel_values 工具单元测试。"""
 
 import json
+import os
 from pathlib import Path
 
 import pytest
@@ -168,3 +169,66 @@ class TestSearchExcelValuesEdgeCases:
         ))
         # 空 query 应该返回错误或空结果
         assert data.get("total_matches", 0) == 0 or "error" in data
+
+
+class TestSearchExcelValuesMultiFile:
+    """file_paths 多文件并行搜索。"""
+
+    @pytest.fixture
+    def monthly_files(self, tmp_path: Path) -> list[Path]:
+        files = []
+        for month in range(1, 13):
+            wb = Workbook()
+            ws = wb.active
+            ws.title = "明细"
+            ws.append(["月份", "客户", "金额"])
+            ws.append([f"{month}月", "张三丰", month * 100])
+            ws.append([f"{month}月", "李四光", month * 10])
+            fp = tmp_path / f"report_{month:02d}.xlsx"
+            wb.save(fp)
+            files.append(fp)
+        return files
+
+    def _search(self, files: list[Path], **kwargs) -> dict:
+        return json.loads(search_excel_values(file_paths=[str(f) for f in files], **kwargs))
+
+    def test_no_ten_file_cap(self, monthly_files: list[Path], monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setenv("EXCELMANUS_SEARCH_WORKERS", "1")
+        data = self._search(monthly_files, query="张三丰")
+        assert data["files_searched"] == 12
+        assert data["total_matches"] == 12
+        assert [m["file"] for m in data["matches"]] == [str(f) for f in monthly_files]
+
+    def test_global_early_stop(self, monthly_files: list[Path], monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setenv("EXCELMANUS_SEARCH_WORKERS", "1")
+        data = self._search(monthly_files, query="张三丰", max_results=3)
+        assert data["returned"] == 3
+        assert data["truncated"] is True
+        assert data["files_not_searched"] == 9
+
+    def test_process_pool_matches_inline(
+        self, monthly_files: list[Path], monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        monkeypatch.setenv("EXCELMANUS_SEARCH_WORKERS", "1")
+        inline = self._search(monthly_files, query="李四光")
+        monkeypatch.setenv("EXCELMANUS_SEARCH_WORKERS", "2")
+        pooled = self._search(monthly_files, query="李四光")
+        assert pooled == inline
+
+    def test_pool_workers_disable_read_cache(self) -> None:
+        from excelmanus.tools import data_tools
+
+        pool = data_tools._get_search_pool(1)
+        try:
+            assert pool.submit(os.getenv, "EXCELMANUS_READ_CACHE_MB").result(timeout=60) == "0"
+        finally:
+            data_tools._reset_search_pool()
+
+    def test_missing_files_counted(self, monthly_files: list[Path], tmp_path: Path) -> None:
+        data = self._search([monthly_files[0], tmp_path / "missing.xlsx"], query="张三丰")
+        assert data["files_searched"] == 1
+        assert data["files_failed"] == 1
+
+    def test_invalid_regex(self, monthly_files: list[Path]) -> None:
+        data = self._search(monthly_files[:2], query="[", match_mode="regex")
+        assert "error" in data
@@ -280,6 +280,111 @@ class TestAcquireForChat:
         assert all(p.protocol == "openai_responses" for p in codex_profiles)
 
 
+class TestEnginePool:
+    """预热引擎池：acquire 优先取用预构造引擎。"""
+
+    @pytest.fixture
+    def pooled_manager(
+        self, config: ExcelManusConfig, registry: ToolRegistry
+    ) -> SessionManager:
+        from dataclasses import replace
+
+        pool_config = replace(config, engine_pool_size=1)
+        return SessionManager(
+            max_sessions=pool_config.max_sessions,
+            ttl_seconds=pool_config.session_ttl_seconds,
+            config=pool_config,
+            registry=registry,
+        )
+
+    @pytest.mark.asyncio
+    async def test_new_session_takes_prewarmed_engine(
+        self, pooled_manager: SessionManager
+    ) -> None:
+        """预热后新建会话应直接取用池中引擎，并在后台补足。"""
+        assert await pooled_manager.prewarm_engines() == 1
+        prewarmed = pooled_manager._engine_pool._idle[None][0].engine
+
+        with patch.object(
+            pooled_manager, "_create_engine_with_history",
+            side_effect=AssertionError("不应走冷启动"),
+        ):
+            sid, engine = await pooled_manager.acquire_for_chat(None)
+        await pooled_manager.release_for_chat(sid)
+
+        assert engine is prewarmed
+        assert engine._session_id == sid
+        stats = pooled_manager.engine_pool_stats()
+        assert stats["hits"] == 1
+        assert stats["engine_ready"]["pooled"]["count"] == 1
+        await asyncio.gather(*pooled_manager._engine_pool._refills)
+        assert pooled_manager.engine_pool_stats()["idle"] == 1
+        await pooled_manager.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_failed_bind_disposes_pooled_engine(
+        self, pooled_manager: SessionManager
+    ) -> None:
+        """预热引擎绑定会话失败时应回收该引擎并释放预留 slot。"""
+        assert await pooled_manager.prewarm_engines() == 1
+        prewarmed = pooled_manager._engine_pool._idle[None][0].engine
+
+        with patch.object(
+            pooled_manager, "_bind_engine", side_effect=RuntimeError("bind failed"),
+        ), patch.object(
+            pooled_manager, "_dispose_pooled_engine", new_callable=AsyncMock,
+        ) as dispose:
+            with pytest.raises(RuntimeError, match="bind failed"):
+                await pooled_manager.acquire_for_chat(None)
+
+        dispose.assert_awaited_once_with(prewarmed)
+        assert not pooled_manager._pending_creates
+        await pooled_manager.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_pool_is_keyed_by_user_and_fingerprint(
+        self, config: ExcelManusConfig, registry: ToolRegistry
+    ) -> None:
+        """池中引擎只能被同一用户取用；用户 LLM 配置变化后旧引擎被丢弃。"""
+        from dataclasses import replace
+
+        user_rec = SimpleNamespace(llm_api_key=None, llm_base_url=None, llm_model=None)
+        user_store = MagicMock()
+        user_store.get_by_id.return_value = user_rec
+        manager = SessionManager(
+            max_sessions=config.max_sessions,
+            ttl_seconds=config.session_ttl_seconds,
+            config=replace(config, engine_pool_size=1),
+            registry=registry,
+            user_store=user_store,
+        )
+        await manager.prewarm_engines("user-a")
+
+        sid_b, engine_b = await manager.acquire_for_chat(None, user_id="user-b")
+        assert str(engine_b._config.workspace_root).endswith("/users/user-b")
+        assert manager.engine_pool_stats()["misses"] == 1
+
+        user_rec.llm_model = "user-model"
+        sid_a, engine_a = await manager.acquire_for_chat(None, user_id="user-a")
+        assert engine_a.current_model == "user-model"
+        assert manager.engine_pool_stats()["discarded"] == 1
+        for sid in (sid_a, sid_b):
+            await manager.release_for_chat(sid)
+        await manager.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_first_token_latency_recorded_once(
+        self, manager: SessionManager
+    ) -> None:
+        sid, engine = await manager.acquire_for_chat(None)
+        engine._on_first_token()
+        assert engine._on_first_token is not None  # 回调由 LLMCaller 负责清除
+        stats = manager.engine_pool_stats()
+        assert stats["first_token"]["cold"]["count"] == 1
+        assert stats["engine_ready"]["cold"]["count"] == 1
+        await manager.release_for_chat(sid)
+
+
 class TestSessionDetail:
     """get_session_detail 方法测试。"""
 
@@ -0,0 +1,159 @@
+"""轻量表头探测（zip 内 XML 直读工作表尺寸与前 N 行）测试。"""
+from __future__ import annotations
+
+import json
+import re
+import zipfile
+from datetime import datetime, time, timedelta
+from pathlib import Path
+
+import pytest
+from openpyxl import Workbook, load_workbook
+
+from excelmanus.tools import _sheet_head
+from excelmanus.tools._sheet_head import read_sheet_heads, read_sheet_names
+from excelmanus.tools._sheet_probe import clear_probe_cache
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    clear_probe_cache()
+    yield
+    clear_probe_cache()
+
+
+@pytest.fixture()
+def workbook(tmp_path: Path) -> Path:
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "明细"
+    ws.append(["日期", "金额", "时长", "时间", "备注"])
+    ws.append([datetime(2024, 1, 2, 3, 4), 12.5, timedelta(hours=5), time(8, 30), "甲"])
+    ws.append([None, -3, None, None, True])
+    ws["A5"] = "跳行"
+    for i in range(100):
+        ws.append([f"r{i}", i])
+    other = wb.create_sheet("汇总")
+    other["C3"] = "x"
+    other["A1"] = "=1+1"
+    wb.create_sheet("空表")
+    fp = tmp_path / "data.xlsx"
+    wb.save(fp)
+    return fp
+
+
+def _openpyxl_heads(fp: Path, max_rows: int, max_cols: int) -> list[tuple]:
+    wb = load_workbook(fp, read_only=True, data_only=True)
+    try:
+        result = []
+        for ws in wb.worksheets:
+            total_rows, total_cols = ws.max_row or 0, ws.max_column or 0
+            rows = [
+                list(r)
+                for r in ws.iter_rows(
+                    min_row=1,
+                    max_row=min(max_rows, total_rows),
+                    min_col=1,
+                    max_col=min(max_cols, total_cols),
+                    values_only=True,
+                )
+            ]
+            result.append((ws.title, total_rows, total_cols, rows))
+        return result
+    finally:
+        wb.close()
+
+
+def _strip_dimensions(src: Path, dst: Path) -> Path:
+    """复制工作簿并删除所有工作表的 <dimension> 元素。"""
+    with zipfile.ZipFile(src) as zin, zipfile.ZipFile(dst, "w", zipfile.ZIP_DEFLATED) as zout:
+        for item in zin.infolist():
+            data = zin.read(item.filename)
+            if item.filename.startswith("xl/worksheets/"):
+                data = re.sub(rb"<dimension[^>]*/>", b"", data)
+            zout.writestr(item, data)
+    return dst
+
+
+class TestReadSheetHeads:
+    @pytest.mark.parametrize("max_rows,max_cols", [(5, 30), (3, 2), (10, 200)])
+    def test_matches_openpyxl(self, workbook: Path, max_rows: int, max_cols: int) -> None:
+        heads = read_sheet_heads(workbook, max_rows=max_rows, max_cols=max_cols)
+        assert [(h.name, h.max_row, h.max_column, h.rows) for h in heads] == _openpyxl_heads(
+            workbook, max_rows, max_cols,
+        )
+
+    def test_missing_dimension_scans_extent(self, workbook: Path, tmp_path: Path) -> None:
+        stripped = _strip_dimensions(workbook, tmp_path / "nodim.xlsx")
+        heads = read_sheet_heads(stripped, max_rows=2, max_cols=30)
+        assert [(h.name, h.max_row, h.max_column) for h in heads] == [
+            ("明细", 105, 5), ("汇总", 3, 3), ("空表", 0, 0),
+        ]
+        assert heads[0].rows[0] == ["日期", "金额", "时长", "时间", "备注"]
+
+    def test_does_not_open_openpyxl(self, workbook: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        def _fail(*args, **kwargs):
+            raise AssertionError("不应打开 openpyxl")
+
+        monkeypatch.setattr("openpyxl.load_workbook", _fail)
+        assert read_sheet_heads(workbook) is not None
+        assert read_sheet_names(workbook) == ["明细", "汇总", "空表"]
+
+    def test_shared_strings_read_lazily(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        import xlsxwriter
+
+        fp = tmp_path / "sst.xlsx"
+        book = xlsxwriter.Workbook(str(fp))
+        sheet = book.add_worksheet("数据")
+        sheet.write_row(0, 0, ["姓名", "部门"])
+        for i in range(1, 200):
+            sheet.write_row(i, 0, [f"员工{i}", f"部门{i}"])
+        book.close()
+
+        reads: list[int] = []
+        original = _sheet_head._read_shared_strings
+
+        def _tracking(zf, upto):
+            reads.append(upto)
+            strings = original(zf, upto)
+            assert len(strings) == upto + 1
+            return strings
+
+        monkeypatch.setattr(_sheet_head, "_read_shared_strings", _tracking)
+        heads = read_sheet_heads(fp, max_rows=2, max_cols=30)
+        assert heads[0].rows == [["姓名", "部门"], ["员工1", "部门1"]]
+        # 只解析前两行引用到的 4 个字符串，而非全部 400 个
+        assert reads == [3]
+
+    def test_non_xlsx_returns_none(self, tmp_path: Path) -> None:
+        fp = tmp_path / "a.xlsx"
+        fp.write_bytes(b"not a zip")
+        assert read_sheet_heads(fp) is None
+        assert read_sheet_names(fp) is None
+
+
+class TestCallers:
+    def test_file_registry_scan_uses_xml_heads(
+        self, workbook: Path, monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        from excelmanus.file_registry import FileRegistry
+
+        monkeypatch.setattr("openpyxl.load_workbook", lambda *a, **k: pytest.fail("不应打开 openpyxl"))
+        sheets = FileRegistry._scan_xlsx_sheets(workbook, 5)
+        assert sheets[0] == {
+            "name": "明细", "rows": 105, "columns": 5,
+            "headers": ["日期", "金额", "时长", "时间", "备注"],
+        }
+
+    def test_inspect_excel_files_uses_xml_heads(
+        self, workbook: Path, monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        from excelmanus.tools import data_tools
+
+        data_tools.init_guard(str(workbook.parent))
+        monkeypatch.setattr("openpyxl.load_workbook", lambda *a, **k: pytest.fail("不应打开 openpyxl"))
+        result = json.loads(data_tools.inspect_excel_files(".", search="汇总"))
+        assert result["excel_files_found"] == 1
+        sheet = result["files"][0]["sheets"][0]
+        assert (sheet["name"], sheet["rows"], sheet["columns"]) == ("明细", 105, 5)
+        assert sheet["header"] == ["日期", "金额", "时长", "时间", "备注"]
@@ -0,0 +1,116 @@
+"""工作表行数探测（zip 内 XML dimension / CSV 换行计数）测试。"""
+from __future__ import annotations
+
+import re
+import zipfile
+from pathlib import Path
+
+import pytest
+from openpyxl import Workbook, load_workbook
+
+from excelmanus.tools import _sheet_probe
+from excelmanus.tools._sheet_probe import clear_probe_cache, count_csv_rows, count_sheet_rows
+from excelmanus.tools.data_tools import _get_sheet_total_rows
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    clear_probe_cache()
+    yield
+    clear_probe_cache()
+
+
+@pytest.fixture()
+def workbook(tmp_path: Path) -> Path:
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "明细"
+    ws.append(["日期", "金额"])
+    for i in range(120):
+        ws.append([f"2024-01-{i % 28 + 1:02d}", i])
+    other = wb.create_sheet("备注")
+    other["C7"] = "x"
+    fp = tmp_path / "data.xlsx"
+    wb.save(fp)
+    return fp
+
+
+def _openpyxl_max_row(fp: Path, sheet: str | None) -> int:
+    wb = load_workbook(fp, read_only=True)
+    try:
+        ws = wb[sheet] if sheet and sheet in wb.sheetnames else wb.active
+        return ws.max_row or 0
+    finally:
+        wb.close()
+
+
+def _strip_dimensions(src: Path, dst: Path) -> Path:
+    """复制工作簿并删除所有工作表的 <dimension> 元素。"""
+    with zipfile.ZipFile(src) as zin, zipfile.ZipFile(dst, "w", zipfile.ZIP_DEFLATED) as zout:
+        for item in zin.infolist():
+            data = zin.read(item.filename)
+            if item.filename.startswith("xl/worksheets/"):
+                data = re.sub(rb"<dimension[^>]*/>", b"", data)
+            zout.writestr(item, data)
+    return dst
+
+
+class TestXlsx:
+    @pytest.mark.parametrize("sheet", [None, "明细", "备注", "不存在"])
+    def test_matches_openpyxl(self, workbook: Path, sheet) -> None:
+        assert count_sheet_rows(workbook, sheet) == _openpyxl_max_row(workbook, sheet)
+
+    def test_missing_dimension_scans_rows(self, workbook: Path, tmp_path: Path) -> None:
+        stripped = _strip_dimensions(workbook, tmp_path / "nodim.xlsx")
+        assert count_sheet_rows(stripped, "明细") == 121
+        assert count_sheet_rows(stripped, "备注") == 7
+
+    def test_does_not_open_openpyxl(self, workbook: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        def _fail(*args, **kwargs):
+            raise AssertionError("不应打开 openpyxl")
+
+        monkeypatch.setattr("openpyxl.load_workbook", _fail)
+        assert _get_sheet_total_rows(workbook, "明细") == 121
+
+    def test_cached_per_file_version(self, workbook: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        calls = []
+        original = _sheet_probe._probe_xlsx_rows
+
+        def _counting(*args):
+            calls.append(args)
+            return original(*args)
+
+        monkeypatch.setattr(_sheet_probe, "_probe_xlsx_rows", _counting)
+        count_sheet_rows(workbook, "明细")
+        count_sheet_rows(workbook, "明细")
+        assert len(calls) == 1
+
+        wb = load_workbook(workbook)
+        wb["明细"].append(["new", 1])
+        wb.save(workbook)
+        assert count_sheet_rows(workbook, "明细") == 122
+        assert len(calls) == 2
+
+    def test_non_zip_returns_none(self, tmp_path: Path) -> None:
+        fp = tmp_path / "fake.xlsx"
+        fp.write_bytes(b"not a zip")
+        assert count_sheet_rows(fp, None) is None
+
+
+class TestCsv:
+    @pytest.mark.parametrize(
+        "content,expected",
+        [
+            (b"a,b\n1,2\n3,4\n", 2),
+            (b"a,b\n1,2\n3,4", 2),
+            (b"a,b\r\n1,2\r\n", 1),
+            (b"a,b\r1,2\r3,4", 2),
+            (b"a,b\n", 0),
+            (b"", 0),
+        ],
+    )
+    def test_line_counts(self, tmp_path: Path, content: bytes, expected: int) -> None:
+        fp = tmp_path / "data.csv"
+        fp.write_bytes(content)
+        assert count_csv_rows(fp) == expected
+        assert _get_sheet_total_rows(fp, None) == expected
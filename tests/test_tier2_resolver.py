@@ -78,3 +78,54 @@ class TestTier2Resolver:
         d1 = resolver.resolve(str(chain_workbook), "Sheet1", "C2", direction="precedents", depth=1)
         d2 = resolver.resolve(str(chain_workbook), "Sheet1", "C2", direction="precedents", depth=2)
         assert len(d1.precedents) <= len(d2.precedents)
+
+
+@pytest.fixture()
+def range_workbook(tmp_path: Path) -> Path:
+    """Data!A1:A3 被 Summary!B1=SUM(Data!A1:A3) 以区域方式引用。"""
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Data"
+    ws["A1"] = 1
+    ws["A2"] = 2
+    ws["A3"] = 3
+    ws["B2"] = "=A2*10"
+    summary = wb.create_sheet("Summary")
+    summary["B1"] = "=SUM(Data!A1:A3)"
+    summary["B2"] = "=SUM(Data!A:A)"
+    fp = tmp_path / "ranges.xlsx"
+    wb.save(fp)
+    return fp
+
+
+class TestDependencyGraph:
+    def test_range_dependents(self, range_workbook: Path) -> None:
+        resolver = Tier2Resolver()
+        node = resolver.resolve(str(range_workbook), "Data", "A2", direction="dependents", depth=1)
+        deps = {(r.sheet_name, r.cell_or_range) for r in node.dependents}
+        assert deps == {(None, "B2"), ("Summary", "B1"), ("Summary", "B2")}
+
+    def test_outside_range_not_dependent(self, range_workbook: Path) -> None:
+        resolver = Tier2Resolver()
+        node = resolver.resolve(str(range_workbook), "Data", "A4", direction="dependents", depth=1)
+        deps = {(r.sheet_name, r.cell_or_range) for r in node.dependents}
+        assert deps == {("Summary", "B2")}
+
+    def test_graph_cached_by_content_hash(self, range_workbook: Path) -> None:
+        from excelmanus.reference_graph.cache import RefCache, reset_session_cache, set_session_cache
+
+        token = set_session_cache(RefCache())
+        try:
+            resolver = Tier2Resolver()
+            g1 = resolver.get_graph(str(range_workbook))
+            assert resolver.get_graph(str(range_workbook)) is g1
+
+            wb = Workbook()
+            wb.active.title = "Data"
+            wb.active["C1"] = "=A1"
+            wb.save(range_workbook)
+            g2 = resolver.get_graph(str(range_workbook))
+            assert g2 is not g1
+            assert g2.formula_at("Data", "C1") == "=A1"
+        finally:
+            reset_session_cache(token)
@@ -0,0 +1,128 @@
+"""进程级 token 计数缓存（token_cache）测试。"""
+from __future__ import annotations
+
+import pytest
+
+from excelmanus.memory import TokenCounter
+from excelmanus.token_cache import TokenCountCache, set_token_cache, stats_delta
+
+
+class _FakeEncoding:
+    """按空白切分计数，记录 encode / encode_batch 调用。"""
+
+    def __init__(self) -> None:
+        self.encoded: list[str] = []
+        self.batches: list[list[str]] = []
+
+    def encode(self, text: str) -> list[int]:
+        self.encoded.append(text)
+        return list(range(len(text.split())))
+
+    def encode_batch(self, texts: list[str]) -> list[list[int]]:
+        self.batches.append(list(texts))
+        return [list(range(len(t.split()))) for t in texts]
+
+    def decode(self, tokens: list[int]) -> str:
+        return " ".join("w" for _ in tokens)
+
+
+@pytest.fixture()
+def enc() -> _FakeEncoding:
+    return _FakeEncoding()
+
+
+@pytest.fixture()
+def cache(enc: _FakeEncoding) -> TokenCountCache:
+    c = TokenCountCache(4, encoding=enc)
+    set_token_cache(c)
+    yield c
+    set_token_cache(None)
+
+
+class TestTokenCountCache:
+    def test_repeat_count_hits_cache(self, cache: TokenCountCache, enc: _FakeEncoding) -> None:
+        assert cache.count("a b c") == 3
+        assert cache.count("a b c") == 3
+        assert enc.encoded == ["a b c"]
+        stats = cache.stats()
+        assert stats["hits"] == 1 and stats["misses"] == 1
+        assert stats["hit_ratio"] == 0.5
+
+    def test_empty_text_is_zero_without_lookup(self, cache: TokenCountCache) -> None:
+        assert cache.count("") == 0
+        assert cache.stats()["hits"] + cache.stats()["misses"] == 0
+
+    def test_batch_encodes_only_unique_misses(
+        self, cache: TokenCountCache, enc: _FakeEncoding,
+    ) -> None:
+        cache.count("x")
+        assert cache.count_batch(["x", "a b", "", "a b", "c d e"]) == [1, 2, 0, 2, 3]
+        assert enc.encoded == ["x", "a b", "c d e"]
+        assert enc.batches == []  # 小批量逐条 encode，不走 encode_batch
+
+    def test_large_batch_uses_encode_batch(
+        self, cache: TokenCountCache, enc: _FakeEncoding,
+    ) -> None:
+        texts = [f"{i} " + "w " * 5000 for i in range(8)]
+        assert cache.count_batch(texts) == [5001] * 8
+        assert enc.batches == [texts]
+        assert enc.encoded == []
+
+    def test_uncached_batch_skips_lru(
+        self, cache: TokenCountCache, enc: _FakeEncoding,
+    ) -> None:
+        assert cache.count_batch(["a b", "", "a b"], cache=False) == [2, 0, 2]
+        stats = cache.stats()
+        assert stats["entries"] == 0
+        assert stats["hits"] + stats["misses"] == 0
+
+    def test_lru_eviction(self, cache: TokenCountCache, enc: _FakeEncoding) -> None:
+        for text in ["a", "b", "c", "d"]:
+            cache.count(text)
+        cache.count("a")  # a 变为最近使用
+        cache.count("e")  # 淘汰 b
+        enc.encoded.clear()
+        cache.count("a")
+        cache.count("b")
+        assert enc.encoded == ["b"]
+        assert cache.stats()["evictions"] >= 1
+
+    def test_disabled_cache_still_counts(self, enc: _FakeEncoding) -> None:
+        cache = TokenCountCache(0, encoding=enc)
+        assert cache.count("a b") == 2
+        assert cache.count("a b") == 2
+        assert cache.stats()["entries"] == 0
+        assert len(enc.encoded) == 2
+
+    def test_stats_delta(self, cache: TokenCountCache) -> None:
+        before = cache.stats()
+        cache.count("a b")
+        cache.count("a b")
+        delta = stats_delta(before, cache.stats())
+        assert delta["hits"] == 1 and delta["misses"] == 1
+        assert delta["hit_ratio"] == 0.5
+
+
+class TestTokenCounterUsesSharedCache:
+    def test_count_message_batches_parts(
+        self, cache: TokenCountCache, enc: _FakeEncoding,
+    ) -> None:
+        msg = {
+            "role": "user",
+            "content": [
+                {"type": "text", "text": "hello world"},
+                {"type": "image_url", "image_url": {"url": "data:..."}},
+            ],
+        }
+        first = TokenCounter.count_message(msg)
+        assert TokenCounter.count_message(msg) == first
+        assert enc.encoded.count("hello world") == 1
+        assert cache.stats()["hits"] == 1
+
+    def test_count_message_does_not_cache_ids(
+        self, cache: TokenCountCache, enc: _FakeEncoding,
+    ) -> None:
+        msg = {"role": "user", "content": "hello world", "message_id": "abc123"}
+        assert TokenCounter.count_message(msg) == 4 + 1 + 2 + 1
+        stats = cache.stats()
+        assert stats["entries"] == 1  # 只缓存 content
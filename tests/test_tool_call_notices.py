@@ -11,6 +11,7 @@ P6: 失败引导增强 — failure_guidance retryable hint
 from __future__ import annotations
 
 import asyncio
+import json
 from unittest.mock import AsyncMock, MagicMock
 
 import pytest
@@ -217,6 +218,34 @@ class TestSafeModeChannelBypass:
         result = sse_event_to_sse(event, safe_mode=False, is_channel=False)
         assert result is not None
 
+    def test_tool_output_delta_filtered_in_safe_mode(self):
+        """safe_mode=True → tool_output_delta 对 Web 与渠道均过滤。"""
+        event = ToolCallEvent(
+            event_type=EventType.TOOL_OUTPUT_DELTA,
+            tool_call_id="tc1",
+            tool_name="run_code",
+            output_stream="stdout",
+            output_delta="row 1",
+        )
+        assert sse_event_to_sse(event, safe_mode=True, is_channel=False) is None
+        assert sse_event_to_sse(event, safe_mode=True, is_channel=True) is None
+
+    def test_tool_output_delta_payload(self):
+        """safe_mode=False → tool_output_delta 携带调用 ID、输出流与内容。"""
+        event = ToolCallEvent(
+            event_type=EventType.TOOL_OUTPUT_DELTA,
+            tool_call_id="tc1",
+            tool_name="run_code",
+            output_stream="stderr",
+            output_delta="x" * 5000,
+        )
+        result = sse_event_to_sse(event, safe_mode=False)
+        assert result is not None
+        assert result.startswith("event: tool_output_delta")
+        data = json.loads(result.split("data: ", 1)[1])
+        assert (data["tool_call_id"], data["tool_name"], data["stream"]) == ("tc1", "run_code", "stderr")
+        assert len(data["content"]) <= 4100
+
 
 # ══════════════════════════════════════════════════════════════
 # P2: 子代理事件处理
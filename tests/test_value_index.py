@@ -0,0 +1,209 @@
+"""单元格值倒排索引测试：索引查询结果须与全表扫描一致。"""
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+from openpyxl import Workbook
+
+from excelmanus.tools import data_tools
+from excelmanus.tools._value_index import (
+    FileValueIndex,
+    WorkspaceValueIndex,
+    _ResidentIndexes,
+    get_value_index,
+    lookup_file_index,
+    reset_value_indexes,
+)
+
+
+@pytest.fixture()
+def enabled(monkeypatch: pytest.MonkeyPatch, tmp_path_factory: pytest.TempPathFactory) -> None:
+    monkeypatch.setenv("EXCELMANUS_VALUE_INDEX_ENABLED", "1")
+    monkeypatch.setenv("EXCELMANUS_VALUE_INDEX_DIR", str(tmp_path_factory.mktemp("value_index")))
+    reset_value_indexes()
+
+
+@pytest.fixture()
+def workbook(tmp_path: Path) -> Path:
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "学生"
+    ws.append(["姓名", "班级", "成绩", "备注"])
+    for i in range(40):
+        ws.append([f"学生{i}", f"电子{i % 3 + 1}班", i * 2.5, None if i % 4 else "Apple Pie"])
+    ws.append(["张三", "电子一班", 100, "apple"])
+    other = wb.create_sheet("汇总")
+    other.append(["项目", "值"])
+    other.append(["电子1班人数", 14])
+    other.append(["APPLE", "x" * 300 + "apple"])
+    fp = tmp_path / "scores.xlsx"
+    wb.save(fp)
+    return fp
+
+
+def _search(fp: Path, query: str, mode: str, **kwargs) -> dict:
+    matcher = data_tools._build_search_matcher(query, mode, kwargs.pop("case_sensitive", False))
+    return data_tools._search_file_values(
+        fp,
+        matcher,
+        sheets=kwargs.get("sheets"),
+        columns=kwargs.get("columns"),
+        max_results=kwargs.get("max_results", 50),
+    )
+
+
+CASES = [
+    ("apple", "contains", {}),
+    ("apple", "contains", {"case_sensitive": True}),
+    ("学生1", "startswith", {}),
+    ("张三", "exact", {}),
+    ("电子一班", "fuzzy", {}),
+    ("电子1班", "contains", {"columns": ["班级"]}),
+    ("1", "contains", {"sheets": ["汇总"]}),
+    ("电子", "contains", {"max_results": 7}),
+    ("电子", "contains", {"max_results": 0}),
+    ("不存在的值", "contains", {}),
+    ("e", "contains", {}),
+]
+
+
+class TestIndexMatchesScan:
+    @pytest.mark.parametrize("query,mode,kwargs", CASES)
+    def test_same_result(self, workbook: Path, enabled: None, query, mode, kwargs) -> None:
+        expected = _search(workbook, query, mode, **dict(kwargs))
+        get_value_index(workbook.parent).build(workbook)
+        assert lookup_file_index(workbook) is not None
+        assert _search(workbook, query, mode, **dict(kwargs)) == expected
+
+    def test_index_used_instead_of_parsing(
+        self, workbook: Path, enabled: None, monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        get_value_index(workbook.parent).build(workbook)
+
+        def _fail(*args, **kwargs):
+            raise AssertionError("不应再解析 xlsx")
+
+        monkeypatch.setattr("openpyxl.load_workbook", _fail)
+        result = _search(workbook, "apple", "contains")
+        assert result["total_matches"] == 13
+
+    def test_regex_falls_back_to_scan(self, workbook: Path, enabled: None) -> None:
+        matcher = data_tools._build_search_matcher(r"^学生\d$", "regex", False)
+        assert matcher.required_substrings is None
+        get_value_index(workbook.parent).build(workbook)
+        result = _search(workbook, r"^学生\d$", "regex")
+        assert result["total_matches"] == 10
+
+
+class TestFreshness:
+    def test_rewritten_file_is_stale(self, workbook: Path, enabled: None) -> None:
+        get_value_index(workbook.parent).build(workbook)
+        wb = Workbook()
+        wb.active.append(["新内容"])
+        wb.save(workbook)
+        assert lookup_file_index(workbook) is None
+        assert _search(workbook, "新内容", "exact")["total_matches"] == 1
+
+    def test_disabled_returns_none(self, workbook: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setenv("EXCELMANUS_VALUE_INDEX_ENABLED", "0")
+        assert get_value_index(workbook.parent) is None
+        assert lookup_file_index(workbook) is None
+
+
+class TestPersistenceAndBudget:
+    def test_reloaded_from_disk_after_restart(
+        self, workbook: Path, enabled: None, monkeypatch: pytest.MonkeyPatch,
+        tmp_path_factory: pytest.TempPathFactory,
+    ) -> None:
+        from excelmanus.database import Database
+        from excelmanus.file_registry import FileRegistry
+
+        expected = _search(workbook, "apple", "contains")
+        get_value_index(workbook.parent).build(workbook)
+        reset_value_indexes()  # 模拟进程重启：内存索引清空
+        assert lookup_file_index(workbook) is None
+        db = Database(str(tmp_path_factory.mktemp("db") / "reg.db"))
+        FileRegistry(db, workbook.parent)
+
+        def _fail(*args, **kwargs):
+            raise AssertionError("不应再解析 xlsx")
+
+        monkeypatch.setattr("openpyxl.load_workbook", _fail)
+        assert lookup_file_index(workbook) is not None
+        assert _search(workbook, "apple", "contains") == expected
+
+    def test_disk_entry_ignored_after_rewrite(self, workbook: Path, enabled: None) -> None:
+        get_value_index(workbook.parent).build(workbook)
+        reset_value_indexes()
+        wb = Workbook()
+        wb.active.append(["新内容"])
+        wb.save(workbook)
+        assert lookup_file_index(workbook) is None
+
+    def test_roundtrip_preserves_lookup(self, workbook: Path) -> None:
+        index = FileValueIndex.build(str(workbook), _rows(workbook))
+        restored = FileValueIndex.from_dict(json.loads(json.dumps(index.to_dict())))
+        assert restored.values == index.values
+        assert restored.postings == index.postings
+        assert restored.grams == index.grams
+        assert restored.long_values == index.long_values
+
+    def test_resident_budget_evicts_lru(self, workbook: Path, tmp_path: Path) -> None:
+        other = tmp_path / "copy.xlsx"
+        other.write_bytes(workbook.read_bytes())
+        size = FileValueIndex.build(str(workbook), _rows(workbook)).estimated_bytes()
+        index = WorkspaceValueIndex(
+            tmp_path, resident=_ResidentIndexes(int(size * 1.5)), disk_max_bytes=0,
+        )
+        assert index.build(workbook) and index.build(other)
+        assert index.get(workbook) is None
+        assert index.get(other) is not None
+        assert index.stats()["evictions"] == 1
+
+
+def _rows(fp: Path) -> list:
+    from excelmanus.tools._value_index import _read_cell_rows
+
+    return _read_cell_rows(str(fp))
+
+
+class TestRegistryHooks:
+    def test_register_upload_schedules_build(self, workbook: Path, enabled: None) -> None:
+        from excelmanus.database import Database
+        from excelmanus.file_registry import FileRegistry
+
+        db = Database(str(workbook.parent / "reg.db"))
+        registry = FileRegistry(db, workbook.parent)
+        registry.register_upload("scores.xlsx", "scores.xlsx")
+        future = get_value_index(workbook.parent).schedule(workbook)
+        if future is not None:
+            future.result(timeout=30)
+        assert lookup_file_index(workbook) is not None
+
+        data_tools.init_guard(str(workbook.parent))
+        result = json.loads(data_tools.search_excel_values(file_path="scores.xlsx", query="张三"))
+        assert result["total_matches"] == 1
+
+        registry.mark_deleted("scores.xlsx")
+        assert lookup_file_index(workbook) is None
+
+    def test_scan_cache_hits_do_not_reschedule(
+        self, workbook: Path, enabled: None, monkeypatch: pytest.MonkeyPatch,
+        tmp_path_factory: pytest.TempPathFactory,
+    ) -> None:
+        from excelmanus.database import Database
+        from excelmanus.file_registry import FileRegistry
+
+        scheduled: list[str] = []
+        monkeypatch.setattr(
+            WorkspaceValueIndex, "schedule", lambda self, path: scheduled.append(str(path)),
+        )
+        db = Database(str(tmp_path_factory.mktemp("db") / "reg.db"))
+        registry = FileRegistry(db, workbook.parent)
+        registry.scan_workspace()
+        first = len(scheduled)
+        assert first == 1
+        registry.scan_workspace()
+        assert len(scheduled) == first
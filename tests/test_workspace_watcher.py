@@ -0,0 +1,173 @@
+"""工作区文件监听（WorkspaceWatcher）测试。"""
+from __future__ import annotations
+
+import gc
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from excelmanus import workspace_watcher as ww
+from excelmanus.workspace_watcher import (
+    ROOT_CHANGED,
+    WorkspaceWatcher,
+    get_workspace_watcher,
+    reset_workspace_watchers,
+)
+
+
+class _Collector:
+    def __init__(self) -> None:
+        self.batches: list[set[str]] = []
+        self._seen: set[str] = set()
+        self._cond = threading.Condition()
+
+    def on_changes(self, paths: set[str]) -> None:
+        with self._cond:
+            self.batches.append(paths)
+            self._seen |= paths
+            self._cond.notify_all()
+
+    def wait_for(self, expected: set[str], timeout: float = 5.0) -> set[str]:
+        """等待累计收到 expected 中的全部路径，返回并清空累计结果。"""
+        with self._cond:
+            assert self._cond.wait_for(lambda: expected <= self._seen, timeout), self._seen
+            seen, self._seen = self._seen, set()
+        return seen
+
+
+@pytest.fixture(autouse=True)
+def _reset_watchers():
+    yield
+    reset_workspace_watchers()
+
+
+def _poll_watcher(root: Path, **kwargs) -> WorkspaceWatcher:
+    kwargs.setdefault("debounce", 0.05)
+    kwargs.setdefault("poll_interval", 0.05)
+    return WorkspaceWatcher(root, backend="poll", **kwargs)
+
+
+def _wait_ready(watcher: WorkspaceWatcher) -> None:
+    deadline = time.monotonic() + 5
+    while not watcher.ready and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert watcher.ready
+
+
+class TestPollBackend:
+    def test_reports_created_modified_and_deleted_paths(self, tmp_path: Path) -> None:
+        (tmp_path / "keep.csv").write_text("a\n", encoding="utf-8")
+        watcher = _poll_watcher(tmp_path)
+        collector = _Collector()
+        watcher.subscribe(collector.on_changes)
+        assert watcher.start()
+        _wait_ready(watcher)
+        assert watcher.backend == "poll"
+
+        (tmp_path / "sub").mkdir()
+        (tmp_path / "sub" / "new.csv").write_text("x\n", encoding="utf-8")
+        assert collector.wait_for({"sub/new.csv"}) == {"sub/new.csv"}
+
+        (tmp_path / "keep.csv").unlink()
+        assert collector.wait_for({"keep.csv"}) == {"keep.csv"}
+        watcher.stop()
+        assert not watcher.running
+
+    def test_excluded_prefixes_are_ignored(self, tmp_path: Path) -> None:
+        watcher = _poll_watcher(tmp_path)
+        collector = _Collector()
+        watcher.subscribe(collector.on_changes)
+        watcher.start()
+        _wait_ready(watcher)
+        (tmp_path / ".git").mkdir()
+        (tmp_path / ".git" / "HEAD").write_text("ref", encoding="utf-8")
+        (tmp_path / "a.txt").write_text("a", encoding="utf-8")
+        assert collector.wait_for({"a.txt"}) == {"a.txt"}
+
+
+    def test_partial_snapshot_abandons_polling(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        monkeypatch.setattr(
+            ww, "collect_workspace_mtime_index", lambda root: ({}, True),
+        )
+        watcher = _poll_watcher(tmp_path)
+        collector = _Collector()
+        watcher.subscribe(collector.on_changes)
+        watcher.start()
+        assert collector.wait_for({ROOT_CHANGED}) == {ROOT_CHANGED}
+        deadline = time.monotonic() + 5
+        while watcher.running and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert not watcher.running
+        assert not watcher.ready
+
+
+class TestDebounce:
+    def test_burst_is_merged_into_one_batch(self, tmp_path: Path) -> None:
+        watcher = WorkspaceWatcher(tmp_path, backend="poll", debounce=0.2, poll_interval=60)
+        collector = _Collector()
+        watcher.subscribe(collector.on_changes)
+        watcher.start()
+        for i in range(20):
+            watcher.notify([str(tmp_path / f"f{i}.xlsx")])
+        expected = {f"f{i}.xlsx" for i in range(20)}
+        assert collector.wait_for(expected) == expected
+        assert len(collector.batches) == 1
+
+    def test_overflow_collapses_to_root(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(ww, "_MAX_PENDING", 5)
+        watcher = WorkspaceWatcher(tmp_path, backend="poll", debounce=0.05, poll_interval=60)
+        collector = _Collector()
+        watcher.subscribe(collector.on_changes)
+        watcher.start()
+        watcher.notify([f"f{i}.xlsx" for i in range(10)])
+        watcher.notify(["later.xlsx"])
+        assert collector.wait_for({ROOT_CHANGED}) == {ROOT_CHANGED}
+        assert watcher.stats()["overflows"] == 1
+
+    def test_paths_outside_root_are_dropped(self, tmp_path: Path) -> None:
+        watcher = WorkspaceWatcher(tmp_path / "ws", backend="poll")
+        (tmp_path / "ws").mkdir()
+        watcher.start()
+        watcher.notify([str(tmp_path / "other.xlsx"), "../x.xlsx"])
+        assert watcher.stats()["pending"] == 0
+
+
+class TestSharing:
+    def test_watchers_are_shared_per_root(self, tmp_path: Path) -> None:
+        assert get_workspace_watcher(tmp_path) is get_workspace_watcher(str(tmp_path) + "/")
+
+    def test_disabled_by_env(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setenv("EXCELMANUS_WORKSPACE_WATCH", "off")
+        assert get_workspace_watcher(tmp_path) is None
+
+    def test_auto_without_watchdog_does_not_poll(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        monkeypatch.setattr(ww, "_import_watchdog", lambda: None)
+        assert get_workspace_watcher(tmp_path) is None
+        watcher = WorkspaceWatcher(tmp_path, backend="auto")
+        watcher.subscribe(_Collector().on_changes)
+        assert watcher.start() is False
+        assert not watcher.running
+        assert watcher._thread is None
+
+    def test_stops_when_subscribers_are_collected(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        monkeypatch.setenv("EXCELMANUS_WORKSPACE_WATCH", "poll")
+        watcher = get_workspace_watcher(tmp_path)
+        watcher._poll_interval = 0.05
+        collector = _Collector()
+        watcher.subscribe(collector.on_changes)
+        watcher.start()
+        del collector
+        gc.collect()
+        deadline = time.monotonic() + 5
+        while watcher.running and time.monotonic() < deadline:
+            time.sleep(0.02)
+        assert not watcher.running
+        assert get_workspace_watcher(tmp_path) is not watcher
@@ -0,0 +1,136 @@
+"""run_code 前后 Excel 快照（zip part 指纹 + 流式解析）测试。"""
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+from openpyxl import Workbook, load_workbook
+from openpyxl.styles import Font, PatternFill
+
+from excelmanus.engine_core.tool_dispatcher import ToolDispatcher
+from excelmanus.tools import _xlsx_snapshot
+from excelmanus.tools._xlsx_snapshot import (
+    WorkbookSnapshot,
+    changed_sheets,
+    clear_snapshot_cache,
+    snapshot_workbook,
+)
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    clear_snapshot_cache()
+    yield
+    clear_snapshot_cache()
+
+
+@pytest.fixture()
+def workbook(tmp_path: Path) -> Path:
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "销售"
+    ws.append(["产品", "数量", "单价", "金额"])
+    for i in range(1, 21):
+        ws.append([f"P{i}", i, 1.5 * i, f"=B{i + 1}*C{i + 1}"])
+    ws["A1"].font = Font(bold=True, color="FF0000")
+    ws["B1"].fill = PatternFill("solid", fgColor="FFFF00")
+    ws["F3"] = True
+    ws.merge_cells("A23:D23")
+    ws["A23"] = "合计"
+    other = wb.create_sheet("备注")
+    other["B2"] = "说明"
+    other["C5"] = 3.25
+    fp = tmp_path / "data.xlsx"
+    wb.save(fp)
+    return fp
+
+
+def _edit(fp: Path, sheet: str, ref: str, value) -> None:
+    wb = load_workbook(fp)
+    wb[sheet][ref] = value
+    wb.save(fp)
+
+
+class TestSnapshotEquivalence:
+    def test_matches_openpyxl_snapshot(self, workbook: Path) -> None:
+        expected = ToolDispatcher._snapshot_excel_with_openpyxl(workbook)
+        snap = snapshot_workbook(workbook)
+        assert isinstance(snap, WorkbookSnapshot)
+        assert snap.materialize() == expected
+
+    def test_window_limits(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(_xlsx_snapshot, "MAX_ROWS", 3)
+        monkeypatch.setattr(_xlsx_snapshot, "MAX_COLS", 2)
+        wb = Workbook()
+        ws = wb.active
+        for r in range(1, 6):
+            ws.append([r, r * 10, r * 100])
+        fp = tmp_path / "w.xlsx"
+        wb.save(fp)
+        [(_, cells, _)] = snapshot_workbook(fp).materialize()
+        assert [c["cell"] for c in cells] == ["A1", "B1", "A2", "B2", "A3", "B3"]
+
+    def test_non_zip_returns_none(self, tmp_path: Path) -> None:
+        fp = tmp_path / "fake.xlsx"
+        fp.write_text("a,b\n1,2\n", encoding="utf-8")
+        assert snapshot_workbook(fp) is None
+
+
+class TestChangedSheets:
+    def test_same_content_reuses_snapshot(self, workbook: Path) -> None:
+        assert snapshot_workbook(workbook) is snapshot_workbook(workbook)
+
+    def test_only_modified_sheet_is_parsed(
+        self, workbook: Path, monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        before = snapshot_workbook(workbook)
+        _edit(workbook, "备注", "B2", "已更新")
+        after = snapshot_workbook(workbook)
+
+        parsed: list[str] = []
+        real_parse = _xlsx_snapshot._parse_sheet
+
+        def _spy(zf, part, ctx):
+            parsed.append(part)
+            return real_parse(zf, part, ctx)
+
+        monkeypatch.setattr(_xlsx_snapshot, "_parse_sheet", _spy)
+        pairs = changed_sheets(before, after)
+        # 重新保存会重写 sharedStrings，但字符串表变化时仍需比较所有工作表
+        assert "备注" in pairs
+        (b_cells, _), (a_cells, _) = pairs["备注"]
+        assert ("B2", "说明") in {(c["cell"], c["value"]) for c in b_cells}
+        assert ("B2", "已更新") in {(c["cell"], c["value"]) for c in a_cells}
+        assert len(parsed) == 2 * len(pairs)
+
+    def test_unchanged_parts_are_skipped(self, workbook: Path) -> None:
+        before = snapshot_workbook(workbook)
+        _edit(workbook, "备注", "C5", 4.5)  # 数值修改不影响共享字符串表
+        after = snapshot_workbook(workbook)
+        assert set(changed_sheets(before, after)) == {"备注"}
+
+
+class TestDispatcherDiff:
+    def test_diff_reports_modified_cell(self, workbook: Path) -> None:
+        root = str(workbook.parent)
+        before = ToolDispatcher._snapshot_excel_for_diff([workbook.name], root)
+        _edit(workbook, "备注", "C5", 4.5)
+        after = ToolDispatcher._snapshot_excel_for_diff([workbook.name], root)
+        diffs = ToolDispatcher._compute_snapshot_diffs(before, after)
+        assert [d["sheet"] for d in diffs] == ["备注"]
+        assert diffs[0]["file_path"] == workbook.name
+        assert any(c["cell"] == "C5" for c in diffs[0]["changes"])
+
+    def test_new_file_diff_from_tombstone(self, tmp_path: Path, workbook: Path) -> None:
+        root = str(tmp_path)
+        before = ToolDispatcher._snapshot_excel_for_diff(["new.xlsx"], root)
+        assert before == {"new.xlsx": []}
+        (tmp_path / "new.xlsx").write_bytes(workbook.read_bytes())
+        after = ToolDispatcher._snapshot_excel_for_diff(["new.xlsx"], root)
+        diffs = ToolDispatcher._compute_snapshot_diffs(before, after)
+        assert {d["sheet"] for d in diffs} == {"销售", "备注"}
+
+    def test_mixed_legacy_and_snapshot_inputs(self, workbook: Path) -> None:
+        legacy = ToolDispatcher._snapshot_excel_with_openpyxl(workbook)
+        snap = snapshot_workbook(workbook)
+        assert ToolDispatcher._compute_snapshot_diffs({"f": legacy}, {"f": snap}) == []
@@ -410,6 +410,20 @@ export function dispatchSSEEvent(event: SSEEvent, ctx: SSEHandlerContext): void
       break;
     }
 
+    // --- 工具执行中的增量输出（run_code stdout/stderr）---
+    case "tool_output_delta": {
+      const odToolCallId = (data.tool_call_id as string) || "";
+      const odContent = (data.content as string) || "";
+      const odLines = odContent.split("\n").filter((line) => line.trim());
+      if (odToolCallId && odLines.length > 0) {
+        S().setToolProgress(odToolCallId, {
+          stage: `output_${(data.stream as string) || "stdout"}`,
+          message: odLines[odLines.length - 1],
+        });
+      }
+      break;
+    }
+
     // --- 工具调用 ---
     case "tool_call_start": {
       S().setPipelineStatus(null);